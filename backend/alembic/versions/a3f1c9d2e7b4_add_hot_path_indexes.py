@@ -0,0 +1,48 @@
+"""Add indexes for hot lookup paths
+
+Revision ID: a3f1c9d2e7b4
+Revises: 6eb747c0acdc
+Create Date: 2026-10-19 09:12:44.512318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c9d2e7b4'
+down_revision: Union[str, Sequence[str], None] = '6eb747c0acdc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Library listing: ORDER BY created_at DESC, optional status filter
+    op.create_index('ix_videos_created_at_id', 'videos', ['created_at', 'id'], if_not_exists=True)
+    op.create_index('ix_videos_status_created_at', 'videos', ['status', 'created_at'], if_not_exists=True)
+
+    # Per-video lookups
+    op.create_index('ix_chat_messages_video_id_created_at', 'chat_messages', ['video_id', 'created_at'], if_not_exists=True)
+    op.create_index('ix_notes_video_id_timestamp', 'notes', ['video_id', 'timestamp'], if_not_exists=True)
+    op.create_index('ix_quizzes_video_id_created_at', 'quizzes', ['video_id', 'created_at'], if_not_exists=True)
+
+    # Latest attempt for a quiz
+    op.create_index(
+        'ix_quiz_attempts_quiz_id_created_at',
+        'quiz_attempts',
+        ['quiz_id', sa.text('created_at DESC')],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_quiz_attempts_quiz_id_created_at', table_name='quiz_attempts', if_exists=True)
+    op.drop_index('ix_quizzes_video_id_created_at', table_name='quizzes', if_exists=True)
+    op.drop_index('ix_notes_video_id_timestamp', table_name='notes', if_exists=True)
+    op.drop_index('ix_chat_messages_video_id_created_at', table_name='chat_messages', if_exists=True)
+    op.drop_index('ix_videos_status_created_at', table_name='videos', if_exists=True)
+    op.drop_index('ix_videos_created_at_id', table_name='videos', if_exists=True)
@@ -0,0 +1,98 @@
+"""Key the notes full-text index on an explicit notes.search_rowid
+
+Revision ID: a5d3e8c1f926
+Revises: f4b8d2c6e157
+Create Date: 2026-10-21 10:12:44.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5d3e8c1f926'
+down_revision: Union[str, Sequence[str], None] = 'f4b8d2c6e157'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copy of the notes part of app.models.fulltext, parameterised by the key column
+TOKENIZER = "unicode61 remove_diacritics 2"
+
+
+def _notes_fts_statements(key: str):
+    return (
+        f"""CREATE VIRTUAL TABLE notes_fts USING fts5(
+            content, video_id UNINDEXED, "timestamp" UNINDEXED,
+            content = 'notes', content_rowid = '{key}', tokenize = '{TOKENIZER}'
+        )""",
+        f"""CREATE TRIGGER notes_fts_insert AFTER INSERT ON notes BEGIN
+            INSERT INTO notes_fts(rowid, content, video_id, "timestamp")
+            VALUES (new.{key}, new.content, new.video_id, new."timestamp");
+        END""",
+        f"""CREATE TRIGGER notes_fts_delete AFTER DELETE ON notes BEGIN
+            INSERT INTO notes_fts(notes_fts, rowid, content, video_id, "timestamp")
+            VALUES ('delete', old.{key}, old.content, old.video_id, old."timestamp");
+        END""",
+        f"""CREATE TRIGGER notes_fts_update AFTER UPDATE ON notes BEGIN
+            INSERT INTO notes_fts(notes_fts, rowid, content, video_id, "timestamp")
+            VALUES ('delete', old.{key}, old.content, old.video_id, old."timestamp");
+            INSERT INTO notes_fts(rowid, content, video_id, "timestamp")
+            VALUES (new.{key}, new.content, new.video_id, new."timestamp");
+        END""",
+        "INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')",
+    )
+
+
+DROP_STATEMENTS = (
+    "DROP TRIGGER IF EXISTS notes_fts_insert",
+    "DROP TRIGGER IF EXISTS notes_fts_delete",
+    "DROP TRIGGER IF EXISTS notes_fts_update",
+    "DROP TABLE IF EXISTS notes_fts",
+)
+
+
+def _fts5_available(bind) -> bool:
+    if bind.dialect.name != 'sqlite':
+        return False
+    return 'ENABLE_FTS5' in {row[0] for row in bind.exec_driver_sql("PRAGMA compile_options")}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    fts5 = _fts5_available(bind)
+    if fts5:
+        for statement in DROP_STATEMENTS:
+            op.execute(statement)
+
+    # create_all may have made the column already (SQLite has no ADD COLUMN IF NOT EXISTS)
+    if 'search_rowid' not in {c['name'] for c in sa.inspect(bind).get_columns('notes')}:
+        op.add_column('notes', sa.Column('search_rowid', sa.Integer(), nullable=True))
+        # Today's rowids are unique, so they seed the explicit keys
+        op.execute("UPDATE notes SET search_rowid = rowid")
+        with op.batch_alter_table('notes') as batch:
+            batch.alter_column('search_rowid', existing_type=sa.Integer(), nullable=False)
+    if 'ix_notes_search_rowid' not in {i['name'] for i in sa.inspect(bind).get_indexes('notes')}:
+        op.create_index('ix_notes_search_rowid', 'notes', ['search_rowid'], unique=True)
+
+    if fts5:
+        for statement in _notes_fts_statements('search_rowid'):
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    fts5 = _fts5_available(bind)
+    if fts5:
+        for statement in DROP_STATEMENTS:
+            op.execute(statement)
+    op.drop_index('ix_notes_search_rowid', table_name='notes')
+    with op.batch_alter_table('notes') as batch:
+        batch.drop_column('search_rowid')
+    if fts5:
+        for statement in _notes_fts_statements('rowid'):
+            op.execute(statement)
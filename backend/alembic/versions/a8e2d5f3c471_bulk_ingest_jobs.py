@@ -0,0 +1,53 @@
+"""Bulk ingest jobs
+
+Revision ID: a8e2d5f3c471
+Revises: f1a7c3e9b250
+Create Date: 2026-10-19 20:12:37.508163
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8e2d5f3c471'
+down_revision: Union[str, Sequence[str], None] = 'f1a7c3e9b250'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'ingest_jobs',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_table(
+        'ingest_items',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('job_id', sa.String(36), sa.ForeignKey('ingest_jobs.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('line', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(20), nullable=False),
+        sa.Column('source', sa.Text(), nullable=True),
+        sa.Column('video_id', sa.String(36), sa.ForeignKey('videos.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_ingest_items_job_status_line', 'ingest_items', ['job_id', 'status', 'line'], if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_ingest_items_job_status_line', table_name='ingest_items', if_exists=True)
+    op.drop_table('ingest_items', if_exists=True)
+    op.drop_table('ingest_jobs', if_exists=True)
@@ -0,0 +1,104 @@
+"""Full-text (FTS5) index over transcript segments and notes
+
+Revision ID: b3c9e1f7d542
+Revises: a8e2d5f3c471
+Create Date: 2026-10-19 21:40:12.731904
+
+"""
+from typing import Sequence, Union
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3c9e1f7d542'
+down_revision: Union[str, Sequence[str], None] = 'a8e2d5f3c471'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copy of app.models.fulltext
+TOKENIZER = "unicode61 remove_diacritics 2"
+CREATE_STATEMENTS = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS transcript_fts USING fts5(
+        text, video_id UNINDEXED, seg_start UNINDEXED, seg_end UNINDEXED,
+        tokenize = '{TOKENIZER}'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS transcript_fts_delete AFTER DELETE ON transcript_segments BEGIN
+        DELETE FROM transcript_fts WHERE rowid = old.id;
+    END""",
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+        content, video_id UNINDEXED, "timestamp" UNINDEXED,
+        content = 'notes', content_rowid = 'rowid', tokenize = '{TOKENIZER}'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS notes_fts_insert AFTER INSERT ON notes BEGIN
+        INSERT INTO notes_fts(rowid, content, video_id, "timestamp")
+        VALUES (new.rowid, new.content, new.video_id, new."timestamp");
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS notes_fts_delete AFTER DELETE ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, content, video_id, "timestamp")
+        VALUES ('delete', old.rowid, old.content, old.video_id, old."timestamp");
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS notes_fts_update AFTER UPDATE ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, content, video_id, "timestamp")
+        VALUES ('delete', old.rowid, old.content, old.video_id, old."timestamp");
+        INSERT INTO notes_fts(rowid, content, video_id, "timestamp")
+        VALUES (new.rowid, new.content, new.video_id, new."timestamp");
+    END""",
+)
+
+
+def _fts5_available(bind) -> bool:
+    if bind.dialect.name != 'sqlite':
+        return False
+    return 'ENABLE_FTS5' in {row[0] for row in bind.exec_driver_sql("PRAGMA compile_options")}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if not _fts5_available(bind):
+        # Phrase/keyword search answers 501 without the index
+        return
+
+    for statement in CREATE_STATEMENTS:
+        op.execute(statement)
+
+    # Index existing transcripts (stored compressed, so decoded here) and notes
+    op.execute("DELETE FROM transcript_fts")
+    rows = bind.execute(sa.text(
+        'SELECT id, video_id, start, "end", data FROM transcript_segments'
+    ))
+    insert = sa.text(
+        "INSERT INTO transcript_fts(rowid, text, video_id, seg_start, seg_end) "
+        "VALUES (:id, :text, :video_id, :start, :end)"
+    )
+    batch = []
+    for segment_id, video_id, start, end, data in rows.fetchall():
+        batch.append({
+            'id': segment_id, 'video_id': video_id, 'start': start, 'end': end,
+            'text': zlib.decompress(data).decode('utf-8'),
+        })
+        if len(batch) >= 500:
+            bind.execute(insert, batch)
+            batch = []
+    if batch:
+        bind.execute(insert, batch)
+    op.execute("INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in (
+        "DROP TRIGGER IF EXISTS transcript_fts_delete",
+        "DROP TRIGGER IF EXISTS notes_fts_insert",
+        "DROP TRIGGER IF EXISTS notes_fts_delete",
+        "DROP TRIGGER IF EXISTS notes_fts_update",
+        "DROP TABLE IF EXISTS transcript_fts",
+        "DROP TABLE IF EXISTS notes_fts",
+    ):
+        op.execute(statement)
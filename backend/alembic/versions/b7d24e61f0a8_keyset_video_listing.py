@@ -0,0 +1,39 @@
+"""Keyset-friendly video listing index
+
+Revision ID: b7d24e61f0a8
+Revises: a3f1c9d2e7b4
+Create Date: 2026-10-19 10:03:17.204716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d24e61f0a8'
+down_revision: Union[str, Sequence[str], None] = 'a3f1c9d2e7b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Status listing orders by (created_at, id); include id to avoid a sort
+    op.drop_index('ix_videos_status_created_at', table_name='videos', if_exists=True)
+    op.create_index('ix_videos_status_created_at_id', 'videos', ['status', 'created_at', 'id'], if_not_exists=True)
+
+    # Rows written by server_default lack the microsecond part SQLAlchemy binds
+    # with on SQLite, which breaks equality in (created_at, id) cursors
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute(
+            "UPDATE videos SET created_at = created_at || '.000000' "
+            "WHERE length(created_at) = 19"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_videos_status_created_at_id', table_name='videos', if_exists=True)
+    op.create_index('ix_videos_status_created_at', 'videos', ['status', 'created_at'], if_not_exists=True)
@@ -0,0 +1,33 @@
+"""Record when each video was last indexed into an embedding space
+
+Revision ID: b7e2f9a4c318
+Revises: a5d3e8c1f926
+Create Date: 2026-10-21 16:05:31.442917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2f9a4c318'
+down_revision: Union[str, Sequence[str], None] = 'a5d3e8c1f926'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # create_all may have made the column already (SQLite has no ADD COLUMN IF NOT EXISTS)
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('video_embeddings')}
+    if 'indexed_at' not in columns:
+        op.add_column('video_embeddings', sa.Column('indexed_at', sa.DateTime(timezone=True), nullable=True))
+        op.execute("UPDATE video_embeddings SET indexed_at = created_at")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('video_embeddings') as batch:
+        batch.drop_column('indexed_at')
@@ -0,0 +1,101 @@
+"""Move transcripts into compressed, time-indexed segments
+
+Revision ID: c58e0b3a9d16
+Revises: b7d24e61f0a8
+Create Date: 2026-10-19 11:26:05.881930
+
+"""
+from typing import Sequence, Union
+import re
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c58e0b3a9d16'
+down_revision: Union[str, Sequence[str], None] = 'b7d24e61f0a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copy of app.services.transcript_store.build_segments
+WORDS_PER_SECOND = 2.5
+SEGMENT_WORDS = 150
+
+
+def _build_segments(text):
+    starts = [m.start() for m in re.finditer(r"\S+", text)]
+    for seq, i in enumerate(range(0, len(starts), SEGMENT_WORDS)):
+        begin = 0 if i == 0 else starts[i]
+        stop = starts[i + SEGMENT_WORDS] if i + SEGMENT_WORDS < len(starts) else len(text)
+        word_count = min(SEGMENT_WORDS, len(starts) - i)
+        yield seq, int(i / WORDS_PER_SECOND), int((i + word_count) / WORDS_PER_SECOND), text[begin:stop]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    segments = op.create_table(
+        'transcript_segments',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('video_id', sa.String(36), sa.ForeignKey('videos.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('seq', sa.Integer(), nullable=False),
+        sa.Column('start', sa.Integer(), nullable=False),
+        sa.Column('end', sa.Integer(), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_transcript_segments_video_id_start',
+        'transcript_segments',
+        ['video_id', 'start'],
+        if_not_exists=True,
+    )
+
+    bind = op.get_bind()
+    columns = {c['name'] for c in sa.inspect(bind).get_columns('videos')}
+    if 'transcript' not in columns:
+        return
+
+    # Backfill from the old column, then drop it
+    rows = bind.execute(sa.text(
+        "SELECT id, transcript FROM videos WHERE transcript IS NOT NULL"
+    ))
+    for video_id, transcript in rows.fetchall():
+        op.bulk_insert(segments, [
+            {
+                'video_id': video_id,
+                'seq': seq,
+                'start': start,
+                'end': end,
+                'data': zlib.compress(text.encode('utf-8'), 6),
+            }
+            for seq, start, end, text in _build_segments(transcript)
+        ])
+
+    with op.batch_alter_table('videos') as batch_op:
+        batch_op.drop_column('transcript')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('videos') as batch_op:
+        batch_op.add_column(sa.Column('transcript', sa.Text(), nullable=True))
+
+    bind = op.get_bind()
+    transcripts = {}
+    rows = bind.execute(sa.text(
+        "SELECT video_id, data FROM transcript_segments ORDER BY video_id, seq"
+    ))
+    for video_id, data in rows:
+        transcripts.setdefault(video_id, []).append(zlib.decompress(data).decode('utf-8'))
+
+    for video_id, parts in transcripts.items():
+        bind.execute(
+            sa.text("UPDATE videos SET transcript = :transcript WHERE id = :id"),
+            {"transcript": "".join(parts), "id": video_id},
+        )
+
+    op.drop_index('ix_transcript_segments_video_id_start', table_name='transcript_segments')
+    op.drop_table('transcript_segments')
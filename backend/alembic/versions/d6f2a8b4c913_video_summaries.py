@@ -0,0 +1,45 @@
+"""Video summary tree (section -> chapter -> video)
+
+Revision ID: d6f2a8b4c913
+Revises: b3c9e1f7d542
+Create Date: 2026-10-19 22:31:48.215406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6f2a8b4c913'
+down_revision: Union[str, Sequence[str], None] = 'b3c9e1f7d542'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'video_summaries',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('video_id', sa.String(36), sa.ForeignKey('videos.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('level', sa.String(10), nullable=False),
+        sa.Column('seq', sa.Integer(), nullable=False),
+        sa.Column('parent_seq', sa.Integer(), nullable=True),
+        sa.Column('start', sa.Integer(), nullable=False),
+        sa.Column('end', sa.Integer(), nullable=False),
+        sa.Column('heading', sa.String(200), nullable=False),
+        sa.Column('summary', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_video_summaries_video_id_level_seq', 'video_summaries', ['video_id', 'level', 'seq'], if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_video_summaries_video_id_level_seq', table_name='video_summaries', if_exists=True)
+    op.drop_table('video_summaries', if_exists=True)
@@ -0,0 +1,43 @@
+"""Keyset-friendly chat history index
+
+Revision ID: d902f4c7a1e3
+Revises: c58e0b3a9d16
+Create Date: 2026-10-19 12:40:51.337402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd902f4c7a1e3'
+down_revision: Union[str, Sequence[str], None] = 'c58e0b3a9d16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # History pages order by (created_at, id); include id to avoid a sort
+    op.drop_index('ix_chat_messages_video_id_created_at', table_name='chat_messages', if_exists=True)
+    op.create_index(
+        'ix_chat_messages_video_id_created_at_id',
+        'chat_messages',
+        ['video_id', 'created_at', 'id'],
+        if_not_exists=True,
+    )
+
+    # See b7d24e61f0a8: align legacy SQLite timestamps with bound cursor values
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute(
+            "UPDATE chat_messages SET created_at = created_at || '.000000' "
+            "WHERE length(created_at) = 19"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_chat_messages_video_id_created_at_id', table_name='chat_messages', if_exists=True)
+    op.create_index('ix_chat_messages_video_id_created_at', 'chat_messages', ['video_id', 'created_at'], if_not_exists=True)
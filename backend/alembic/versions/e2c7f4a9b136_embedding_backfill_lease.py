@@ -0,0 +1,35 @@
+"""Lease columns so one worker at a time backfills an embedding space
+
+Revision ID: e2c7f4a9b136
+Revises: d6f2a8b4c913
+Create Date: 2026-10-20 10:12:44.508127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c7f4a9b136'
+down_revision: Union[str, Sequence[str], None] = 'd6f2a8b4c913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # create_all may have made the columns already (SQLite has no ADD COLUMN IF NOT EXISTS)
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('embedding_spaces')}
+    if 'lease_owner' not in columns:
+        op.add_column('embedding_spaces', sa.Column('lease_owner', sa.String(100), nullable=True))
+    if 'lease_heartbeat' not in columns:
+        op.add_column('embedding_spaces', sa.Column('lease_heartbeat', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('embedding_spaces') as batch:
+        batch.drop_column('lease_heartbeat')
+        batch.drop_column('lease_owner')
@@ -0,0 +1,43 @@
+"""Token and cost usage ledger
+
+Revision ID: e4b61a7d2c90
+Revises: d902f4c7a1e3
+Create Date: 2026-10-19 15:02:17.604118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b61a7d2c90'
+down_revision: Union[str, Sequence[str], None] = 'd902f4c7a1e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'usage_ledger',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('route', sa.String(120), nullable=False),
+        sa.Column('video_id', sa.String(36), nullable=False),
+        sa.Column('kind', sa.String(20), nullable=False),
+        sa.Column('provider', sa.String(20), nullable=False),
+        sa.Column('model', sa.String(80), nullable=False),
+        sa.Column('calls', sa.Integer(), nullable=False),
+        sa.Column('prompt_tokens', sa.Integer(), nullable=False),
+        sa.Column('completion_tokens', sa.Integer(), nullable=False),
+        sa.Column('cost_usd', sa.Float(), nullable=False),
+        sa.UniqueConstraint('day', 'route', 'video_id', 'kind', 'provider', 'model', name='uq_usage_ledger_key'),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('usage_ledger', if_exists=True)
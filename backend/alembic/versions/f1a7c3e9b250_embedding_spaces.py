@@ -0,0 +1,46 @@
+"""Versioned embedding spaces
+
+Revision ID: f1a7c3e9b250
+Revises: e4b61a7d2c90
+Create Date: 2026-10-19 18:41:09.215734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a7c3e9b250'
+down_revision: Union[str, Sequence[str], None] = 'e4b61a7d2c90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'embedding_spaces',
+        sa.Column('name', sa.String(120), primary_key=True),
+        sa.Column('provider', sa.String(20), nullable=False),
+        sa.Column('model', sa.String(80), nullable=False),
+        sa.Column('state', sa.String(20), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('activated_at', sa.DateTime(timezone=True), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_table(
+        'video_embeddings',
+        sa.Column('video_id', sa.String(36), sa.ForeignKey('videos.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('space', sa.String(120), primary_key=True),
+        sa.Column('chunks', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('video_embeddings', if_exists=True)
+    op.drop_table('embedding_spaces', if_exists=True)
@@ -0,0 +1,35 @@
+"""Lease columns so one worker at a time runs a bulk ingest job
+
+Revision ID: f4b8d2c6e157
+Revises: e2c7f4a9b136
+Create Date: 2026-10-20 14:37:05.221690
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b8d2c6e157'
+down_revision: Union[str, Sequence[str], None] = 'e2c7f4a9b136'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # create_all may have made the columns already (SQLite has no ADD COLUMN IF NOT EXISTS)
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('ingest_jobs')}
+    if 'lease_owner' not in columns:
+        op.add_column('ingest_jobs', sa.Column('lease_owner', sa.String(100), nullable=True))
+    if 'lease_heartbeat' not in columns:
+        op.add_column('ingest_jobs', sa.Column('lease_heartbeat', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('ingest_jobs') as batch:
+        batch.drop_column('lease_heartbeat')
+        batch.drop_column('lease_owner')
@@ -0,0 +1,112 @@
+"""
+Bulk Ingest
+Backfill a catalogue from an NDJSON manifest in this process, printing
+progress as it goes. Interrupt it at any point; --resume continues the
+job with the items that are still pending.
+
+Usage (from backend/):
+    python -m app.bulk_ingest manifest.ndjson [--workers 8] [--batch-size 100]
+    python -m app.bulk_ingest --resume JOB_ID [--retry-failed]
+    python -m app.bulk_ingest --status JOB_ID
+
+Manifest lines: {"url": ...}, {"file": ...} or {"transcript": ...}, each
+with an optional "title".
+"""
+from typing import Optional
+import argparse
+import asyncio
+import logging
+import sys
+
+import orjson
+
+from .config import get_settings
+from .database import SessionLocal
+from .startup import init_resources
+from .services.bulk_ingest import (
+    ManifestError, create_job, job_progress, parse_manifest, retry_failed, run_job
+)
+from .services.usage import usage_meter
+
+
+def _format(progress: dict) -> str:
+    finished = progress["done"] + progress["failed"] + progress["skipped"]
+    return (
+        f"{finished}/{progress['total']} "
+        f"(done {progress['done']}, failed {progress['failed']}, skipped {progress['skipped']})"
+    )
+
+
+async def _run(job_id: str, workers: Optional[int], batch_size: Optional[int], interval: float) -> Optional[dict]:
+    runner = asyncio.create_task(run_job(job_id, workers=workers, batch_size=batch_size))
+    while not runner.done():
+        await asyncio.wait([runner], timeout=interval)
+        db = SessionLocal()
+        try:
+            print(f"[{job_id}] {_format(job_progress(db, job_id))}", flush=True)
+        finally:
+            db.close()
+    return runner.result()
+
+
+def main(argv: Optional[list] = None):
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Bulk-ingest videos from an NDJSON manifest")
+    parser.add_argument("manifest", nargs="?", help="NDJSON file, or - for stdin")
+    parser.add_argument("--resume", metavar="JOB_ID", help="continue an interrupted job")
+    parser.add_argument("--retry-failed", action="store_true", help="with --resume, also retry failed items")
+    parser.add_argument("--status", metavar="JOB_ID", help="print a job's progress and exit")
+    parser.add_argument("--workers", type=int, default=settings.bulk_ingest_workers,
+                        help="transcripts prepared concurrently")
+    parser.add_argument("--batch-size", type=int, help="texts per embedding call (default: the provider's limit)")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between progress lines")
+    args = parser.parse_args(argv)
+    if sum(bool(x) for x in (args.manifest, args.resume, args.status)) != 1:
+        parser.error("give a manifest, --resume JOB_ID or --status JOB_ID")
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    init_resources(settings)
+
+    db = SessionLocal()
+    try:
+        job_id = args.resume or args.status
+        if job_id:
+            if job_progress(db, job_id) is None:
+                print(f"No ingest job {job_id}", file=sys.stderr)
+                return 1
+            if args.status:
+                print(orjson.dumps(job_progress(db, job_id), option=orjson.OPT_INDENT_2).decode())
+                return 0
+            if args.retry_failed:
+                retry_failed(db, job_id)
+        else:
+            stream = sys.stdin.buffer if args.manifest == "-" else open(args.manifest, "rb")
+            try:
+                # Command-line manifests may reference files anywhere on this machine
+                entries = parse_manifest(stream, max_items=sys.maxsize)
+            except ManifestError as e:
+                print(e, file=sys.stderr)
+                return 1
+            finally:
+                stream.close()
+            job_id = create_job(db, entries).id
+            print(f"Created ingest job {job_id} with {len(entries)} items (resume with --resume {job_id})")
+    finally:
+        db.close()
+
+    try:
+        progress = asyncio.run(_run(job_id, args.workers, args.batch_size, args.interval))
+    except KeyboardInterrupt:
+        print(f"Interrupted; continue with --resume {job_id}", file=sys.stderr)
+        return 130
+    finally:
+        usage_meter.flush()
+    if progress is None:
+        print(f"Ingest job {job_id} is already running in another worker", file=sys.stderr)
+        return 1
+    print(f"Finished: {_format(progress)}")
+    return 0 if progress["failed"] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
-import os
+from typing import Optional
 
 
 class Settings(BaseSettings):
@@ -13,21 +13,118 @@ class Settings(BaseSettings):
     
     # Vector DB
     chroma_persist_dir: str = "./chroma_db"
+    # Empty: each worker opens Chroma itself. Otherwise the URL of the shared
+    # vector service (python -m app.vector_service), e.g.
+    # unix:///tmp/videorag-vectors.sock or http://127.0.0.1:8765
+    vector_store_url: str = ""
+    vector_store_timeout: float = 10.0  # seconds
+    # Collection layout: "bucket" (videos hashed into vector_shard_buckets
+    # collections), "video" (one per video; cross-video search then costs a
+    # query per video) or "none" (a single collection)
+    vector_shard_mode: str = "bucket"
+    vector_shard_buckets: int = 16
+    # Threads a cross-video search queries the shards on
+    vector_fanout_workers: int = 4
+    # After an embedding model change, re-embed existing videos into the new
+    # space in the background at this pace (one worker at a time, under a
+    # lease on the target space; or with python -m app.embedding_migration backfill)
+    embedding_backfill_enabled: bool = True
+    embedding_backfill_videos_per_minute: float = 6.0
+    # Bulk ingest (POST /api/ingest, python -m app.bulk_ingest): transcripts
+    # prepared concurrently; chunks of several videos share each embedding call
+    bulk_ingest_workers: int = 4
+    bulk_ingest_max_items: int = 10000
+    bulk_ingest_max_bytes: int = 64 * 1024 * 1024  # POST /api/ingest body
+    # Search autocomplete: in-memory prefix index over titles, transcript
+    # phrases and past queries, snapshotted to this file (empty: memory
+    # only) and merged with other workers' changes every interval
+    suggestions_snapshot_path: str = "./suggestions.json"
+    suggestions_sync_interval: float = 30.0  # seconds
+    
+    # Summary tree built at ingest (one LLM call per ~10 minute section,
+    # plus chapters and the video) for answering overview questions
+    summaries_enabled: bool = True
     
     # AI Services
     openai_api_key: str = ""
     google_api_key: str = ""
     
-    # Which LLM to use: "openai" or "google"
+    # Preferred LLM: "openai" or "google" (the other is the failover),
+    # or "fake" for a deterministic offline provider
     llm_provider: str = "google"
     
+    # Embedding model, independent of the preferred LLM: "google", "openai"
+    # or "fake" (unset = the first provider with an API key), and its model
+    # (empty = that provider's default). Changing either starts an
+    # embedding space migration.
+    embedding_provider: Optional[str] = None
+    embedding_model: str = ""
+    
+    # LLM routing: per-call timeout, retries with jittered backoff,
+    # circuit breaking and optional hedging to the second provider
+    llm_timeout: float = 30.0  # seconds
+    llm_max_retries: int = 2
+    llm_backoff_base: float = 0.5  # seconds
+    llm_hedge_enabled: bool = False
+    llm_hedge_min_delay: float = 0.5  # seconds; hedge after max(this, primary p95)
+    llm_circuit_failure_threshold: int = 5
+    llm_circuit_reset_timeout: float = 30.0  # seconds
+    fake_provider_latency: float = 0.0  # seconds, for llm_provider="fake"
+    
+    # Admission control: provider slots shared by priority lanes
+    # (interactive > quiz > background); full lane queues answer 429
+    llm_concurrency: int = 8
+    lane_interactive_queue: int = 32
+    lane_quiz_queue: int = 8
+    lane_quiz_concurrency: int = 4
+    lane_background_queue: int = 1000
+    lane_background_concurrency: int = 2
+    
+    # Semantic answer cache for chat (cosine similarity of question embeddings)
+    answer_cache_threshold: float = 0.92
+    answer_cache_ttl: int = 3600  # seconds
+    answer_cache_max_entries: int = 256  # per video
+    
     # File Storage
     upload_dir: str = "./uploads"
     max_file_size: int = 500 * 1024 * 1024  # 500MB
     
+    # Responses at least this large (bytes) are gzip/brotli compressed
+    compression_min_size: int = 1024
+    
+    # Prometheus metrics at /metrics. Per-statement SQL histograms come from
+    # tracing spans, so enabling them turns on the tracing SDK (a span per
+    # stage and statement) even with no exporter
+    metrics_enabled: bool = True
+    metrics_sql_enabled: bool = False
+    
+    # Token/cost ledger: buffered usage is written this often (seconds)
+    usage_flush_interval: float = 10.0
+    
+    # Open the vector store, provider SDKs and tokenizer in the background
+    # right after startup instead of on the first request
+    warmup_on_startup: bool = True
+    
+    # Admin-only profiling (X-Profile header, /api/admin/memory/*); off by default
+    profiling_enabled: bool = False
+    admin_token: str = ""  # sent as X-Admin-Token; profiling stays locked while empty
+    
+    # Tracing: "none", "console", "file" (JSON lines) or "otlp"
+    tracing_exporter: str = "none"
+    tracing_file: str = "./traces.jsonl"
+    otlp_endpoint: str = ""  # e.g. http://localhost:4317; empty uses the OTLP default
+    
     # Redis
     redis_url: str = "redis://localhost:6379"
     
+    # Rate limiting: cost-weighted token bucket per client, shared by all
+    # workers through a SQLite file, or Redis (needs the redis package)
+    rate_limit_enabled: bool = True
+    rate_limit_backend: str = "sqlite"  # "sqlite" or "redis"
+    rate_limit_sqlite_path: str = "./ratelimit.db"
+    rate_limit_capacity: int = 200  # tokens; a plain GET costs 1, chat 10
+    rate_limit_refill_per_second: float = 200 / 60
+    
     class Config:
         env_file = ".env"
         extra = "ignore"
@@ -37,8 +134,3 @@ class Settings(BaseSettings):
 def get_settings() -> Settings:
     return Settings()
 
-
-# Create upload directory if it doesn't exist
-settings = get_settings()
-os.makedirs(settings.upload_dir, exist_ok=True)
-os.makedirs(settings.chroma_persist_dir, exist_ok=True)
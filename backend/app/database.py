@@ -1,3 +1,4 @@
+from datetime import datetime, timezone
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -18,6 +19,11 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def utcnow() -> datetime:
+    """Timezone-aware current time, used for client-side timestamp defaults"""
+    return datetime.now(timezone.utc)
+
+
 # Dependency to get DB session
 def get_db():
     db = SessionLocal()
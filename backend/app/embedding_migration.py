@@ -0,0 +1,57 @@
+"""
+Embedding Migration
+Inspect and finish a change of embedding model: the new model's space is
+registered (as the target) by the next startup, or by any command here.
+
+Usage (from backend/):
+    python -m app.embedding_migration status
+    python -m app.embedding_migration backfill [--rate 30]
+    python -m app.embedding_migration cutover [--force] [--drop-old]
+"""
+from typing import Optional
+import argparse
+import asyncio
+import logging
+import sys
+
+import orjson
+
+from .config import get_settings
+from .startup import init_resources
+from .services.embedding_spaces import embedding_spaces, run_backfill
+
+
+def main(argv: Optional[list] = None):
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Re-embed videos after an embedding model change")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="show the active and target spaces and progress")
+    backfill = commands.add_parser("backfill", help="re-embed every pending video into the target space")
+    backfill.add_argument(
+        "--rate", type=float, default=settings.embedding_backfill_videos_per_minute, help="videos per minute"
+    )
+    cutover = commands.add_parser("cutover", help="make the target space active")
+    cutover.add_argument("--force", action="store_true", help="even if some videos are not re-embedded yet")
+    cutover.add_argument("--drop-old", action="store_true", help="delete the retired space's vectors")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    init_resources(settings)
+
+    if args.command == "backfill":
+        done = asyncio.run(run_backfill(embedding_spaces, args.rate))
+        print(f"Re-embedded {done} videos")
+    elif args.command == "cutover":
+        try:
+            result = embedding_spaces.cutover(force=args.force, drop_old=args.drop_old)
+        except ValueError as exc:
+            print(exc, file=sys.stderr)
+            return 1
+        print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
+    else:
+        print(orjson.dumps(embedding_spaces.status(), option=orjson.OPT_INDENT_2).decode())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,36 +1,104 @@
+from contextlib import asynccontextmanager
+import asyncio
+import logging
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from fastapi.exceptions import RequestValidationError
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
+from prometheus_client import CONTENT_TYPE_LATEST
 
 from .config import get_settings
-from .database import engine, Base
-from .routers import videos_router, chat_router, quiz_router, search_router, notes_router
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
+from .database import SessionLocal, engine
+from .routers import (
+    videos_router, chat_router, quiz_router, search_router, notes_router, usage_router, admin_router,
+    ingest_router,
+)
+from .utils.compression import CompressionMiddleware
+from .utils.rate_limit import RateLimitMiddleware, build_backend
+from .telemetry import TracingMiddleware, instrument_sqlalchemy, setup_tracing, shutdown_tracing
+from .metrics import MetricsMiddleware, SQLMetricsProcessor, render, setup_metrics, shutdown_metrics
+from .profiling import ProfilingMiddleware
+from .services.embedding_spaces import embedding_spaces, run_backfill
+from .services.scheduler import LaneSaturated
+from .services.suggestions import suggestion_index
+from .services.usage import UsageScopeMiddleware, usage_meter
+from .startup import init_resources, warm_up, warmup_status
 
 # Get settings
 settings = get_settings()
 
-# Initialize rate limiter
-limiter = Limiter(key_func=get_remote_address, default_limits=["100/minute"])
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Logging, tracing, metrics, directories and tables are set up here, not
+    # at import, so importing the app (tests, worker forks, tooling) stays
+    # cheap and leaves no global state or files behind
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    # Tracing (exported only if TRACING_EXPORTER is set); SQL metrics, if
+    # enabled, are derived from the same spans
+    sql_metrics = settings.metrics_enabled and settings.metrics_sql_enabled
+    tracer_provider = setup_tracing(settings, processors=[SQLMetricsProcessor()] if sql_metrics else [])
+    instrument_sqlalchemy(engine)
+    if settings.metrics_enabled:
+        setup_metrics(engine)
+    init_resources(settings)
+    if settings.warmup_on_startup:
+        # Not awaited: the worker accepts requests while this runs
+        asyncio.get_running_loop().run_in_executor(None, warm_up)
+    backfill = None
+    if settings.embedding_backfill_enabled and embedding_spaces.target:
+        backfill = asyncio.create_task(
+            run_backfill(embedding_spaces, settings.embedding_backfill_videos_per_minute)
+        )
+    # Autocomplete: load the snapshot (or build it from the database), then
+    # keep it in sync with other workers
+    suggestions = asyncio.create_task(
+        suggestion_index.run(SessionLocal, settings.suggestions_sync_interval)
+    )
+    # Token usage is written on an interval, even while no calls come in
+    usage = asyncio.create_task(usage_meter.run())
+    yield
+    if backfill:
+        backfill.cancel()
+    # Cancelling saves this worker's unsynced changes and buffered token usage
+    suggestions.cancel()
+    usage.cancel()
+    await asyncio.gather(suggestions, usage, return_exceptions=True)
+    shutdown_metrics()
+    shutdown_tracing(tracer_provider)
+
 
 # Create FastAPI app
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.app_name,
     description="Backend API for Video-RAG application",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
-# Add rate limiter to app state
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+# Per-request CPU profiles for admins; not installed unless enabled
+if settings.profiling_enabled:
+    app.add_middleware(ProfilingMiddleware, admin_token=settings.admin_token)
+
+# Cost-weighted rate limiting, shared across workers. Added before CORS so
+# 429 responses still carry CORS headers and the browser can read Retry-After.
+# The bucket store is opened on the first request.
+if settings.rate_limit_enabled:
+    app.add_middleware(
+        RateLimitMiddleware,
+        backend=build_backend(settings),
+        capacity=settings.rate_limit_capacity,
+        refill_per_second=settings.rate_limit_refill_per_second,
+    )
 
 # CORS middleware - allow frontend
 app.add_middleware(
@@ -45,14 +113,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Retry-After", "X-RateLimit-Limit", "X-RateLimit-Remaining"],
 )
 
+# Compress large responses (transcripts, search results, history)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_min_size)
+
+# Attribute provider token usage to the request's route
+app.add_middleware(UsageScopeMiddleware)
+
+# Root span and latency histogram per request; added last so they wrap
+# every other middleware
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
+
 # Include routers
 app.include_router(videos_router, prefix="/api")
 app.include_router(chat_router, prefix="/api")
 app.include_router(quiz_router, prefix="/api")
 app.include_router(search_router, prefix="/api")
 app.include_router(notes_router, prefix="/api")
+app.include_router(usage_router, prefix="/api")
+app.include_router(admin_router, prefix="/api")
+app.include_router(ingest_router, prefix="/api")
 
 
 # ============================================
@@ -72,11 +156,23 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
+@app.exception_handler(LaneSaturated)
+async def lane_saturated_handler(request: Request, exc: LaneSaturated):
+    """Shed load early when an LLM lane's queue is full"""
+    return JSONResponse(
+        status_code=429,
+        content={
+            "error": "Too Many Requests",
+            "message": f"The {exc.lane} queue is full, please retry shortly"
+        },
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Catch-all exception handler for unexpected errors"""
-    # Log the error (in production, use proper logging)
-    print(f"Unhandled exception: {exc}")
+    logger.exception("Unhandled exception on %s %s", request.method, request.url.path, exc_info=exc)
     
     # Don't expose internal details in production
     if settings.debug:
@@ -104,5 +200,11 @@ def root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
+    return {"status": "healthy", "warmup": warmup_status["state"]}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(render(), media_type=CONTENT_TYPE_LATEST)
 
@@ -0,0 +1,207 @@
+"""
+Metrics
+Prometheus metrics served at /metrics. Request latency comes from an ASGI
+middleware; pipeline stages, provider calls, embedding batches and vector
+queries are recorded where they run; SQL statement timings are derived from
+the tracing spans (when enabled, as they need the tracing SDK); queue
+depths, pool usage and cache counters are read from live objects at scrape. With PROMETHEUS_MULTIPROC_DIR
+set, every worker writes its samples there and a scrape merges them.
+"""
+from contextlib import contextmanager
+from typing import Iterator, List
+import os
+import time
+
+from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor
+from opentelemetry.trace import Span
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .telemetry import tracer
+
+registry = CollectorRegistry()
+# Read by prometheus_client when the metrics below are created, so it must
+# be in the environment before the app is imported
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR", "")
+_runtime_collectors: List["RuntimeCollector"] = []
+
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"], registry=registry,
+)
+stage_duration = Histogram(
+    "stage_duration_seconds", "Pipeline stage latency (one series per span name)",
+    ["stage"], buckets=LLM_BUCKETS, registry=registry,
+)
+provider_call_duration = Histogram(
+    "llm_provider_call_duration_seconds", "Latency of individual provider calls",
+    ["provider"], buckets=LLM_BUCKETS, registry=registry,
+)
+provider_errors = Counter(
+    "llm_provider_errors_total", "Failed provider calls (errors and timeouts)",
+    ["provider"], registry=registry,
+)
+embedding_batch_size = Histogram(
+    "embedding_batch_size", "Texts per embedding request",
+    buckets=BATCH_BUCKETS, registry=registry,
+)
+vector_query_duration = Histogram(
+    "vector_query_duration_seconds", "Chroma query latency", registry=registry,
+)
+db_query_duration = Histogram(
+    "db_query_duration_seconds", "SQL statement latency",
+    ["operation"], registry=registry,
+)
+ingest_in_progress = Gauge(
+    "ingest_tasks_in_progress", "Videos currently being processed", registry=registry,
+    multiprocess_mode="livesum",
+)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[Span]:
+    """A pipeline stage: a span (no-op unless tracing is on) and a stage_duration sample"""
+    with tracer.start_as_current_span(name) as span, stage_duration.labels(name).time():
+        yield span
+
+
+class SQLMetricsProcessor(SpanProcessor):
+    """Turns finished `db.query` spans into the SQL latency histogram"""
+
+    def on_end(self, span: ReadableSpan):
+        if span.name == "db.query":
+            operation = (span.attributes or {}).get("db.operation", "OTHER")
+            db_query_duration.labels(operation).observe((span.end_time - span.start_time) / 1e9)
+
+    def shutdown(self):
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+class RuntimeCollector:
+    """Scheduler queues, provider circuits, DB pool and cache counters, read at scrape time"""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    def collect(self):
+        # Imported here: these modules open the vector store and provider clients
+        from .services.answer_cache import answer_cache
+        from .services.llm_router import llm_router
+        from .services.rag_service import embedding_flight, llm_flight
+        from .services.scheduler import llm_scheduler
+
+        running = GaugeMetricFamily("llm_lane_running", "Provider slots held per lane", labels=["lane"])
+        queued = GaugeMetricFamily(
+            "llm_lane_queued", "Requests waiting per lane (background = ingestion queue)", labels=["lane"]
+        )
+        shed = CounterMetricFamily("llm_lane_shed", "Requests rejected with 429 per lane", labels=["lane"])
+        for lane, lane_stats in llm_scheduler.stats().items():
+            running.add_metric([lane], lane_stats["running"])
+            queued.add_metric([lane], lane_stats["queued"])
+            shed.add_metric([lane], lane_stats["shed"])
+        yield running
+        yield queued
+        yield shed
+
+        circuit = GaugeMetricFamily(
+            "llm_provider_circuit_open", "1 if the provider's circuit is open or half-open", labels=["provider"]
+        )
+        for name, status in llm_router.status().items():
+            circuit.add_metric([name], 0 if status["circuit"] == "closed" else 1)
+        yield circuit
+        yield CounterMetricFamily("llm_hedged_requests", "Hedged provider requests", value=llm_router.hedges)
+        yield CounterMetricFamily("llm_hedge_wins", "Hedges answered by the backup provider", value=llm_router.hedge_wins)
+
+        cache_stats = answer_cache.stats()
+        lookups = CounterMetricFamily("answer_cache_lookups", "Semantic answer cache lookups", labels=["result"])
+        lookups.add_metric(["hit"], cache_stats["hits"])
+        lookups.add_metric(["miss"], cache_stats["misses"])
+        yield lookups
+        yield GaugeMetricFamily("answer_cache_entries", "Cached answers", value=cache_stats["entries"])
+
+        flights = CounterMetricFamily(
+            "singleflight_requests", "Provider requests by outcome (coalesced = saved call)",
+            labels=["flight", "outcome"]
+        )
+        for flight in (llm_flight, embedding_flight):
+            flight_stats = flight.stats()
+            flights.add_metric([flight.name, "called"], flight_stats["calls"])
+            flights.add_metric([flight.name, "coalesced"], flight_stats["coalesced"])
+        yield flights
+
+        pool = self.engine.pool
+        if hasattr(pool, "checkedout"):
+            yield GaugeMetricFamily("db_pool_checked_out", "Connections in use", value=pool.checkedout())
+            yield GaugeMetricFamily("db_pool_size", "Configured pool size", value=pool.size())
+            yield GaugeMetricFamily("db_pool_overflow", "Connections beyond pool size", value=pool.overflow())
+
+
+class MetricsMiddleware:
+    """Request latency per route template; unmatched paths share one series"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            http_request_duration.labels(scope["method"], template, str(status["code"])).observe(
+                time.perf_counter() - started
+            )
+
+
+def setup_metrics(engine: Engine):
+    """Register the scrape-time collectors (from the app lifespan)"""
+    if _runtime_collectors:
+        return
+    collector = RuntimeCollector(engine)
+    registry.register(collector)
+    _runtime_collectors.append(collector)
+
+
+def render() -> bytes:
+    """
+    Scrape output. In multiprocess mode the histograms and counters are
+    merged across workers; the runtime gauges are the scraped worker's own.
+    """
+    if not MULTIPROC_DIR:
+        return generate_latest(registry)
+    merged = CollectorRegistry()
+    multiprocess.MultiProcessCollector(merged)
+    for collector in _runtime_collectors:
+        merged.register(collector)
+    return generate_latest(merged)
+
+
+def shutdown_metrics():
+    """
+    Unregister the scrape-time collectors and drop this worker's live
+    gauge samples from the shared directory
+    """
+    while _runtime_collectors:
+        registry.unregister(_runtime_collectors.pop())
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
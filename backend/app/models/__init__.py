@@ -2,6 +2,12 @@ from .video import Video, VideoStatus, VideoSource
 from .chat import ChatMessage
 from .quiz import Quiz, QuizAttempt
 from .note import Note
+from .transcript import TranscriptSegment
+from .usage import UsageRecord
+from .embedding import EmbeddingSpace, EmbeddingSpaceState, VideoEmbedding
+from .ingest import IngestJob, IngestItem, IngestStatus, IngestItemStatus
+from .summary import VideoSummary, SummaryLevel
+from . import fulltext  # noqa: F401 -- FTS5 tables, created with the rest
 
 __all__ = [
     "Video",
@@ -11,5 +17,16 @@ __all__ = [
     "Quiz",
     "QuizAttempt",
     "Note",
+    "TranscriptSegment",
+    "UsageRecord",
+    "EmbeddingSpace",
+    "EmbeddingSpaceState",
+    "VideoEmbedding",
+    "IngestJob",
+    "IngestItem",
+    "IngestStatus",
+    "IngestItemStatus",
+    "VideoSummary",
+    "SummaryLevel",
 ]
 
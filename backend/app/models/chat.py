@@ -1,18 +1,22 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.sql import func
-from ..database import Base
+from ..database import Base, utcnow
 import uuid
 
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # Chat history is read per video in (created_at, id) keyset order
+        Index("ix_chat_messages_video_id_created_at_id", "video_id", "created_at", "id"),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     video_id = Column(String(36), ForeignKey("videos.id", ondelete="CASCADE"), nullable=False)
     role = Column(String(20), nullable=False)  # "user" or "assistant"
     content = Column(Text, nullable=False)
     references = Column(JSON, nullable=True)  # Video timestamp references
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
     
     def to_dict(self):
         return {
@@ -0,0 +1,46 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from ..database import Base, utcnow
+
+
+class EmbeddingSpaceState:
+    ACTIVE = "active"  # serves reads and writes
+    BUILDING = "building"  # being backfilled; serves videos already copied
+    RETIRED = "retired"  # replaced at cutover
+
+
+class EmbeddingSpace(Base):
+    """One embedding model's vector space (vectors from different models never mix)"""
+    __tablename__ = "embedding_spaces"
+    
+    name = Column(String(120), primary_key=True)  # e.g. "google-models-text-embedding-004"
+    provider = Column(String(20), nullable=False)
+    model = Column(String(80), nullable=False)
+    state = Column(String(20), nullable=False)
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    activated_at = Column(DateTime(timezone=True), nullable=True)
+    # The worker backfilling this (target) space, see utils.leases
+    lease_owner = Column(String(100), nullable=True)
+    lease_heartbeat = Column(DateTime(timezone=True), nullable=True)
+    
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "provider": self.provider,
+            "model": self.model,
+            "state": self.state,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "activated_at": self.activated_at.isoformat() if self.activated_at else None,
+        }
+
+
+class VideoEmbedding(Base):
+    """A video whose chunks are fully indexed in an embedding space"""
+    __tablename__ = "video_embeddings"
+    
+    video_id = Column(String(36), ForeignKey("videos.id", ondelete="CASCADE"), primary_key=True)
+    space = Column(String(120), primary_key=True)
+    chunks = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    # Set on every (re)index; cached answers from another version are stale
+    indexed_at = Column(DateTime(timezone=True), default=utcnow, nullable=True)
@@ -0,0 +1,73 @@
+"""
+Full-text index tables: SQLite FTS5 over transcript segments and notes.
+Created alongside the other tables (create_all) when the database is
+SQLite with FTS5; other databases go without them.
+"""
+from sqlalchemy import DDL, event
+
+from ..database import Base
+
+TRANSCRIPT_FTS = "transcript_fts"
+NOTES_FTS = "notes_fts"
+TOKENIZER = "unicode61 remove_diacritics 2"
+
+# Segments are stored compressed, so the index keeps its own copy of the
+# text (needed for highlights); rows are written by the transcript store
+# with the segment id as rowid and removed by the trigger below.
+# Notes are an external-content index over the notes table keyed on its
+# search_rowid column (not the implicit rowid, which VACUUM may renumber),
+# kept in sync entirely by triggers.
+CREATE_STATEMENTS = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {TRANSCRIPT_FTS} USING fts5(
+        text, video_id UNINDEXED, seg_start UNINDEXED, seg_end UNINDEXED,
+        tokenize = '{TOKENIZER}'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS transcript_fts_delete AFTER DELETE ON transcript_segments BEGIN
+        DELETE FROM {TRANSCRIPT_FTS} WHERE rowid = old.id;
+    END""",
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {NOTES_FTS} USING fts5(
+        content, video_id UNINDEXED, "timestamp" UNINDEXED,
+        content = 'notes', content_rowid = 'search_rowid', tokenize = '{TOKENIZER}'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS notes_fts_insert AFTER INSERT ON notes BEGIN
+        INSERT INTO {NOTES_FTS}(rowid, content, video_id, "timestamp")
+        VALUES (new.search_rowid, new.content, new.video_id, new."timestamp");
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS notes_fts_delete AFTER DELETE ON notes BEGIN
+        INSERT INTO {NOTES_FTS}({NOTES_FTS}, rowid, content, video_id, "timestamp")
+        VALUES ('delete', old.search_rowid, old.content, old.video_id, old."timestamp");
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS notes_fts_update AFTER UPDATE ON notes BEGIN
+        INSERT INTO {NOTES_FTS}({NOTES_FTS}, rowid, content, video_id, "timestamp")
+        VALUES ('delete', old.search_rowid, old.content, old.video_id, old."timestamp");
+        INSERT INTO {NOTES_FTS}(rowid, content, video_id, "timestamp")
+        VALUES (new.search_rowid, new.content, new.video_id, new."timestamp");
+    END""",
+)
+
+DROP_STATEMENTS = (
+    "DROP TRIGGER IF EXISTS transcript_fts_delete",
+    "DROP TRIGGER IF EXISTS notes_fts_insert",
+    "DROP TRIGGER IF EXISTS notes_fts_delete",
+    "DROP TRIGGER IF EXISTS notes_fts_update",
+    f"DROP TABLE IF EXISTS {TRANSCRIPT_FTS}",
+    f"DROP TABLE IF EXISTS {NOTES_FTS}",
+)
+
+
+def fts5_available(connection) -> bool:
+    """Whether the connection is SQLite built with FTS5"""
+    if connection.dialect.name != "sqlite":
+        return False
+    options = {row[0] for row in connection.exec_driver_sql("PRAGMA compile_options")}
+    return "ENABLE_FTS5" in options
+
+
+def _if_fts5(ddl, target, bind, **kw) -> bool:
+    return fts5_available(bind)
+
+
+for _statement in CREATE_STATEMENTS:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(callable_=_if_fts5))
+for _statement in DROP_STATEMENTS:
+    event.listen(Base.metadata, "before_drop", DDL(_statement).execute_if(callable_=_if_fts5))
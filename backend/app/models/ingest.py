@@ -0,0 +1,49 @@
+from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from ..database import Base, utcnow
+import uuid
+
+
+class IngestStatus:
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"  # every item done, failed or skipped
+
+
+class IngestItemStatus:
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
+    SKIPPED = "skipped"  # the URL was already ingested
+
+
+class IngestJob(Base):
+    """A bulk ingest manifest; its items are what makes the job resumable"""
+    __tablename__ = "ingest_jobs"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    status = Column(String(20), nullable=False, default=IngestStatus.PENDING)
+    total = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    # The worker running the job, see utils.leases
+    lease_owner = Column(String(100), nullable=True)
+    lease_heartbeat = Column(DateTime(timezone=True), nullable=True)
+
+
+class IngestItem(Base):
+    """One manifest line and the video created for it"""
+    __tablename__ = "ingest_items"
+    __table_args__ = (
+        # Resume and progress: items of a job by status, in manifest order
+        Index("ix_ingest_items_job_status_line", "job_id", "status", "line"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String(36), ForeignKey("ingest_jobs.id", ondelete="CASCADE"), nullable=False)
+    line = Column(Integer, nullable=False)  # 1-based manifest line
+    kind = Column(String(20), nullable=False)  # "url", "file" or "transcript"
+    source = Column(Text, nullable=True)  # URL or file path
+    video_id = Column(String(36), ForeignKey("videos.id", ondelete="SET NULL"), nullable=True)
+    status = Column(String(20), nullable=False, default=IngestItemStatus.PENDING)
+    error = Column(Text, nullable=True)
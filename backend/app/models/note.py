@@ -1,18 +1,27 @@
-from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
-from ..database import Base
+from ..database import Base, utcnow
 import uuid
 
 
 class Note(Base):
     __tablename__ = "notes"
+    __table_args__ = (
+        # Notes are listed per video ordered by video timestamp
+        Index("ix_notes_video_id_timestamp", "video_id", "timestamp"),
+        Index("ix_notes_search_rowid", "search_rowid", unique=True),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     video_id = Column(String(36), ForeignKey("videos.id", ondelete="CASCADE"), nullable=False)
     content = Column(Text, nullable=False)
     timestamp = Column(Integer, nullable=True)  # Video timestamp in seconds
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Key of the note's row in the full-text index. The implicit rowid of a
+    # table with a string primary key can change on VACUUM, so it's explicit:
+    # a random 63-bit integer, like the id needing no coordination between writers.
+    search_rowid = Column(Integer, nullable=False, default=lambda: uuid.uuid4().int >> 65)
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=utcnow)
     
     def to_dict(self):
         return {
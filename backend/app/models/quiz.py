@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.sql import func
 from ..database import Base
 import uuid
@@ -6,6 +6,9 @@ import uuid
 
 class Quiz(Base):
     __tablename__ = "quizzes"
+    __table_args__ = (
+        Index("ix_quizzes_video_id_created_at", "video_id", "created_at"),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     video_id = Column(String(36), ForeignKey("videos.id", ondelete="CASCADE"), nullable=False)
@@ -56,3 +59,11 @@ class QuizAttempt(Base):
             "knowledge_gaps": self.knowledge_gaps,
             "created_at": self.created_at.isoformat() if self.created_at else None,
         }
+
+
+# Latest attempt lookup: WHERE quiz_id = ? ORDER BY created_at DESC LIMIT 1
+Index(
+    "ix_quiz_attempts_quiz_id_created_at",
+    QuizAttempt.quiz_id,
+    QuizAttempt.created_at.desc(),
+)
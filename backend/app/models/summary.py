@@ -0,0 +1,39 @@
+from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from ..database import Base, utcnow
+
+
+class SummaryLevel:
+    SECTION = "section"  # ~10 minutes of transcript
+    CHAPTER = "chapter"  # a few consecutive sections
+    VIDEO = "video"  # the whole video, from its chapters
+
+
+class VideoSummary(Base):
+    """One node of a video's summary tree: section -> chapter -> video"""
+    __tablename__ = "video_summaries"
+    __table_args__ = (
+        # A video's summaries at one level, in order
+        Index("ix_video_summaries_video_id_level_seq", "video_id", "level", "seq"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    video_id = Column(String(36), ForeignKey("videos.id", ondelete="CASCADE"), nullable=False)
+    level = Column(String(10), nullable=False)
+    seq = Column(Integer, nullable=False)  # Position within the level
+    parent_seq = Column(Integer, nullable=True)  # The chapter a section belongs to
+    start = Column(Integer, nullable=False)  # seconds
+    end = Column(Integer, nullable=False)  # seconds
+    heading = Column(String(200), nullable=False)
+    summary = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    
+    def to_dict(self):
+        return {
+            "level": self.level,
+            "seq": self.seq,
+            "start": self.start,
+            "end": self.end,
+            "heading": self.heading,
+            "summary": self.summary,
+        }
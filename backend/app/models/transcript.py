@@ -0,0 +1,33 @@
+from sqlalchemy import Column, String, Integer, LargeBinary, ForeignKey, Index
+from ..database import Base
+import zlib
+
+
+class TranscriptSegment(Base):
+    __tablename__ = "transcript_segments"
+    __table_args__ = (
+        # Window queries: WHERE video_id = ? AND start BETWEEN ? AND ?
+        Index("ix_transcript_segments_video_id_start", "video_id", "start"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    video_id = Column(String(36), ForeignKey("videos.id", ondelete="CASCADE"), nullable=False)
+    seq = Column(Integer, nullable=False)  # Position within the transcript
+    start = Column(Integer, nullable=False)  # seconds
+    end = Column(Integer, nullable=False)  # seconds
+    data = Column(LargeBinary, nullable=False)  # zlib-compressed UTF-8 text
+    
+    @property
+    def text(self) -> str:
+        return zlib.decompress(self.data).decode("utf-8")
+    
+    @staticmethod
+    def compress(text: str) -> bytes:
+        return zlib.compress(text.encode("utf-8"), 6)
+    
+    def to_dict(self):
+        return {
+            "start": self.start,
+            "end": self.end,
+            "text": self.text,
+        }
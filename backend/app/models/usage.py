@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, Integer, Float, Date, UniqueConstraint
+from ..database import Base
+
+
+class UsageRecord(Base):
+    """Aggregated LLM/embedding usage: one row per day, route, video, kind and model"""
+    __tablename__ = "usage_ledger"
+    __table_args__ = (
+        UniqueConstraint("day", "route", "video_id", "kind", "provider", "model", name="uq_usage_ledger_key"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    day = Column(Date, nullable=False)
+    route = Column(String(120), nullable=False, default="")  # e.g. "POST /api/chat", "ingest"
+    video_id = Column(String(36), nullable=False, default="")  # "" when not tied to a video
+    kind = Column(String(20), nullable=False)  # "generate" or "embed"
+    provider = Column(String(20), nullable=False)
+    model = Column(String(80), nullable=False, default="")
+    calls = Column(Integer, nullable=False, default=0)
+    prompt_tokens = Column(Integer, nullable=False, default=0)
+    completion_tokens = Column(Integer, nullable=False, default=0)
+    cost_usd = Column(Float, nullable=False, default=0.0)
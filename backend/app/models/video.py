@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, Integer, Text, DateTime, Enum, Boolean
+from sqlalchemy import Column, String, Integer, Text, DateTime, Enum, Boolean, Index
 from sqlalchemy.sql import func
-from ..database import Base
+from ..database import Base, utcnow
 import uuid
 import enum
 
@@ -19,6 +19,11 @@ class VideoSource(str, enum.Enum):
 
 class Video(Base):
     __tablename__ = "videos"
+    __table_args__ = (
+        # Library listing: ORDER BY created_at DESC, optionally filtered by status
+        Index("ix_videos_created_at_id", "created_at", "id"),
+        Index("ix_videos_status_created_at_id", "status", "created_at", "id"),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     title = Column(String(255), nullable=False)
@@ -30,10 +35,11 @@ class Video(Base):
     status = Column(String(20), default=VideoStatus.PENDING)
     progress = Column(Integer, default=0)
     is_liked = Column(Boolean, default=False)
-    transcript = Column(Text, nullable=True)
     error_message = Column(Text, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Client-side default keeps microseconds so (created_at, id) cursors are stable
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    # Also the version behind HTTP ETags, so keep sub-second precision
+    updated_at = Column(DateTime(timezone=True), onupdate=utcnow)
     
     def to_dict(self):
         return {
@@ -47,7 +53,6 @@ class Video(Base):
             "status": self.status,
             "progress": self.progress or 0,
             "is_liked": self.is_liked,
-            "transcript": self.transcript,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
@@ -0,0 +1,207 @@
+"""
+Profiling
+On-demand CPU profiles of single requests and tracemalloc heap snapshots,
+for admins only and disabled by default. A request sent with
+`X-Profile: sample` (stack sampling, folded stacks for flamegraph.pl or
+speedscope) or `X-Profile: cprofile` (pstats text) gets its profile back
+as the response body instead of the normal response. cProfile only sees
+the event loop's thread, so cprofile mode adds a sampled table of what
+the other threads ran, where sync endpoints and dependencies execute.
+"""
+from collections import Counter
+from typing import Iterable, Optional
+import cProfile
+import hmac
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PROFILE_HEADER = "x-profile"
+ADMIN_HEADER = "x-admin-token"
+
+
+def is_admin(token: Optional[str], admin_token: str) -> bool:
+    """Admin token check; an unset ADMIN_TOKEN never matches"""
+    return bool(admin_token) and token is not None and hmac.compare_digest(token, admin_token)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})"
+
+
+# Leaf frames of a thread waiting for work rather than running it
+_IDLE_FILES = ("threading.py", "queue.py", "selectors.py")
+
+
+class StackSampler:
+    """Samples every thread's stack at a fixed interval into folded-stack counts"""
+
+    def __init__(self, interval: float = 0.001, exclude: Iterable[int] = ()):
+        self.interval = interval
+        self.exclude = set(exclude)
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or thread_id in self.exclude:
+                    continue
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def functions(self, limit: int = 40) -> str:
+        """Per-function sample counts (inclusive, self) of busy threads, most inclusive first"""
+        inclusive: Counter = Counter()
+        own: Counter = Counter()
+        for stack, count in self.samples.items():
+            frames = stack.split(";")[1:]
+            if not frames or frames[-1].split(" (", 1)[-1].startswith(_IDLE_FILES):
+                continue
+            for frame in set(frames):
+                inclusive[frame] += count
+            own[frames[-1]] += count
+        rows = [f"{'samples':>9} {'self':>9}  function"]
+        rows += [f"{count:>9} {own[frame]:>9}  {frame}" for frame, count in inclusive.most_common(limit)]
+        return "\n".join(rows) + "\n"
+
+
+class ProfilingMiddleware:
+    """Profiles requests that carry X-Profile and a valid X-Admin-Token"""
+
+    def __init__(self, app: ASGIApp, admin_token: str, sample_interval: float = 0.001):
+        self.app = app
+        self.admin_token = admin_token
+        self.sample_interval = sample_interval
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+        mode = headers.get(PROFILE_HEADER)
+        if mode not in ("sample", "cprofile") or not is_admin(headers.get(ADMIN_HEADER), self.admin_token):
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 0}
+
+        async def discard(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+
+        started = time.perf_counter()
+        if mode == "sample":
+            with StackSampler(self.sample_interval) as sampler:
+                await self.app(scope, receive, discard)
+            body = sampler.folded()
+        else:
+            profiler = cProfile.Profile()
+            # Sync endpoints and dependencies run on worker threads, out of
+            # cProfile's sight; sample those threads alongside it
+            with StackSampler(self.sample_interval, exclude=[threading.get_ident()]) as sampler:
+                profiler.enable()
+                try:
+                    await self.app(scope, receive, discard)
+                finally:
+                    profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(60)
+            out.write(f"\nOther threads, sampled every {self.sample_interval * 1000:g}ms:\n")
+            out.write(sampler.functions())
+            body = out.getvalue()
+
+        response = PlainTextResponse(body, headers={
+            "X-Profile-Status": str(status["code"]),
+            "X-Profile-Duration-Ms": f"{(time.perf_counter() - started) * 1000:.1f}",
+        })
+        await response(scope, receive, send)
+
+
+class HeapTracker:
+    """tracemalloc snapshots of the process, diffed against a baseline"""
+
+    def __init__(self):
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 10):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.baseline = self._snapshot()
+
+    def stop(self):
+        tracemalloc.stop()
+        self.baseline = None
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+
+    def top(self, group_by: str = "filename", limit: int = 25) -> dict:
+        snapshot = self._snapshot()
+        stats = snapshot.statistics(group_by)
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "top": [
+                {"where": str(s.traceback), "size_bytes": s.size, "count": s.count}
+                for s in stats[:limit]
+            ],
+        }
+
+    def diff(self, group_by: str = "filename", limit: int = 25, rebase: bool = False) -> dict:
+        """Growth since the baseline; `rebase` makes this snapshot the new baseline"""
+        snapshot = self._snapshot()
+        stats = snapshot.compare_to(self.baseline, group_by)
+        if rebase:
+            self.baseline = snapshot
+        return {
+            "growth_bytes": sum(s.size_diff for s in stats),
+            "top": [
+                {
+                    "where": str(s.traceback),
+                    "size_bytes": s.size,
+                    "size_diff_bytes": s.size_diff,
+                    "count_diff": s.count_diff,
+                }
+                for s in stats[:limit]
+            ],
+        }
+
+
+heap_tracker = HeapTracker()
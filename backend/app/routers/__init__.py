@@ -3,6 +3,9 @@ from .chat import router as chat_router
 from .quiz import router as quiz_router
 from .search import router as search_router
 from .notes import router as notes_router
+from .usage import router as usage_router
+from .admin import router as admin_router
+from .ingest import router as ingest_router
 
 __all__ = [
     "videos_router",
@@ -10,5 +13,8 @@ __all__ = [
     "quiz_router",
     "search_router",
     "notes_router",
+    "usage_router",
+    "admin_router",
+    "ingest_router",
 ]
 
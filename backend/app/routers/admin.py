@@ -0,0 +1,57 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+
+from ..config import get_settings
+from ..profiling import heap_tracker, is_admin
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+GROUP_BY_PATTERN = "^(filename|lineno|traceback)$"
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Profiling endpoints exist only when enabled, and only for admins"""
+    settings = get_settings()
+    if not settings.profiling_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_admin(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+def require_tracing():
+    if not heap_tracker.tracing:
+        raise HTTPException(status_code=409, detail="Memory tracing is not running; POST /api/admin/memory/start first")
+
+
+@router.post("/memory/start", dependencies=[Depends(require_admin)])
+def start_memory_tracing(frames: int = Query(10, ge=1, le=50)):
+    """Start tracemalloc and take the baseline snapshot"""
+    heap_tracker.start(frames)
+    return {"tracing": True, "frames": frames}
+
+
+@router.get("/memory/snapshot", dependencies=[Depends(require_admin), Depends(require_tracing)])
+def memory_snapshot(
+    group_by: str = Query("filename", pattern=GROUP_BY_PATTERN),
+    limit: int = Query(25, ge=1, le=200)
+):
+    """Largest live allocations, grouped by file, line or traceback"""
+    return heap_tracker.top(group_by, limit)
+
+
+@router.get("/memory/diff", dependencies=[Depends(require_admin), Depends(require_tracing)])
+def memory_diff(
+    group_by: str = Query("filename", pattern=GROUP_BY_PATTERN),
+    limit: int = Query(25, ge=1, le=200),
+    rebase: bool = False
+):
+    """Allocation growth since the baseline (e.g. Chroma client, caches)"""
+    return heap_tracker.diff(group_by, limit, rebase)
+
+
+@router.post("/memory/stop", dependencies=[Depends(require_admin)])
+def stop_memory_tracing():
+    """Stop tracemalloc and drop its overhead"""
+    heap_tracker.stop()
+    return {"tracing": False}
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+import orjson
 
-from ..database import get_db
+from ..database import get_db, utcnow
 from ..models import ChatMessage, Video, VideoStatus
 from ..schemas import ChatMessageRequest, ChatMessageResponse, ChatHistoryResponse
 from ..services.rag_service import get_rag_response
+from ..utils.pagination import encode_cursor, decode_cursor
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
@@ -25,10 +29,12 @@ async def send_message(
         raise HTTPException(status_code=400, detail="Video processing not completed")
     
     # Save user message
+    # Timestamp now so the question sorts before the answer saved with it
     user_msg = ChatMessage(
         video_id=data.videoId,
         role="user",
-        content=data.message
+        content=data.message,
+        created_at=utcnow()
     )
     db.add(user_msg)
     
@@ -52,15 +58,56 @@ async def send_message(
 
 
 @router.get("/{video_id}/history", response_model=ChatHistoryResponse)
-def get_chat_history(video_id: str, db: Session = Depends(get_db)):
-    """Get chat history for a video"""
+def get_chat_history(
+    video_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Get the most recent chat messages for a video, oldest first.
+    Pass `next_cursor` back as `before` to page further into the past.
+    """
+    query = db.query(ChatMessage).filter(
+        ChatMessage.video_id == video_id
+    ).order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+    
+    if before:
+        try:
+            created_at, last_id = decode_cursor(before)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(or_(
+            ChatMessage.created_at < created_at,
+            and_(ChatMessage.created_at == created_at, ChatMessage.id < last_id),
+        ))
+    
+    # Newest first from the index, one extra row to detect older pages
+    messages = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(messages) > limit:
+        messages = messages[:limit]
+        oldest = messages[-1]
+        next_cursor = encode_cursor(oldest.created_at, oldest.id)
+    
+    # Already plain dicts shaped like ChatHistoryResponse; skip re-validation
+    return ORJSONResponse({
+        "video_id": video_id,
+        "messages": [m.to_dict() for m in reversed(messages)],
+        "next_cursor": next_cursor,
+    })
+
+
+@router.get("/{video_id}/history/export")
+def export_chat_history(video_id: str, db: Session = Depends(get_db)):
+    """Stream the full chat history for a video as NDJSON, oldest first"""
     messages = db.query(ChatMessage).filter(
         ChatMessage.video_id == video_id
-    ).order_by(ChatMessage.created_at.asc()).all()
+    ).order_by(ChatMessage.created_at.asc(), ChatMessage.id.asc()).yield_per(200)
     
-    return ChatHistoryResponse(
-        video_id=video_id,
-        messages=[m.to_dict() for m in messages]
+    return StreamingResponse(
+        (orjson.dumps(m.to_dict()) + b"\n" for m in messages),
+        media_type="application/x-ndjson"
     )
 
 
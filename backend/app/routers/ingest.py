@@ -0,0 +1,77 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from ..config import get_settings
+from ..database import get_db
+from ..services.bulk_ingest import (
+    ManifestError, create_job, is_running, job_progress, parse_manifest, retry_failed, run_job
+)
+
+router = APIRouter(prefix="/ingest", tags=["Ingest"])
+settings = get_settings()
+
+
+async def _read_body(request: Request, limit: int) -> bytes:
+    """The request body, refused with 413 as soon as it exceeds `limit` bytes"""
+    too_large = HTTPException(status_code=413, detail=f"Manifest is larger than {limit} bytes")
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > limit:
+        raise too_large
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise too_large
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+@router.post("", status_code=202)
+async def start_bulk_ingest(request: Request, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    """
+    Ingest many videos from an NDJSON body, one object per line:
+    {"url": ...}, {"file": ...} (already in the upload directory) or
+    {"transcript": ...}, each with an optional "title". Returns the job;
+    poll GET /api/ingest/{job_id} for progress.
+    """
+    body = await _read_body(request, settings.bulk_ingest_max_bytes)
+    # Parsing and thousands of inserts block; keep them off the event loop
+    try:
+        entries = await run_in_threadpool(
+            parse_manifest, body.splitlines(), settings.bulk_ingest_max_items, allowed_root=settings.upload_dir
+        )
+    except ManifestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    job = await run_in_threadpool(create_job, db, entries)
+    background_tasks.add_task(run_job, job.id)
+    return await run_in_threadpool(job_progress, db, job.id)
+
+
+@router.get("/{job_id}")
+def get_bulk_ingest(job_id: str, db: Session = Depends(get_db)):
+    """Progress of a bulk ingest job: item counts by status"""
+    progress = job_progress(db, job_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Ingest job not found")
+    return progress
+
+
+@router.post("/{job_id}/resume", status_code=202)
+def resume_bulk_ingest(
+    job_id: str,
+    background_tasks: BackgroundTasks,
+    retry: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Continue an interrupted job's pending items (and failed ones with retry=true)"""
+    if job_progress(db, job_id) is None:
+        raise HTTPException(status_code=404, detail="Ingest job not found")
+    if is_running(db, job_id):
+        raise HTTPException(status_code=409, detail="Ingest job is already running")
+
+    if retry:
+        retry_failed(db, job_id)
+    background_tasks.add_task(run_job, job_id)
+    return job_progress(db, job_id)
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List
 from pydantic import BaseModel
 
 from ..database import get_db
 from ..models import Note, Video
+from ..utils.http_cache import make_etag, check_not_modified
 
 router = APIRouter(prefix="/videos", tags=["Notes"])
 
@@ -28,13 +30,23 @@ class NoteResponse(BaseModel):
 # ============================================
 
 @router.get("/{video_id}/notes", response_model=List[NoteResponse])
-def get_notes(video_id: str, db: Session = Depends(get_db)):
+def get_notes(video_id: str, request: Request, response: Response, db: Session = Depends(get_db)):
     """Get all notes for a video"""
     # Verify video exists
-    video = db.query(Video).filter(Video.id == video_id).first()
+    video = db.query(Video.id).filter(Video.id == video_id).first()
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
     
+    # Version the listing by its size and newest write (creates, edits, deletes)
+    count, last_created, last_updated = db.query(
+        func.count(Note.id), func.max(Note.created_at), func.max(Note.updated_at)
+    ).filter(Note.video_id == video_id).one()
+    last_modified = max(filter(None, (last_created, last_updated)), default=None)
+    etag = make_etag(video_id, count, last_created, last_updated)
+    not_modified = check_not_modified(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+    
     notes = db.query(Note).filter(Note.video_id == video_id).order_by(Note.timestamp.asc()).all()
     return [NoteResponse(**n.to_dict()) for n in notes]
 
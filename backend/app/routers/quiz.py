@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
 from ..database import get_db
 from ..models import Quiz, QuizAttempt, Video, VideoStatus
 from ..schemas import QuizGenerateRequest, QuizResponse, QuizSubmitRequest, QuizResultResponse
-from ..services.quiz_service import generate_quiz_questions, analyze_quiz_results
+from ..services.quiz_service import generate_quiz_questions, analyze_quiz_results, MAX_TRANSCRIPT_CHARS
+from ..services.transcript_store import load_transcript
+from ..services.usage import usage_scope
+from ..utils.http_cache import make_etag, check_not_modified, IMMUTABLE
 
 router = APIRouter(prefix="/quiz", tags=["Quiz"])
 
@@ -23,10 +26,13 @@ async def generate_quiz(
     if video.status != VideoStatus.COMPLETED:
         raise HTTPException(status_code=400, detail="Video processing not completed")
     
+    # One char past the budget lets the quiz service tell the text was cut
+    transcript = load_transcript(db, data.videoId, max_chars=MAX_TRANSCRIPT_CHARS + 1)
+    
     # Generate questions using AI
     questions = await generate_quiz_questions(
         video_id=data.videoId,
-        transcript=video.transcript,
+        transcript=transcript,
         count=data.questionCount
     )
     
@@ -43,12 +49,22 @@ async def generate_quiz(
 
 
 @router.get("/{quiz_id}", response_model=QuizResponse)
-def get_quiz(quiz_id: str, db: Session = Depends(get_db)):
+def get_quiz(quiz_id: str, request: Request, response: Response, db: Session = Depends(get_db)):
     """Get quiz questions (without correct answers)"""
-    quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
-    if not quiz:
+    # Quizzes never change once generated, so validate before loading questions
+    version = db.query(Quiz.id, Quiz.created_at).filter(Quiz.id == quiz_id).first()
+    if not version:
         raise HTTPException(status_code=404, detail="Quiz not found")
     
+    not_modified = check_not_modified(
+        request, response, make_etag(version.id, version.created_at),
+        version.created_at, cache_control=IMMUTABLE
+    )
+    if not_modified:
+        return not_modified
+    
+    quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+    
     return QuizResponse(**quiz.to_dict(include_answers=False))
 
 
@@ -81,9 +97,10 @@ async def submit_quiz(
     total = len(questions)
     
     # Get AI analysis
-    analysis, knowledge_gaps = await analyze_quiz_results(
-        correct_count, total, incorrect_questions
-    )
+    with usage_scope(video_id=quiz.video_id):
+        analysis, knowledge_gaps = await analyze_quiz_results(
+            correct_count, total, incorrect_questions
+        )
     
     # Save attempt
     attempt = QuizAttempt(
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from ..database import get_db
 from ..schemas import SearchRequest, SearchResponse
+from ..services.fulltext import FullTextUnavailable, search_text
 from ..services.rag_service import search_videos
+from ..services.suggestions import suggestion_index
 
 router = APIRouter(prefix="/search", tags=["Search"])
 
@@ -13,23 +17,40 @@ async def search(
     data: SearchRequest,
     db: Session = Depends(get_db)
 ):
-    """Search across all videos using semantic search"""
-    results = await search_videos(
-        query=data.query,
-        video_id=data.video_id,
-        limit=data.limit,
-        db=db
-    )
+    """
+    Search across all videos: semantically, or by exact phrase or keywords
+    in transcripts and notes (served from the local full-text index)
+    """
+    if data.mode == "semantic":
+        results = await search_videos(
+            query=data.query,
+            video_id=data.video_id,
+            limit=data.limit,
+            db=db
+        )
+    else:
+        try:
+            results = await run_in_threadpool(
+                search_text, db, data.query, data.mode, data.video_id, data.limit, data.include_notes
+            )
+        except FullTextUnavailable as e:
+            raise HTTPException(status_code=501, detail=str(e))
+    if results:
+        suggestion_index.record_query(data.query)
     
-    return SearchResponse(
-        query=data.query,
-        results=results,
-        total=len(results)
-    )
+    # Already plain dicts shaped like SearchResponse; skip re-validation
+    return ORJSONResponse({
+        "query": data.query,
+        "results": results,
+        "total": len(results),
+    })
 
 
 @router.get("/suggestions")
-async def get_suggestions(q: str):
-    """Get search suggestions (autocomplete)"""
-    # For now, return empty - can be enhanced with popular searches
-    return {"suggestions": []}
+async def get_suggestions(q: str = Query(..., max_length=200), limit: int = Query(8, ge=1, le=20)):
+    """
+    Autocomplete from the in-memory index of titles, transcript phrases and
+    popular searches; never touches the database or the embedding provider
+    (async, so the lookup skips the threadpool hop)
+    """
+    return ORJSONResponse({"suggestions": suggestion_index.suggest(q, limit)})
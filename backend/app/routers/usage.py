@@ -0,0 +1,79 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..models import UsageRecord
+
+router = APIRouter(prefix="/usage", tags=["Usage"])
+
+GROUP_COLUMNS = {
+    "video": UsageRecord.video_id,
+    "route": UsageRecord.route,
+    "day": UsageRecord.day,
+    "kind": UsageRecord.kind,
+    "provider": UsageRecord.provider,
+    "model": UsageRecord.model,
+}
+
+
+@router.get("")
+def get_usage(
+    group_by: str = Query("video", description="Comma-separated: video, route, day, kind, provider, model"),
+    video_id: Optional[str] = None,
+    route: Optional[str] = None,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Token and estimated cost totals, most expensive first. Read-only: calls
+    still buffered in a worker appear after its next flush (USAGE_FLUSH_INTERVAL).
+    """
+    fields = [f.strip() for f in group_by.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in GROUP_COLUMNS]
+    if unknown or not fields:
+        raise HTTPException(status_code=400, detail=f"Invalid group_by field(s): {', '.join(unknown) or group_by}")
+    
+    columns = [GROUP_COLUMNS[f] for f in fields]
+    query = db.query(
+        *columns,
+        func.sum(UsageRecord.calls),
+        func.sum(UsageRecord.prompt_tokens),
+        func.sum(UsageRecord.completion_tokens),
+        func.sum(UsageRecord.cost_usd),
+    )
+    if video_id is not None:
+        query = query.filter(UsageRecord.video_id == video_id)
+    if route is not None:
+        query = query.filter(UsageRecord.route == route)
+    if since is not None:
+        query = query.filter(UsageRecord.day >= since)
+    if until is not None:
+        query = query.filter(UsageRecord.day <= until)
+    
+    rows = query.group_by(*columns).order_by(
+        func.sum(UsageRecord.cost_usd).desc(),
+        (func.sum(UsageRecord.prompt_tokens) + func.sum(UsageRecord.completion_tokens)).desc()
+    ).all()
+    
+    results = []
+    for row in rows:
+        keys = row[:len(fields)]
+        calls, prompt_tokens, completion_tokens, cost = row[len(fields):]
+        entry = {
+            field: value.isoformat() if isinstance(value, date) else value
+            for field, value in zip(fields, keys)
+        }
+        entry.update({
+            "calls": calls,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cost_usd": round(cost, 6),
+        })
+        results.append(entry)
+    
+    return {"group_by": fields, "rows": results}
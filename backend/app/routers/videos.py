@@ -1,40 +1,99 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 from typing import List, Optional
+import orjson
 import os
 import uuid
 
 from ..database import get_db
-from ..models import Video, VideoStatus, VideoSource
+from ..models import Video, VideoStatus, VideoSource, VideoEmbedding, VideoSummary, SummaryLevel
 from ..schemas import VideoProcessUrl, VideoResponse, VideoStatusResponse, VideoUploadResponse
 from ..config import get_settings
 from ..services.video_processor import process_video_task
+from ..services.transcript_store import iter_segments, delete_transcript
+from ..services.answer_cache import answer_cache
+from ..services.suggestions import suggestion_index
+from ..services.summaries import delete_summaries
+from ..services.vector_store import get_vector_store
+from ..utils.pagination import encode_cursor, decode_cursor
+from ..utils.http_cache import make_etag, cache_headers, check_not_modified
 
 router = APIRouter(prefix="/videos", tags=["Videos"])
 settings = get_settings()
 
 
+# Columns needed to build a VideoResponse; the list never touches the transcript
+VIDEO_LIST_COLUMNS = (
+    Video.id,
+    Video.title,
+    Video.source_type,
+    Video.source_url,
+    Video.file_path,
+    Video.duration,
+    Video.thumbnail_url,
+    Video.status,
+    Video.progress,
+    Video.is_liked,
+    Video.created_at,
+)
+
+
 @router.get("", response_model=List[VideoResponse])
 def get_all_videos(
+    response: Response,
     status: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """Get all videos, optionally filtered by status"""
-    query = db.query(Video).order_by(Video.created_at.desc())
+    """
+    Get videos newest first, optionally filtered by status.
+    Keyset paginated: pass the X-Next-Cursor response header back as `cursor`.
+    """
+    query = db.query(*VIDEO_LIST_COLUMNS).order_by(
+        Video.created_at.desc(), Video.id.desc()
+    )
     
     if status:
         query = query.filter(Video.status == status)
     
-    videos = query.all()
-    return [VideoResponse(**v.to_dict()) for v in videos]
+    if cursor:
+        try:
+            created_at, last_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(or_(
+            Video.created_at < created_at,
+            and_(Video.created_at == created_at, Video.id < last_id),
+        ))
+    
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+    
+    return [
+        VideoResponse(**{**row._asdict(), "progress": row.progress or 0, "is_liked": bool(row.is_liked)})
+        for row in rows
+    ]
 
 
 @router.get("/{video_id}", response_model=VideoResponse)
-def get_video(video_id: str, db: Session = Depends(get_db)):
+def get_video(video_id: str, request: Request, response: Response, db: Session = Depends(get_db)):
     """Get a single video by ID"""
     video = db.query(Video).filter(Video.id == video_id).first()
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
+    
+    version = video.updated_at or video.created_at
+    not_modified = check_not_modified(request, response, make_etag(video.id, version), version)
+    if not_modified:
+        return not_modified
+    
     return VideoResponse(**video.to_dict())
 
 
@@ -132,16 +191,75 @@ def get_video_status(video_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/{video_id}/transcript")
-def get_video_transcript(video_id: str, db: Session = Depends(get_db)):
-    """Get video transcript"""
-    video = db.query(Video).filter(Video.id == video_id).first()
+def get_video_transcript(
+    video_id: str,
+    request: Request,
+    response: Response,
+    start: Optional[int] = Query(None, alias="from", ge=0),
+    end: Optional[int] = Query(None, alias="to", ge=0),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get video transcript, optionally only the [from, to) seconds window.
+    format=ndjson streams one segment per line.
+    """
+    video = db.query(
+        Video.id, Video.status, Video.created_at, Video.updated_at
+    ).filter(Video.id == video_id).first()
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
     
     if video.status != VideoStatus.COMPLETED:
         raise HTTPException(status_code=400, detail="Video processing not completed")
     
-    return {"video_id": video.id, "transcript": video.transcript}
+    # Segments are only rewritten while processing, which bumps videos.updated_at
+    version = video.updated_at or video.created_at
+    etag = make_etag(video.id, version, start, end, format)
+    not_modified = check_not_modified(request, response, etag, version)
+    if not_modified:
+        return not_modified
+    
+    segments = iter_segments(db, video_id, start=start, end=end)
+    
+    if format == "ndjson":
+        return StreamingResponse(
+            (orjson.dumps(s.to_dict()) + b"\n" for s in segments),
+            media_type="application/x-ndjson",
+            headers=cache_headers(etag, version)
+        )
+    
+    # Large payload: serialize straight to bytes, skipping jsonable_encoder
+    segments = [s.to_dict() for s in segments]
+    return ORJSONResponse(
+        {
+            "video_id": video_id,
+            "transcript": "".join(s["text"] for s in segments),
+            "segments": segments,
+        },
+        headers=cache_headers(etag, version)
+    )
+
+
+@router.get("/{video_id}/summary")
+def get_video_summary(video_id: str, db: Session = Depends(get_db)):
+    """
+    Get the video's summary tree: the video summary and its chapters, each
+    with its sections. Empty until the video has been summarized.
+    """
+    if not db.query(Video.id).filter(Video.id == video_id).first():
+        raise HTTPException(status_code=404, detail="Video not found")
+    
+    nodes = db.query(VideoSummary).filter(VideoSummary.video_id == video_id).order_by(
+        VideoSummary.level, VideoSummary.seq
+    ).all()
+    video = next((n.to_dict() for n in nodes if n.level == SummaryLevel.VIDEO), None)
+    chapters = [{**n.to_dict(), "sections": []} for n in nodes if n.level == SummaryLevel.CHAPTER]
+    for node in nodes:
+        if node.level == SummaryLevel.SECTION and node.parent_seq is not None and node.parent_seq < len(chapters):
+            chapters[node.parent_seq]["sections"].append(node.to_dict())
+    
+    return {"video_id": video_id, "video": video, "chapters": chapters}
 
 
 @router.post("/{video_id}/like")
@@ -162,10 +280,18 @@ def delete_video(video_id: str, db: Session = Depends(get_db)):
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
     
+    # Drop its vectors first so a failure leaves the video in place to retry
+    get_vector_store().delete_video(video_id)
+    answer_cache.invalidate(video_id)
+    suggestion_index.remove_video(video_id)
+    
     # Delete file if exists
     if video.file_path and os.path.exists(video.file_path):
         os.remove(video.file_path)
     
+    delete_transcript(db, video_id)
+    delete_summaries(db, video_id)
+    db.query(VideoEmbedding).filter(VideoEmbedding.video_id == video_id).delete(synchronize_session=False)
     db.delete(video)
     db.commit()
     
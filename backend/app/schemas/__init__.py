@@ -1,5 +1,5 @@
 from pydantic import BaseModel, HttpUrl
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Literal
 from datetime import datetime
 
 
@@ -66,6 +66,7 @@ class ChatMessageResponse(BaseModel):
 class ChatHistoryResponse(BaseModel):
     video_id: str
     messages: List[dict]
+    next_cursor: Optional[str] = None  # Pass as `before` to load older messages
 
 
 # ============================================
@@ -119,15 +120,22 @@ class SearchRequest(BaseModel):
     query: str
     video_id: Optional[str] = None
     limit: int = 10
+    # "semantic" embeds the query; "phrase" (exact words in order) and
+    # "keyword" (all words, last as a prefix) use the full-text index
+    mode: Literal["semantic", "phrase", "keyword"] = "semantic"
+    include_notes: bool = True  # phrase/keyword modes only
 
 
 class SearchResult(BaseModel):
     video_id: str
     video_title: str
     text: str
-    timestamp_start: int
-    timestamp_end: int
+    timestamp_start: Optional[int]  # notes may have no timestamp
+    timestamp_end: Optional[int]
     relevance_score: float
+    source: str = "transcript"  # or "note"
+    snippet: Optional[str] = None  # HTML-escaped, matches in <mark>
+    note_id: Optional[str] = None
 
 
 class SearchResponse(BaseModel):
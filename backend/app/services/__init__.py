@@ -1,6 +1,7 @@
 from .video_processor import process_video_task
 from .rag_service import (
     add_video_to_index,
+    add_videos_to_index,
     search_similar_chunks,
     get_rag_response,
     search_videos
@@ -10,6 +11,7 @@ from .quiz_service import generate_quiz_questions, analyze_quiz_results
 __all__ = [
     "process_video_task",
     "add_video_to_index",
+    "add_videos_to_index",
     "search_similar_chunks", 
     "get_rag_response",
     "search_videos",
@@ -0,0 +1,129 @@
+"""
+Semantic Answer Cache
+Per-video cache of chat answers keyed by question embedding, so a question
+close enough to one already answered skips retrieval and generation.
+Answers are kept per embedding space and tagged with the video's index
+version (recorded in the database), so a reindex or delete in any worker
+retires them here too.
+"""
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+import copy
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from ..config import get_settings
+
+settings = get_settings()
+
+
+class SemanticAnswerCache:
+    """
+    Entries expire after `ttl` seconds, or as soon as a lookup passes a
+    different index version. Each (video, space) keeps at most
+    `max_entries` answers and at most `max_videos` of them are tracked,
+    both evicted least-recently-used first.
+    """
+
+    def __init__(self, threshold: float, ttl: float, max_entries: int, max_videos: int = 1024):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_videos = max_videos
+        self.hits = 0
+        self.misses = 0
+        self._videos: "OrderedDict[Tuple[str, Optional[str]], OrderedDict[str, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, video_id: str, space: Optional[str], version: Any, embedding: List[float]) -> Optional[dict]:
+        """
+        Return the stored response for the most similar prior question, if
+        close enough. `embedding` is in `space`; answers cached against any
+        other index `version` of the video are dropped.
+        """
+        query = self._normalize(embedding)
+        now = time.monotonic()
+        cache_key = (video_id, space)
+
+        with self._lock:
+            entries = self._videos.get(cache_key)
+            if entries:
+                for key in [k for k, e in entries.items() if e["expires"] <= now or e["version"] != version]:
+                    del entries[key]
+
+            if not entries:
+                self.misses += 1
+                return None
+
+            keys = list(entries)
+            matrix = np.stack([entries[k]["vector"] for k in keys])
+            scores = matrix @ query
+            best = int(np.argmax(scores))
+
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            entries.move_to_end(keys[best])
+            self._videos.move_to_end(cache_key)
+            self.hits += 1
+            return copy.deepcopy(entries[keys[best]]["response"])
+
+    def put(self, video_id: str, space: Optional[str], version: Any, question: str, embedding: List[float], response: dict):
+        cache_key = (video_id, space)
+        with self._lock:
+            entries = self._videos.setdefault(cache_key, OrderedDict())
+            self._videos.move_to_end(cache_key)
+
+            entries[str(uuid.uuid4())] = {
+                "question": question,
+                "version": version,
+                "vector": self._normalize(embedding),
+                "response": copy.deepcopy(response),
+                "expires": time.monotonic() + self.ttl,
+            }
+
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+            while len(self._videos) > self.max_videos:
+                self._videos.popitem(last=False)
+
+    def invalidate(self, video_id: str):
+        """
+        Drop all answers for a video in this worker (e.g. after it is
+        reindexed here); other workers notice the new index version on lookup
+        """
+        with self._lock:
+            for cache_key in [k for k in self._videos if k[0] == video_id]:
+                del self._videos[cache_key]
+
+    def clear(self):
+        with self._lock:
+            self._videos.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "videos": len({video_id for video_id, _ in self._videos}),
+                "entries": sum(len(e) for e in self._videos.values()),
+            }
+
+
+answer_cache = SemanticAnswerCache(
+    threshold=settings.answer_cache_threshold,
+    ttl=settings.answer_cache_ttl,
+    max_entries=settings.answer_cache_max_entries,
+)
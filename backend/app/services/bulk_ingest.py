@@ -0,0 +1,424 @@
+"""
+Bulk Ingest Service
+Backfills large catalogues from an NDJSON manifest, one URL, file or
+pre-existing transcript per line. Transcripts are prepared by a bounded
+worker pool, and chunks from several videos are embedded together so each
+provider call carries a full batch; indexed videos are then summarized for
+overview questions. Every manifest line is an ingest_items row, so an
+interrupted job resumes with the items still pending. The runner holds a
+lease on the job row, so one worker (or CLI process) runs it at a time and
+another can take over once a crashed runner's heartbeat goes stale.
+"""
+from datetime import datetime, timezone
+from typing import Callable, Iterable, List, Optional, Tuple, Union
+import asyncio
+import logging
+import os
+
+import orjson
+from sqlalchemy import exists, func
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..database import SessionLocal
+from ..models import IngestItem, IngestItemStatus, IngestJob, IngestStatus, Video, VideoSource, VideoStatus, VideoSummary
+from ..metrics import stage
+from ..utils import leases
+from .llm_router import llm_router
+from .rag_service import add_videos_to_index, chunk_text
+from .suggestions import suggestion_index
+from .transcript_store import load_transcript, save_transcript
+from .usage import usage_scope
+from .video_processor import create_summaries, fetch_transcript
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+MANIFEST_KINDS = ("url", "file", "transcript")
+# Seconds a partly filled embedding batch waits for more videos
+BATCH_LINGER = 2.0
+# Bind parameters per IN (...) lookup, well under SQLite's limit
+LOOKUP_PAGE = 500
+
+# Seconds a runner's lease on its job lasts; renewed every third of that
+JOB_LEASE_TTL = 60.0
+
+
+class ManifestError(ValueError):
+    """A manifest line is not a valid ingest entry"""
+
+
+def parse_manifest(
+    lines: Iterable[Union[str, bytes]], max_items: int, allowed_root: Optional[str] = None
+) -> List[dict]:
+    """
+    Validate NDJSON manifest lines: objects with "url", "file" or
+    "transcript" (a URL or file may carry its transcript too) and an
+    optional "title". Files must exist, under `allowed_root` if given.
+    """
+    root = os.path.realpath(allowed_root) if allowed_root else None
+    entries = []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            entry = orjson.loads(line)
+        except orjson.JSONDecodeError as exc:
+            raise ManifestError(f"Line {number}: invalid JSON ({exc})")
+        if not isinstance(entry, dict) or not any(entry.get(k) and isinstance(entry[k], str) for k in MANIFEST_KINDS):
+            raise ManifestError(f"Line {number}: expected an object with a url, file or transcript")
+        if entry.get("file"):
+            path = os.path.realpath(entry["file"])
+            if root and os.path.commonpath([path, root]) != root:
+                raise ManifestError(f"Line {number}: files must be in the upload directory")
+            if not os.path.isfile(path):
+                raise ManifestError(f"Line {number}: file not found: {entry['file']}")
+            entry["file"] = path
+        entry["line"] = number
+        entries.append(entry)
+        if len(entries) > max_items:
+            raise ManifestError(f"Manifest has more than {max_items} items")
+    if not entries:
+        raise ManifestError("Manifest is empty")
+    return entries
+
+
+def _ingested_urls(db: Session, urls: List[str]) -> dict:
+    """Completed videos by source URL"""
+    found = {}
+    for i in range(0, len(urls), LOOKUP_PAGE):
+        found.update(
+            (url, video_id) for video_id, url in db.query(Video.id, Video.source_url).filter(
+                Video.source_url.in_(urls[i:i + LOOKUP_PAGE]), Video.status == VideoStatus.COMPLETED
+            )
+        )
+    return found
+
+
+def _default_title(entry: dict, kind: str) -> str:
+    if kind == "url":
+        # Replaced by the fetched title, unless the transcript came with the URL
+        return entry["url"] if entry.get("transcript") else "Processing..."
+    if kind == "file":
+        return os.path.basename(entry["file"])
+    return f"Transcript {entry['line']}"
+
+
+def create_job(db: Session, entries: List[dict]) -> IngestJob:
+    """
+    Create a job with a pending video per entry. URLs that are already
+    ingested (or repeated in the manifest) are skipped, so re-submitting a
+    manifest only adds what is missing.
+    """
+    job = IngestJob(total=len(entries))
+    db.add(job)
+    db.flush()
+
+    seen = _ingested_urls(db, list({e["url"] for e in entries if e.get("url")}))
+    for entry in entries:
+        kind = next(k for k in MANIFEST_KINDS if entry.get(k))
+        url = entry.get("url")
+        item = IngestItem(job_id=job.id, line=entry["line"], kind=kind, source=url or entry.get("file"))
+        if url and url in seen:
+            item.video_id = seen[url]
+            item.status = IngestItemStatus.SKIPPED
+        else:
+            video = Video(
+                title=entry.get("title") or _default_title(entry, kind),
+                source_type=VideoSource.YOUTUBE if url else VideoSource.UPLOAD,
+                source_url=url,
+                file_path=entry.get("file"),
+                status=VideoStatus.PENDING,
+            )
+            db.add(video)
+            db.flush()
+            if entry.get("transcript"):
+                save_transcript(db, video.id, entry["transcript"])
+            item.video_id = video.id
+            if url:
+                seen[url] = video.id
+        db.add(item)
+    db.commit()
+    return job
+
+
+def job_progress(db: Session, job_id: str) -> Optional[dict]:
+    job = db.get(IngestJob, job_id)
+    if job is None:
+        return None
+    counts = dict(
+        db.query(IngestItem.status, func.count()).filter(IngestItem.job_id == job_id).group_by(IngestItem.status)
+    )
+    return {
+        "id": job.id,
+        "status": job.status,
+        "running": leases.is_held(job, JOB_LEASE_TTL),
+        "total": job.total,
+        **{status: counts.get(status, 0) for status in (
+            IngestItemStatus.PENDING, IngestItemStatus.DONE, IngestItemStatus.FAILED, IngestItemStatus.SKIPPED
+        )},
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def is_running(db: Session, job_id: str) -> bool:
+    """Whether any worker is running the job (holds a live lease on it)"""
+    job = db.get(IngestJob, job_id)
+    return job is not None and leases.is_held(job, JOB_LEASE_TTL)
+
+
+def _lease(session_factory: Callable[[], Session], job_id: str, release: bool = False) -> bool:
+    db = session_factory()
+    try:
+        if release:
+            leases.release(db, IngestJob, job_id)
+            return False
+        return leases.claim(db, IngestJob, job_id, JOB_LEASE_TTL)
+    finally:
+        db.close()
+
+
+async def _heartbeat(session_factory: Callable[[], Session], job_id: str, stop: asyncio.Event):
+    """
+    Keep renewing the job's lease until `stop` is set. Stopped rather than
+    cancelled: a cancelled renewal still commits in its thread, and could
+    re-take the lease after the job released it.
+    """
+    while True:
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=JOB_LEASE_TTL / 3)
+            return
+        except asyncio.TimeoutError:
+            pass
+        if not await asyncio.to_thread(_lease, session_factory, job_id):
+            logger.warning("Lost the lease on ingest job %s", job_id)
+
+
+async def _release(session_factory: Callable[[], Session], job_id: str, heartbeat: asyncio.Task):
+    """Release the job's lease once its heartbeat has stopped (or failed)"""
+    await asyncio.wait([heartbeat])
+    await asyncio.to_thread(_lease, session_factory, job_id, True)
+
+
+def retry_failed(db: Session, job_id: str) -> int:
+    """Queue a job's failed items again; returns how many"""
+    retried = db.query(IngestItem).filter(
+        IngestItem.job_id == job_id, IngestItem.status == IngestItemStatus.FAILED
+    ).update({"status": IngestItemStatus.PENDING, "error": None}, synchronize_session=False)
+    db.commit()
+    return retried
+
+
+def _finish(
+    db: Session, items: List[IngestItem], error: Optional[Exception] = None, transcripts: Optional[dict] = None
+):
+    """
+    Record items (and their videos) as done, or failed with `error`. Done
+    videos are added to autocomplete with their `transcripts` by item id.
+    """
+    rows = db.query(IngestItem).filter(IngestItem.id.in_([item.id for item in items])).all()
+    videos = {v.id: v for v in db.query(Video).filter(Video.id.in_([row.video_id for row in rows]))}
+    for row in rows:
+        video = videos.get(row.video_id)
+        if error is None:
+            row.status = IngestItemStatus.DONE
+            if video:
+                video.status = VideoStatus.COMPLETED
+                video.progress = 100
+        else:
+            row.status = IngestItemStatus.FAILED
+            row.error = str(error)[:1000]
+            if video:
+                video.status = VideoStatus.FAILED
+                video.error_message = str(error)
+    db.commit()
+    if error is None:
+        for row in rows:
+            video = videos.get(row.video_id)
+            if video:
+                suggestion_index.add_video(video.id, video.title, (transcripts or {}).get(row.id))
+
+
+async def _prepare(db: Session, item: IngestItem) -> str:
+    """Load or fetch one item's transcript, leaving its video at 60%"""
+    video = db.get(Video, item.video_id)
+    if video is None:
+        raise ValueError("Video was deleted")
+    video.status = VideoStatus.PROCESSING
+
+    # Manifest transcripts (and earlier attempts') are already stored
+    transcript = load_transcript(db, video.id)
+    if not transcript:
+        video.progress = 10
+        db.commit()
+        transcript = await fetch_transcript(
+            db, video, item.source, is_local=item.kind != "url", keep_title=video.title != "Processing..."
+        )
+    video.progress = 60
+    db.commit()
+    return transcript
+
+
+async def run_job(
+    job_id: str,
+    workers: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    session_factory: Callable[[], Session] = SessionLocal,
+) -> Optional[dict]:
+    """
+    Process a job's pending items: `workers` transcripts are prepared at
+    once, and prepared videos are grouped until their chunks fill
+    `batch_size` texts (default: the embedding provider's request size)
+    before one embedding call indexes the whole group. Once indexed, done
+    videos without summaries are summarized `workers` at a time. Returns the
+    job's progress, or None if the job is gone or another worker holds its
+    lease; cancelling leaves unfinished items pending for a resume.
+    """
+    workers = workers or settings.bulk_ingest_workers
+    if batch_size is None:
+        provider = llm_router.embedding_provider()
+        batch_size = provider.embed_batch_size if provider else 100
+
+    if not await asyncio.to_thread(_lease, session_factory, job_id):
+        return None
+    db = session_factory()
+    stop_heartbeat = asyncio.Event()
+    heartbeat = asyncio.create_task(_heartbeat(session_factory, job_id, stop_heartbeat))
+    tasks: List[asyncio.Task] = []
+    try:
+        job = db.get(IngestJob, job_id)
+        if job is None:
+            return None
+        job.status = IngestStatus.RUNNING
+        db.commit()
+
+        todo: asyncio.Queue = asyncio.Queue()
+        for item in db.query(IngestItem).filter(
+            IngestItem.job_id == job_id, IngestItem.status == IngestItemStatus.PENDING
+        ).order_by(IngestItem.line):
+            todo.put_nowait(item)
+        db.expunge_all()
+        # Bounded, so preparation can't run far ahead of embedding
+        ready: asyncio.Queue = asyncio.Queue(maxsize=workers * 4)
+        # Up to the background lane's share of provider slots
+        embed_slots = asyncio.Semaphore(max(1, settings.lane_background_concurrency))
+
+        async def prepare():
+            session = session_factory()
+            try:
+                while not todo.empty():
+                    item = todo.get_nowait()
+                    try:
+                        with usage_scope(route="bulk-ingest", video_id=item.video_id):
+                            transcript = await _prepare(session, item)
+                    except Exception as exc:
+                        logger.warning("Bulk ingest item %s (line %d) failed: %s", item.id, item.line, exc)
+                        session.rollback()
+                        _finish(session, [item], exc)
+                        continue
+                    await ready.put((item, transcript))
+            finally:
+                session.close()
+
+        async def index_batch(batch: List[Tuple[IngestItem, str]], session: Session):
+            try:
+                await add_videos_to_index([(item.video_id, transcript) for item, transcript in batch])
+            except Exception as exc:
+                if len(batch) == 1:
+                    logger.warning("Bulk ingest item %s (line %d) failed: %s", batch[0][0].id, batch[0][0].line, exc)
+                    _finish(session, [batch[0][0]], exc)
+                    return
+                # One bad video shouldn't fail its whole batch: retry them one by one
+                for entry in batch:
+                    await index_batch([entry], session)
+                return
+            _finish(session, [item for item, _ in batch], transcripts={item.id: text for item, text in batch})
+
+        async def index(batch: List[Tuple[IngestItem, str]]):
+            async with embed_slots:
+                session = session_factory()
+                try:
+                    with stage("ingest.bulk_batch") as span, usage_scope(route="bulk-ingest"):
+                        span.set_attribute("ingest.videos", len(batch))
+                        await index_batch(batch, session)
+                finally:
+                    session.close()
+
+        async def batch_videos():
+            batch, texts, pending = [], 0, set()
+
+            def flush():
+                nonlocal batch, texts
+                task = asyncio.create_task(index(batch))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                batch, texts = [], 0
+
+            while True:
+                try:
+                    entry = await asyncio.wait_for(ready.get(), timeout=BATCH_LINGER)
+                except asyncio.TimeoutError:
+                    if batch:
+                        flush()
+                    continue
+                if entry is None:
+                    break
+                batch.append(entry)
+                texts += len(chunk_text(entry[1] or ""))
+                if texts >= batch_size:
+                    flush()
+            if batch:
+                flush()
+            await asyncio.gather(*pending)
+
+        tasks = [asyncio.create_task(prepare()) for _ in range(workers)]
+        batcher = asyncio.create_task(batch_videos())
+        tasks.append(batcher)
+        await asyncio.gather(*tasks[:-1])
+        await ready.put(None)
+        await batcher
+
+        # Summaries after indexing, so LLM calls never hold up embedding batches
+        if settings.summaries_enabled:
+            unsummarized: asyncio.Queue = asyncio.Queue()
+            for (video_id,) in db.query(IngestItem.video_id).join(Video, Video.id == IngestItem.video_id).filter(
+                IngestItem.job_id == job_id,
+                IngestItem.status == IngestItemStatus.DONE,
+                ~exists().where(VideoSummary.video_id == IngestItem.video_id),
+            ).order_by(IngestItem.line):
+                unsummarized.put_nowait(video_id)
+
+            async def summarize():
+                session = session_factory()
+                try:
+                    while not unsummarized.empty():
+                        video_id = unsummarized.get_nowait()
+                        with usage_scope(route="bulk-ingest", video_id=video_id):
+                            await create_summaries(session, video_id, load_transcript(session, video_id))
+                finally:
+                    session.close()
+
+            tasks = [asyncio.create_task(summarize()) for _ in range(workers)]
+            await asyncio.gather(*tasks)
+
+        job = db.get(IngestJob, job_id)
+        pending = db.query(IngestItem).filter(
+            IngestItem.job_id == job_id, IngestItem.status == IngestItemStatus.PENDING
+        ).count()
+        if not pending:
+            job.status = IngestStatus.COMPLETED
+            job.finished_at = datetime.now(timezone.utc)
+            db.commit()
+    finally:
+        stop_heartbeat.set()
+        for task in tasks:
+            task.cancel()
+        db.close()
+        await asyncio.shield(_release(session_factory, job_id, heartbeat))
+
+    db = session_factory()
+    try:
+        return job_progress(db, job_id)
+    finally:
+        db.close()
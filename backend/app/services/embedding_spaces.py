@@ -0,0 +1,338 @@
+"""
+Embedding Spaces
+Each embedding model gets its own vector space, so switching models never
+mixes incompatible vectors. The configured model's space becomes the
+migration target when it differs from the active one: new videos are
+indexed there, a throttled backfill re-embeds existing videos into it, and
+each video is read from the target as soon as it is complete there (from
+the old space until then). Cutover makes the target active.
+"""
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+import threading
+import time
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models import EmbeddingSpace, EmbeddingSpaceState, Video, VideoEmbedding, VideoStatus
+from ..utils import leases
+from .providers import Provider
+
+logger = logging.getLogger(__name__)
+
+# Seconds a backfill lease lasts without renewal (renewed before each video)
+BACKFILL_LEASE_TTL = 300.0
+
+
+class EmbeddingSpaces:
+    """
+    Which space serves reads for each video and which receives writes.
+    State lives in the embedding_spaces / video_embeddings tables and is
+    cached here, reloaded every `refresh_interval` seconds so all workers
+    follow a migration.
+    """
+
+    def __init__(self, session_factory=SessionLocal, refresh_interval: float = 5.0):
+        self.session_factory = session_factory
+        self.refresh_interval = refresh_interval
+        self.active: Optional[str] = None
+        self.target: Optional[str] = None
+        self._migrated: Set[str] = set()
+        # space -> (provider, model) of every space not retired
+        self._models: Dict[str, Tuple[str, str]] = {}
+        self._loaded_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def _session(self, db: Optional[Session]):
+        return db or self.session_factory()
+
+    def load(self, db: Optional[Session] = None):
+        session = self._session(db)
+        try:
+            spaces = session.query(EmbeddingSpace).filter(EmbeddingSpace.state != EmbeddingSpaceState.RETIRED).all()
+            rows = {row.state: row.name for row in spaces}
+            models = {row.name: (row.provider, row.model) for row in spaces}
+            target = rows.get(EmbeddingSpaceState.BUILDING)
+            migrated = set()
+            if target:
+                migrated = {video_id for (video_id,) in session.query(VideoEmbedding.video_id).filter(
+                    VideoEmbedding.space == target
+                )}
+        finally:
+            if db is None:
+                session.close()
+        with self._lock:
+            self.active = rows.get(EmbeddingSpaceState.ACTIVE)
+            self.target = target
+            self._migrated = migrated
+            self._models = models
+            self._loaded_at = time.monotonic()
+
+    def _fresh(self):
+        if time.monotonic() - self._loaded_at > self.refresh_interval:
+            self.load()
+
+    def configure(self, provider: Provider, db: Optional[Session] = None) -> str:
+        """
+        Register the configured embedding provider's space at startup. The
+        first space becomes active (adopting vectors from before spaces
+        existed); a different one becomes the migration target. Workers
+        starting together may race to insert the row: the loser rolls back
+        and goes by the winner's row, and only the winner adopts vectors.
+        """
+        from .vector_store import get_vector_store
+
+        name = provider.embedding_space
+        session = self._session(db)
+        try:
+            try:
+                created = self._register(session, provider)
+            except IntegrityError:
+                session.rollback()
+                created = self._register(session, provider)
+            if created:
+                moved = get_vector_store().adopt_legacy(name)
+                if moved:
+                    logger.info("Adopted %d unversioned vectors into %s", moved, name)
+            self.load(session)
+        finally:
+            if db is None:
+                session.close()
+        return name
+
+    def _register(self, session: Session, provider: Provider) -> bool:
+        """Write the provider's space row; True if this made it the first, active space"""
+        name = provider.embedding_space
+        spaces = {row.name: row for row in session.query(EmbeddingSpace)}
+        active = next((r for r in spaces.values() if r.state == EmbeddingSpaceState.ACTIVE), None)
+        if active is None:
+            session.add(EmbeddingSpace(
+                name=name, provider=provider.name, model=provider.embedding_model,
+                state=EmbeddingSpaceState.ACTIVE, activated_at=datetime.now(timezone.utc),
+            ))
+            session.commit()
+            return True
+        if active.name != name:
+            # Only one migration at a time: a newly configured model replaces an unfinished one
+            for row in spaces.values():
+                if row.state == EmbeddingSpaceState.BUILDING and row.name != name:
+                    row.state = EmbeddingSpaceState.RETIRED
+            row = spaces.get(name)
+            if row is None:
+                session.add(EmbeddingSpace(
+                    name=name, provider=provider.name, model=provider.embedding_model,
+                    state=EmbeddingSpaceState.BUILDING,
+                ))
+            elif row.state != EmbeddingSpaceState.BUILDING:
+                row.state = EmbeddingSpaceState.BUILDING
+            session.commit()
+            logger.info("Embedding model changed: migrating from %s to %s", active.name, name)
+        return False
+
+    def write_space(self) -> Optional[str]:
+        """Space new videos are indexed into"""
+        self._fresh()
+        return self.target or self.active
+
+    def read_space(self, video_id: str) -> Optional[str]:
+        """Space holding this video's complete index"""
+        self._fresh()
+        if self.target and video_id in self._migrated:
+            return self.target
+        return self.active
+
+    def read_space_many(self, video_ids) -> Dict[str, Optional[str]]:
+        """read_space for several videos from one refresh"""
+        self._fresh()
+        with self._lock:
+            target, active, migrated = self.target, self.active, self._migrated
+        return {v: target if target and v in migrated else active for v in video_ids}
+
+    def index_version(self, video_id: str, space: Optional[str], db: Optional[Session] = None) -> Optional[datetime]:
+        """When the video was last indexed into `space` (None if it never was through spaces)"""
+        if not space:
+            return None
+        session = self._session(db)
+        try:
+            return session.query(VideoEmbedding.indexed_at).filter(
+                VideoEmbedding.video_id == video_id, VideoEmbedding.space == space
+            ).scalar()
+        finally:
+            if db is None:
+                session.close()
+
+    def model_of(self, space: str) -> Optional[Tuple[str, str]]:
+        """(provider, model) embedding into a space that isn't retired"""
+        model = self._models.get(space)
+        if model is None:
+            # Registered since the last refresh, perhaps by another worker
+            self.load()
+            model = self._models.get(space)
+        return model
+
+    def read_spaces(self) -> List[str]:
+        """Spaces a cross-video search reads (both while migrating)"""
+        self._fresh()
+        return [s for s in (self.active, self.target) if s]
+
+    def mark_indexed(self, video_id: str, space: str, chunks: int, db: Optional[Session] = None):
+        self.mark_indexed_many(space, {video_id: chunks}, db)
+
+    def mark_indexed_many(self, space: str, chunks_by_video: Dict[str, int], db: Optional[Session] = None):
+        """Record videos as fully indexed in `space`, in one transaction"""
+        session = self._session(db)
+        try:
+            indexed_at = datetime.now(timezone.utc)
+            for video_id, chunks in chunks_by_video.items():
+                session.merge(VideoEmbedding(video_id=video_id, space=space, chunks=chunks, indexed_at=indexed_at))
+            session.commit()
+        finally:
+            if db is None:
+                session.close()
+        with self._lock:
+            if space == self.target:
+                self._migrated.update(chunks_by_video)
+
+    def pending(self, db: Optional[Session] = None, limit: Optional[int] = None) -> List[str]:
+        """Completed videos not yet indexed in the target space, oldest first"""
+        self._fresh()
+        if not self.target:
+            return []
+        session = self._session(db)
+        try:
+            indexed = session.query(VideoEmbedding.video_id).filter(VideoEmbedding.space == self.target)
+            query = session.query(Video.id).filter(
+                Video.status == VideoStatus.COMPLETED, ~Video.id.in_(indexed)
+            ).order_by(Video.created_at, Video.id)
+            if limit:
+                query = query.limit(limit)
+            return [video_id for (video_id,) in query]
+        finally:
+            if db is None:
+                session.close()
+
+    def status(self, db: Optional[Session] = None) -> dict:
+        session = self._session(db)
+        try:
+            self.load(session)
+            total = session.query(Video).filter(Video.status == VideoStatus.COMPLETED).count()
+            return {
+                "active": self.active,
+                "target": self.target,
+                "videos": total,
+                "migrated": total - len(self.pending(session)) if self.target else None,
+                "spaces": [row.to_dict() for row in session.query(EmbeddingSpace).order_by(EmbeddingSpace.created_at)],
+            }
+        finally:
+            if db is None:
+                session.close()
+
+    def cutover(self, db: Optional[Session] = None, force: bool = False, drop_old: bool = False) -> dict:
+        """
+        Make the target space active. Refuses while videos are still pending
+        unless `force` (those videos then need re-indexing). `drop_old`
+        deletes the retired space's vectors.
+        """
+        from .answer_cache import answer_cache
+        from .vector_store import get_vector_store
+
+        session = self._session(db)
+        try:
+            self.load(session)
+            if not self.target:
+                raise ValueError("No embedding migration in progress")
+            pending = self.pending(session)
+            if pending and not force:
+                raise ValueError(f"{len(pending)} videos are not yet re-embedded into {self.target}")
+
+            old, new = self.active, self.target
+            for row in session.query(EmbeddingSpace).filter(EmbeddingSpace.name.in_([old, new])):
+                if row.name == new:
+                    row.state = EmbeddingSpaceState.ACTIVE
+                    row.activated_at = datetime.now(timezone.utc)
+                else:
+                    row.state = EmbeddingSpaceState.RETIRED
+            session.query(VideoEmbedding).filter(VideoEmbedding.space == old).delete(synchronize_session=False)
+            session.commit()
+            self.load(session)
+        finally:
+            if db is None:
+                session.close()
+
+        # Cached answers were matched with query vectors from the old space
+        answer_cache.clear()
+        if drop_old:
+            get_vector_store().drop_space(old)
+        logger.info("Embedding cutover: %s -> %s (%d videos skipped)", old, new, len(pending))
+        return {"retired": old, "active": new, "skipped": len(pending)}
+
+
+def _load_transcript(spaces: "EmbeddingSpaces", video_id: str) -> Optional[str]:
+    from .transcript_store import load_transcript
+
+    db = spaces.session_factory()
+    try:
+        return load_transcript(db, video_id)
+    finally:
+        db.close()
+
+
+def _lease(spaces: "EmbeddingSpaces", target: str, release: bool = False) -> bool:
+    db = spaces.session_factory()
+    try:
+        if release:
+            leases.release(db, EmbeddingSpace, target)
+            return False
+        return leases.claim(db, EmbeddingSpace, target, BACKFILL_LEASE_TTL)
+    finally:
+        db.close()
+
+
+async def run_backfill(spaces: "EmbeddingSpaces", videos_per_minute: float) -> int:
+    """
+    Re-embed pending videos into the target space, one at a time on the
+    background lane, pausing between videos. Only the worker holding the
+    target space's lease backfills; the others wait to take over if its
+    lease lapses. Returns how many were done; stops when nothing is pending
+    or the target changes.
+    """
+    from .rag_service import add_video_to_index
+
+    await asyncio.to_thread(spaces.load)
+    target = spaces.target
+    done = 0
+    failed: Set[str] = set()
+    try:
+        while target and spaces.target == target:
+            if not await asyncio.to_thread(_lease, spaces, target):
+                # Another worker is backfilling
+                await asyncio.sleep(BACKFILL_LEASE_TTL / 2)
+                await asyncio.to_thread(spaces.load)
+                continue
+            pending = await asyncio.to_thread(spaces.pending, None, len(failed) + 1)
+            pending = [v for v in pending if v not in failed]
+            if not pending:
+                break
+            video_id = pending[0]
+            transcript = await asyncio.to_thread(_load_transcript, spaces, video_id)
+            try:
+                await add_video_to_index(video_id, transcript or "", space=target)
+                done += 1
+            except Exception:
+                logger.exception("Re-embedding video %s into %s failed", video_id, target)
+                failed.add(video_id)
+            await asyncio.sleep(60.0 / videos_per_minute)
+    finally:
+        if target:
+            await asyncio.to_thread(_lease, spaces, target, True)
+
+    if done:
+        logger.info("Backfilled %d videos into %s", done, target)
+    return done
+
+
+embedding_spaces = EmbeddingSpaces()
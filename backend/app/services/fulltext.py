@@ -0,0 +1,151 @@
+"""
+Full-Text Search Service
+Exact phrase and keyword lookups over transcripts and notes from the SQLite
+FTS5 index, answered locally without an embedding call. Results carry an
+HTML-safe snippet with the matches in <mark> and the estimated time of the
+first match.
+"""
+from html import escape
+from typing import List, Optional, Tuple
+import re
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..models.fulltext import NOTES_FTS, TRANSCRIPT_FTS, fts5_available
+from ..metrics import stage
+
+PHRASE, KEYWORD = "phrase", "keyword"
+# Words of context on each side of the first match
+SNIPPET_WORDS = 12
+# Match markers; private-use characters, so they survive HTML escaping
+_OPEN, _CLOSE = "\ue000", "\ue001"
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+_available = {}
+
+
+class FullTextUnavailable(RuntimeError):
+    """The database has no FTS5 index (not SQLite, or SQLite without FTS5)"""
+
+
+def is_available(db: Session) -> bool:
+    """Whether the database has the full-text tables (remembered once true)"""
+    bind = db.get_bind()
+    if _available.get(bind):
+        return True
+    connection = db.connection()
+    found = fts5_available(connection) and connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (TRANSCRIPT_FTS,)
+    ).first() is not None
+    if found:
+        _available[bind] = True
+    return found
+
+
+def match_expression(query: str, mode: str) -> Optional[str]:
+    """
+    FTS5 MATCH expression for a user query: the words as one exact phrase,
+    or (keyword) each word required anywhere, the last as a prefix.
+    Operators and punctuation in the query are never interpreted.
+    """
+    words = _TOKEN.findall(query)
+    if not words:
+        return None
+    if mode == PHRASE:
+        return '"' + " ".join(words) + '"'
+    return " ".join(f'"{w}"' for w in words[:-1]) + (" " if len(words) > 1 else "") + f'"{words[-1]}"*'
+
+
+def index_segments(db: Session, video_id: str, segments: List[dict]):
+    """Index a transcript's saved segments: dicts with id, start, end and text"""
+    if not segments or not is_available(db):
+        return
+    db.execute(
+        text(
+            f"INSERT INTO {TRANSCRIPT_FTS}(rowid, text, video_id, seg_start, seg_end) "
+            "VALUES (:id, :text, :video_id, :start, :end)"
+        ),
+        [{**s, "video_id": video_id} for s in segments],
+    )
+
+
+def _snippet(highlighted: str) -> Tuple[str, int]:
+    """HTML-safe snippet around the first match, and how many words precede it"""
+    words = highlighted.split()
+    first = next((i for i, w in enumerate(words) if _OPEN in w), 0)
+    begin = max(0, first - SNIPPET_WORDS)
+    end = min(len(words), first + SNIPPET_WORDS + 1)
+    window = " ".join(words[begin:end])
+    # A match cut off at either edge keeps its markers balanced
+    if window.count(_OPEN) > window.count(_CLOSE):
+        window += _CLOSE
+    if window.count(_CLOSE) > window.count(_OPEN):
+        window = _OPEN + window
+    snippet = escape(window).replace(_OPEN, "<mark>").replace(_CLOSE, "</mark>")
+    return ("…" if begin else "") + snippet + ("…" if end < len(words) else ""), first
+
+
+def search_text(
+    db: Session,
+    query: str,
+    mode: str = PHRASE,
+    video_id: Optional[str] = None,
+    limit: int = 10,
+    include_notes: bool = True,
+) -> List[dict]:
+    """
+    Best-matching transcript passages and notes (BM25), shaped like
+    semantic search results plus source, snippet and note_id
+    """
+    from .transcript_store import WORDS_PER_SECOND  # it imports this module
+
+    if not is_available(db):
+        raise FullTextUnavailable("Full-text search needs SQLite with FTS5")
+    expression = match_expression(query, mode)
+    if expression is None:
+        return []
+
+    params = {"q": expression, "video_id": video_id, "limit": limit, "open": _OPEN, "close": _CLOSE}
+    video_filter = "AND {table}.video_id = :video_id" if video_id else ""
+
+    with stage("search.fulltext") as span:
+        span.set_attribute("search.mode", mode)
+        rows = db.execute(text(f"""
+            SELECT 'transcript' AS source, NULL AS note_id, t.video_id, v.title, t.seg_start, t.seg_end,
+                   highlight({TRANSCRIPT_FTS}, 0, :open, :close) AS body, bm25({TRANSCRIPT_FTS}) AS score
+            FROM {TRANSCRIPT_FTS} t JOIN videos v ON v.id = t.video_id
+            WHERE {TRANSCRIPT_FTS} MATCH :q {video_filter.format(table="t")}
+            ORDER BY score LIMIT :limit
+        """), params).all()
+        if include_notes:
+            rows += db.execute(text(f"""
+                SELECT 'note' AS source, n.id AS note_id, f.video_id, v.title, f."timestamp", f."timestamp",
+                       highlight({NOTES_FTS}, 0, :open, :close) AS body, bm25({NOTES_FTS}) AS score
+                FROM {NOTES_FTS} f JOIN notes n ON n.search_rowid = f.rowid JOIN videos v ON v.id = f.video_id
+                WHERE {NOTES_FTS} MATCH :q {video_filter.format(table="f")}
+                ORDER BY score LIMIT :limit
+            """), params).all()
+        span.set_attribute("search.results", len(rows))
+
+    # bm25() is lower-is-better
+    rows.sort(key=lambda row: row.score)
+    results = []
+    for row in rows[:limit]:
+        snippet, words_before = _snippet(row.body)
+        start, end = row[4], row[5]
+        if row.source == "transcript":
+            # Same speaking-rate estimate as the segments' own timestamps
+            start = min(end, start + int(words_before / WORDS_PER_SECOND))
+        results.append({
+            "video_id": row.video_id,
+            "video_title": row.title,
+            "text": row.body.replace(_OPEN, "").replace(_CLOSE, ""),
+            "timestamp_start": start,
+            "timestamp_end": end,
+            "relevance_score": -row.score,
+            "source": row.source,
+            "snippet": snippet,
+            "note_id": row.note_id,
+        })
+    return results
@@ -0,0 +1,322 @@
+"""
+LLM Router
+Routes LLM and embedding calls across providers with per-call timeouts,
+jittered retries, failover, circuit breaking and optional hedged requests
+"""
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
+import asyncio
+import random
+import time
+
+from ..config import get_settings
+from ..metrics import provider_call_duration, provider_errors
+from ..telemetry import tracer, record_error
+from .providers import EMBEDDING_PREFERENCE, Provider, ProviderError, build_providers
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+
+class ProviderStats:
+    """Rolling latency window and success/error counters for one provider"""
+
+    def __init__(self, window: int = 200):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)  # True = success
+        self.successes = 0
+        self.errors = 0
+
+    def record(self, latency: float, ok: bool):
+        self.outcomes.append(ok)
+        if ok:
+            self.latencies.append(latency)
+            self.successes += 1
+        else:
+            self.errors += 1
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return 1 - sum(self.outcomes) / len(self.outcomes)
+
+    def to_dict(self) -> dict:
+        return {
+            "successes": self.successes,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate(), 4),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+        }
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures. After `reset_timeout`
+    seconds one trial call is let through (half-open); its outcome closes or
+    re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self._state = self.CLOSED
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return state == self.CLOSED
+
+    def release(self):
+        """A call ended without an outcome (cancelled); free the half-open trial slot"""
+        self._trial_in_flight = False
+
+    def record_success(self):
+        self.failures = 0
+        self._trial_in_flight = False
+        self._state = self.CLOSED
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self._state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+class LLMRouter:
+    def __init__(
+        self,
+        providers: List[Provider],
+        timeout: float = 30.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        hedge_enabled: bool = False,
+        hedge_min_delay: float = 0.5,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        embedding: Optional[str] = None,
+        embedding_model: str = "",
+    ):
+        self.providers = providers
+        # Name of the provider that embeds (None or empty: the first available)
+        # and its model (empty: the provider's default)
+        self.embedding = embedding or None
+        self.embedding_model = embedding_model
+        # Embedding clients by space: the configured model's, and older models
+        # still read from during a migration, each next to the other
+        self.embedders: Dict[str, Provider] = {}
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_enabled = hedge_enabled
+        self.hedge_min_delay = hedge_min_delay
+        self.stats = {p.name: ProviderStats() for p in providers}
+        self.breakers = {p.name: CircuitBreaker(failure_threshold, reset_timeout) for p in providers}
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    @classmethod
+    def from_settings(cls, settings) -> "LLMRouter":
+        return cls(
+            build_providers(settings),
+            timeout=settings.llm_timeout,
+            max_retries=settings.llm_max_retries,
+            backoff_base=settings.llm_backoff_base,
+            hedge_enabled=settings.llm_hedge_enabled,
+            hedge_min_delay=settings.llm_hedge_min_delay,
+            failure_threshold=settings.llm_circuit_failure_threshold,
+            reset_timeout=settings.llm_circuit_reset_timeout,
+            embedding=settings.embedding_provider,
+            embedding_model=settings.embedding_model,
+        )
+
+    def available(self) -> List[Provider]:
+        return [p for p in self.providers if p.available()]
+
+    def _candidates(self, providers: List[Provider]) -> List[Provider]:
+        return [p for p in providers if self.breakers[p.name].state != CircuitBreaker.OPEN]
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, base * 2^attempt]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def hedge_delay(self, provider: Provider) -> float:
+        p95 = self.stats[provider.name].percentile(95)
+        return max(self.hedge_min_delay, p95 or self.timeout / 2)
+
+    async def _call(self, provider: Provider, fn: Callable[[Provider], Awaitable[T]]) -> T:
+        if not self.breakers[provider.name].allow():
+            raise ProviderError(f"{provider.name} circuit is open")
+
+        with tracer.start_as_current_span(
+            "llm.provider_call", record_exception=False, set_status_on_exception=False
+        ) as span:
+            span.set_attribute("llm.provider", provider.name)
+            started = time.monotonic()
+            try:
+                result = await asyncio.wait_for(fn(provider), timeout=self.timeout)
+            except asyncio.CancelledError:
+                # Lost a hedge race: not the provider's fault
+                self.breakers[provider.name].release()
+                span.set_attribute("llm.cancelled", True)
+                raise
+            except Exception as e:
+                self.stats[provider.name].record(time.monotonic() - started, ok=False)
+                provider_errors.labels(provider.name).inc()
+                self.breakers[provider.name].record_failure()
+                record_error(span, e)
+                if isinstance(e, asyncio.TimeoutError):
+                    raise ProviderError(f"{provider.name} timed out after {self.timeout}s") from e
+                raise
+            elapsed = time.monotonic() - started
+            self.stats[provider.name].record(elapsed, ok=True)
+            provider_call_duration.labels(provider.name).observe(elapsed)
+            self.breakers[provider.name].record_success()
+            return result
+
+    async def _hedged(self, primary: Provider, secondary: Provider, fn: Callable[[Provider], Awaitable[T]]) -> T:
+        """Start `primary`; if it hasn't answered by its p95, race `secondary` against it"""
+        first = asyncio.ensure_future(self._call(primary, fn))
+        done, _ = await asyncio.wait({first}, timeout=self.hedge_delay(primary))
+        if done:
+            if first.exception() is None:
+                return first.result()
+            # Primary failed fast: go straight to the secondary
+            return await self._call(secondary, fn)
+
+        self.hedges += 1
+        second = asyncio.ensure_future(self._call(secondary, fn))
+        pending = {first, second}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _route(self, fn: Callable[[Provider], Awaitable[T]], providers: List[Provider]) -> T:
+        """Try providers in order, retrying the whole list with jittered backoff"""
+        last_error: Optional[Exception] = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                await asyncio.sleep(self._backoff(attempt - 1))
+
+            candidates = self._candidates(providers)
+            if not candidates:
+                last_error = ProviderError("All providers unavailable (circuits open)")
+                continue
+
+            if self.hedge_enabled and len(candidates) > 1:
+                try:
+                    return await self._hedged(candidates[0], candidates[1], fn)
+                except Exception as e:
+                    last_error = e
+                    continue
+
+            for provider in candidates:
+                try:
+                    return await self._call(provider, fn)
+                except Exception as e:
+                    last_error = e
+
+        raise last_error
+
+    async def generate(self, system_prompt: str, user_message: str) -> str:
+        providers = self.available()
+        if not providers:
+            raise ProviderError("No valid LLM API key configured")
+        return await self._route(lambda p: p.generate(system_prompt, user_message), providers)
+
+    async def embed(self, texts: List[str], space: Optional[str] = None) -> List[List[float]]:
+        """Embed with the embedding provider, or with the client embedding into `space`"""
+        if not self.available():
+            raise ProviderError("No valid AI API key configured. Please add GOOGLE_API_KEY or OPENAI_API_KEY to .env")
+        if space:
+            provider = self.embedders.get(space) or next(
+                (p for p in [self.embedding_provider(), *self.available()] if p and p.embedding_space == space), None
+            )
+            if provider is None:
+                raise ProviderError(f"No configured provider embeds into space {space}")
+        else:
+            provider = self.embedding_provider()
+            if provider is None:
+                raise ProviderError(f"Embedding provider {self.embedding} has no API key configured")
+        # Vectors from different providers live in different spaces, so
+        # embeddings retry on one provider but never fail over
+        return await self._route(lambda p: p.embed(texts), [provider])
+
+    def embedding_provider(self) -> Optional[Provider]:
+        """The client new vectors come from, or None if its provider isn't configured"""
+        providers = self.available()
+        if self.embedding is None:
+            # Not the preferred LLM, so changing LLM_PROVIDER never moves the space
+            base = min(providers, key=self._embedding_rank, default=None)
+        else:
+            base = next((p for p in providers if p.name == self.embedding), None)
+        return base and self.embedder(base.name, self.embedding_model)
+
+    def embedder(self, provider: str, model: str) -> Optional[Provider]:
+        """
+        The client embedding with `model` on the named provider, created once
+        per space (None if that provider has no API key). Registered spaces
+        get one each, so videos not yet re-embedded after a model change are
+        still queried with their own model.
+        """
+        base = next((p for p in self.available() if p.name == provider), None)
+        if base is None:
+            return None
+        client = base.with_embedding_model(model)
+        return self.embedders.setdefault(client.embedding_space, client)
+
+    @staticmethod
+    def _embedding_rank(provider: Provider) -> int:
+        if provider.name in EMBEDDING_PREFERENCE:
+            return EMBEDDING_PREFERENCE.index(provider.name)
+        return len(EMBEDDING_PREFERENCE)
+
+    def status(self) -> dict:
+        return {
+            p.name: {
+                "available": p.available(),
+                "circuit": self.breakers[p.name].state,
+                **self.stats[p.name].to_dict(),
+            }
+            for p in self.providers
+        }
+
+
+llm_router = LLMRouter.from_settings(settings)
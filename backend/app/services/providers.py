@@ -0,0 +1,269 @@
+"""
+LLM Providers
+Thin async wrappers around the Google and OpenAI SDKs, plus a deterministic
+fake provider for offline tests and benchmarks
+"""
+from abc import ABC, abstractmethod
+from typing import List, Optional
+import asyncio
+import copy
+import hashlib
+import json
+import math
+import random
+import re
+
+from ..config import Settings
+from .usage import report_usage
+
+
+# Which provider embeds when none is configured: the first of these with an
+# API key, whichever LLM is preferred
+EMBEDDING_PREFERENCE = ("google", "openai")
+
+
+class ProviderError(Exception):
+    """A provider call failed (timeout, API error, or no provider configured)"""
+
+
+class Provider(ABC):
+    name: str = "base"
+    embedding_model: str = ""
+    # Most texts one embedding request may carry; larger lists are split
+    embed_batch_size: int = 100
+
+    @property
+    def embedding_space(self) -> str:
+        """Name of the vector space this provider's embeddings live in"""
+        return re.sub(r"[^a-z0-9]+", "-", f"{self.name}-{self.embedding_model}".lower()).strip("-")
+
+    def available(self) -> bool:
+        return True
+
+    def warm_up(self):
+        """Import the SDK and build the client ahead of the first request"""
+
+    def with_embedding_model(self, model: str) -> "Provider":
+        """This provider embedding with `model` instead (itself if that's its model)"""
+        if not model or model == self.embedding_model:
+            return self
+        embedder = copy.copy(self)
+        embedder.embedding_model = model
+        return embedder
+
+    @abstractmethod
+    async def generate(self, system_prompt: str, user_message: str) -> str:
+        """Answer `user_message` under `system_prompt`"""
+
+    @abstractmethod
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """One embedding per text, in order"""
+
+
+def _valid_key(key: str) -> bool:
+    return bool(key) and not key.startswith("your-")
+
+
+class GoogleProvider(Provider):
+    name = "google"
+    embedding_model = "models/text-embedding-004"
+
+    def __init__(self, api_key: str, model: str = "gemini-2.0-flash"):
+        self.api_key = api_key
+        self.model = model
+        self._module = None
+
+    def available(self) -> bool:
+        return _valid_key(self.api_key)
+
+    def warm_up(self):
+        self._genai()
+
+    def _genai(self):
+        # The SDK is imported and configured once, on first use
+        if self._module is None:
+            import google.generativeai as genai
+            genai.configure(api_key=self.api_key)
+            self._module = genai
+        return self._module
+
+    async def generate(self, system_prompt: str, user_message: str) -> str:
+        genai = self._genai()
+        model = genai.GenerativeModel(self.model)
+        # SDK calls block; run them off the event loop
+        response = await asyncio.to_thread(
+            model.generate_content, f"{system_prompt}\n\nUser: {user_message}"
+        )
+        usage = getattr(response, "usage_metadata", None)
+        report_usage(
+            self.name, self.model,
+            getattr(usage, "prompt_token_count", None),
+            getattr(usage, "candidates_token_count", None),
+        )
+        return response.text
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        genai = self._genai()
+        embeddings = []
+        for i in range(0, len(texts), self.embed_batch_size):
+            # A list of contents is embedded in one request, one vector each
+            result = await asyncio.to_thread(
+                genai.embed_content, model=self.embedding_model, content=texts[i:i + self.embed_batch_size]
+            )
+            embeddings.extend(result["embedding"])
+        report_usage(self.name, self.embedding_model)
+        return embeddings
+
+
+class OpenAIProvider(Provider):
+    name = "openai"
+    embedding_model = "text-embedding-ada-002"
+    # The API takes 2048 inputs but caps tokens per request; chunks run ~650 tokens
+    embed_batch_size = 256
+
+    def __init__(self, api_key: str, model: str = "gpt-4o-mini"):
+        self.api_key = api_key
+        self.model = model
+        self._openai = None
+
+    def available(self) -> bool:
+        return _valid_key(self.api_key)
+
+    def warm_up(self):
+        self._client()
+
+    def _client(self):
+        # One client (and connection pool) per provider, created on first use
+        if self._openai is None:
+            import openai
+            self._openai = openai.OpenAI(api_key=self.api_key)
+        return self._openai
+
+    async def generate(self, system_prompt: str, user_message: str) -> str:
+        response = await asyncio.to_thread(
+            self._client().chat.completions.create,
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_message}
+            ],
+            temperature=0.7
+        )
+        usage = getattr(response, "usage", None)
+        report_usage(
+            self.name, self.model,
+            getattr(usage, "prompt_tokens", None),
+            getattr(usage, "completion_tokens", None),
+        )
+        return response.choices[0].message.content
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        embeddings = []
+        prompt_tokens = 0
+        for i in range(0, len(texts), self.embed_batch_size):
+            response = await asyncio.to_thread(
+                self._client().embeddings.create,
+                model=self.embedding_model,
+                input=texts[i:i + self.embed_batch_size]
+            )
+            usage = getattr(response, "usage", None)
+            if prompt_tokens is not None and getattr(usage, "prompt_tokens", None) is not None:
+                prompt_tokens += usage.prompt_tokens
+            else:
+                prompt_tokens = None
+            embeddings.extend(e.embedding for e in response.data)
+        report_usage(self.name, self.embedding_model, prompt_tokens, 0)
+        return embeddings
+
+
+class FakeProvider(Provider):
+    """
+    Offline provider. Embeddings are hashed bags of words, so texts sharing
+    words are similar. Quiz prompts get valid quiz JSON, summary prompts a
+    heading line and the opening words; anything else gets a short canned
+    answer. Latency and failure rate are configurable.
+    """
+    name = "fake"
+    embedding_model = "fake-hash-64"
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        dimensions: int = 64,
+        seed: Optional[int] = None,
+        name: str = "fake",
+    ):
+        self.name = name
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.dimensions = dimensions
+        self.embedding_model = f"fake-hash-{dimensions}"
+        self._random = random.Random(seed)
+
+    def with_embedding_model(self, model: str) -> "FakeProvider":
+        embedder = super().with_embedding_model(model)
+        match = re.fullmatch(r"fake-hash-(\d+)", model or "")
+        if match:
+            embedder.dimensions = int(match.group(1))
+        return embedder
+
+    async def _simulate(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            raise ProviderError("fake provider failure")
+
+    async def generate(self, system_prompt: str, user_message: str) -> str:
+        await self._simulate()
+        report_usage(self.name, "fake")
+
+        match = re.search(r"Create (\d+) multiple choice questions", system_prompt)
+        if match:
+            return json.dumps([
+                {
+                    "id": f"q{i + 1}",
+                    "question": f"Fake question {i + 1}?",
+                    "options": [{"id": o, "text": f"Option {o.upper()}"} for o in "abcd"],
+                    "correct_answer": "a",
+                }
+                for i in range(int(match.group(1)))
+            ])
+
+        if system_prompt.startswith("Summarize"):
+            words = user_message.split()
+            return f"Part on {' '.join(words[:3])}\n{' '.join(words[:30])}"
+
+        return f"Fake answer to: {user_message[:200]}"
+
+    def embed_one(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for word in re.findall(r"\w+", text.lower()):
+            bucket = int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dimensions
+            vector[bucket] += 1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        # One simulated round trip per request, as real providers batch
+        for _ in range(0, len(texts), self.embed_batch_size):
+            await self._simulate()
+        report_usage(self.name, self.embedding_model)
+        return [self.embed_one(t) for t in texts]
+
+
+def build_providers(settings: Settings) -> List[Provider]:
+    """
+    Configured providers, preferred (settings.llm_provider) first, each with
+    its default embedding model; the router derives one embedding client per
+    embedding space from them (see LLMRouter.embedder)
+    """
+    if settings.llm_provider == "fake":
+        return [FakeProvider(latency=settings.fake_provider_latency)]
+
+    providers = [
+        GoogleProvider(settings.google_api_key),
+        OpenAIProvider(settings.openai_api_key),
+    ]
+    providers.sort(key=lambda p: p.name != settings.llm_provider)
+    return providers
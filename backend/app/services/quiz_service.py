@@ -2,23 +2,30 @@
 Quiz Service
 Handles quiz generation and analysis using AI
 """
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 import json
 import uuid
 
 from ..config import get_settings
+from ..metrics import stage
+from ..telemetry import estimate_tokens
 from .rag_service import generate_llm_response
+from .scheduler import LaneSaturated, QUIZ
+from .usage import usage_scope
 
 settings = get_settings()
 
+# Transcript budget for the quiz generation prompt
+MAX_TRANSCRIPT_CHARS = 10000
+
 
 async def generate_quiz_questions(video_id: str, transcript: str, count: int = 10) -> List[dict]:
     """Generate quiz questions from video transcript using AI"""
     
     # Truncate transcript if too long
-    max_chars = 10000
-    if len(transcript) > max_chars:
-        transcript = transcript[:max_chars] + "..."
+    transcript = transcript or ""
+    if len(transcript) > MAX_TRANSCRIPT_CHARS:
+        transcript = transcript[:MAX_TRANSCRIPT_CHARS] + "..."
     
     system_prompt = f"""You are a quiz generator. Create {count} multiple choice questions based on the video transcript.
     
@@ -48,9 +55,24 @@ Video Transcript:
 
     user_message = f"Generate {count} multiple choice questions about this video content."
     
-    response = await generate_llm_response(system_prompt, user_message)
+    with usage_scope(video_id=video_id):
+        response = await generate_llm_response(system_prompt, user_message, lane=QUIZ)
     
     # Parse JSON from response
+    with stage("quiz.parse_json") as span:
+        span.set_attribute("video.id", video_id)
+        span.set_attribute("llm.completion_tokens", estimate_tokens(response))
+        questions = parse_quiz_questions(response)
+        span.set_attribute("quiz.fallback", questions is None)
+        if questions is None:
+            # Fallback: generate simple questions
+            return generate_fallback_questions(count)
+        span.set_attribute("quiz.questions", len(questions))
+        return questions
+
+
+def parse_quiz_questions(response: str) -> Optional[List[dict]]:
+    """Questions from the model's reply (bare or fenced JSON); None if it isn't JSON"""
     try:
         # Try to extract JSON from response
         json_match = response
@@ -60,17 +82,15 @@ Video Transcript:
             json_match = response.split("```")[1].split("```")[0]
         
         questions = json.loads(json_match.strip())
-        
-        # Ensure all questions have proper IDs
-        for i, q in enumerate(questions):
-            if "id" not in q:
-                q["id"] = f"q{i+1}"
-        
-        return questions
-        
     except json.JSONDecodeError:
-        # Fallback: generate simple questions
-        return generate_fallback_questions(count)
+        return None
+    
+    # Ensure all questions have proper IDs
+    for i, q in enumerate(questions):
+        if "id" not in q:
+            q["id"] = f"q{i+1}"
+    
+    return questions
 
 
 def generate_fallback_questions(count: int) -> List[dict]:
@@ -120,7 +140,7 @@ Be constructive and helpful."""
     user_message = "Analyze these quiz results and provide feedback."
     
     try:
-        analysis = await generate_llm_response(system_prompt, user_message)
+        analysis = await generate_llm_response(system_prompt, user_message, lane=QUIZ)
         
         # Extract knowledge gaps (simplified)
         knowledge_gaps = []
@@ -133,6 +153,9 @@ Be constructive and helpful."""
         
         return analysis, knowledge_gaps
         
+    except LaneSaturated:
+        # Shed load: the client retries after Retry-After
+        raise
     except Exception as e:
         # Fallback analysis
         if percentage >= 80:
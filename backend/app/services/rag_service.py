@@ -2,28 +2,28 @@
 RAG Service
 Handles vector embeddings, semantic search, and AI chat responses
 """
-import chromadb
-from chromadb.config import Settings as ChromaSettings
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
+import asyncio
 import re
 
 from ..config import get_settings
 from ..models import Video
+from ..metrics import embedding_batch_size, stage, vector_query_duration
+from ..telemetry import estimate_tokens
+from .answer_cache import answer_cache
+from .embedding_spaces import embedding_spaces
+from .singleflight import SingleFlight, request_key
+from .llm_router import llm_router
+from .scheduler import llm_scheduler, INTERACTIVE, BACKGROUND
+from .usage import usage_meter, usage_scope, EMBED, GENERATE
+from .vector_store import get_vector_store
 
 settings = get_settings()
 
-# Initialize ChromaDB
-chroma_client = chromadb.PersistentClient(
-    path=settings.chroma_persist_dir,
-    settings=ChromaSettings(anonymized_telemetry=False)
-)
-
-# Get or create collection
-collection = chroma_client.get_or_create_collection(
-    name="video_chunks",
-    metadata={"hnsw:space": "cosine"}
-)
+# Coalesce identical concurrent provider calls (e.g. a class opening one video)
+llm_flight = SingleFlight("llm")
+embedding_flight = SingleFlight("embeddings")
 
 
 def chunk_text(text: str, chunk_size: int = 500, overlap: int = 50) -> List[dict]:
@@ -52,108 +52,219 @@ def chunk_text(text: str, chunk_size: int = 500, overlap: int = 50) -> List[dict
     return chunks
 
 
-async def get_embeddings(texts: List[str]) -> List[List[float]]:
-    """Get embeddings for texts using Google or OpenAI"""
-    # Check for valid Google API key (prioritize Google)
-    if settings.google_api_key and not settings.google_api_key.startswith('your-'):
-        import google.generativeai as genai
-        genai.configure(api_key=settings.google_api_key)
-        
-        embeddings = []
-        for text in texts:
-            result = genai.embed_content(
-                model="models/text-embedding-004",
-                content=text
-            )
-            embeddings.append(result['embedding'])
-        return embeddings
-    
-    # Fallback to OpenAI if valid key exists
-    elif settings.openai_api_key and not settings.openai_api_key.startswith('your-'):
-        import openai
-        client = openai.OpenAI(api_key=settings.openai_api_key)
-        
-        response = client.embeddings.create(
-            model="text-embedding-ada-002",
-            input=texts
-        )
-        return [e.embedding for e in response.data]
+async def get_embeddings(
+    texts: List[str], lane: str = INTERACTIVE, space: Optional[str] = None
+) -> List[List[float]]:
+    """
+    Get embeddings for texts, in the given embedding space (default: the
+    primary provider's). Identical concurrent requests share one call,
+    which waits for a provider slot in the given scheduler lane.
+    """
+    async def fetch():
+        async with llm_scheduler.slot(lane):
+            with usage_meter.metered(EMBED, "\n".join(texts)):
+                return await _fetch_embeddings(texts, space)
     
-    else:
-        raise Exception("No valid AI API key configured. Please add GOOGLE_API_KEY or OPENAI_API_KEY to .env")
+    embedding_batch_size.observe(len(texts))
+    with stage("rag.embed") as span:
+        span.set_attribute("embedding.texts", len(texts))
+        span.set_attribute("embedding.tokens", sum(estimate_tokens(t) for t in texts))
+        span.set_attribute("llm.lane", lane)
+        if space:
+            span.set_attribute("embedding.space", space)
+        return await embedding_flight.do(request_key(space or "", *texts), fetch)
+
+
+async def _fetch_embeddings(texts: List[str], space: Optional[str] = None) -> List[List[float]]:
+    """Get embeddings from the client owning the space (default: the configured embedding model)"""
+    if space and space not in llm_router.embedders:
+        # An older model still serving unmigrated videos: embed with it, not the new one
+        model = await asyncio.to_thread(embedding_spaces.model_of, space)
+        if model:
+            llm_router.embedder(*model)
+    return await llm_router.embed(texts, space)
 
 
-async def add_video_to_index(video_id: str, transcript: str):
-    """Add video transcript chunks to vector index"""
-    chunks = chunk_text(transcript)
+async def add_video_to_index(video_id: str, transcript: str, space: Optional[str] = None):
+    """
+    Add video transcript chunks to vector index, in the current write space
+    unless another is given (the re-embedding backfill passes its target)
+    """
+    await add_videos_to_index([(video_id, transcript)], space=space)
+
+
+async def add_videos_to_index(videos: List[Tuple[str, str]], space: Optional[str] = None):
+    """
+    Index several (video_id, transcript) pairs with a single embedding call
+    for all their chunks, so bulk ingestion fills provider batches
+    """
+    space = space or await asyncio.to_thread(embedding_spaces.write_space)
+    chunked = [(video_id, chunk_text(transcript)) for video_id, transcript in videos]
     
-    if not chunks:
-        return
+    # Answers cached against the previous index may no longer hold
+    for video_id, _ in chunked:
+        answer_cache.invalidate(video_id)
     
     # Get embeddings
-    texts = [c["text"] for c in chunks]
-    embeddings = await get_embeddings(texts)
-    
-    # Add to ChromaDB
-    collection.add(
-        ids=[f"{video_id}_{c['index']}" for c in chunks],
-        embeddings=embeddings,
-        documents=texts,
-        metadatas=[{
-            "video_id": video_id,
-            "start": c["start"],
-            "end": c["end"]
-        } for c in chunks]
-    )
-
-
-async def search_similar_chunks(query: str, video_id: Optional[str] = None, limit: int = 5) -> List[dict]:
-    """Search for similar chunks in vector database"""
-    # Get query embedding
-    query_embedding = (await get_embeddings([query]))[0]
+    texts = [c["text"] for _, chunks in chunked for c in chunks]
+    embeddings = await get_embeddings(texts, lane=BACKGROUND, space=space) if texts else []
     
-    # Build where filter
-    where_filter = {"video_id": video_id} if video_id else None
+    # Add to the vector store, one video at a time
+    offset = 0
+    for video_id, chunks in chunked:
+        if chunks:
+            with stage("vector.add") as span:
+                span.set_attribute("video.id", video_id)
+                span.set_attribute("vector.chunks", len(chunks))
+                span.set_attribute("embedding.space", space)
+                await asyncio.to_thread(
+                    get_vector_store().add,
+                    space,
+                    video_id,
+                    ids=[f"{video_id}_{c['index']}" for c in chunks],
+                    embeddings=embeddings[offset:offset + len(chunks)],
+                    documents=texts[offset:offset + len(chunks)],
+                    metadatas=[{
+                        "video_id": video_id,
+                        "start": c["start"],
+                        "end": c["end"]
+                    } for c in chunks]
+                )
+            offset += len(chunks)
+    if space:
+        await asyncio.to_thread(
+            embedding_spaces.mark_indexed_many, space, {video_id: len(chunks) for video_id, chunks in chunked}
+        )
+
+
+async def search_similar_chunks(
+    query: str,
+    video_id: Optional[str] = None,
+    limit: int = 5,
+    query_embedding: Optional[List[float]] = None
+) -> List[dict]:
+    """
+    Search for similar chunks in vector database. A given query_embedding
+    must be in the video's read space.
+    """
+    if video_id:
+        space = await asyncio.to_thread(embedding_spaces.read_space, video_id)
+        # Get query embedding unless the caller already has it
+        if query_embedding is None:
+            query_embedding = (await get_embeddings([query], space=space))[0]
+        searches = [(space, query_embedding)]
+    else:
+        # While re-embedding, each video is searched in the one space holding
+        # its complete index, with a query embedding from that space's model
+        spaces = await asyncio.to_thread(embedding_spaces.read_spaces) or [None]
+        embeddings = await asyncio.gather(*(get_embeddings([query], space=s) for s in spaces))
+        searches = [(s, e[0]) for s, e in zip(spaces, embeddings)]
     
     # Search
-    results = collection.query(
-        query_embeddings=[query_embedding],
-        n_results=limit,
-        where=where_filter,
-        include=["documents", "metadatas", "distances"]
-    )
+    with stage("vector.query") as span, vector_query_duration.time():
+        span.set_attribute("vector.n_results", limit)
+        span.set_attribute("vector.spaces", len(searches))
+        if video_id:
+            span.set_attribute("video.id", video_id)
+        # Store calls block (Chroma, or the vector service); keep them off the event loop
+        found = [
+            (space, await asyncio.to_thread(get_vector_store().query, space, embedding, limit, video_id))
+            for space, embedding in searches
+        ]
+        hits = [hit for _, space_hits in found for hit in space_hits]
+        if len(searches) > 1:
+            # Keep each video's hits from its read space only
+            read_space = await asyncio.to_thread(
+                embedding_spaces.read_space_many, {hit["metadata"]["video_id"] for hit in hits}
+            )
+            hits = sorted(
+                (hit for space, space_hits in found for hit in space_hits
+                 if read_space[hit["metadata"]["video_id"]] == space),
+                key=lambda hit: hit["distance"],
+            )[:limit]
+        span.set_attribute("vector.hits", len(hits))
     
     chunks = []
-    if results and results["documents"]:
-        for i, doc in enumerate(results["documents"][0]):
-            chunks.append({
-                "text": doc,
-                "video_id": results["metadatas"][0][i]["video_id"],
-                "start": results["metadatas"][0][i]["start"],
-                "end": results["metadatas"][0][i]["end"],
-                "score": 1 - results["distances"][0][i]  # Convert distance to similarity
-            })
+    for hit in hits:
+        chunks.append({
+            "text": hit["text"],
+            "video_id": hit["metadata"]["video_id"],
+            "start": hit["metadata"]["start"],
+            "end": hit["metadata"]["end"],
+            "score": 1 - hit["distance"]  # Convert distance to similarity
+        })
     
     return chunks
 
 
 async def get_rag_response(video_id: str, question: str, db: Session) -> dict:
     """Get AI response using RAG (Retrieval Augmented Generation)"""
-    # Get relevant chunks
-    chunks = await search_similar_chunks(question, video_id, limit=5)
-    
-    # Build context
+    with stage("rag.answer") as span, usage_scope(video_id=video_id):
+        span.set_attribute("video.id", video_id)
+        span.set_attribute("llm.question_tokens", estimate_tokens(question))
+        
+        # Near-duplicate questions are answered from the semantic cache, as
+        # long as the video hasn't been reindexed since (by any worker)
+        space = await asyncio.to_thread(embedding_spaces.read_space, video_id)
+        version, embeddings = await asyncio.gather(
+            asyncio.to_thread(embedding_spaces.index_version, video_id, space),
+            get_embeddings([question], space=space),
+        )
+        query_embedding = embeddings[0]
+        cached = answer_cache.get(video_id, space, version, query_embedding)
+        span.set_attribute("cache.hit", cached is not None)
+        if cached:
+            return cached
+        
+        # Get video info
+        video = db.query(Video).filter(Video.id == video_id).first()
+        video_title = video.title if video else "Unknown"
+        
+        # Overview questions are answered from the precomputed summary tree
+        from .summaries import answer_from_summaries  # it imports this module
+        response = await answer_from_summaries(video_id, video_title, question, db, query_embedding)
+        span.set_attribute("rag.summary_route", response is not None)
+        if response:
+            answer_cache.put(video_id, space, version, question, query_embedding, response)
+            return response
+        
+        # Get relevant chunks
+        chunks = await search_similar_chunks(question, video_id, limit=5, query_embedding=query_embedding)
+        
+        with stage("rag.build_prompt") as prompt_span:
+            system_prompt = build_chat_prompt(video_title, chunks)
+            prompt_span.set_attribute("rag.chunks", len(chunks))
+            prompt_span.set_attribute("llm.prompt_tokens", estimate_tokens(system_prompt))
+        
+        # Generate response
+        response_text = await generate_llm_response(system_prompt, question)
+        
+        # Extract timestamp references
+        references = []
+        for chunk in chunks[:3]:  # Top 3 relevant chunks
+            references.append({
+                "start": chunk["start"],
+                "end": chunk["end"],
+                "text": chunk["text"][:100] + "..."
+            })
+        
+        response = {
+            "message": response_text,
+            "references": references
+        }
+        answer_cache.put(video_id, space, version, question, query_embedding, response)
+        
+        return response
+
+
+def build_chat_prompt(video_title: str, chunks: List[dict]) -> str:
+    """System prompt for a chat turn: the video title plus retrieved excerpts"""
     context = "\n\n".join([
         f"[{c['start']}s - {c['end']}s]: {c['text']}"
         for c in chunks
     ])
     
-    # Get video info
-    video = db.query(Video).filter(Video.id == video_id).first()
-    video_title = video.title if video else "Unknown"
-    
-    # Build prompt
-    system_prompt = f"""You are an AI assistant helping users understand the video "{video_title}".
+    return f"""You are an AI assistant helping users understand the video "{video_title}".
 Use the following transcript excerpts to answer the user's question.
 Always cite the relevant timestamps when referencing content.
 If the answer isn't in the provided context, say so.
@@ -161,52 +272,29 @@ If the answer isn't in the provided context, say so.
 Context from video transcript:
 {context}"""
 
-    # Generate response
-    response_text = await generate_llm_response(system_prompt, question)
-    
-    # Extract timestamp references
-    references = []
-    for chunk in chunks[:3]:  # Top 3 relevant chunks
-        references.append({
-            "start": chunk["start"],
-            "end": chunk["end"],
-            "text": chunk["text"][:100] + "..."
-        })
-    
-    return {
-        "message": response_text,
-        "references": references
-    }
-
-
-async def generate_llm_response(system_prompt: str, user_message: str) -> str:
-    """Generate response using configured LLM"""
-    # Prioritize Google Gemini
-    if settings.google_api_key and not settings.google_api_key.startswith('your-'):
-        import google.generativeai as genai
-        genai.configure(api_key=settings.google_api_key)
-        
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        response = model.generate_content(f"{system_prompt}\n\nUser: {user_message}")
-        return response.text
-    
-    # Fallback to OpenAI
-    elif settings.openai_api_key and not settings.openai_api_key.startswith('your-'):
-        import openai
-        client = openai.OpenAI(api_key=settings.openai_api_key)
-        
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message}
-            ],
-            temperature=0.7
-        )
-        return response.choices[0].message.content
+
+async def generate_llm_response(system_prompt: str, user_message: str, lane: str = INTERACTIVE) -> str:
+    """
+    Generate response using configured LLM. Identical concurrent prompts share
+    one call, which waits for a provider slot in the given scheduler lane.
+    """
+    async def generate():
+        async with llm_scheduler.slot(lane):
+            with usage_meter.metered(GENERATE, f"{system_prompt}\n{user_message}") as call:
+                call["output"] = await _call_llm(system_prompt, user_message)
+                return call["output"]
     
-    else:
-        raise Exception("No valid LLM API key configured")
+    with stage("rag.generate") as span:
+        span.set_attribute("llm.lane", lane)
+        span.set_attribute("llm.prompt_tokens", estimate_tokens(system_prompt) + estimate_tokens(user_message))
+        response = await llm_flight.do(request_key(system_prompt, user_message), generate)
+        span.set_attribute("llm.completion_tokens", estimate_tokens(response))
+        return response
+
+
+async def _call_llm(system_prompt: str, user_message: str) -> str:
+    """Generate response via the provider router (timeouts, retries, failover)"""
+    return await llm_router.generate(system_prompt, user_message)
 
 
 async def search_videos(query: str, video_id: Optional[str], limit: int, db: Session) -> List[dict]:
@@ -222,7 +310,8 @@ async def search_videos(query: str, video_id: Optional[str], limit: int, db: Ses
             "text": chunk["text"],
             "timestamp_start": chunk["start"],
             "timestamp_end": chunk["end"],
-            "relevance_score": chunk["score"]
+            "relevance_score": chunk["score"],
+            "source": "transcript"
         })
     
     return results
@@ -0,0 +1,149 @@
+"""
+LLM Work Scheduler
+Admission control in front of the LLM and embedding clients. Work is split
+into priority lanes (interactive > quiz > background) sharing a fixed number
+of provider slots; each lane has a bounded queue and sheds load once full.
+"""
+from collections import Counter
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+import asyncio
+import heapq
+import itertools
+import math
+import time
+
+from ..config import get_settings
+
+settings = get_settings()
+
+INTERACTIVE = "interactive"  # chat turns, search
+QUIZ = "quiz"  # quiz generation and analysis
+BACKGROUND = "background"  # ingestion
+
+
+class LaneSaturated(Exception):
+    """The lane's queue is full; the caller should retry after `retry_after` seconds"""
+
+    def __init__(self, lane: str, retry_after: int):
+        super().__init__(f"{lane} lane is saturated, retry after {retry_after}s")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+@dataclass
+class LaneConfig:
+    priority: int  # lower runs first
+    max_queue: int  # waiting requests beyond this are shed
+    max_concurrency: int  # slots this lane may hold at once
+
+
+class PriorityScheduler:
+    def __init__(self, concurrency: int, lanes: Dict[str, LaneConfig]):
+        self.concurrency = concurrency
+        self.lanes = lanes
+        self.running = 0
+        self.running_by_lane: Counter = Counter()
+        self.queued_by_lane: Counter = Counter()
+        self.shed: Counter = Counter()
+        self.service_time = {lane: 1.0 for lane in lanes}  # EWMA seconds per call
+        self._waiting: List[Tuple[int, int, str, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    @classmethod
+    def from_settings(cls, settings) -> "PriorityScheduler":
+        concurrency = settings.llm_concurrency
+        return cls(concurrency, {
+            INTERACTIVE: LaneConfig(0, settings.lane_interactive_queue, concurrency),
+            QUIZ: LaneConfig(1, settings.lane_quiz_queue, settings.lane_quiz_concurrency),
+            BACKGROUND: LaneConfig(2, settings.lane_background_queue, settings.lane_background_concurrency),
+        })
+
+    def _can_start(self, lane: str) -> bool:
+        return (
+            self.running < self.concurrency
+            and self.running_by_lane[lane] < self.lanes[lane].max_concurrency
+        )
+
+    def _start(self, lane: str):
+        self.running += 1
+        self.running_by_lane[lane] += 1
+
+    def _has_waiters_at_or_above(self, priority: int) -> bool:
+        return any(p <= priority and not f.done() for p, _, _, f in self._waiting)
+
+    def retry_after(self, lane: str) -> int:
+        """Rough time until a new request in this lane would get a slot"""
+        slots = max(1, min(self.concurrency, self.lanes[lane].max_concurrency))
+        backlog = self.queued_by_lane[lane] + 1
+        return max(1, math.ceil(backlog * self.service_time[lane] / slots))
+
+    async def acquire(self, lane: str):
+        config = self.lanes[lane]
+        if self._can_start(lane) and not self._has_waiters_at_or_above(config.priority):
+            self._start(lane)
+            return
+
+        if self.queued_by_lane[lane] >= config.max_queue:
+            self.shed[lane] += 1
+            raise LaneSaturated(lane, self.retry_after(lane))
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (config.priority, next(self._seq), lane, future))
+        self.queued_by_lane[lane] += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                self.queued_by_lane[lane] -= 1
+            else:
+                # Granted a slot just as we were cancelled: hand it on
+                self.release(lane)
+            raise
+
+    def release(self, lane: str):
+        self.running -= 1
+        self.running_by_lane[lane] -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """Grant free slots to the highest-priority waiters whose lane has room"""
+        skipped = []
+        while self._waiting and self.running < self.concurrency:
+            item = heapq.heappop(self._waiting)
+            _, _, lane, future = item
+            if future.done():
+                continue  # cancelled while waiting
+            if not self._can_start(lane):
+                skipped.append(item)
+                continue
+            self.queued_by_lane[lane] -= 1
+            self._start(lane)
+            future.set_result(None)
+        for item in skipped:
+            heapq.heappush(self._waiting, item)
+
+    @asynccontextmanager
+    async def slot(self, lane: str):
+        await self.acquire(lane)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            self.service_time[lane] = 0.8 * self.service_time[lane] + 0.2 * elapsed
+            self.release(lane)
+
+    def stats(self) -> dict:
+        return {
+            lane: {
+                "running": self.running_by_lane[lane],
+                "queued": self.queued_by_lane[lane],
+                "shed": self.shed[lane],
+            }
+            for lane in self.lanes
+        }
+
+
+llm_scheduler = PriorityScheduler.from_settings(settings)
@@ -0,0 +1,58 @@
+"""
+Single-Flight Request Coalescing
+Concurrent calls with the same key share one in-flight provider call
+"""
+from typing import Awaitable, Callable, Dict, TypeVar
+import asyncio
+import hashlib
+import re
+
+T = TypeVar("T")
+
+
+def request_key(*parts: str) -> str:
+    """Hash of whitespace-normalized request parts"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(re.sub(r"\s+", " ", part).strip().encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    """
+    The first caller for a key starts the call as a task; callers arriving
+    while it runs await the same task. A caller being cancelled (e.g. client
+    disconnect) does not cancel the shared call.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0  # provider calls actually made
+        self.coalesced = 0  # calls saved by joining an in-flight one
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is not None and not task.done():
+            self.coalesced += 1
+        else:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Avoid "exception was never retrieved" when every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+        }
@@ -0,0 +1,491 @@
+"""
+Suggestion Index
+In-memory prefix index for search autocomplete over video titles, salient
+transcript phrases and popular past queries. Lookups bisect a sorted array
+of keys (short prefixes, whose ranges are too long to rank per lookup, keep
+their strongest terms ranked instead) and never touch the database or the
+embedding provider; the index
+is updated as videos are indexed and snapshotted to disk, which is also how
+workers pick up each other's changes.
+"""
+from bisect import bisect_left, insort
+import heapq
+from collections import Counter, OrderedDict
+from operator import itemgetter
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+import os
+import re
+import threading
+
+import orjson
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: snapshot writes aren't serialized across workers
+    fcntl = None
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+TITLE, QUERY, PHRASE = "title", "query", "phrase"
+# A suggestion's weight sums what each source contributes to it
+TITLE_WEIGHT = 5.0
+QUERY_WEIGHT = 2.0  # per time it was searched
+PHRASE_WEIGHT = 1.0  # per video it is salient in
+# A suggestion is shown as its strongest kind
+KIND_PRIORITY = (TITLE, QUERY, PHRASE)
+
+PHRASES_PER_VIDEO = 20
+MAX_QUERIES = 5000
+MAX_QUERY_LENGTH = 80
+# Prefixes up to this long keep their TOP_K strongest terms ranked, since
+# on a big catalogue their key ranges are too long to rank on every lookup
+TOP_PREFIX_LENGTH = 3
+TOP_K = 20  # the endpoint's largest limit
+
+SNAPSHOT_VERSION = 1
+
+_WORD = re.compile(r"[\w']+")
+STOPWORDS = frozenset("""
+a about after all also am an and any are as at be because been before being but by can could did do
+does doing don't for from get go going got had has have he her here him his how i i'm if in into is
+it it's its just know let's like me more my no not now of on one or our out over really right said
+say see she so some something than that that's the their them then there these they thing things
+this those through to too um uh up us very was way we we're well were what when where which while
+who why will with would yeah you you're your
+""".split())
+
+
+def normalize(text: str) -> str:
+    """Lowercase words separated by single spaces; the form keys are stored in"""
+    return " ".join(_WORD.findall(text.lower()))
+
+
+def salient_phrases(transcript: str, limit: int = PHRASES_PER_VIDEO) -> List[Tuple[str, int]]:
+    """
+    The transcript's most repeated words and two/three-word phrases that
+    neither start nor end with a stopword, longer phrases first on ties
+    """
+    words = _WORD.findall(transcript.lower())
+    counts: Counter = Counter()
+    for n in (1, 2, 3):
+        for i in range(len(words) - n + 1):
+            first, last = words[i], words[i + n - 1]
+            if first in STOPWORDS or last in STOPWORDS or (n == 1 and len(first) < 4):
+                continue
+            counts[" ".join(words[i:i + n])] += 1
+    ranked = sorted(
+        ((phrase, count) for phrase, count in counts.items() if count > 1),
+        key=lambda item: (-item[1] * (1 + item[0].count(" ")), item[0]),
+    )
+    return ranked[:limit]
+
+
+def _keys(term: str) -> List[str]:
+    """Lookup keys for a term: itself and every suffix starting at a non-stopword"""
+    words = term.split()
+    return [term] + [" ".join(words[i:]) for i in range(1, len(words)) if words[i] not in STOPWORDS]
+
+
+class _State:
+    """
+    Videos' titles and phrases and query counts (what is snapshotted), and
+    the derived terms and sorted keys. Not thread-safe.
+    """
+
+    def __init__(self):
+        self.videos: Dict[str, dict] = {}
+        self.queries: Dict[str, int] = {}
+        # normalized term -> {"text", "weights": {kind: weight}, "video_id"}
+        self.terms: Dict[str, dict] = {}
+        # normalized term -> summed weight, for ranking
+        self.weights: Dict[str, float] = {}
+        # Terms changed since the owner last invalidated its cached lookups
+        self.touched: Set[str] = set()
+        self.keys: List[Tuple[str, str]] = []
+        # short prefix -> its TOP_K strongest terms in lookup order, filled on first lookup
+        self.top: Dict[str, List[str]] = {}
+
+    @classmethod
+    def from_snapshot(cls, data: dict) -> "_State":
+        state = cls()
+        state.videos = data.get("videos", {})
+        state.queries = data.get("queries", {})
+        for video_id, video in state.videos.items():
+            state._contribute_video(video_id, video, 1)
+        for query, count in state.queries.items():
+            state._contribute(query, query, QUERY, QUERY_WEIGHT * count, index=False)
+        # One sort instead of an insort per key
+        state.keys = sorted((key, term) for term in state.terms for key in _keys(term))
+        state.touched.clear()
+        return state
+
+    def snapshot(self) -> dict:
+        return {"version": SNAPSHOT_VERSION, "videos": self.videos, "queries": self.queries}
+
+    def _contribute(self, text: str, term: str, kind: str, weight: float, video_id: Optional[str] = None, index=True):
+        entry = self.terms.get(term)
+        if entry is None:
+            if weight <= 0:
+                return
+            entry = self.terms[term] = {"text": text, "weights": {}, "video_id": video_id}
+            if index:
+                for key in _keys(term):
+                    insort(self.keys, (key, term))
+        self.touched.add(term)
+        weights = entry["weights"]
+        weights[kind] = weights.get(kind, 0.0) + weight
+        if weights[kind] <= 1e-9:
+            del weights[kind]
+        self.weights[term] = sum(weights.values())
+        self._rerank(term, weight)
+        if kind == TITLE:
+            if weight > 0:
+                entry["text"] = text
+                entry["video_id"] = entry["video_id"] or video_id
+            elif entry["video_id"] == video_id:
+                entry["video_id"] = None
+        if not weights:
+            del self.terms[term]
+            del self.weights[term]
+            self._rerank(term, weight)
+            for key in _keys(term):
+                i = bisect_left(self.keys, (key, term))
+                if i < len(self.keys) and self.keys[i] == (key, term):
+                    del self.keys[i]
+
+    def _contribute_video(self, video_id: str, video: dict, sign: int, index=False):
+        title = video.get("title")
+        if title and normalize(title):
+            self._contribute(title, normalize(title), TITLE, sign * TITLE_WEIGHT, video_id, index)
+        for phrase, _ in video.get("phrases", []):
+            self._contribute(phrase, phrase, PHRASE, sign * PHRASE_WEIGHT, index=index)
+
+    def apply(self, op: tuple):
+        kind = op[0]
+        if kind == "video":
+            _, video_id, video = op
+            self.remove_video(video_id)
+            self.videos[video_id] = video
+            self._contribute_video(video_id, video, 1, index=True)
+        elif kind == "remove":
+            self.remove_video(op[1])
+        elif kind == "query":
+            _, query, count = op
+            self.queries[query] = self.queries.get(query, 0) + count
+            self._contribute(query, query, QUERY, QUERY_WEIGHT * count, index=True)
+
+    def remove_video(self, video_id: str):
+        video = self.videos.pop(video_id, None)
+        if video:
+            self._contribute_video(video_id, video, -1, index=True)
+
+    def prune_queries(self, limit: int):
+        """Forget all but the `limit` most frequent queries"""
+        if len(self.queries) <= limit:
+            return
+        for query in sorted(self.queries, key=self.queries.get)[:len(self.queries) - limit]:
+            self._contribute(query, query, QUERY, -QUERY_WEIGHT * self.queries.pop(query))
+
+    def _order(self, prefix: str) -> Callable[[str], tuple]:
+        """Lookup order under `prefix`: strongest first, ties by the term's first key in the range"""
+        return lambda term: (-self.weights[term], min((k, term) for k in _keys(term) if k.startswith(prefix)))
+
+    def _rerank(self, term: str, change: float):
+        """Keep the ranked short prefixes of a term's keys in step with its weight changing by `change`"""
+        if not self.top:
+            return
+        for prefix in {key[:n] for key in _keys(term) for n in range(1, min(len(key), TOP_PREFIX_LENGTH) + 1)}:
+            ranked = self.top.get(prefix)
+            if ranked is None:
+                continue
+            if term in ranked:
+                if change < 0:
+                    # A term left out of the list may outrank it now; rank again on the next lookup
+                    del self.top[prefix]
+                else:
+                    ranked.sort(key=self._order(prefix))
+            elif change > 0 and term in self.weights:
+                # Holding fewer than TOP_K means the list had every term in the range
+                ranked.append(term)
+                ranked.sort(key=self._order(prefix))
+                del ranked[TOP_K:]
+
+    def _rank(self, prefix: str, limit: int) -> List[str]:
+        """The `limit` strongest terms with a key starting with `prefix`"""
+        start = bisect_left(self.keys, (prefix, ""))
+        # Every key starting with the prefix sorts before prefix + U+FFFF
+        end = bisect_left(self.keys, (prefix + "\uffff", ""), start)
+        # Distinct terms in key order, which breaks weight ties (nlargest is stable)
+        terms = dict.fromkeys(map(itemgetter(1), self.keys[start:end]))
+        return heapq.nlargest(limit, terms, key=self.weights.__getitem__)
+
+    def lookup(self, prefix: str, limit: int) -> List[dict]:
+        if len(prefix) <= TOP_PREFIX_LENGTH and limit <= TOP_K:
+            ranked = self.top.get(prefix)
+            if ranked is None:
+                ranked = self.top[prefix] = self._rank(prefix, TOP_K)
+            terms = ranked[:limit]
+        else:
+            terms = self._rank(prefix, limit)
+        results = []
+        for term in terms:
+            entry = self.terms[term]
+            suggestion = {
+                "text": entry["text"],
+                "kind": next(k for k in KIND_PRIORITY if k in entry["weights"]),
+            }
+            if entry["video_id"] and TITLE in entry["weights"]:
+                suggestion["video_id"] = entry["video_id"]
+            results.append(suggestion)
+        return results
+
+
+class SuggestionIndex:
+    """
+    Thread-safe autocomplete index. Changes are applied in memory at once
+    and remembered until the next sync(), which merges them into the
+    snapshot at `path` (empty: memory only) on top of other workers' changes.
+    """
+
+    def __init__(self, path: str = "", cache_size: int = 2048, max_queries: int = MAX_QUERIES):
+        self.path = path
+        self.cache_size = cache_size
+        self.max_queries = max_queries
+        self.ready = False
+        self._state = _State()
+        self._pending: List[tuple] = []
+        self._synced_mtime: Optional[int] = None
+        # prefix -> {limit: suggestions}, least recently used first
+        self._cache: "OrderedDict[str, Dict[int, List[dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._state.terms)
+
+    def _apply(self, op: tuple):
+        with self._lock:
+            self._state.apply(op)
+            self._pending.append(op)
+            self._invalidate()
+
+    def _invalidate(self):
+        """Drop cached lookups for every prefix of a changed term's keys"""
+        for term in self._state.touched:
+            for key in _keys(term):
+                for end in range(1, len(key) + 1):
+                    self._cache.pop(key[:end], None)
+        self._state.touched.clear()
+
+    def add_video(self, video_id: str, title: Optional[str], transcript: Optional[str] = None):
+        """(Re)index a video's title and salient transcript phrases"""
+        self._apply(("video", video_id, {
+            "title": title or "",
+            "phrases": [list(p) for p in salient_phrases(transcript)] if transcript else [],
+        }))
+
+    def remove_video(self, video_id: str):
+        self._apply(("remove", video_id))
+
+    def record_query(self, query: str):
+        """Count a search so frequent queries are suggested"""
+        query = normalize(query)
+        if query and len(query) <= MAX_QUERY_LENGTH:
+            self._apply(("query", query, 1))
+
+    def suggest(self, prefix: str, limit: int = 8) -> List[dict]:
+        """Up to `limit` suggestions whose words start with `prefix`, strongest first"""
+        key = normalize(prefix)
+        if not key:
+            return []
+        if prefix[-1:].isspace():
+            # "neural " means the next word, not "neurons"
+            key += " "
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and limit in cached:
+                self._cache.move_to_end(key)
+                return cached[limit]
+            results = self._state.lookup(key, limit)
+            if self.cache_size:
+                self._cache.setdefault(key, {})[limit] = results
+                self._cache.move_to_end(key)
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            return results
+
+    def clear(self):
+        with self._lock:
+            self._state = _State()
+            self._pending = []
+            self._cache.clear()
+
+    def rebuild(self, db: Session):
+        """Index every completed video from the database, replacing the current contents"""
+        from ..models import Video, VideoStatus
+        from .transcript_store import load_transcript
+
+        rows = db.query(Video.id, Video.title).filter(Video.status == VideoStatus.COMPLETED).all()
+        state = _State()
+        ops = []
+        for video_id, title in rows:
+            transcript = load_transcript(db, video_id)
+            op = ("video", video_id, {
+                "title": title or "",
+                "phrases": [list(p) for p in salient_phrases(transcript)] if transcript else [],
+            })
+            state.apply(op)
+            ops.append(op)
+        with self._lock:
+            queries = self._state.queries
+            for query, count in queries.items():
+                state.apply(("query", query, count))
+            state.touched.clear()
+            self._state = state
+            # Written out at the next sync, merged with other workers' queries
+            self._pending = ops + [("query", q, c) for q, c in queries.items()]
+            self._cache.clear()
+        logger.info("Suggestion index rebuilt from %d videos (%d terms)", len(rows), len(state.terms))
+
+    def _mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _read(self) -> Optional[dict]:
+        try:
+            with open(self.path, "rb") as f:
+                data = orjson.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, orjson.JSONDecodeError):
+            logger.exception("Could not read the suggestion snapshot %s", self.path)
+            return None
+        return data if data.get("version") == SNAPSHOT_VERSION else None
+
+    def _write(self, data: bytes):
+        # Readers never see a half-written snapshot
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+
+    def load(self) -> bool:
+        """Replace the contents with the snapshot; False if there is none"""
+        if not self.path:
+            return False
+        with self._sync_lock:
+            mtime = self._mtime()
+            data = self._read()
+            if data is None:
+                return False
+            state = _State.from_snapshot(data)
+            with self._lock:
+                self._state = state
+                self._pending = []
+                self._synced_mtime = mtime
+                self._cache.clear()
+            return True
+
+    def sync(self):
+        """
+        Merge with the snapshot: reload it if another worker wrote it, replay
+        this worker's unsaved changes on top, and write the result
+        """
+        if not self.path:
+            return
+        with self._sync_lock, _file_lock(self.path):
+            with self._lock:
+                ops, self._pending = self._pending, []
+            mtime = self._mtime()
+            try:
+                data = self._read() if mtime is not None and mtime != self._synced_mtime else None
+                if data is not None:
+                    # Another worker wrote the snapshot: start from it
+                    state = _State.from_snapshot(data)
+                    for op in ops:
+                        state.apply(op)
+                    state.prune_queries(self.max_queries)
+                    if ops:
+                        self._write(orjson.dumps(state.snapshot()))
+                    with self._lock:
+                        # Changes made while the snapshot was read stay pending
+                        for op in self._pending:
+                            state.apply(op)
+                        state.touched.clear()
+                        self._state = state
+                        self._cache.clear()
+                elif ops or mtime != self._synced_mtime:
+                    with self._lock:
+                        self._state.prune_queries(self.max_queries)
+                        self._invalidate()
+                        blob = orjson.dumps(self._state.snapshot())
+                    self._write(blob)
+                self._synced_mtime = self._mtime()
+            except Exception:
+                with self._lock:
+                    self._pending = ops + self._pending
+                raise
+
+    def start(self, session_factory: Callable[[], Session]):
+        """Load the snapshot, or build the index from the database if there is none"""
+        if not self.load():
+            db = session_factory()
+            try:
+                self.rebuild(db)
+            finally:
+                db.close()
+            self.sync()
+        self.ready = True
+
+    async def run(self, session_factory: Callable[[], Session], interval: float):
+        """
+        Start the index (retrying until it succeeds), then sync it every
+        `interval` seconds until cancelled
+        """
+        try:
+            while True:
+                try:
+                    if self.ready:
+                        await asyncio.to_thread(self.sync)
+                    else:
+                        await asyncio.to_thread(self.start, session_factory)
+                except Exception:
+                    logger.exception("Suggestion index %s failed", "sync" if self.ready else "start")
+                await asyncio.sleep(interval)
+        finally:
+            # Save this worker's last changes on shutdown (never a half-built index)
+            if self.ready:
+                await asyncio.shield(asyncio.to_thread(self.sync))
+
+
+class _file_lock:
+    """Exclusive lock on `path`.lock, so two workers never interleave a sync"""
+
+    def __init__(self, path: str):
+        self.path = f"{path}.lock"
+        self._file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, "a")
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+
+
+suggestion_index = SuggestionIndex(settings.suggestions_snapshot_path)
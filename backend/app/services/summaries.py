@@ -0,0 +1,260 @@
+"""
+Summary Service
+Builds each video's summary tree at ingest: transcript sections (~10
+minutes each) are summarized, runs of sections are summarized into
+chapters, and the chapters into one video summary. Overview questions
+("summarize this video", "what are the main topics") are answered from the
+matching level with one small prompt instead of retrieved chunks.
+"""
+from typing import List, Optional
+import asyncio
+import logging
+import re
+
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..models import SummaryLevel, Video, VideoSummary
+from ..metrics import stage
+from ..telemetry import estimate_tokens
+from .rag_service import chunk_text, generate_llm_response, search_similar_chunks
+from .scheduler import BACKGROUND
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+SECTION_WORDS = 1500  # ~10 minutes at ~150 wpm
+SECTIONS_PER_CHAPTER = 4
+SENTENCES = {SummaryLevel.SECTION: 3, SummaryLevel.CHAPTER: 4, SummaryLevel.VIDEO: 6}
+# Section summaries given for a question about part of a video
+MAX_SECTIONS = 2
+
+SUMMARY_PROMPT = """Summarize {part} of the video "{title}" in at most {sentences} sentences.
+Reply with a heading of at most 8 words on the first line, then the summary."""
+
+# Questions asking for a summary at all; anything else uses chunk retrieval
+_OVERVIEW = re.compile(
+    r"\b(summar\w*|overview|recap|gist|tl;?dr|outline|main (points?|ideas?|topics?|takeaways?)"
+    r"|key (points?|ideas?|takeaways?)|chapters?|topics (are )?covered|structure"
+    r"|what('s| is) (this|the) (video|lecture|talk|course) about)\b",
+    re.IGNORECASE,
+)
+_CHAPTERS = re.compile(r"\b(outline|chapters?|topics|structure|break ?down|agenda)\b", re.IGNORECASE)
+_PART = re.compile(
+    r"\b(part|section|segment|portion|bit|beginning|start|first|opening|intro\w*"
+    r"|end|ending|last|final|conclusion|middle)\b",
+    re.IGNORECASE,
+)
+_TIMESTAMP = re.compile(r"\b(?:(\d{1,2}):)?(\d{1,2}):(\d{2})\b")
+# "the part about X": X picks the section, so it isn't a subject of its own
+_PART_TOPIC = re.compile(
+    r"\b(part|section|segment|portion|bit)s? (about|on|where|when|covering|that covers|with)\b.*$", re.IGNORECASE
+)
+# Words an overview request is made of; any other word is a subject of the
+# question ("summarize how backprop works"), which retrieval answers
+_OVERVIEW_WORDS = frozenset("""
+    a about all an and any are at be briefly can cover covered covering covers could did discuss discussed
+    do does dr for give gist going happen happened happens i in is it its key let list main me of on
+    outline overall overview please points point provide quick quickly recap s short show so summaries
+    summarise summarize summary takeaway takeaways tell that the this tl to topic topics us was we were
+    what whats whole would you ideas idea chapter chapters structure agenda break breakdown down
+    video lecture talk course lesson clip episode presentation recording
+    part section segment portion bit beginning start first opening intro introduction end ending last
+    final conclusion middle minute minutes
+""".split())
+
+
+def route_question(question: str) -> Optional[str]:
+    """
+    The summary level that answers an overview of the video itself, or None
+    (chunk retrieval) for anything else, including overview words around a
+    subject of their own
+    """
+    if not _OVERVIEW.search(question):
+        return None
+    words = re.findall(r"[a-z]+", _PART_TOPIC.sub("", _TIMESTAMP.sub("", question.lower())))
+    if any(word not in _OVERVIEW_WORDS for word in words):
+        return None
+    if _TIMESTAMP.search(question):
+        return SummaryLevel.SECTION
+    if _CHAPTERS.search(question):
+        return SummaryLevel.CHAPTER
+    if _PART.search(question):
+        return SummaryLevel.SECTION
+    return SummaryLevel.VIDEO
+
+
+def parse_summary(reply: str) -> tuple:
+    """(heading, summary) from a reply with the heading on its first line"""
+    lines = [line.strip() for line in reply.strip().splitlines() if line.strip()]
+    if not lines:
+        raise ValueError("Empty summary")
+    heading = lines[0].strip("#*\"' ").rstrip(":")
+    if len(lines) == 1:
+        return " ".join(heading.split()[:8]), heading
+    return heading[:200], " ".join(lines[1:])
+
+
+def _outline(nodes: List[dict], with_summaries: bool = True) -> str:
+    return "\n".join(
+        f"[{n['start']}s - {n['end']}s] {n['heading']}" + (f": {n['summary']}" if with_summaries else "")
+        for n in nodes
+    )
+
+
+async def _summarize(title: str, level: str, part: str, text: str) -> tuple:
+    system_prompt = SUMMARY_PROMPT.format(part=part, title=title, sentences=SENTENCES[level])
+    return parse_summary(await generate_llm_response(system_prompt, text, lane=BACKGROUND))
+
+
+async def build_summary_tree(title: str, transcript: str) -> List[dict]:
+    """
+    Summaries for every level, as VideoSummary fields. A chapter of one
+    section (or a video of one chapter) reuses its child's summary, so a
+    short video costs one call.
+    """
+    sections = chunk_text(transcript, chunk_size=SECTION_WORDS, overlap=0)
+    if not sections:
+        return []
+
+    summaries = await asyncio.gather(*(
+        _summarize(title, SummaryLevel.SECTION, f"the part from {s['start']}s to {s['end']}s", s["text"])
+        for s in sections
+    ))
+    section_nodes = [
+        {"level": SummaryLevel.SECTION, "seq": i, "parent_seq": i // SECTIONS_PER_CHAPTER,
+         "start": s["start"], "end": s["end"], "heading": heading, "summary": summary}
+        for i, (s, (heading, summary)) in enumerate(zip(sections, summaries))
+    ]
+
+    async def summarize_group(level: str, seq: int, children: List[dict], part: str) -> dict:
+        if len(children) == 1:
+            heading, summary = children[0]["heading"], children[0]["summary"]
+        else:
+            heading, summary = await _summarize(title, level, part, _outline(children))
+        return {"level": level, "seq": seq, "parent_seq": None if level == SummaryLevel.VIDEO else 0,
+                "start": children[0]["start"], "end": children[-1]["end"], "heading": heading, "summary": summary}
+
+    groups = [
+        section_nodes[i:i + SECTIONS_PER_CHAPTER] for i in range(0, len(section_nodes), SECTIONS_PER_CHAPTER)
+    ]
+    chapter_nodes = list(await asyncio.gather(*(
+        summarize_group(SummaryLevel.CHAPTER, seq, group, "a chapter (given as its section summaries)")
+        for seq, group in enumerate(groups)
+    )))
+    video_node = await summarize_group(
+        SummaryLevel.VIDEO, 0, chapter_nodes, "the whole video (given as its chapter summaries)"
+    )
+    return section_nodes + chapter_nodes + [video_node]
+
+
+def replace_summaries(db: Session, video_id: str, nodes: List[dict]):
+    """Store a video's summary tree in place of the old one (caller commits)"""
+    delete_summaries(db, video_id)
+    db.add_all([VideoSummary(video_id=video_id, **node) for node in nodes])
+
+
+def delete_summaries(db: Session, video_id: str):
+    """Remove a video's summaries (caller commits)"""
+    db.query(VideoSummary).filter(VideoSummary.video_id == video_id).delete(synchronize_session=False)
+
+
+def load_summaries(db: Session, video_id: str, level: str) -> List[VideoSummary]:
+    return db.query(VideoSummary).filter(
+        VideoSummary.video_id == video_id, VideoSummary.level == level
+    ).order_by(VideoSummary.seq).all()
+
+
+async def summarize_video(db: Session, video_id: str, transcript: str) -> int:
+    """Build and store a video's summary tree; returns the number of summaries"""
+    if not settings.summaries_enabled or not transcript or not transcript.strip():
+        return 0
+    title = db.query(Video.title).filter(Video.id == video_id).scalar() or "Untitled Video"
+    with stage("ingest.summarize") as span:
+        span.set_attribute("video.id", video_id)
+        nodes = await build_summary_tree(title, transcript)
+        span.set_attribute("summary.nodes", len(nodes))
+    replace_summaries(db, video_id, nodes)
+    db.commit()
+    return len(nodes)
+
+
+async def _pick_sections(
+    video_id: str, question: str, sections: List[VideoSummary], query_embedding: Optional[List[float]]
+) -> List[VideoSummary]:
+    """The sections a question is about: a timestamp, a position word, or where retrieval lands"""
+    match = _TIMESTAMP.search(question)
+    if match:
+        hours, minutes, seconds = (int(g or 0) for g in match.groups())
+        at = hours * 3600 + minutes * 60 + seconds
+        return [next((s for s in sections if s.start <= at < s.end), sections[-1])]
+    lowered = question.lower()
+    if re.search(r"\b(beginning|start|first|opening|intro\w*)\b", lowered):
+        return sections[:1]
+    if re.search(r"\b(end|ending|last|final|conclusion)\b", lowered):
+        return sections[-1:]
+    if re.search(r"\bmiddle\b", lowered):
+        return [sections[len(sections) // 2]]
+
+    chunks = await search_similar_chunks(question, video_id, limit=3, query_embedding=query_embedding)
+    picked = []
+    for chunk in chunks:
+        section = next((s for s in sections if s.start <= chunk["start"] < s.end), None)
+        if section is not None and section not in picked:
+            picked.append(section)
+    return picked[:MAX_SECTIONS] or sections[:1]
+
+
+def build_overview_prompt(video_title: str, video: VideoSummary, label: str, nodes: List[dict], with_summaries: bool) -> str:
+    """System prompt answering from summaries: the video summary plus one level's outline"""
+    return f"""You are an AI assistant helping users understand the video "{video_title}".
+Use the following summaries of the video to answer the user's question.
+Always cite the relevant timestamps when referencing content.
+
+Video summary:
+{video.summary}
+
+{label}:
+{_outline(nodes, with_summaries)}"""
+
+
+async def answer_from_summaries(
+    video_id: str,
+    video_title: str,
+    question: str,
+    db: Session,
+    query_embedding: Optional[List[float]] = None,
+) -> Optional[dict]:
+    """
+    Answer an overview question from the summary tree with one small
+    prompt. None if the question isn't an overview or the video has no
+    summaries, so the caller falls back to chunk retrieval.
+    """
+    level = route_question(question)
+    if level is None:
+        return None
+    video = load_summaries(db, video_id, SummaryLevel.VIDEO)
+    if not video:
+        return None
+
+    if level == SummaryLevel.SECTION:
+        nodes = await _pick_sections(
+            video_id, question, load_summaries(db, video_id, SummaryLevel.SECTION), query_embedding
+        )
+        label, with_summaries = "Summaries of the parts asked about", True
+    else:
+        nodes = load_summaries(db, video_id, SummaryLevel.CHAPTER)
+        # The video summary covers the content; its chapters give the outline
+        label, with_summaries = "Chapters", level == SummaryLevel.CHAPTER
+    nodes = [n.to_dict() for n in nodes]
+
+    with stage("rag.build_prompt") as span:
+        system_prompt = build_overview_prompt(video_title, video[0], label, nodes, with_summaries)
+        span.set_attribute("rag.route", f"summary:{level}")
+        span.set_attribute("rag.summaries", len(nodes))
+        span.set_attribute("llm.prompt_tokens", estimate_tokens(system_prompt))
+
+    return {
+        "message": await generate_llm_response(system_prompt, question),
+        "references": [{"start": n["start"], "end": n["end"], "text": n["heading"]} for n in nodes[:3]],
+    }
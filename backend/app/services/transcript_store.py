@@ -0,0 +1,120 @@
+"""
+Transcript Store
+Stores transcripts as compressed, time-indexed segments so callers can
+load a single window instead of the whole text
+"""
+from sqlalchemy.orm import Session
+from typing import Iterator, List, Optional
+import re
+
+from ..models import TranscriptSegment
+from .fulltext import index_segments
+
+# Same speaking-rate estimate as chunk_text (~150 wpm)
+WORDS_PER_SECOND = 2.5
+
+# ~60 seconds of speech per segment
+SEGMENT_WORDS = 150
+MAX_SEGMENT_SECONDS = int(SEGMENT_WORDS / WORDS_PER_SECOND) + 1
+
+
+def build_segments(text: str) -> List[dict]:
+    """
+    Split text into segments of SEGMENT_WORDS words with estimated timestamps.
+    Segments keep the original whitespace, so joining them restores the text.
+    """
+    starts = [m.start() for m in re.finditer(r"\S+", text)]
+    segments = []
+
+    for i in range(0, len(starts), SEGMENT_WORDS):
+        begin = 0 if i == 0 else starts[i]
+        stop = starts[i + SEGMENT_WORDS] if i + SEGMENT_WORDS < len(starts) else len(text)
+        word_count = min(SEGMENT_WORDS, len(starts) - i)
+
+        segments.append({
+            "seq": len(segments),
+            "start": int(i / WORDS_PER_SECOND),
+            "end": int((i + word_count) / WORDS_PER_SECOND),
+            "text": text[begin:stop],
+        })
+
+    return segments
+
+
+def save_transcript(db: Session, video_id: str, text: str):
+    """Replace the stored transcript for a video and its full-text index rows (caller commits)"""
+    delete_transcript(db, video_id)
+    segments = build_segments(text)
+    rows = [
+        TranscriptSegment(
+            video_id=video_id,
+            seq=s["seq"],
+            start=s["start"],
+            end=s["end"],
+            data=TranscriptSegment.compress(s["text"]),
+        )
+        for s in segments
+    ]
+    db.add_all(rows)
+    db.flush()
+    index_segments(db, video_id, [
+        {"id": row.id, "start": s["start"], "end": s["end"], "text": s["text"]}
+        for row, s in zip(rows, segments)
+    ])
+
+
+def delete_transcript(db: Session, video_id: str):
+    """Remove all segments for a video (caller commits); a trigger drops their index rows"""
+    db.query(TranscriptSegment).filter(
+        TranscriptSegment.video_id == video_id
+    ).delete(synchronize_session=False)
+
+
+def has_transcript(db: Session, video_id: str) -> bool:
+    return db.query(TranscriptSegment.id).filter(
+        TranscriptSegment.video_id == video_id
+    ).first() is not None
+
+
+def iter_segments(
+    db: Session,
+    video_id: str,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    batch_size: int = 100,
+) -> Iterator[TranscriptSegment]:
+    """Yield segments overlapping [start, end) seconds, in time order"""
+    query = db.query(TranscriptSegment).filter(TranscriptSegment.video_id == video_id)
+
+    if start is not None:
+        # Segments never span more than MAX_SEGMENT_SECONDS, which bounds the index range
+        query = query.filter(
+            TranscriptSegment.start > start - MAX_SEGMENT_SECONDS,
+            TranscriptSegment.end > start,
+        )
+    if end is not None:
+        query = query.filter(TranscriptSegment.start < end)
+
+    return query.order_by(TranscriptSegment.start).yield_per(batch_size)
+
+
+def load_transcript(db: Session, video_id: str, max_chars: Optional[int] = None) -> Optional[str]:
+    """
+    Reassemble the transcript text. With max_chars, stop decompressing once
+    enough text has been read. Returns None if the video has no transcript.
+    """
+    parts = []
+    length = 0
+
+    for segment in iter_segments(db, video_id):
+        text = segment.text
+        parts.append(text)
+        length += len(text)
+        if max_chars is not None and length >= max_chars:
+            break
+
+    if not parts:
+        return None
+
+    transcript = "".join(parts)
+    return transcript[:max_chars] if max_chars is not None else transcript
@@ -0,0 +1,272 @@
+"""
+Usage Metering
+Counts prompt/completion tokens and estimated cost for every provider call
+and aggregates them in memory; the usage_ledger table is updated in batches.
+Calls are attributed to the current route and video via context variables.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+import asyncio
+import logging
+import threading
+import time
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..config import get_settings
+from ..database import SessionLocal
+from ..models import UsageRecord
+from ..telemetry import estimate_tokens
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+GENERATE = "generate"
+EMBED = "embed"
+
+# USD per million (prompt, completion) tokens; estimates for the ledger
+PRICES_PER_MILLION = {
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gpt-4o-mini": (0.15, 0.60),
+    "models/text-embedding-004": (0.0, 0.0),
+    "text-embedding-ada-002": (0.10, 0.0),
+}
+
+# Attribution for calls made in this context: route, video_id, and the
+# ASGI scope of the request (the route template is resolved lazily)
+_usage_scope: ContextVar[dict] = ContextVar("usage_scope", default={})
+# Usage reported by the provider for the call in progress
+_current_call: ContextVar[Optional[dict]] = ContextVar("usage_current_call", default=None)
+
+
+@contextmanager
+def usage_scope(**fields):
+    """Attribute provider calls made inside the block, e.g. usage_scope(video_id=...)"""
+    token = _usage_scope.set({**_usage_scope.get(), **fields})
+    try:
+        yield
+    finally:
+        _usage_scope.reset(token)
+
+
+def current_attribution() -> Tuple[str, str]:
+    """(route, video_id) for the current context"""
+    fields = _usage_scope.get()
+    route = fields.get("route")
+    if route is None:
+        request = fields.get("request")
+        if request is not None:
+            template = getattr(request.get("route"), "path", None) or request["path"]
+            route = f"{request['method']} {template}"
+    return route or "", fields.get("video_id") or ""
+
+
+def report_usage(
+    provider: str,
+    model: str,
+    prompt_tokens: Optional[int] = None,
+    completion_tokens: Optional[int] = None,
+):
+    """Called by providers with the model used and the API's usage fields, if any"""
+    call = _current_call.get()
+    if call is not None:
+        call.update(provider=provider, model=model)
+        if prompt_tokens is not None:
+            call["prompt_tokens"] = prompt_tokens
+        if completion_tokens is not None:
+            call["completion_tokens"] = completion_tokens
+
+
+_encoding = None
+_encoding_failed = False
+
+
+def count_tokens(text: str) -> int:
+    """Token count via tiktoken when available, else a character-based estimate"""
+    global _encoding, _encoding_failed
+    if not text:
+        return 0
+    if _encoding is None and not _encoding_failed:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            # Not installed, or the encoding can't be downloaded (offline)
+            _encoding_failed = True
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return estimate_tokens(text)
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prompt_price, completion_price = PRICES_PER_MILLION.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+class UsageMeter:
+    """
+    Buffers usage per ledger key in memory and upserts it in one transaction
+    when `max_pending` keys accumulate or `flush_interval` seconds pass.
+    In the app, run() also flushes on that interval while idle and once
+    more on shutdown.
+    """
+
+    def __init__(self, session_factory=SessionLocal, flush_interval: float = 10.0, max_pending: int = 100):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._flushing = False
+
+    @contextmanager
+    def metered(self, kind: str, prompt: str):
+        """
+        Meter one provider call. Providers fill in usage via report_usage();
+        whatever they don't report is estimated from the text.
+        """
+        call = {"provider": "unknown", "model": ""}
+        token = _current_call.set(call)
+        try:
+            yield call
+        finally:
+            _current_call.reset(token)
+        if "prompt_tokens" not in call:
+            call["prompt_tokens"] = count_tokens(prompt)
+        if "completion_tokens" not in call:
+            call["completion_tokens"] = count_tokens(call.get("output", ""))
+        self.record(kind, call["provider"], call["model"], call["prompt_tokens"], call["completion_tokens"])
+
+    def record(self, kind: str, provider: str, model: str, prompt_tokens: int, completion_tokens: int):
+        route, video_id = current_attribution()
+        key = (datetime.now(timezone.utc).date(), route, video_id, kind, provider, model)
+        cost = estimate_cost(model, prompt_tokens, completion_tokens)
+        with self._lock:
+            totals = self._pending.setdefault(key, [0, 0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += prompt_tokens
+            totals[2] += completion_tokens
+            totals[3] += cost
+            due = (
+                len(self._pending) >= self.max_pending
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        if due:
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        with self._lock:
+            if self._flushing:
+                return
+            self._flushing = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is None:
+            self._flush_in_background()
+        else:
+            loop.run_in_executor(None, self._flush_in_background)
+
+    def _flush_in_background(self):
+        try:
+            self._flush_logged()
+        finally:
+            with self._lock:
+                self._flushing = False
+
+    def _flush_logged(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Failed to write usage ledger")
+
+    async def run(self):
+        """Flush every `flush_interval` seconds until cancelled, then once more"""
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                if self.pending():
+                    await asyncio.to_thread(self._flush_logged)
+        finally:
+            # Write what was buffered since the last flush before the worker exits
+            await asyncio.shield(asyncio.to_thread(self._flush_logged))
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self, db: Optional[Session] = None):
+        """Upsert buffered totals; uses `db` if given, else a new session"""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not batch:
+            return
+
+        with self._flush_lock:
+            session = db or self.session_factory()
+            try:
+                try:
+                    self._write(session, batch)
+                except IntegrityError:
+                    # Another worker inserted one of the keys first; retry as updates
+                    session.rollback()
+                    self._write(session, batch)
+            except Exception:
+                session.rollback()
+                self._restore(batch)
+                raise
+            finally:
+                if db is None:
+                    session.close()
+
+    def _write(self, db: Session, batch: Dict[tuple, list]):
+        for (day, route, video_id, kind, provider, model), (calls, prompt, completion, cost) in batch.items():
+            row = db.query(UsageRecord).filter_by(
+                day=day, route=route, video_id=video_id, kind=kind, provider=provider, model=model
+            ).first()
+            if row is None:
+                row = UsageRecord(
+                    day=day, route=route, video_id=video_id, kind=kind, provider=provider, model=model,
+                    calls=0, prompt_tokens=0, completion_tokens=0, cost_usd=0.0
+                )
+                db.add(row)
+            row.calls += calls
+            row.prompt_tokens += prompt
+            row.completion_tokens += completion
+            row.cost_usd += cost
+        db.commit()
+
+    def _restore(self, batch: Dict[tuple, list]):
+        """Put an unwritten batch back so the next flush retries it"""
+        with self._lock:
+            for key, (calls, prompt, completion, cost) in batch.items():
+                totals = self._pending.setdefault(key, [0, 0, 0, 0.0])
+                totals[0] += calls
+                totals[1] += prompt
+                totals[2] += completion
+                totals[3] += cost
+
+
+class UsageScopeMiddleware:
+    """Makes the current request available for usage attribution"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with usage_scope(request=scope):
+            await self.app(scope, receive, send)
+
+
+usage_meter = UsageMeter(flush_interval=settings.usage_flush_interval)
@@ -0,0 +1,428 @@
+"""
+Vector Store
+Storage for transcript chunk embeddings. By default each API process opens
+the Chroma store itself; with VECTOR_STORE_URL set, workers are thin
+clients of a single vector service process (app.vector_service) that owns
+the index, so adding workers doesn't multiply index memory.
+
+Vectors live in named embedding spaces (one per embedding model, see
+embedding_spaces) that never share a collection.
+"""
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlparse
+import hashlib
+import heapq
+import logging
+import re
+import threading
+import time
+
+import orjson
+
+from ..config import Settings, get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Chroma rejects oversized writes; larger upserts are split into slices
+MAX_UPSERT_BATCH = 1000
+
+SHARD_MODES = ("video", "bucket", "none")
+# Collections are named "chunks.<space>" ("none") or "chunks.<space>.<shard>";
+# space names never contain dots
+SHARD_PREFIX = "chunks."
+# The single unversioned collection used before spaces and sharding
+LEGACY_COLLECTION = "video_chunks"
+# Seconds a cross-video search may use a cached list of shards
+SHARD_REFRESH_INTERVAL = 10.0
+
+
+class VectorStoreError(Exception):
+    """The vector service is unreachable or rejected a request"""
+
+
+class VectorStore(ABC):
+    """
+    Chunk embeddings keyed by embedding space and video. Query hits are
+    dicts with id, text, metadata and distance (cosine), nearest first.
+    """
+
+    @abstractmethod
+    def add(self, space: str, video_id: str, ids: List[str], embeddings: List[List[float]],
+            documents: List[str], metadatas: List[dict]):
+        """Store a video's chunks in `space`, replacing any with the same ids"""
+
+    @abstractmethod
+    def query(self, space: str, embedding: List[float], n_results: int,
+              video_id: Optional[str] = None) -> List[dict]:
+        """The `n_results` chunks nearest to `embedding` in `space`, optionally within one video"""
+
+    @abstractmethod
+    def delete_video(self, video_id: str, space: Optional[str] = None):
+        """Remove a video's chunks from one space, or from every space"""
+
+    @abstractmethod
+    def drop_space(self, space: str):
+        """Delete every chunk in `space`"""
+
+    @abstractmethod
+    def adopt_legacy(self, space: str) -> int:
+        """Move chunks from the unversioned collection into `space`; returns how many"""
+
+    @abstractmethod
+    def count(self, space: Optional[str] = None) -> int:
+        """Chunks stored in one space, or in all of them"""
+
+
+class ChromaVectorStore(VectorStore):
+    """
+    The Chroma persistent store, opened in this process. Within a space,
+    chunks are sharded into one collection per hash bucket of videos
+    ("bucket"), or per video ("video"), so a per-video query searches a
+    small HNSW graph and a delete touches one collection. Cross-video
+    queries fan out over the shards on `fanout_workers` threads and merge
+    the top k. "none" keeps a single collection per space with a metadata
+    filter. Collections left by another layout (or bucket count) are moved
+    into this one when the store is opened.
+    """
+
+    def __init__(self, path: str, shard_mode: str = "bucket", buckets: int = 16, fanout_workers: int = 4):
+        import chromadb
+        from chromadb.config import Settings as ChromaSettings
+        from chromadb.errors import NotFoundError
+
+        if shard_mode not in SHARD_MODES:
+            raise ValueError(f"Unknown shard mode {shard_mode!r}; expected one of {', '.join(SHARD_MODES)}")
+        self.shard_mode = shard_mode
+        self.buckets = buckets
+        self.client = chromadb.PersistentClient(
+            path=path,
+            settings=ChromaSettings(anonymized_telemetry=False)
+        )
+        self._not_found = NotFoundError
+        self._shards: Dict[str, object] = {}
+        self._listed_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._pool = (
+            ThreadPoolExecutor(max_workers=fanout_workers, thread_name_prefix="vector-fanout")
+            if fanout_workers > 1 else None
+        )
+        # The shard names this layout uses, after the "chunks.<space>" prefix
+        self._native_shard = {
+            "video": re.compile(r"\.v[0-9a-f]{24}"),
+            "bucket": re.compile(rf"\.b\d{{4}}of{buckets}"),
+            "none": re.compile(""),
+        }[shard_mode]
+        moved = self.relayout()
+        if moved:
+            logger.info("Moved %d vectors into the %s layout", moved, shard_mode)
+
+    def shard_name(self, space: str, video_id: str) -> str:
+        if self.shard_mode == "none":
+            return f"{SHARD_PREFIX}{space}"
+        digest = hashlib.sha1(video_id.encode()).hexdigest()
+        if self.shard_mode == "bucket":
+            # The bucket count is part of the name, so changing it relayouts
+            return f"{SHARD_PREFIX}{space}.b{int(digest, 16) % self.buckets:04d}of{self.buckets}"
+        return f"{SHARD_PREFIX}{space}.v{digest[:24]}"
+
+    def _shard(self, name: str, create: bool = False):
+        """Collection handle for a shard; None if it doesn't exist and create is False"""
+        collection = self._shards.get(name)
+        if collection is None:
+            with self._lock:
+                collection = self._shards.get(name)
+                if collection is None:
+                    if create:
+                        collection = self.client.get_or_create_collection(
+                            name=name, metadata={"hnsw:space": "cosine"}
+                        )
+                    else:
+                        try:
+                            collection = self.client.get_collection(name)
+                        except self._not_found:
+                            return None
+                    self._shards[name] = collection
+        return collection
+
+    @staticmethod
+    def _in_space(name: str, space: str) -> bool:
+        return name == f"{SHARD_PREFIX}{space}" or name.startswith(f"{SHARD_PREFIX}{space}.")
+
+    def _space_shards(self, space: str) -> list:
+        """
+        Every shard in a space. The listing is cached for SHARD_REFRESH_INTERVAL
+        seconds (shards this process creates or drops are tracked immediately)
+        so shards created by other processes show up after at most that long.
+        Shards other processes drop are noticed when a query hits them.
+        """
+        if time.monotonic() - self._listed_at.get(space, float("-inf")) > SHARD_REFRESH_INTERVAL:
+            listed = {c.name: c for c in self.client.list_collections() if self._in_space(c.name, space)}
+            with self._lock:
+                for name in [n for n in self._shards if self._in_space(n, space)]:
+                    if name not in listed:
+                        del self._shards[name]
+                for name, collection in listed.items():
+                    self._shards.setdefault(name, collection)
+                self._listed_at[space] = time.monotonic()
+        return [c for name, c in list(self._shards.items()) if self._in_space(name, space)]
+
+    def _forget(self, space: str, name: str):
+        """Drop the handle to a shard another process deleted, and relist the space next time"""
+        with self._lock:
+            self._shards.pop(name, None)
+            self._listed_at.pop(space, None)
+
+    def spaces(self) -> Set[str]:
+        """Spaces with at least one collection on disk"""
+        return {
+            c.name[len(SHARD_PREFIX):].split(".", 1)[0]
+            for c in self.client.list_collections() if c.name.startswith(SHARD_PREFIX)
+        }
+
+    def _move(self, name: str, space: str) -> int:
+        """Re-add a collection's chunks into `space` under this layout, then drop it"""
+        try:
+            source = self.client.get_collection(name)
+            total = source.count()
+            logger.info("Moving %d vectors from %s into space %s", total, name, space)
+            for offset in range(0, total, MAX_UPSERT_BATCH):
+                page = source.get(
+                    limit=MAX_UPSERT_BATCH, offset=offset, include=["embeddings", "documents", "metadatas"]
+                )
+                by_video = defaultdict(lambda: ([], [], [], []))
+                for row in zip(page["ids"], page["embeddings"], page["documents"], page["metadatas"]):
+                    group = by_video[row[3]["video_id"]]
+                    for column, value in zip(group, row):
+                        column.append(value)
+                for video_id, (ids, embeddings, documents, metadatas) in by_video.items():
+                    self.add(space, video_id, ids, [e.tolist() for e in embeddings], documents, metadatas)
+        except self._not_found:
+            # Another process moved it first; upserts made any overlap harmless
+            return 0
+        self._drop(name)
+        return total
+
+    def adopt_legacy(self, space):
+        return self._move(LEGACY_COLLECTION, space)
+
+    def relayout(self) -> int:
+        """
+        Move chunks out of collections named for another shard layout into
+        this one's shards; returns how many moved
+        """
+        moved = 0
+        for collection in self.client.list_collections():
+            if not collection.name.startswith(SHARD_PREFIX):
+                continue
+            space, _, shard = collection.name[len(SHARD_PREFIX):].partition(".")
+            if not self._native_shard.fullmatch(f".{shard}" if shard else ""):
+                moved += self._move(collection.name, space)
+        return moved
+
+    def add(self, space, video_id, ids, embeddings, documents, metadatas):
+        collection = self._shard(self.shard_name(space, video_id), create=True)
+        with self._write_lock:
+            for i in range(0, len(ids), MAX_UPSERT_BATCH):
+                batch = slice(i, i + MAX_UPSERT_BATCH)
+                collection.upsert(
+                    ids=ids[batch],
+                    embeddings=embeddings[batch],
+                    documents=documents[batch],
+                    metadatas=metadatas[batch],
+                )
+
+    @staticmethod
+    def _query_one(collection, embedding, n_results, where) -> List[dict]:
+        results = collection.query(
+            query_embeddings=[embedding],
+            n_results=n_results,
+            where=where,
+            include=["documents", "metadatas", "distances"]
+        )
+        if not results or not results["documents"]:
+            return []
+        return [
+            {"id": id_, "text": text, "metadata": metadata, "distance": distance}
+            for id_, text, metadata, distance in zip(
+                results["ids"][0], results["documents"][0], results["metadatas"][0], results["distances"][0]
+            )
+        ]
+
+    def _query_shard(self, space: str, collection, embedding, n_results, where) -> Optional[List[dict]]:
+        """Hits from one shard; None if another process dropped it since its handle was cached"""
+        try:
+            return self._query_one(collection, embedding, n_results, where)
+        except self._not_found:
+            self._forget(space, collection.name)
+            return None
+
+    def query(self, space, embedding, n_results, video_id=None):
+        # A shard dropped by another process is skipped; if it was re-created
+        # (re-shard, re-index), the second pass queries the new collection
+        if video_id:
+            name = self.shard_name(space, video_id)
+            # A per-video shard holds only this video; other layouts share collections
+            where = None if self.shard_mode == "video" else {"video_id": video_id}
+            for _ in range(2):
+                collection = self._shard(name)
+                if collection is None:
+                    return []
+                hits = self._query_shard(space, collection, embedding, n_results, where)
+                if hits is not None:
+                    return hits
+            return []
+
+        hits: List[dict] = []
+        queried: Set[str] = set()
+        for _ in range(2):
+            shards = [s for s in self._space_shards(space) if s.name not in queried]
+            if self._pool is not None and len(shards) > 1:
+                futures = [
+                    self._pool.submit(self._query_shard, space, s, embedding, n_results, None) for s in shards
+                ]
+                found = [future.result() for future in futures]
+            else:
+                found = [self._query_shard(space, s, embedding, n_results, None) for s in shards]
+            for shard, shard_hits in zip(shards, found):
+                if shard_hits is not None:
+                    queried.add(shard.name)
+                    hits.extend(shard_hits)
+            if all(shard_hits is not None for shard_hits in found):
+                break
+        return heapq.nsmallest(n_results, hits, key=lambda hit: hit["distance"])
+
+    def _drop(self, name: str):
+        with self._lock:
+            self._shards.pop(name, None)
+        try:
+            self.client.delete_collection(name)
+        except self._not_found:
+            pass
+
+    def delete_video(self, video_id, space=None):
+        spaces = [space] if space else self.spaces()
+        with self._write_lock:
+            for space in spaces:
+                name = self.shard_name(space, video_id)
+                if self.shard_mode == "video":
+                    self._drop(name)
+                else:
+                    collection = self._shard(name)
+                    if collection is not None:
+                        collection.delete(where={"video_id": video_id})
+
+    def drop_space(self, space):
+        with self._write_lock:
+            for collection in self.client.list_collections():
+                if self._in_space(collection.name, space):
+                    self._drop(collection.name)
+            self._listed_at.pop(space, None)
+
+    def _count(self, space: str, collection) -> int:
+        try:
+            return collection.count()
+        except self._not_found:
+            self._forget(space, collection.name)
+            return 0
+
+    def count(self, space=None):
+        spaces = [space] if space else self.spaces()
+        return sum(self._count(s, collection) for s in spaces for collection in self._space_shards(s))
+
+
+class RemoteVectorStore(VectorStore):
+    """
+    Client for the vector service over a Unix socket (unix:///path/to.sock)
+    or local HTTP (http://127.0.0.1:8765)
+    """
+
+    def __init__(self, url: str, timeout: float = 10.0, client=None):
+        import httpx  # only API workers in thin-client mode need it
+
+        self.url = url
+        self._errors = httpx.HTTPError
+        if client is None:
+            parsed = urlparse(url)
+            if parsed.scheme == "unix":
+                client = httpx.Client(
+                    transport=httpx.HTTPTransport(uds=parsed.path), base_url="http://vector-store", timeout=timeout
+                )
+            elif parsed.scheme in ("http", "https"):
+                client = httpx.Client(base_url=url, timeout=timeout)
+            else:
+                raise ValueError(f"Unsupported vector store URL: {url}")
+        self.client = client
+
+    def _call(self, method: str, path: str, payload: Optional[dict] = None):
+        try:
+            response = self.client.request(
+                method, path,
+                content=orjson.dumps(payload) if payload is not None else None,
+                headers={"Content-Type": "application/json"},
+            )
+        except self._errors as exc:
+            raise VectorStoreError(f"Vector service at {self.url} unreachable: {exc}") from exc
+        if response.status_code != 200:
+            raise VectorStoreError(f"Vector service {path} failed ({response.status_code}): {response.text[:200]}")
+        return orjson.loads(response.content)
+
+    def add(self, space, video_id, ids, embeddings, documents, metadatas):
+        self._call("POST", "/add", {
+            "space": space,
+            "video_id": video_id,
+            "ids": ids,
+            "embeddings": embeddings,
+            "documents": documents,
+            "metadatas": metadatas,
+        })
+
+    def query(self, space, embedding, n_results, video_id=None):
+        return self._call("POST", "/query", {
+            "space": space,
+            "embedding": embedding,
+            "n_results": n_results,
+            "video_id": video_id,
+        })["hits"]
+
+    def delete_video(self, video_id, space=None):
+        self._call("POST", "/delete", {"video_id": video_id, "space": space})
+
+    def drop_space(self, space):
+        self._call("POST", "/drop_space", {"space": space})
+
+    def adopt_legacy(self, space):
+        return self._call("POST", "/adopt_legacy", {"space": space})["moved"]
+
+    def count(self, space=None):
+        return self._call("POST", "/count", {"space": space})["count"]
+
+
+def build_vector_store(settings: Settings) -> VectorStore:
+    if settings.vector_store_url:
+        return RemoteVectorStore(settings.vector_store_url, timeout=settings.vector_store_timeout)
+    return ChromaVectorStore(
+        settings.chroma_persist_dir,
+        shard_mode=settings.vector_shard_mode,
+        buckets=settings.vector_shard_buckets,
+        fanout_workers=settings.vector_fanout_workers,
+    )
+
+
+# Opened on first use (or by the startup warm-up), not at import: importing
+# chromadb alone takes most of a second
+_store: Optional[VectorStore] = None
+_store_lock = threading.Lock()
+
+
+def get_vector_store() -> VectorStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = build_vector_store(settings)
+    return _store
@@ -2,13 +2,21 @@
 Video Processing Service
 Simplified version that works for YouTube embeds and demo purposes
 """
+import asyncio
+import logging
 import re
 from sqlalchemy.orm import Session
 from ..database import SessionLocal
 from ..models import Video, VideoStatus
 from ..config import get_settings
+from ..metrics import ingest_in_progress, stage
+from ..telemetry import record_error
+from .suggestions import suggestion_index
+from .transcript_store import save_transcript, load_transcript
+from .usage import usage_scope
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 
 def extract_youtube_id(url: str) -> str:
@@ -48,64 +56,96 @@ async def process_video_task(video_id: str, source: str, is_local: bool = False)
     """
     db = SessionLocal()
     
-    try:
-        # Update status to processing
-        video = db.query(Video).filter(Video.id == video_id).first()
-        if not video:
-            return
-        
-        video.status = VideoStatus.PROCESSING
-        video.progress = 10
-        db.commit()
-        
-        if not is_local:
-            # YouTube video - get info and use demo transcript
-            info = await get_youtube_info(source)
-            video.title = info.get("title", "Untitled Video")
-            video.duration = info.get("duration", 0)
+    with stage("ingest.process_video") as root, ingest_in_progress.track_inprogress(), \
+            usage_scope(route="ingest", video_id=video_id):
+        root.set_attribute("video.id", video_id)
+        root.set_attribute("ingest.local", is_local)
+        try:
+            # Update status to processing
+            video = db.query(Video).filter(Video.id == video_id).first()
+            if not video:
+                return
             
-            # Update progress
-            video.progress = 30
+            video.status = VideoStatus.PROCESSING
+            video.progress = 10
             db.commit()
             
-            # Demo transcript for YouTube videos
-            # In production, you'd use Whisper API or YouTube captions
-            video.transcript = generate_demo_transcript(video.title)
-        else:
-            # Local file - already have file path
-            video.duration = 300  # Default duration
-            if not video.transcript:
-                video.transcript = generate_demo_transcript(video.title or "Uploaded Video")
-        
-        # Update progress
-        video.progress = 60
-        db.commit()
-        
-        # Create embeddings for RAG
-        if video.transcript:
-            await create_embeddings(video_id, video.transcript)
+            with stage("ingest.transcript") as span:
+                transcript = await fetch_transcript(db, video, source, is_local)
+                
+                # Update progress
+                video.progress = 60
+                db.commit()
+                span.set_attribute("transcript.chars", len(transcript or ""))
+            
+            # Create embeddings for RAG
+            if transcript:
+                with stage("ingest.embed"):
+                    await create_embeddings(video_id, transcript)
+            
+            with stage("ingest.finalize"):
+                # Update progress
+                video.progress = 90
+                db.commit()
+                
+                # Mark as completed
+                video.status = VideoStatus.COMPLETED
+                video.progress = 100
+                db.commit()
+                
+                # Autocomplete for its title and salient phrases
+                await asyncio.to_thread(suggestion_index.add_video, video_id, video.title, transcript)
+            
+            logger.info("Video %s processed successfully", video_id)
+            
+            # Summary tree for overview questions; chat already works from
+            # the chunks meanwhile, so this runs after the video is completed
+            if transcript:
+                await create_summaries(db, video_id, transcript)
+            
+        except Exception as e:
+            logger.exception("Error processing video %s", video_id)
+            record_error(root, e)
+            # Mark as failed
+            video = db.query(Video).filter(Video.id == video_id).first()
+            if video:
+                video.status = VideoStatus.FAILED
+                video.error_message = str(e)
+                db.commit()
+        finally:
+            db.close()
+
+
+async def fetch_transcript(
+    db: Session, video: Video, source: str, is_local: bool = False, keep_title: bool = False
+) -> str:
+    """
+    Get and store a video's transcript. YouTube: basic info plus a demo
+    transcript. Uploads: the stored transcript, else a demo one.
+    """
+    if not is_local:
+        # YouTube video - get info and use demo transcript
+        info = await get_youtube_info(source)
+        if not keep_title:
+            video.title = info.get("title", "Untitled Video")
+        video.duration = info.get("duration", 0)
         
         # Update progress
-        video.progress = 90
+        video.progress = 30
         db.commit()
         
-        # Mark as completed
-        video.status = VideoStatus.COMPLETED
-        video.progress = 100
-        db.commit()
-        
-        print(f"✅ Video {video_id} processed successfully!")
-        
-    except Exception as e:
-        print(f"❌ Error processing video {video_id}: {e}")
-        # Mark as failed
-        video = db.query(Video).filter(Video.id == video_id).first()
-        if video:
-            video.status = VideoStatus.FAILED
-            video.error_message = str(e)
-            db.commit()
-    finally:
-        db.close()
+        # Demo transcript for YouTube videos
+        # In production, you'd use Whisper API or YouTube captions
+        transcript = generate_demo_transcript(video.title)
+        save_transcript(db, video.id, transcript)
+    else:
+        # Local file - already have file path
+        video.duration = 300  # Default duration
+        transcript = load_transcript(db, video.id)
+        if not transcript:
+            transcript = generate_demo_transcript(video.title or "Uploaded Video")
+            save_transcript(db, video.id, transcript)
+    return transcript
 
 
 def generate_demo_transcript(title: str) -> str:
@@ -150,7 +190,19 @@ async def create_embeddings(video_id: str, transcript: str):
     try:
         from .rag_service import add_video_to_index
         await add_video_to_index(video_id, transcript)
-        print(f"✅ Embeddings created for video {video_id}")
+        logger.info("Embeddings created for video %s", video_id)
     except Exception as e:
-        print(f"⚠️ Could not create embeddings: {e}")
+        logger.warning("Could not create embeddings for video %s: %s", video_id, e)
         # Don't fail the whole process if embeddings fail
+
+
+async def create_summaries(db: Session, video_id: str, transcript: str):
+    """Build the section/chapter/video summaries for overview questions"""
+    try:
+        from .summaries import summarize_video
+        count = await summarize_video(db, video_id, transcript)
+        logger.info("%d summaries created for video %s", count, video_id)
+    except Exception as e:
+        db.rollback()
+        logger.warning("Could not summarize video %s: %s", video_id, e)
+        # Chat falls back to chunk retrieval without summaries
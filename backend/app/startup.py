@@ -0,0 +1,105 @@
+"""
+Startup
+Resource initialization for the app lifespan (directories, tables) and an
+explicit warm-up that opens the vector store, imports the provider SDKs and
+primes caches, so the first requests don't pay for them. Nothing here runs
+at import time.
+"""
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import text
+
+from .config import Settings
+from .database import Base, engine
+
+logger = logging.getLogger(__name__)
+
+# "idle" until warm-up starts, then "running" and "ready" (or "failed");
+# per-step durations in seconds
+warmup_status = {"state": "idle", "steps": {}, "error": None}
+_warmup_lock = threading.Lock()
+
+
+def init_resources(settings: Settings):
+    """
+    Create the upload and vector store directories and any missing tables,
+    and register the current embedding space
+    """
+    os.makedirs(settings.upload_dir, exist_ok=True)
+    if not settings.vector_store_url:
+        os.makedirs(settings.chroma_persist_dir, exist_ok=True)
+    from . import models  # noqa: F401 -- registers every table on Base
+    Base.metadata.create_all(bind=engine)
+    _configure_embedding_space()
+
+
+def _configure_embedding_space():
+    """Register the embedding model's vector space (a migration target if the model changed)"""
+    from .services.embedding_spaces import embedding_spaces
+    from .services.llm_router import llm_router
+
+    provider = llm_router.embedding_provider()
+    if provider is None:
+        logger.error(
+            "Embedding provider %s has no API key configured; videos can't be indexed",
+            llm_router.embedding or "(any)",
+        )
+        return
+    embedding_spaces.configure(provider)
+
+
+def _open_database():
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+def _open_vector_store():
+    from .services.vector_store import get_vector_store
+    get_vector_store().count()
+
+
+def _load_providers():
+    from .services.llm_router import llm_router
+    for provider in llm_router.providers:
+        if provider.available():
+            provider.warm_up()
+
+
+def _load_tokenizer():
+    from .services.usage import count_tokens
+    count_tokens("warm up")
+
+
+WARMUP_STEPS = (
+    ("database", _open_database),
+    ("vector_store", _open_vector_store),
+    ("providers", _load_providers),
+    ("tokenizer", _load_tokenizer),
+)
+
+
+def warm_up() -> dict:
+    """
+    Run every warm-up step once (blocking) and return warmup_status.
+    Safe to call from several threads; later callers wait for the first.
+    """
+    with _warmup_lock:
+        if warmup_status["state"] == "ready":
+            return warmup_status
+        warmup_status.update(state="running", steps={}, error=None)
+        started = time.perf_counter()
+        for name, step in WARMUP_STEPS:
+            step_started = time.perf_counter()
+            try:
+                step()
+            except Exception as exc:
+                logger.exception("Warm-up step %s failed", name)
+                warmup_status.update(state="failed", error=f"{name}: {exc}")
+                return warmup_status
+            warmup_status["steps"][name] = round(time.perf_counter() - step_started, 4)
+        warmup_status["state"] = "ready"
+        logger.info("Warm-up finished in %.2fs: %s", time.perf_counter() - started, warmup_status["steps"])
+        return warmup_status
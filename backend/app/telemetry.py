@@ -0,0 +1,173 @@
+"""
+Telemetry
+OpenTelemetry tracing for the RAG and ingestion pipelines. Spans are exported
+to the console, a JSON-lines file (offline use) or an OTLP collector; with
+the exporter set to "none" the tracer is a no-op.
+"""
+from typing import Optional, Sequence
+import logging
+import time
+
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import SpanProcessor, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+from opentelemetry.trace import Status, StatusCode
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+
+class AppTracer(trace.Tracer):
+    """
+    The tracer every module imports: a no-op until setup_tracing() points
+    it at a provider. Tests point it at their own provider and back, so no
+    process-wide provider is installed.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.provider: Optional[TracerProvider] = None
+        self._tracer: trace.Tracer = trace.NoOpTracer()
+
+    def use(self, provider: Optional[TracerProvider]) -> Optional[TracerProvider]:
+        """Record spans with `provider` (None: no-op); returns the previous provider"""
+        previous = self.provider
+        self.provider = provider
+        self._tracer = provider.get_tracer(self.name) if provider is not None else trace.NoOpTracer()
+        return previous
+
+    def start_span(self, *args, **kwargs) -> trace.Span:
+        return self._tracer.start_span(*args, **kwargs)
+
+    def start_as_current_span(self, *args, **kwargs):
+        return self._tracer.start_as_current_span(*args, **kwargs)
+
+
+tracer = AppTracer("videorag")
+
+MAX_STATEMENT_CHARS = 500
+
+
+def setup_tracing(settings, processors: Sequence[SpanProcessor] = ()) -> Optional[TracerProvider]:
+    """
+    Install a tracer provider with the configured exporter plus any extra
+    span processors (e.g. SQL metrics). With neither, tracing stays off.
+    """
+    exporter_name = settings.tracing_exporter
+    if exporter_name == "none" and not processors:
+        return None
+
+    provider = TracerProvider(resource=Resource.create({"service.name": settings.app_name}))
+    for processor in processors:
+        provider.add_span_processor(processor)
+    tracer.use(provider)
+
+    if exporter_name == "none":
+        return provider
+    if exporter_name == "console":
+        exporter = ConsoleSpanExporter()
+    elif exporter_name == "file":
+        out = open(settings.tracing_file, "a", encoding="utf-8")
+        exporter = ConsoleSpanExporter(
+            out=out, formatter=lambda span: span.to_json(indent=None) + "\n"
+        )
+    elif exporter_name == "otlp":
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter(endpoint=settings.otlp_endpoint or None)
+    else:
+        raise ValueError(f"Unknown tracing exporter: {exporter_name}")
+
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    logger.info("Tracing enabled (%s exporter)", exporter_name)
+    return provider
+
+
+def shutdown_tracing(provider: Optional[TracerProvider]):
+    """Flush and detach a provider installed by setup_tracing()"""
+    if provider is None:
+        return
+    if tracer.provider is provider:
+        tracer.use(None)
+    provider.shutdown()
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) for span attributes"""
+    return (len(text) + 3) // 4 if text else 0
+
+
+def record_error(span, exc: BaseException):
+    span.record_exception(exc)
+    span.set_status(Status(StatusCode.ERROR, str(exc)))
+
+
+def instrument_sqlalchemy(engine: Engine):
+    """One `db.query` span per statement, parented to the active span"""
+    if getattr(engine, "_videorag_traced", False):
+        return
+    engine._videorag_traced = True
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        span = tracer.start_span("db.query", attributes={
+            "db.system": engine.dialect.name,
+            "db.statement": statement[:MAX_STATEMENT_CHARS],
+            "db.operation": statement.lstrip().split(" ", 1)[0].upper(),
+        })
+        context._otel_span = span
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_otel_span", None)
+        if span is not None:
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                span.set_attribute("db.rowcount", cursor.rowcount)
+            span.end()
+            context._otel_span = None
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        context = exception_context.execution_context
+        span = getattr(context, "_otel_span", None) if context else None
+        if span is not None:
+            record_error(span, exception_context.original_exception)
+            span.end()
+            context._otel_span = None
+
+
+class TracingMiddleware:
+    """Root span per HTTP request, named after the matched route template"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        with tracer.start_as_current_span(f"{method} {scope['path']}", kind=trace.SpanKind.SERVER) as span:
+            span.set_attribute("http.method", method)
+            span.set_attribute("http.target", scope["path"])
+            started = time.perf_counter()
+
+            async def send_with_status(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = scope.get("route")
+                if route is not None and hasattr(route, "path"):
+                    span.update_name(f"{method} {route.path}")
+                    span.set_attribute("http.route", route.path)
+                span.set_attribute("http.duration_ms", round((time.perf_counter() - started) * 1000, 3))
@@ -0,0 +1,177 @@
+"""
+Response Compression
+Negotiates brotli or gzip per request for bodies above a size threshold.
+Brotli is optional: without the package only gzip is offered.
+"""
+from abc import ABC, abstractmethod
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+def parse_accept_encoding(value: str) -> dict:
+    """Map each coding in an Accept-Encoding header to its q-value"""
+    codings = {}
+    for item in value.split(","):
+        parts = [p.strip() for p in item.split(";")]
+        if not parts[0]:
+            continue
+        q = 1.0
+        for param in parts[1:]:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        codings[parts[0].lower()] = q
+    return codings
+
+
+def choose_encoding(accept_encoding: str) -> str:
+    """Pick the best supported coding; prefers brotli on ties"""
+    codings = parse_accept_encoding(accept_encoding)
+    supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+
+    best, best_q = "identity", 0.0
+    for coding in supported:
+        q = codings.get(coding, codings.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+# Streams whose events must reach the client one by one
+EXCLUDED_CONTENT_TYPES = ("text/event-stream",)
+
+
+class CompressionResponder(ABC):
+    """
+    Compresses one response: holds back its start message until the first
+    body chunk shows whether the body is worth compressing, then sets the
+    encoding headers (a strong ETag becomes weak, since a compressed body
+    is a different representation). Streamed chunks are flushed as they go.
+    """
+
+    content_encoding = ""
+
+    def __init__(self, app: ASGIApp, minimum_size: int) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.send: Send = None
+        self.start: Message = None
+        self.compressing = False
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    @abstractmethod
+    def compress(self, body: bytes, more_body: bool) -> bytes:
+        """Compress the next chunk; the last one (`more_body` false) ends the stream"""
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            self.start = message
+            self.passthrough = (
+                "content-encoding" in headers
+                or headers.get("content-type", "").startswith(EXCLUDED_CONTENT_TYPES)
+            )
+            return
+        if message["type"] != "http.response.body":
+            # http.response.pathsend and the like go out untouched
+            await self._send_start()
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start is not None:
+            if not self.passthrough and (len(body) >= self.minimum_size or more_body):
+                self.compressing = True
+                headers = MutableHeaders(raw=self.start["headers"])
+                headers.add_vary_header("Accept-Encoding")
+                headers["Content-Encoding"] = self.content_encoding
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                if more_body:
+                    del headers["Content-Length"]
+            if self.compressing:
+                body = self.compress(body, more_body)
+                if not more_body:
+                    MutableHeaders(raw=self.start["headers"])["Content-Length"] = str(len(body))
+            await self._send_start()
+        elif self.compressing:
+            body = self.compress(body, more_body)
+        await self.send({**message, "body": body})
+
+    async def _send_start(self) -> None:
+        if self.start is not None:
+            start, self.start = self.start, None
+            await self.send(start)
+
+
+class GZipResponder(CompressionResponder):
+    content_encoding = "gzip"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, compresslevel: int = 6) -> None:
+        super().__init__(app, minimum_size)
+        # wbits=31: deflate with a gzip header and trailer
+        self.compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, 31)
+
+    def compress(self, body: bytes, more_body: bool) -> bytes:
+        out = self.compressor.compress(body)
+        return out + self.compressor.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+
+
+class BrotliResponder(CompressionResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int = 4) -> None:
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, body: bytes, more_body: bool) -> bytes:
+        out = self.compressor.process(body)
+        if more_body:
+            # Flush so streamed chunks (NDJSON lines) reach the client promptly
+            return out + self.compressor.flush()
+        return out + self.compressor.finish()
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("Accept-Encoding", ""))
+        responder: ASGIApp
+        if encoding == "br":
+            responder = BrotliResponder(self.app, self.minimum_size, quality=self.brotli_quality)
+        elif encoding == "gzip":
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.gzip_level)
+        else:
+            responder = self.app
+
+        await responder(scope, receive, send)
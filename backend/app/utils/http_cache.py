@@ -0,0 +1,77 @@
+"""
+HTTP Cache Utilities
+Strong ETags / Last-Modified validators and 304 handling for read endpoints
+"""
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+import hashlib
+
+from fastapi import Request, Response
+
+# Mutable resources: the browser may store them but must revalidate each use
+REVALIDATE = "private, no-cache"
+
+# Resources that never change once created (e.g. a generated quiz)
+IMMUTABLE = "private, max-age=86400, immutable"
+
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag from row version parts (ids, timestamps, counters)"""
+    raw = "|".join("" if p is None else str(p) for p in parts)
+    return '"' + hashlib.sha1(raw.encode("utf-8")).hexdigest() + '"'
+
+
+def http_date(dt: datetime) -> str:
+    if dt.tzinfo is None:
+        # SQLite hands back naive UTC datetimes
+        dt = dt.replace(tzinfo=timezone.utc)
+    return format_datetime(dt.astimezone(timezone.utc), usegmt=True)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Evaluate If-None-Match (preferred) or If-Modified-Since against the current version"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [t.strip() for t in if_none_match.split(",")]
+        # Weak comparison is what RFC 9110 prescribes for If-None-Match
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return last_modified.replace(microsecond=0) <= since
+
+    return False
+
+
+def cache_headers(etag: str, last_modified: Optional[datetime] = None, cache_control: str = REVALIDATE) -> dict:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def check_not_modified(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = REVALIDATE,
+) -> Optional[Response]:
+    """
+    Attach validators to `response` and return a bare 304 response when the
+    client's copy is still current. Call before loading the payload.
+    """
+    headers = cache_headers(etag, last_modified, cache_control)
+    response.headers.update(headers)
+
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return None
@@ -0,0 +1,61 @@
+"""
+Row leases for background work shared by several workers: a worker claims
+a row by writing its id and a heartbeat into the row's lease_owner and
+lease_heartbeat columns, and keeps it by claiming again before the lease
+expires. Other workers leave a leased row alone until its heartbeat is
+older than the ttl, so a crashed worker's work is taken over.
+"""
+from datetime import timedelta
+import os
+import socket
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from ..database import utcnow
+
+
+def worker_id() -> str:
+    """This process's lease owner id (computed per call, so forked workers differ)"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim(db: Session, model, key, ttl: float, owner: str = None) -> bool:
+    """
+    Take or renew the lease on the `model` row with primary key `key`.
+    False if another worker holds a live lease (or the row is gone).
+    """
+    owner = owner or worker_id()
+    now = utcnow()
+    primary_key = model.__mapper__.primary_key[0]
+    claimed = db.query(model).filter(
+        primary_key == key,
+        or_(
+            model.lease_owner.is_(None),
+            model.lease_owner == owner,
+            model.lease_heartbeat < now - timedelta(seconds=ttl),
+        ),
+    ).update({model.lease_owner: owner, model.lease_heartbeat: now}, synchronize_session=False)
+    db.commit()
+    return claimed == 1
+
+
+def is_held(row, ttl: float) -> bool:
+    """Whether some worker holds a live lease on `row`"""
+    if row.lease_owner is None or row.lease_heartbeat is None:
+        return False
+    now = utcnow()
+    if row.lease_heartbeat.tzinfo is None:
+        # SQLite hands datetimes back naive (in UTC)
+        now = now.replace(tzinfo=None)
+    return row.lease_heartbeat >= now - timedelta(seconds=ttl)
+
+
+def release(db: Session, model, key, owner: str = None):
+    """Give up a lease this worker holds"""
+    owner = owner or worker_id()
+    primary_key = model.__mapper__.primary_key[0]
+    db.query(model).filter(primary_key == key, model.lease_owner == owner).update(
+        {model.lease_owner: None, model.lease_heartbeat: None}, synchronize_session=False
+    )
+    db.commit()
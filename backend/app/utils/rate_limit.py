@@ -0,0 +1,228 @@
+"""
+Rate Limiting
+Cost-weighted token buckets per client, stored where every uvicorn worker
+sees them: a shared SQLite file by default, or Redis when configured.
+Redis support needs the optional `redis` package.
+"""
+from abc import ABC, abstractmethod
+from typing import List, Optional, Pattern, Tuple
+import asyncio
+import math
+import re
+import sqlite3
+import threading
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class BucketBackend(ABC):
+    @abstractmethod
+    async def consume(self, key: str, cost: float, capacity: float, refill_rate: float) -> Tuple[bool, float, float]:
+        """
+        Take `cost` tokens from the bucket at `key`.
+        Returns (allowed, tokens_remaining, retry_after_seconds).
+        """
+
+
+def _refill(tokens: float, updated: float, now: float, capacity: float, refill_rate: float) -> float:
+    return min(capacity, tokens + max(0.0, now - updated) * refill_rate)
+
+
+def _decide(tokens: float, cost: float, refill_rate: float) -> Tuple[bool, float, float]:
+    if tokens >= cost:
+        return True, tokens - cost, 0.0
+    return False, tokens, (cost - tokens) / refill_rate
+
+
+class SQLiteBucketBackend(BucketBackend):
+    """
+    Buckets in a SQLite file shared by all worker processes on the host.
+    BEGIN IMMEDIATE serializes the read-modify-write across processes, so
+    it runs on a thread rather than blocking the event loop on the lock.
+    Buckets idle long enough to be full again are pruned now and then.
+    The file is opened on the first request, not when the app is built.
+    """
+
+    def __init__(self, path: str, prune_interval: float = 60.0):
+        self.path = path
+        self.prune_interval = prune_interval
+        self._pruned_at = time.time()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        if self.path != ":memory:":
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        return conn
+
+    async def consume(self, key: str, cost: float, capacity: float, refill_rate: float) -> Tuple[bool, float, float]:
+        return await asyncio.to_thread(self._consume, key, cost, capacity, refill_rate)
+
+    def _consume(self, key: str, cost: float, capacity: float, refill_rate: float) -> Tuple[bool, float, float]:
+        now = time.time()
+        with self._lock:
+            if self._conn is None:
+                self._conn = self._connect()
+            conn = self._conn
+            if now - self._pruned_at >= self.prune_interval:
+                self._prune(now - capacity / refill_rate)
+                self._pruned_at = now
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT tokens, updated FROM rate_buckets WHERE key = ?", (key,)
+                ).fetchone()
+                tokens = capacity if row is None else _refill(row[0], row[1], now, capacity, refill_rate)
+                allowed, remaining, retry_after = _decide(tokens, cost, refill_rate)
+                conn.execute(
+                    "INSERT INTO rate_buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                    (key, remaining, now),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return allowed, remaining, retry_after
+
+    def _prune(self, full_before: float):
+        """Drop buckets untouched since `full_before`: refilled, so the same as no row"""
+        self._conn.execute("DELETE FROM rate_buckets WHERE updated < ?", (full_before,))
+
+
+class RedisBucketBackend(BucketBackend):
+    """Buckets in Redis, updated atomically by a Lua script"""
+
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local cost = tonumber(ARGV[3])
+    local now = tonumber(ARGV[4])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(state[1])
+    local updated = tonumber(state[2])
+    if tokens == nil then
+        tokens = capacity
+    else
+        tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+    end
+    local allowed = 0
+    if tokens >= cost then
+        tokens = tokens - cost
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        self.url = url
+        self.prefix = prefix
+        self.script = None
+
+    async def consume(self, key: str, cost: float, capacity: float, refill_rate: float) -> Tuple[bool, float, float]:
+        if self.script is None:
+            import redis.asyncio as redis
+            self.script = redis.from_url(self.url).register_script(self.SCRIPT)
+        allowed, tokens = await self.script(
+            keys=[self.prefix + key], args=[capacity, refill_rate, cost, time.time()]
+        )
+        tokens = float(tokens)
+        if allowed:
+            return True, tokens, 0.0
+        return False, tokens, (cost - tokens) / refill_rate
+
+
+# (method, path pattern, cost). First match wins; anything else costs 1.
+DEFAULT_ROUTE_COSTS = [
+    ("POST", r"^/api/quiz/generate$", 20),
+    ("POST", r"^/api/quiz/[^/]+/submit$", 10),
+    ("POST", r"^/api/chat$", 10),
+    ("POST", r"^/api/videos/(upload|process-url)$", 10),
+    ("POST", r"^/api/ingest$", 50),
+    ("POST", r"^/api/search$", 5),
+]
+
+
+class RateLimitMiddleware:
+    """
+    Charges each /api request its route cost against the client's bucket.
+    Cheap reads cost 1 token, LLM-backed POSTs cost more.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        backend: BucketBackend,
+        capacity: float,
+        refill_per_second: float,
+        route_costs: Optional[List[Tuple[str, str, float]]] = None,
+        path_prefix: str = "/api",
+    ):
+        self.app = app
+        self.backend = backend
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.path_prefix = path_prefix
+        self.route_costs: List[Tuple[str, Pattern, float]] = [
+            (method, re.compile(pattern), cost)
+            for method, pattern, cost in (route_costs if route_costs is not None else DEFAULT_ROUTE_COSTS)
+        ]
+
+    def cost(self, method: str, path: str) -> float:
+        for rule_method, pattern, cost in self.route_costs:
+            if rule_method == method and pattern.match(path):
+                return cost
+        return 1
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix) or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        key = client[0] if client else "anonymous"
+        cost = self.cost(scope["method"], scope["path"])
+        allowed, remaining, retry_after = await self.backend.consume(
+            key, cost, self.capacity, self.refill_per_second
+        )
+
+        if not allowed:
+            response = JSONResponse(
+                status_code=429,
+                content={
+                    "error": "Too Many Requests",
+                    "message": "Rate limit exceeded, please retry shortly"
+                },
+                headers={
+                    "Retry-After": str(max(1, math.ceil(retry_after))),
+                    "X-RateLimit-Remaining": str(int(remaining)),
+                },
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-RateLimit-Limit"] = str(int(self.capacity))
+                headers["X-RateLimit-Remaining"] = str(int(remaining))
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+def build_backend(settings) -> BucketBackend:
+    if settings.rate_limit_backend == "redis":
+        return RedisBucketBackend(settings.redis_url)
+    return SQLiteBucketBackend(settings.rate_limit_sqlite_path)
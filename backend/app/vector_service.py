@@ -0,0 +1,128 @@
+"""
+Vector Service
+A single process that owns the Chroma store and serves queries and batched
+upserts to the API workers (RemoteVectorStore), so the HNSW index is loaded
+once however many workers run. Point workers at it with VECTOR_STORE_URL.
+
+Usage (from backend/):
+    python -m app.vector_service --socket /tmp/videorag-vectors.sock
+        -> VECTOR_STORE_URL=unix:///tmp/videorag-vectors.sock
+    python -m app.vector_service --port 8765
+        -> VECTOR_STORE_URL=http://127.0.0.1:8765
+"""
+from typing import Optional
+import argparse
+import logging
+import os
+import sys
+
+import orjson
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from .config import get_settings
+from .services.vector_store import ChromaVectorStore, VectorStore
+
+logger = logging.getLogger(__name__)
+
+
+def _json(data, status_code: int = 200) -> Response:
+    return Response(orjson.dumps(data), status_code=status_code, media_type="application/json")
+
+
+def create_app(store: VectorStore) -> Starlette:
+    """ASGI app serving `store`; Chroma calls block, so they run in the threadpool"""
+
+    async def body(request: Request) -> dict:
+        return orjson.loads(await request.body())
+
+    async def add(request: Request):
+        payload = await body(request)
+        await run_in_threadpool(
+            store.add, payload["space"], payload["video_id"], payload["ids"], payload["embeddings"],
+            payload["documents"], payload["metadatas"],
+        )
+        return _json({"added": len(payload["ids"])})
+
+    async def query(request: Request):
+        payload = await body(request)
+        hits = await run_in_threadpool(
+            store.query, payload["space"], payload["embedding"], payload["n_results"], payload.get("video_id")
+        )
+        return _json({"hits": hits})
+
+    async def delete(request: Request):
+        payload = await body(request)
+        await run_in_threadpool(store.delete_video, payload["video_id"], payload.get("space"))
+        return _json({"deleted": payload["video_id"]})
+
+    async def drop_space(request: Request):
+        payload = await body(request)
+        await run_in_threadpool(store.drop_space, payload["space"])
+        return _json({"dropped": payload["space"]})
+
+    async def adopt_legacy(request: Request):
+        payload = await body(request)
+        return _json({"moved": await run_in_threadpool(store.adopt_legacy, payload["space"])})
+
+    async def count(request: Request):
+        payload = await body(request)
+        return _json({"count": await run_in_threadpool(store.count, payload.get("space"))})
+
+    async def health(request: Request):
+        return _json({"status": "healthy"})
+
+    async def error(request: Request, exc: Exception):
+        logger.exception("Vector service error on %s", request.url.path, exc_info=exc)
+        return _json({"error": str(exc)}, status_code=500)
+
+    return Starlette(
+        routes=[
+            Route("/add", add, methods=["POST"]),
+            Route("/query", query, methods=["POST"]),
+            Route("/delete", delete, methods=["POST"]),
+            Route("/drop_space", drop_space, methods=["POST"]),
+            Route("/adopt_legacy", adopt_legacy, methods=["POST"]),
+            Route("/count", count, methods=["POST"]),
+            Route("/health", health, methods=["GET"]),
+        ],
+        exception_handlers={Exception: error},
+    )
+
+
+def main(argv: Optional[list] = None):
+    import uvicorn
+
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Vector index service shared by the API workers")
+    parser.add_argument("--socket", help="listen on this Unix socket")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--path", default=settings.chroma_persist_dir, help="Chroma data directory")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    os.makedirs(args.path, exist_ok=True)
+    store = ChromaVectorStore(
+        args.path,
+        shard_mode=settings.vector_shard_mode,
+        buckets=settings.vector_shard_buckets,
+        fanout_workers=settings.vector_fanout_workers,
+    )
+    logger.info("Serving %d vectors from %s", store.count(), args.path)
+
+    app = create_app(store)
+    if args.socket:
+        if os.path.exists(args.socket):
+            os.remove(args.socket)  # stale socket from a previous run
+        uvicorn.run(app, uds=args.socket, log_level="warning")
+    else:
+        uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
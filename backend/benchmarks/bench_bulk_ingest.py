@@ -0,0 +1,116 @@
+"""
+Bulk Ingest Benchmark
+Wall time to ingest a catalogue of short transcripts one video at a time
+(a process_video_task per video, as the single-video endpoints do) versus
+as one bulk ingest job, with the fake provider's per-request latency
+standing in for embedding round trips.
+
+Usage (from backend/):
+    python -m benchmarks.bench_bulk_ingest [--videos 200] [--words 750]
+        [--latency 0.2] [--output run.json]
+"""
+import argparse
+import asyncio
+import shutil
+import sys
+import tempfile
+import time
+
+from .common import configure_offline_app, write_results
+from .synthetic import synthetic_transcript
+
+
+def create_videos(count: int, words: int, prefix: str):
+    from app.database import SessionLocal
+    from app.models import Video, VideoSource, VideoStatus
+    from app.services.transcript_store import save_transcript
+
+    db = SessionLocal()
+    try:
+        ids = []
+        for i in range(count):
+            video = Video(
+                id=f"{prefix}-{i}", title=f"{prefix} {i}", source_type=VideoSource.UPLOAD,
+                file_path=f"/videos/{prefix}-{i}.mp4", status=VideoStatus.PENDING,
+            )
+            db.add(video)
+            db.flush()
+            save_transcript(db, video.id, synthetic_transcript(words, seed=i))
+            ids.append(video.id)
+        db.commit()
+        return ids
+    finally:
+        db.close()
+
+
+async def one_by_one(video_ids, concurrency: int):
+    """Per-video tasks, `concurrency` at a time (uvicorn runs them all at once)"""
+    from app.services.video_processor import process_video_task
+
+    slots = asyncio.Semaphore(concurrency)
+
+    async def process(video_id):
+        async with slots:
+            await process_video_task(video_id, f"/videos/{video_id}.mp4", is_local=True)
+
+    await asyncio.gather(*(process(v) for v in video_ids))
+
+
+def bulk(count: int, words: int, workers: int) -> dict:
+    from app.database import SessionLocal
+    from app.services.bulk_ingest import create_job, parse_manifest, run_job
+    import orjson
+
+    lines = [orjson.dumps({"transcript": synthetic_transcript(words, seed=i), "title": f"bulk {i}"}) for i in range(count)]
+    db = SessionLocal()
+    try:
+        job_id = create_job(db, parse_manifest(lines, max_items=count)).id
+    finally:
+        db.close()
+    return asyncio.run(run_job(job_id, workers=workers))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--videos", type=int, default=200)
+    parser.add_argument("--words", type=int, default=750, help="words per transcript (750 = 5 minutes, 2 chunks)")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per fake embedding request")
+    parser.add_argument("--workers", type=int, default=4, help="bulk ingest preparation workers")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="videorag-bulk-")
+    configure_offline_app(workdir, latency=args.latency)
+    try:
+        from app.config import get_settings
+        from app.services.usage import usage_meter
+        from app.startup import init_resources
+
+        init_resources(get_settings())
+        results = {}
+
+        video_ids = create_videos(args.videos, args.words, "single")
+        started = time.perf_counter()
+        asyncio.run(one_by_one(video_ids, concurrency=args.workers))
+        results["one_by_one_s"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        progress = bulk(args.videos, args.words, args.workers)
+        results["bulk_s"] = time.perf_counter() - started
+        results["bulk_done"] = progress["done"]
+        usage_meter.flush()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for mode in ("one_by_one", "bulk"):
+        seconds = results[f"{mode}_s"]
+        print(f"{mode:11} {args.videos} videos  {seconds:7.2f} s  {args.videos / seconds:7.1f} videos/s")
+
+    if args.output:
+        params = {k: v for k, v in vars(args).items() if k != "output"}
+        write_results(args.output, "bulk_ingest", results, params)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""
+Hot Path Benchmark
+Micro benchmarks (chunking, prompt building, quiz parsing, to_dict,
+autocomplete lookups) and in-process macro benchmarks (ingestion, video
+listing, semantic and keyword search, chat) against the fake provider, a
+scratch SQLite database and a scratch Chroma store.
+
+Usage (from backend/):
+    python -m benchmarks.bench_hot_paths [--suite micro|macro|all]
+        [--latency 0.05] [--output run.json] [--compare baseline.json]
+"""
+import argparse
+import asyncio
+import json
+import shutil
+import sys
+import tempfile
+import time
+
+from .common import compare, configure_offline_app, latency_summary, time_per_call, write_results
+from .synthetic import TRANSCRIPT_SIZES, synthetic_questions, synthetic_transcript
+
+
+def run_micro(number: int) -> dict:
+    from datetime import datetime, timezone
+
+    from app.models import ChatMessage, TranscriptSegment, Video
+    from app.services.providers import FakeProvider
+    from app.services.quiz_service import parse_quiz_questions
+    from app.services.rag_service import build_chat_prompt, chunk_text
+    from app.services.suggestions import SuggestionIndex
+
+    results = {}
+
+    for name, words in TRANSCRIPT_SIZES.items():
+        text = synthetic_transcript(words, seed=1)
+        results[f"chunk_text[{name}]"] = {
+            "chunks": len(chunk_text(text)),
+            "per_call_us": time_per_call(lambda: chunk_text(text), number) * 1e6,
+        }
+
+    chunks = [
+        {"text": c["text"], "start": c["start"], "end": c["end"]}
+        for c in chunk_text(synthetic_transcript(2500, seed=2))[:5]
+    ]
+    results["build_chat_prompt[5 chunks]"] = {
+        "per_call_us": time_per_call(lambda: build_chat_prompt("Lecture 1", chunks), number) * 1e6,
+    }
+
+    reply = asyncio.run(FakeProvider().generate("Create 10 multiple choice questions", ""))
+    fenced = f"Here is your quiz:\n```json\n{reply}\n```"
+    results["parse_quiz_questions[10, bare]"] = {
+        "per_call_us": time_per_call(lambda: parse_quiz_questions(reply), number) * 1e6,
+    }
+    results["parse_quiz_questions[10, fenced]"] = {
+        "per_call_us": time_per_call(lambda: parse_quiz_questions(fenced), number) * 1e6,
+    }
+
+    now = datetime.now(timezone.utc)
+    videos = [
+        Video(id=f"v{i}", title=f"Lecture {i}", source_type="youtube", duration=3600,
+              status="completed", progress=100, is_liked=False, created_at=now)
+        for i in range(50)
+    ]
+    messages = [
+        ChatMessage(id=f"m{i}", video_id="v1", role="assistant", content="An answer. " * 40,
+                    references=[{"start": 0, "end": 60, "text": "ref"}], created_at=now)
+        for i in range(50)
+    ]
+    text = synthetic_transcript(150, seed=3)
+    segments = [
+        TranscriptSegment(video_id="v1", seq=i, start=i * 60, end=i * 60 + 60, data=TranscriptSegment.compress(text))
+        for i in range(60)
+    ]
+    for name, objects in (("Video", videos), ("ChatMessage", messages), ("TranscriptSegment", segments)):
+        results[f"to_dict[{name} x{len(objects)}]"] = {
+            "per_call_us": time_per_call(lambda: [o.to_dict() for o in objects], number) * 1e6,
+        }
+
+    # Uncached lookups over 2000 indexed videos and 2000 distinct past queries
+    index = SuggestionIndex(cache_size=0)
+    for i in range(2000):
+        index.add_video(f"v{i}", f"Lecture {i}: {synthetic_transcript(4, seed=i)}", synthetic_transcript(750, seed=i))
+        index.record_query(synthetic_transcript(3, seed=i))
+    for prefix in ("g", "gra", "gradient d"):
+        results[f"suggest[{prefix!r}, {len(index)} terms]"] = {
+            "per_call_us": time_per_call(lambda: index.suggest(prefix), number) * 1e6,
+        }
+
+    return results
+
+
+def run_macro(requests: int, videos_per_size: int) -> dict:
+    from fastapi.testclient import TestClient
+
+    from app.config import get_settings
+    from app.database import SessionLocal
+    from app.main import app
+    from app.models import Video, VideoStatus
+    from app.services.answer_cache import answer_cache
+    from app.services.transcript_store import save_transcript
+    from app.services.video_processor import process_video_task
+    from app.startup import init_resources, warm_up
+
+    results = {}
+
+    # Ingestion runs before the app's lifespan, so set up storage here
+    init_resources(get_settings())
+    warm_up()
+
+    # Ingestion: full process_video_task per transcript size
+    video_ids = []
+    for name, words in TRANSCRIPT_SIZES.items():
+        samples = []
+        for i in range(videos_per_size):
+            db = SessionLocal()
+            try:
+                video = Video(title=f"Synthetic {name} {i}", source_type="upload", status=VideoStatus.PENDING)
+                db.add(video)
+                db.flush()
+                save_transcript(db, video.id, synthetic_transcript(words, seed=i))
+                db.commit()
+                video_id = video.id
+            finally:
+                db.close()
+
+            started = time.perf_counter()
+            asyncio.run(process_video_task(video_id, "", is_local=True))
+            samples.append(time.perf_counter() - started)
+            video_ids.append(video_id)
+        results[f"process_video_task[{name}]"] = latency_summary(samples)
+
+    questions = synthetic_questions(requests)
+    with TestClient(app) as client:
+        def measure(call) -> dict:
+            samples = []
+            errors = 0
+            for i in range(requests):
+                started = time.perf_counter()
+                response = call(i)
+                samples.append(time.perf_counter() - started)
+                errors += response.status_code >= 400
+            summary = latency_summary(samples)
+            summary["errors"] = errors
+            return summary
+
+        results["GET /api/videos"] = measure(lambda i: client.get("/api/videos", params={"limit": 50}))
+        results["POST /api/search"] = measure(
+            lambda i: client.post("/api/search", json={"query": questions[i], "limit": 5})
+        )
+        results["POST /api/search[keyword]"] = measure(
+            # The question's first topic word, e.g. "gradient"
+            lambda i: client.post("/api/search", json={"query": questions[i].split()[4], "limit": 5, "mode": "keyword"})
+        )
+
+        def chat(i):
+            # Measure the full retrieval + generation path, not cache hits
+            answer_cache.clear()
+            return client.post("/api/chat", json={"videoId": video_ids[i % len(video_ids)], "message": questions[i]})
+
+        results["POST /api/chat"] = measure(chat)
+
+    return results
+
+
+def print_results(results: dict):
+    for suite, rows in results.items():
+        print(f"\n[{suite}]")
+        for name, row in rows.items():
+            if "per_call_us" in row:
+                print(f"  {name:40} {row['per_call_us']:>12.1f} us")
+            else:
+                print(
+                    f"  {name:40} p50 {row['p50_ms']:>8.2f} ms  p95 {row['p95_ms']:>8.2f} ms  "
+                    f"p99 {row['p99_ms']:>8.2f} ms  (n={row['count']})"
+                )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--suite", choices=["micro", "macro", "all"], default="all")
+    parser.add_argument("--number", type=int, default=200, help="calls per micro timing round")
+    parser.add_argument("--requests", type=int, default=100, help="requests per macro endpoint")
+    parser.add_argument("--videos", type=int, default=2, help="videos ingested per transcript size")
+    parser.add_argument("--latency", type=float, default=0.0, help="fake provider latency (seconds)")
+    parser.add_argument("--workdir", help="scratch directory (default: a temp dir, removed afterwards)")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="baseline JSON from a previous --output")
+    parser.add_argument("--threshold", type=float, default=0.10, help="slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="videorag-bench-")
+    configure_offline_app(workdir, args.latency)
+    try:
+        results = {}
+        if args.suite in ("micro", "all"):
+            results["micro"] = run_micro(args.number)
+        if args.suite in ("macro", "all"):
+            results["macro"] = run_macro(args.requests, args.videos)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print_results(results)
+
+    if args.output:
+        params = {k: v for k, v in vars(args).items() if k not in ("output", "compare", "workdir")}
+        write_results(args.output, "hot_paths", results, params)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Serialization Benchmark
+Measures per-endpoint cost of the standard path (Pydantic model +
+jsonable_encoder + json.dumps) against the orjson path, plus compression.
+
+Usage (from backend/):
+    python -m benchmarks.bench_serialization [--output results.json]
+"""
+from datetime import datetime, timezone
+from typing import Callable, List
+import argparse
+import gzip
+import json
+import sys
+import timeit
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.schemas import ChatHistoryResponse, SearchResponse, VideoResponse
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+def video_list_payload(count: int = 50) -> List[dict]:
+    now = datetime.now(timezone.utc).isoformat()
+    return [{
+        "id": f"video-{i:04d}",
+        "title": f"Lecture {i}: An Introduction to Something Important",
+        "source_type": "youtube",
+        "source_url": f"https://www.youtube.com/watch?v=abcdefghi{i:02d}",
+        "file_path": None,
+        "duration": 3600,
+        "thumbnail_url": None,
+        "status": "completed",
+        "progress": 100,
+        "is_liked": i % 3 == 0,
+        "created_at": now,
+    } for i in range(count)]
+
+
+def transcript_payload(minutes: int = 60) -> dict:
+    segments = [{
+        "start": m * 60,
+        "end": (m + 1) * 60,
+        "text": " ".join(f"word{w}" for w in range(150)),
+    } for m in range(minutes)]
+    return {
+        "video_id": "video-0001",
+        "transcript": "".join(s["text"] for s in segments),
+        "segments": segments,
+    }
+
+
+def chat_history_payload(count: int = 50) -> dict:
+    now = datetime.now(timezone.utc).isoformat()
+    return {
+        "video_id": "video-0001",
+        "messages": [{
+            "id": f"msg-{i:04d}",
+            "video_id": "video-0001",
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": "Explain the part about gradient clipping again please. " * 8,
+            "references": [{"start": 120, "end": 180, "text": "gradient clipping " * 6}],
+            "created_at": now,
+        } for i in range(count)],
+        "next_cursor": None,
+    }
+
+
+def search_payload(count: int = 10) -> dict:
+    return {
+        "query": "gradient clipping",
+        "results": [{
+            "video_id": f"video-{i:04d}",
+            "video_title": f"Lecture {i}",
+            "text": "so when the gradients explode we clip them " * 25,
+            "timestamp_start": i * 60,
+            "timestamp_end": i * 60 + 200,
+            "relevance_score": 0.9 - i * 0.01,
+        } for i in range(count)],
+        "total": count,
+    }
+
+
+def standard_path(model) -> Callable:
+    adapter = TypeAdapter(model)
+
+    def render(payload) -> bytes:
+        validated = adapter.validate_python(payload)
+        content = jsonable_encoder(validated)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    return render
+
+
+def orjson_path(payload) -> bytes:
+    return orjson.dumps(payload)
+
+
+# endpoint -> (payload, response model used by the standard path)
+ENDPOINTS = {
+    "GET /api/videos": (video_list_payload(), List[VideoResponse]),
+    "GET /api/videos/{id}/transcript": (transcript_payload(), dict),
+    "GET /api/chat/{id}/history": (chat_history_payload(), ChatHistoryResponse),
+    "POST /api/search": (search_payload(), SearchResponse),
+}
+
+
+def time_per_call(fn: Callable, arg, number: int) -> float:
+    """Best-of-5 mean seconds per call"""
+    return min(timeit.repeat(lambda: fn(arg), number=number, repeat=5)) / number
+
+
+def run(number: int = 200) -> dict:
+    results = {}
+    for endpoint, (payload, model) in ENDPOINTS.items():
+        standard = standard_path(model)
+        body = orjson_path(payload)
+
+        row = {
+            "bytes": len(body),
+            "standard_us": time_per_call(standard, payload, number) * 1e6,
+            "orjson_us": time_per_call(orjson_path, payload, number) * 1e6,
+            "gzip_bytes": len(gzip.compress(body, 6)),
+            "gzip_us": time_per_call(lambda b: gzip.compress(b, 6), body, number) * 1e6,
+        }
+        if brotli is not None:
+            row["br_bytes"] = len(brotli.compress(body, quality=4))
+            row["br_us"] = time_per_call(lambda b: brotli.compress(b, quality=4), body, number) * 1e6
+        row["speedup"] = row["standard_us"] / row["orjson_us"]
+        results[endpoint] = row
+    return results
+
+
+def print_table(results: dict):
+    print(f"{'endpoint':36} {'bytes':>8} {'std us':>9} {'orjson us':>10} {'x':>6} {'gzip B':>8} {'br B':>8}")
+    for endpoint, r in results.items():
+        print(
+            f"{endpoint:36} {r['bytes']:>8} {r['standard_us']:>9.1f} {r['orjson_us']:>10.1f} "
+            f"{r['speedup']:>6.1f} {r['gzip_bytes']:>8} {r.get('br_bytes', '-'):>8}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=200, help="calls per timing round")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    results = run(args.number)
+    print_table(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Vector Store Benchmark
+Per-video (filtered) and cross-video query latency for each collection
+layout as the catalogue grows, using random embeddings in a scratch
+Chroma directory.
+
+Usage (from backend/):
+    python -m benchmarks.bench_vector_store [--videos 10,100,400]
+        [--chunks 30] [--layouts none,video,bucket] [--fanout 4] [--output run.json]
+"""
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from .common import configure_offline_app, latency_summary, write_results
+
+SPACE = "bench"
+
+
+def random_vector(rng: random.Random, dim: int):
+    return [rng.gauss(0, 1) for _ in range(dim)]
+
+
+def run_layout(layout: str, sizes, chunks: int, dim: int, queries: int, fanout: int, workdir: str) -> dict:
+    from app.services.vector_store import ChromaVectorStore
+
+    rng = random.Random(0)
+    store = ChromaVectorStore(f"{workdir}/{layout}", shard_mode=layout, fanout_workers=fanout)
+    results = {}
+    loaded = 0
+    for size in sizes:
+        started = time.perf_counter()
+        for v in range(loaded, size):
+            video_id = f"video-{v}"
+            store.add(
+                SPACE,
+                video_id,
+                ids=[f"{video_id}_{c}" for c in range(chunks)],
+                embeddings=[random_vector(rng, dim) for _ in range(chunks)],
+                documents=[f"chunk {c} of {video_id}" for c in range(chunks)],
+                metadatas=[{"video_id": video_id, "start": c * 60, "end": c * 60 + 60} for c in range(chunks)],
+            )
+        load_s = time.perf_counter() - started
+        loaded = size
+
+        filtered, unfiltered = [], []
+        for _ in range(queries):
+            embedding = random_vector(rng, dim)
+            video_id = f"video-{rng.randrange(size)}"
+            started = time.perf_counter()
+            store.query(SPACE, embedding, 5, video_id)
+            filtered.append(time.perf_counter() - started)
+        for _ in range(max(1, queries // 5)):
+            embedding = random_vector(rng, dim)
+            started = time.perf_counter()
+            store.query(SPACE, embedding, 5)
+            unfiltered.append(time.perf_counter() - started)
+
+        results[f"{size} videos"] = {
+            "load_s": load_s,
+            "per_video": latency_summary(filtered),
+            "all_videos": latency_summary(unfiltered),
+        }
+        print(
+            f"{layout:7} {size:>6} videos  per-video p50 {results[f'{size} videos']['per_video']['p50_ms']:>7.2f} ms"
+            f"  p95 {results[f'{size} videos']['per_video']['p95_ms']:>7.2f} ms"
+            f"  all-videos p50 {results[f'{size} videos']['all_videos']['p50_ms']:>8.2f} ms"
+        )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--videos", default="10,100,400", help="catalogue sizes, cumulative")
+    parser.add_argument("--chunks", type=int, default=30, help="chunks per video")
+    parser.add_argument("--dim", type=int, default=64, help="embedding dimensions")
+    parser.add_argument("--queries", type=int, default=200, help="per-video queries per size")
+    parser.add_argument("--layouts", default="none,video,bucket", help="shard modes to compare")
+    parser.add_argument("--fanout", type=int, default=4, help="cross-video search threads")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    sizes = sorted(int(s) for s in args.videos.split(","))
+    workdir = tempfile.mkdtemp(prefix="videorag-vectors-")
+    configure_offline_app(workdir)
+    try:
+        results = {
+            layout: run_layout(layout, sizes, args.chunks, args.dim, args.queries, args.fanout, workdir)
+            for layout in args.layouts.split(",")
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        params = {k: v for k, v in vars(args).items() if k != "output"}
+        write_results(args.output, "vector_store", results, params)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
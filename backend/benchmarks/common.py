@@ -0,0 +1,117 @@
+"""
+Benchmark Helpers
+Timing, percentiles, an offline app environment, and JSON result files that
+can be compared between runs.
+"""
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def configure_offline_app(workdir: str, latency: float = 0.0):
+    """
+    Point the app at a scratch database and vector store and the fake
+    provider. Must run before anything under `app` is imported.
+    """
+    if "app.config" in sys.modules:
+        raise RuntimeError("configure_offline_app() must be called before importing the app")
+    os.makedirs(workdir, exist_ok=True)
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "CHROMA_PERSIST_DIR": os.path.join(workdir, "chroma"),
+        "UPLOAD_DIR": os.path.join(workdir, "uploads"),
+        "SUGGESTIONS_SNAPSHOT_PATH": os.path.join(workdir, "suggestions.json"),
+        "LLM_PROVIDER": "fake",
+        "EMBEDDING_PROVIDER": "fake",
+        "FAKE_PROVIDER_LATENCY": str(latency),
+        "RATE_LIMIT_ENABLED": "false",
+        "TRACING_EXPORTER": "none",
+    })
+
+
+def time_per_call(fn: Callable[[], object], number: int, repeat: int = 5) -> float:
+    """Best-of-`repeat` mean seconds per call"""
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+
+
+def percentiles(samples: List[float], points=(50, 95, 99)) -> Dict[str, float]:
+    """Nearest-rank percentiles of `samples`, keyed "p50", "p95", ..."""
+    if not samples:
+        return {f"p{p}": 0.0 for p in points}
+    ordered = sorted(samples)
+    return {
+        f"p{p}": ordered[min(len(ordered) - 1, max(0, -(-p * len(ordered) // 100) - 1))]
+        for p in points
+    }
+
+
+def latency_summary(samples: List[float]) -> dict:
+    """Milliseconds: count, mean and percentiles of per-call seconds"""
+    summary = {"count": len(samples), "mean_ms": 1000 * sum(samples) / len(samples) if samples else 0.0}
+    summary.update({f"{k}_ms": v * 1000 for k, v in percentiles(samples).items()})
+    return summary
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path: str, suite: str, results: dict, params: dict):
+    document = {
+        "suite": suite,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+
+
+def _flatten(results: dict, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+# Only timings are compared; counts and sizes are context
+TIMING_SUFFIXES = ("_us", "_ms")
+
+
+def compare(current: dict, baseline_path: str, threshold: float = 0.10) -> List[str]:
+    """Print timing changes against a saved run; return metrics slower by more than `threshold`"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+
+    now, then = _flatten(current), _flatten(baseline)
+    regressions = []
+    print(f"\n{'metric':60} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name in sorted(now):
+        if not name.endswith(TIMING_SUFFIXES) or name not in then or not then[name]:
+            continue
+        change = now[name] / then[name] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:60} {then[name]:>10.2f} {now[name]:>10.2f} {change:>+7.1%}{flag}")
+    return regressions
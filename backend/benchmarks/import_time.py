@@ -0,0 +1,99 @@
+"""
+Import Time Report
+Imports the app in a fresh interpreter under `python -X importtime` and
+reports the wall time, the slowest modules (cumulative) and the cost per
+top-level package (self time). Worker startup pays all of it on every fork.
+
+Usage (from backend/):
+    python -m benchmarks.import_time [--module app.main] [--top 25]
+        [--budget 1.0] [--output imports.json]
+"""
+from collections import defaultdict
+from typing import List
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from .common import BACKEND_DIR, write_results
+
+# Prints the wall time of the import on stdout; -X importtime goes to stderr
+PROBE = (
+    "import time; started = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def parse_importtime(stderr: str) -> List[dict]:
+    """Rows of `-X importtime` output as {module, depth, self_s, cumulative_s}"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self_s": int(self_us) / 1e6,
+            "cumulative_s": int(cumulative_us) / 1e6,
+        })
+    return rows
+
+
+def measure(module: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module)],
+        cwd=BACKEND_DIR, env=os.environ.copy(), capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr[-2000:]}")
+    rows = parse_importtime(result.stderr)
+
+    packages = defaultdict(float)
+    for row in rows:
+        packages[row["module"].split(".", 1)[0]] += row["self_s"]
+    return {
+        "module": module,
+        "wall_s": float(result.stdout.strip().splitlines()[-1]),
+        "modules_imported": len(rows),
+        "slowest": sorted(rows, key=lambda r: r["cumulative_s"], reverse=True),
+        "packages": dict(sorted(packages.items(), key=lambda kv: kv[1], reverse=True)),
+    }
+
+
+def print_report(report: dict, top: int):
+    print(f"import {report['module']}: {report['wall_s'] * 1000:.0f} ms wall, "
+          f"{report['modules_imported']} modules")
+    print(f"\n{'package':32} {'self ms':>9}")
+    for package, seconds in list(report["packages"].items())[:top]:
+        print(f"{package:32} {seconds * 1000:>9.1f}")
+    print(f"\n{'module (slowest, cumulative)':56} {'cum ms':>9} {'self ms':>9}")
+    for row in report["slowest"][:top]:
+        name = "  " * row["depth"] + row["module"]
+        print(f"{name[:56]:56} {row['cumulative_s'] * 1000:>9.1f} {row['self_s'] * 1000:>9.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="app.main", help="module to import")
+    parser.add_argument("--top", type=int, default=25, help="rows per table")
+    parser.add_argument("--budget", type=float, help="exit 1 if the import takes longer (seconds)")
+    parser.add_argument("--output", help="write the report as JSON to this path")
+    args = parser.parse_args(argv)
+
+    report = measure(args.module)
+    print_report(report, args.top)
+
+    if args.output:
+        saved = dict(report, slowest=report["slowest"][:args.top])
+        write_results(args.output, "import_time", saved, {"module": args.module})
+
+    if args.budget is not None and report["wall_s"] > args.budget:
+        print(f"\nOver budget: {report['wall_s']:.2f}s > {args.budget:.2f}s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
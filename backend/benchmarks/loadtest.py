@@ -0,0 +1,253 @@
+"""
+Load Test
+Concurrent virtual users running scripted journeys (upload, poll status,
+chat, quiz, search) against the app in-process or over HTTP, with
+throughput, p50/p95/p99 per route, error rates, and a ramp mode that finds
+the concurrency where chat p99 breaks the SLO or throughput stops growing.
+
+Usage (from backend/):
+    python -m benchmarks.loadtest --users 16 --duration 20 [--latency 0.2]
+    python -m benchmarks.loadtest --ramp 1,2,4,8,16,32,64 --slo-ms 2000
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000 --users 8
+In-process runs use the fake provider; against --url the server's own
+provider and rate-limit settings apply.
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import httpx
+
+from .common import configure_offline_app, latency_summary, write_results
+from .synthetic import synthetic_questions
+
+# Journey mix: one upload+ingest per user, then mostly chat
+CHATS_PER_JOURNEY = 5
+POLL_INTERVAL = 0.05  # seconds between status polls
+MAX_POLLS = 200
+
+
+class Recorder:
+    """Latency samples and error counts per route label"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    async def request(self, client: httpx.AsyncClient, route: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.samples[route].append(time.perf_counter() - started)
+            self.errors[route] += 1
+            return None
+        self.samples[route].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[route] += 1
+            return None
+        return response
+
+    def report(self) -> dict:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        total = sum(len(s) for s in self.samples.values())
+        routes = {}
+        for route, samples in sorted(self.samples.items()):
+            summary = latency_summary(samples)
+            summary["errors"] = self.errors[route]
+            summary["error_rate"] = self.errors[route] / len(samples)
+            summary["rps"] = len(samples) / elapsed
+            routes[route] = summary
+        return {
+            "elapsed_s": elapsed,
+            "requests": total,
+            "rps": total / elapsed if elapsed else 0.0,
+            "error_rate": sum(self.errors.values()) / total if total else 0.0,
+            "routes": routes,
+        }
+
+
+async def journey(client: httpx.AsyncClient, recorder: Recorder, user: int, rng: random.Random, think: float):
+    """Upload a video, wait for ingestion, chat about it, take a quiz, search"""
+    async def pause():
+        if think:
+            await asyncio.sleep(rng.uniform(0, 2 * think))
+
+    response = await recorder.request(
+        client, "POST /api/videos/upload", "POST", "/api/videos/upload",
+        files={"file": (f"user{user}.mp4", b"\x00" * 1024, "video/mp4")},
+        data={"title": f"Load test lecture {user}"},
+    )
+    if response is None:
+        return
+    video_id = response.json()["id"]
+
+    for _ in range(MAX_POLLS):
+        response = await recorder.request(
+            client, "GET /api/videos/{id}/status", "GET", f"/api/videos/{video_id}/status"
+        )
+        status = response.json()["status"] if response is not None else "failed"
+        if status in ("completed", "failed"):
+            break
+        await asyncio.sleep(POLL_INTERVAL)
+    if status != "completed":
+        return
+    await pause()
+
+    for question in synthetic_questions(CHATS_PER_JOURNEY, seed=rng.randrange(1 << 30)):
+        await recorder.request(
+            client, "POST /api/chat", "POST", "/api/chat", json={"videoId": video_id, "message": question}
+        )
+        await pause()
+
+    response = await recorder.request(
+        client, "POST /api/quiz/generate", "POST", "/api/quiz/generate",
+        json={"videoId": video_id, "questionCount": 5},
+    )
+    if response is not None:
+        quiz = response.json()
+        answers = {q["id"]: rng.choice(q["options"])["id"] for q in quiz["questions"]}
+        await recorder.request(
+            client, "POST /api/quiz/{id}/submit", "POST", f"/api/quiz/{quiz['id']}/submit",
+            json={"answers": answers},
+        )
+        await pause()
+
+    await recorder.request(
+        client, "POST /api/search", "POST", "/api/search",
+        json={"query": synthetic_questions(1, seed=user)[0], "limit": 5},
+    )
+
+
+async def run_load(client: httpx.AsyncClient, users: int, duration: float, think: float, seed: int = 0) -> dict:
+    """`users` concurrent users repeat journeys until `duration` seconds pass"""
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+
+    async def user_loop(user: int):
+        rng = random.Random(seed * 100003 + user)
+        while time.perf_counter() < deadline:
+            await journey(client, recorder, user, rng, think)
+
+    await asyncio.gather(*(user_loop(u) for u in range(users)))
+    recorder.finished = time.perf_counter()
+    report = recorder.report()
+    report["users"] = users
+    return report
+
+
+async def run_ramp(client: httpx.AsyncClient, steps: List[int], duration: float, think: float,
+                   slo_ms: float, max_error_rate: float) -> dict:
+    """
+    Run each concurrency step in turn; stop at the first that breaks the chat
+    SLO or error budget, or where throughput falls (the worker is saturated)
+    """
+    results = []
+    saturation = None
+    best_rps = 0.0
+    for users in steps:
+        report = await run_load(client, users, duration, think, seed=users)
+        chat = report["routes"].get("POST /api/chat", {})
+        report["throughput_dropped"] = report["rps"] < best_rps
+        report["within_slo"] = (
+            chat.get("p99_ms", float("inf")) <= slo_ms
+            and report["error_rate"] <= max_error_rate
+            and not report["throughput_dropped"]
+        )
+        best_rps = max(best_rps, report["rps"])
+        results.append(report)
+        print_step(report)
+        if not report["within_slo"]:
+            break
+        saturation = users
+    return {"slo_ms": slo_ms, "max_error_rate": max_error_rate, "max_users_within_slo": saturation, "steps": results}
+
+
+def print_step(report: dict):
+    chat = report["routes"].get("POST /api/chat", {})
+    print(
+        f"users={report['users']:>4}  rps={report['rps']:>8.1f}  errors={report['error_rate']:>6.1%}  "
+        f"chat p50={chat.get('p50_ms', 0):>8.1f} ms  p99={chat.get('p99_ms', 0):>8.1f} ms"
+        + ("" if report.get("within_slo", True) else
+           "  <- throughput dropped" if report["throughput_dropped"] else "  <- SLO broken")
+    )
+
+
+def print_report(report: dict):
+    print(f"\n{report['users']} users, {report['elapsed_s']:.1f}s: "
+          f"{report['requests']} requests, {report['rps']:.1f} req/s, {report['error_rate']:.2%} errors")
+    print(f"{'route':32} {'n':>6} {'rps':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'err':>7}")
+    for route, r in report["routes"].items():
+        print(
+            f"{route:32} {r['count']:>6} {r['rps']:>7.1f} {r['p50_ms']:>9.1f} "
+            f"{r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['error_rate']:>7.1%}"
+        )
+
+
+def make_client(url: Optional[str]) -> httpx.AsyncClient:
+    timeout = httpx.Timeout(60.0)
+    if url:
+        return httpx.AsyncClient(base_url=url, timeout=timeout)
+    from app.config import get_settings
+    from app.main import app
+    from app.startup import init_resources, warm_up
+    # ASGITransport doesn't run the lifespan; warm up so the first
+    # requests aren't measured opening the vector store
+    init_resources(get_settings())
+    warm_up()
+    # Unhandled app errors become 500s, as they would behind a real server
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    return httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=timeout)
+
+
+async def main_async(args) -> dict:
+    async with make_client(args.url) as client:
+        if args.ramp:
+            steps = [int(s) for s in args.ramp.split(",")]
+            result = await run_ramp(client, steps, args.duration, args.think, args.slo_ms, args.max_error_rate)
+            print(f"\nMax users within SLO (chat p99 <= {args.slo_ms:.0f} ms): {result['max_users_within_slo']}")
+            return result
+        report = await run_load(client, args.users, args.duration, args.think)
+        print_report(report)
+        return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="target server; default drives the app in-process")
+    parser.add_argument("--users", type=int, default=8, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per run (or per ramp step)")
+    parser.add_argument("--think", type=float, default=0.0, help="mean think time between steps (seconds)")
+    parser.add_argument("--ramp", help="comma-separated user counts, e.g. 1,2,4,8,16")
+    parser.add_argument("--slo-ms", type=float, default=2000.0, help="chat p99 target for ramp mode")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="error budget for ramp mode")
+    parser.add_argument("--latency", type=float, default=0.0, help="fake provider latency (in-process only)")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    workdir = None
+    if not args.url:
+        workdir = tempfile.mkdtemp(prefix="videorag-load-")
+        configure_offline_app(workdir, args.latency)
+    try:
+        result = asyncio.run(main_async(args))
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        params = {k: v for k, v in vars(args).items() if k != "output"}
+        write_results(args.output, "loadtest", result, params)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
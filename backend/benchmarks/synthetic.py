@@ -0,0 +1,51 @@
+"""
+Synthetic Data
+Deterministic lecture-like transcripts and questions for benchmarks
+"""
+from typing import List
+import random
+
+# Words per transcript at ~150 spoken words per minute
+TRANSCRIPT_SIZES = {
+    "5min": 750,
+    "30min": 4500,
+    "2h": 18000,
+}
+
+_TOPICS = [
+    "gradient", "descent", "learning", "rate", "momentum", "regularization", "overfitting",
+    "validation", "batch", "normalization", "convolution", "attention", "embedding", "token",
+    "transformer", "encoder", "decoder", "loss", "entropy", "optimizer", "weights", "bias",
+    "activation", "dropout", "layer", "network", "dataset", "feature", "vector", "matrix",
+]
+_FILLER = [
+    "the", "a", "so", "and", "we", "then", "is", "of", "to", "in", "this", "that", "it",
+    "you", "can", "see", "here", "when", "now", "what", "because", "which", "will", "just",
+]
+
+
+def synthetic_transcript(words: int, seed: int = 0) -> str:
+    """Sentences of filler and topic words; same `seed` gives the same text"""
+    rng = random.Random(seed)
+    out = []
+    sentence = 0
+    while len(out) < words:
+        length = rng.randint(8, 20)
+        for i in range(length):
+            pool = _TOPICS if rng.random() < 0.3 else _FILLER
+            word = rng.choice(pool)
+            out.append(word.capitalize() if i == 0 else word)
+        out[-1] += "."
+        sentence += 1
+        if sentence % 6 == 0:
+            out[-1] += "\n"
+    return " ".join(out[:words])
+
+
+def synthetic_questions(count: int, seed: int = 0) -> List[str]:
+    """Distinct chat questions, so the semantic answer cache doesn't serve them"""
+    rng = random.Random(seed)
+    return [
+        f"Question {i}: how does {rng.choice(_TOPICS)} relate to {rng.choice(_TOPICS)} and {rng.choice(_TOPICS)}?"
+        for i in range(count)
+    ]
@@ -3,10 +3,23 @@ Test configuration and fixtures
 """
 import sys
 import os
+import tempfile
 
 # Add backend directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Keep rate-limit buckets per test run instead of in a shared file
+os.environ.setdefault("RATE_LIMIT_SQLITE_PATH", ":memory:")
+# Every test client shares one address; earlier tests mustn't drain its bucket
+os.environ.setdefault("RATE_LIMIT_CAPACITY", "100000")
+# Tests open the vector store (or a fake) themselves, never the dev store
+os.environ.setdefault("WARMUP_ON_STARTUP", "false")
+os.environ.setdefault("SUGGESTIONS_SNAPSHOT_PATH", os.path.join(tempfile.mkdtemp(prefix="videorag-test-suggest-"), "suggestions.json"))
+os.environ.setdefault("CHROMA_PERSIST_DIR", tempfile.mkdtemp(prefix="videorag-test-chroma-"))
+# Sessions the app opens itself (background jobs, embedding spaces) use a
+# scratch file rather than the dev database
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='videorag-test-db-')}/app.db")
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -14,7 +27,9 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
-from app.database import Base, get_db
+from app.database import Base, get_db, engine as app_engine
+
+Base.metadata.create_all(bind=app_engine)
 
 
 # Create test database in memory
@@ -63,3 +78,30 @@ def db_session():
     finally:
         session.close()
         Base.metadata.drop_all(bind=engine)
+
+
+class OneChunkStore:
+    """Vector store answering every query with one chunk of the queried video"""
+
+    def query(self, space, embedding, n_results, video_id=None):
+        video_id = video_id or "v1"
+        return [{
+            "id": f"{video_id}_0",
+            "text": "the mitochondria is the powerhouse of the cell",
+            "metadata": {"video_id": video_id, "start": 0, "end": 60},
+            "distance": 0.2,
+        }]
+
+
+@pytest.fixture
+def fake_rag(monkeypatch):
+    """RAG pipeline on the fake provider and a one-chunk store, with an empty answer cache"""
+    from app.services import rag_service, vector_store
+    from app.services.llm_router import LLMRouter
+    from app.services.providers import FakeProvider
+
+    monkeypatch.setattr(rag_service, "llm_router", LLMRouter([FakeProvider()]))
+    monkeypatch.setattr(vector_store, "_store", OneChunkStore())
+    rag_service.answer_cache.clear()
+    yield
+    rag_service.answer_cache.clear()
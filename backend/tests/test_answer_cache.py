@@ -0,0 +1,125 @@
+"""
+Tests for the semantic answer cache
+"""
+import asyncio
+
+from app.services import rag_service
+from app.services.embedding_spaces import embedding_spaces
+from app.services.answer_cache import SemanticAnswerCache
+
+
+SPACE = "fake-fake-hash-64"
+RESPONSE = {"message": "X is a thing", "references": [{"start": 0, "end": 10, "text": "..."}]}
+
+
+def test_similar_question_hits():
+    """Test a close embedding returns the stored answer and a distant one misses"""
+    cache = SemanticAnswerCache(threshold=0.9, ttl=60, max_entries=10)
+    cache.put("v1", SPACE, 1, "what is X?", [1.0, 0.0, 0.0], RESPONSE)
+
+    assert cache.get("v1", SPACE, 1, [0.99, 0.05, 0.0]) == RESPONSE
+    assert cache.get("v1", SPACE, 1, [0.0, 1.0, 0.0]) is None
+    assert cache.get("v2", SPACE, 1, [1.0, 0.0, 0.0]) is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_ttl_expiry():
+    """Test expired answers are not returned"""
+    cache = SemanticAnswerCache(threshold=0.9, ttl=0, max_entries=10)
+    cache.put("v1", SPACE, 1, "what is X?", [1.0, 0.0], RESPONSE)
+    assert cache.get("v1", SPACE, 1, [1.0, 0.0]) is None
+
+
+def test_lru_eviction_and_invalidate():
+    """Test the least recently used answer is evicted and invalidate clears a video"""
+    cache = SemanticAnswerCache(threshold=0.99, ttl=60, max_entries=2)
+    cache.put("v1", SPACE, 1, "a", [1.0, 0.0, 0.0], {"message": "a"})
+    cache.put("v1", SPACE, 1, "b", [0.0, 1.0, 0.0], {"message": "b"})
+    cache.get("v1", SPACE, 1, [1.0, 0.0, 0.0])  # touch "a"
+    cache.put("v1", SPACE, 1, "c", [0.0, 0.0, 1.0], {"message": "c"})
+
+    assert cache.get("v1", SPACE, 1, [0.0, 1.0, 0.0]) is None
+    assert cache.get("v1", SPACE, 1, [1.0, 0.0, 0.0]) == {"message": "a"}
+
+    cache.invalidate("v1")
+    assert cache.get("v1", SPACE, 1, [1.0, 0.0, 0.0]) is None
+
+
+def test_other_embedding_space_misses():
+    """Test answers from another embedding space of the same dimension are never matched"""
+    cache = SemanticAnswerCache(threshold=0.9, ttl=60, max_entries=10)
+    cache.put("v1", "openai-text-embedding-ada-002", 1, "what is X?", [1.0, 0.0, 0.0], RESPONSE)
+
+    assert cache.get("v1", "openai-text-embedding-3-small", 1, [1.0, 0.0, 0.0]) is None
+    assert cache.get("v1", "openai-text-embedding-ada-002", 1, [1.0, 0.0, 0.0]) == RESPONSE
+
+
+def test_new_index_version_misses():
+    """Test a lookup with a newer index version drops the answers cached against the old one"""
+    cache = SemanticAnswerCache(threshold=0.9, ttl=60, max_entries=10)
+    cache.put("v1", SPACE, 1, "what is X?", [1.0, 0.0, 0.0], RESPONSE)
+
+    assert cache.get("v1", SPACE, 2, [1.0, 0.0, 0.0]) is None
+    assert cache.get("v1", SPACE, 1, [1.0, 0.0, 0.0]) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_rag_response_served_from_cache(monkeypatch, db_session):
+    """Test a repeated question skips retrieval and generation"""
+    calls = {"llm": 0, "search": 0}
+
+    async def fake_embeddings(texts, **kwargs):
+        return [[1.0, 0.0] for _ in texts]
+
+    async def fake_search(*args, **kwargs):
+        calls["search"] += 1
+        return [{"text": "chunk", "video_id": "v1", "start": 0, "end": 10, "score": 0.9}]
+
+    async def fake_llm(system_prompt, user_message, **kwargs):
+        calls["llm"] += 1
+        return "answer"
+
+    monkeypatch.setattr(rag_service, "get_embeddings", fake_embeddings)
+    monkeypatch.setattr(rag_service, "search_similar_chunks", fake_search)
+    monkeypatch.setattr(rag_service, "generate_llm_response", fake_llm)
+    rag_service.answer_cache.clear()
+
+    first = asyncio.run(rag_service.get_rag_response("v1", "what is X?", db_session))
+    second = asyncio.run(rag_service.get_rag_response("v1", "What is X ?", db_session))
+
+    assert first == second
+    assert calls == {"llm": 1, "search": 1}
+    rag_service.answer_cache.clear()
+
+
+def test_reindex_in_another_worker_retires_answers(monkeypatch, db_session):
+    """Test an answer cached before the video was reindexed elsewhere is not served"""
+    calls = {"llm": 0}
+
+    async def fake_embeddings(texts, **kwargs):
+        return [[1.0, 0.0] for _ in texts]
+
+    async def fake_search(*args, **kwargs):
+        return [{"text": "chunk", "video_id": "v-reindexed", "start": 0, "end": 10, "score": 0.9}]
+
+    async def fake_llm(system_prompt, user_message, **kwargs):
+        calls["llm"] += 1
+        return f"answer {calls['llm']}"
+
+    monkeypatch.setattr(rag_service, "get_embeddings", fake_embeddings)
+    monkeypatch.setattr(rag_service, "search_similar_chunks", fake_search)
+    monkeypatch.setattr(rag_service, "generate_llm_response", fake_llm)
+    monkeypatch.setattr(embedding_spaces, "read_space", lambda video_id: SPACE)
+    rag_service.answer_cache.clear()
+
+    embedding_spaces.mark_indexed("v-reindexed", SPACE, 1)
+    first = asyncio.run(rag_service.get_rag_response("v-reindexed", "what is X?", db_session))
+    assert asyncio.run(rag_service.get_rag_response("v-reindexed", "what is X?", db_session)) == first
+
+    # Another worker reindexes: only the shared index version changes
+    embedding_spaces.mark_indexed("v-reindexed", SPACE, 1)
+    second = asyncio.run(rag_service.get_rag_response("v-reindexed", "what is X?", db_session))
+
+    assert second["message"] == "answer 2"
+    assert calls["llm"] == 2
+    rag_service.answer_cache.clear()
@@ -0,0 +1,208 @@
+"""
+Tests for bulk ingestion: manifest parsing, cross-video embedding batches,
+resuming and the /api/ingest endpoints
+"""
+import asyncio
+import time
+
+import orjson
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import IngestItem, IngestItemStatus, IngestJob, IngestStatus, Video, VideoStatus, VideoSummary
+from app.routers import ingest as ingest_router
+from app.services import bulk_ingest, rag_service, vector_store
+from app.services.bulk_ingest import ManifestError, create_job, parse_manifest, run_job
+from app.services.embedding_spaces import EmbeddingSpaces
+from app.services.llm_router import LLMRouter
+from app.services.providers import FakeProvider
+from app.services.vector_store import ChromaVectorStore
+from app.utils import leases
+
+
+class CountingProvider(FakeProvider):
+    """Fake provider recording embedding batch sizes; fails on poisoned texts"""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    async def embed(self, texts):
+        if any("poison" in t for t in texts):
+            raise RuntimeError("provider rejected the batch")
+        self.batches.append(len(texts))
+        return await super().embed(texts)
+
+
+def manifest(*entries):
+    return [orjson.dumps(e) for e in entries]
+
+
+def transcript(words: int, tag: str) -> str:
+    return " ".join(f"{tag}{i}" for i in range(words))
+
+
+@pytest.fixture
+def db_session(tmp_path):
+    """
+    A session on a database file: jobs write from several sessions and
+    threads at once, which the shared in-memory connection can't isolate
+    """
+    engine = create_engine(f"sqlite:///{tmp_path}/ingest.db", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def ingest(db_session, tmp_path, monkeypatch):
+    """Run jobs against the test database with a counting fake provider"""
+    factory = sessionmaker(bind=db_session.get_bind())
+    provider = CountingProvider()
+    spaces = EmbeddingSpaces(session_factory=factory, refresh_interval=0)
+    monkeypatch.setattr(vector_store, "_store", ChromaVectorStore(str(tmp_path), shard_mode="none"))
+    monkeypatch.setattr(rag_service, "llm_router", LLMRouter([provider]))
+    monkeypatch.setattr(rag_service, "embedding_spaces", spaces)
+    spaces.configure(provider, db_session)
+
+    def run(job_id, **kwargs):
+        kwargs.setdefault("batch_size", 10)
+        return asyncio.run(run_job(job_id, session_factory=factory, **kwargs))
+
+    run.provider = provider
+    return run
+
+
+def test_manifest_validation(tmp_path):
+    """Test bad lines are reported with their line number and files are confined to the root"""
+    (tmp_path / "a.mp4").write_bytes(b"video")
+    entries = parse_manifest([
+        b'{"url": "https://youtu.be/abcdefghijk"}', b"", orjson.dumps({"file": str(tmp_path / "a.mp4")}),
+    ], 10, allowed_root=str(tmp_path))
+    assert [(e["line"], e.get("url") or e["file"]) for e in entries] == [
+        (1, "https://youtu.be/abcdefghijk"), (3, str((tmp_path / "a.mp4").resolve())),
+    ]
+
+    with pytest.raises(ManifestError, match="Line 2"):
+        parse_manifest([b'{"transcript": "hi"}', b"not json"], 10)
+    with pytest.raises(ManifestError, match="Line 1"):
+        parse_manifest([b'{"title": "no source"}'], 10)
+    with pytest.raises(ManifestError, match="upload directory"):
+        parse_manifest([orjson.dumps({"file": str(tmp_path / "a.mp4")})], 10, allowed_root=str(tmp_path / "uploads"))
+    with pytest.raises(ManifestError, match="more than 1"):
+        parse_manifest(manifest({"transcript": "a"}, {"transcript": "b"}), 1)
+    with pytest.raises(ManifestError, match="empty"):
+        parse_manifest([b"", b"  "], 10)
+
+
+def test_embedding_calls_span_videos(ingest, db_session):
+    """Test short videos share embedding calls filled up to the batch size"""
+    entries = parse_manifest(manifest(*(
+        {"transcript": transcript(300, f"v{i}_"), "title": f"Lecture {i}"} for i in range(25)
+    )), 100)
+    job = create_job(db_session, entries)
+
+    progress = ingest(job.id, workers=3)
+
+    assert progress["done"] == 25 and progress["pending"] == 0 and progress["status"] == IngestStatus.COMPLETED
+    # 25 one-chunk videos in batches of 10 chunks, not one call per video
+    assert sum(ingest.provider.batches) == 25
+    assert len(ingest.provider.batches) <= 4
+    assert db_session.query(Video).filter(Video.status == VideoStatus.COMPLETED).count() == 25
+    assert vector_store._store.count() == 25
+    # Each short video got its one-section summary tree
+    assert db_session.query(VideoSummary).count() == 25 * 3
+
+
+def test_one_bad_video_does_not_fail_its_batch(ingest, db_session):
+    """Test a failing batch is retried video by video so only the bad one fails"""
+    job = create_job(db_session, parse_manifest(manifest(
+        {"transcript": transcript(50, "good")},
+        {"transcript": "poison " + transcript(50, "bad")},
+        {"transcript": transcript(50, "fine")},
+    ), 10))
+
+    progress = ingest(job.id)
+
+    assert (progress["done"], progress["failed"]) == (2, 1)
+    failed = db_session.query(IngestItem).filter(IngestItem.status == IngestItemStatus.FAILED).one()
+    assert failed.line == 2 and "rejected" in failed.error
+    assert db_session.get(Video, failed.video_id).status == VideoStatus.FAILED
+
+
+def test_resume_only_runs_pending_items(ingest, db_session):
+    """Test an interrupted job picks up where it stopped and re-submitted URLs are skipped"""
+    urls = [f"https://youtube.com/watch?v=resume{i:05d}" for i in range(4)]
+    job = create_job(db_session, parse_manifest(manifest(*({"url": u} for u in urls)), 10))
+    # Pretend the first run finished two items before it was interrupted
+    for item in db_session.query(IngestItem).filter(IngestItem.line <= 2):
+        item.status = IngestItemStatus.DONE
+        db_session.get(Video, item.video_id).status = VideoStatus.COMPLETED
+    db_session.commit()
+
+    progress = ingest(job.id)
+    assert progress["done"] == 4
+    # Only the two unfinished videos were fetched and embedded (one chunk each)
+    assert sum(ingest.provider.batches) == 2
+    assert vector_store._store.count() == 2
+
+    again = create_job(db_session, parse_manifest(manifest(*({"url": u} for u in urls)), 10))
+    assert bulk_ingest.job_progress(db_session, again.id)["skipped"] == 4
+
+
+def test_one_runner_per_job(ingest, db_session, monkeypatch):
+    """Test a job leased by another worker isn't run twice, and a stale lease is taken over"""
+    job = create_job(db_session, parse_manifest(manifest({"transcript": transcript(50, "only")}), 10))
+    assert leases.claim(db_session, IngestJob, job.id, bulk_ingest.JOB_LEASE_TTL, owner="other-worker")
+    assert bulk_ingest.is_running(db_session, job.id)
+    assert bulk_ingest.job_progress(db_session, job.id)["running"] is True
+
+    assert ingest(job.id) is None
+    assert ingest.provider.batches == []
+
+    # The other worker died: once its heartbeat is older than the ttl, the job is free
+    monkeypatch.setattr(bulk_ingest, "JOB_LEASE_TTL", 0.05)
+    time.sleep(0.1)
+    progress = ingest(job.id)
+    assert progress["done"] == 1 and progress["running"] is False
+    db_session.expire_all()
+    assert db_session.get(IngestJob, job.id).lease_owner is None
+
+
+def test_ingest_endpoints(client, monkeypatch):
+    """Test POST /api/ingest validates the manifest, starts the job and reports progress"""
+    started = []
+
+    async def fake_run(job_id, **kwargs):
+        started.append(job_id)
+
+    monkeypatch.setattr(ingest_router, "run_job", fake_run)
+
+    assert client.post("/api/ingest", content=b'{"url": 1}\n').status_code == 400
+
+    body = b"\n".join(manifest({"url": "https://youtu.be/abcdefghijk"}, {"transcript": "hello world"}))
+    response = client.post("/api/ingest", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 202
+    job = response.json()
+    assert job["total"] == 2 and job["pending"] == 2
+    assert started == [job["id"]]
+
+    assert client.get(f"/api/ingest/{job['id']}").json()["pending"] == 2
+    assert client.get("/api/ingest/missing").status_code == 404
+    assert client.post(f"/api/ingest/{job['id']}/resume").status_code == 202
+    assert started == [job["id"], job["id"]]
+
+    monkeypatch.setattr(ingest_router, "is_running", lambda db, job_id: True)
+    assert client.post(f"/api/ingest/{job['id']}/resume").status_code == 409
+
+    # Oversized manifests are refused before they are read in full
+    monkeypatch.setattr(ingest_router.settings, "bulk_ingest_max_bytes", len(body) - 1)
+    assert client.post("/api/ingest", content=body).status_code == 413
+    assert client.post("/api/ingest", content=iter([body[:10], body[10:]])).status_code == 413
+    assert started == [job["id"], job["id"]]
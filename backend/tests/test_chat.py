@@ -0,0 +1,61 @@
+"""
+Tests for Chat history endpoints
+"""
+import json
+from datetime import datetime, timedelta
+
+from app.models import ChatMessage
+
+
+def create_messages(db, video_id="chat-video", count=7):
+    """Insert `count` messages; pairs share a timestamp like a question/answer turn"""
+    base = datetime(2026, 1, 1, 12, 0, 0)
+    for i in range(count):
+        db.add(ChatMessage(
+            video_id=video_id,
+            role="user" if i % 2 == 0 else "assistant",
+            content=f"message {i}",
+            created_at=base + timedelta(seconds=i // 2),
+            id=f"m{i:02d}",
+        ))
+    db.commit()
+    return video_id
+
+
+def test_chat_history_empty(client):
+    """Test history for a video without messages"""
+    response = client.get("/api/chat/no-messages/history")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["messages"] == []
+    assert data["next_cursor"] is None
+
+
+def test_chat_history_pages_backwards(client, db_session):
+    """Test paging from the newest messages back with `before` cursors"""
+    video_id = create_messages(db_session)
+
+    first = client.get(f"/api/chat/{video_id}/history", params={"limit": 3}).json()
+    assert [m["content"] for m in first["messages"]] == ["message 4", "message 5", "message 6"]
+    assert first["next_cursor"]
+
+    contents = [m["content"] for m in first["messages"]]
+    cursor = first["next_cursor"]
+    while cursor:
+        page = client.get(
+            f"/api/chat/{video_id}/history", params={"limit": 3, "before": cursor}
+        ).json()
+        contents = [m["content"] for m in page["messages"]] + contents
+        cursor = page["next_cursor"]
+
+    assert contents == [f"message {i}" for i in range(7)]
+
+
+def test_chat_history_export_ndjson(client, db_session):
+    """Test streaming the full history as NDJSON"""
+    video_id = create_messages(db_session)
+
+    response = client.get(f"/api/chat/{video_id}/history/export")
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [m["content"] for m in lines] == [f"message {i}" for i in range(7)]
@@ -0,0 +1,84 @@
+"""
+Tests for negotiated response compression
+"""
+from starlette.applications import Starlette
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.models import Video, VideoStatus
+from app.services.transcript_store import save_transcript
+from app.utils import compression
+from app.utils.compression import choose_encoding
+
+
+def create_transcript_video(db):
+    video = Video(title="Compression Test", status=VideoStatus.COMPLETED)
+    db.add(video)
+    db.flush()
+    save_transcript(db, video.id, "a fairly repetitive transcript line\n" * 400)
+    db.commit()
+    return video.id
+
+
+def test_choose_encoding():
+    """Test Accept-Encoding negotiation honours q-values"""
+    assert choose_encoding("") == "identity"
+    assert choose_encoding("gzip") == "gzip"
+    assert choose_encoding("gzip;q=0") == "identity"
+    if compression.brotli is not None:
+        assert choose_encoding("gzip, deflate, br") == "br"
+        assert choose_encoding("br;q=0.5, gzip") == "gzip"
+
+
+def test_large_response_is_gzipped(client, db_session):
+    """Test large bodies are compressed and their ETag becomes weak"""
+    video_id = create_transcript_video(db_session)
+    url = f"/api/videos/{video_id}/transcript"
+
+    response = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.headers["ETag"].startswith("W/")
+    assert response.json()["video_id"] == video_id
+
+    # The weak validator still revalidates
+    cached = client.get(url, headers={
+        "Accept-Encoding": "gzip", "If-None-Match": response.headers["ETag"]
+    })
+    assert cached.status_code == 304
+
+
+def test_small_response_is_not_compressed(client):
+    """Test responses below the threshold are sent as-is"""
+    response = client.get("/health", headers={"Accept-Encoding": "gzip, br"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+
+
+def test_streamed_responses_are_compressed_per_chunk():
+    """Test streamed bodies are compressed chunk by chunk and event streams are left alone"""
+    lines = [b'{"line": %d}\n' % i for i in range(50)]
+
+    async def ndjson(request):
+        return StreamingResponse(iter(lines), media_type="application/x-ndjson")
+
+    async def events(request):
+        return StreamingResponse(iter([b"data: 1\n\n"]), media_type="text/event-stream")
+
+    app = compression.CompressionMiddleware(Starlette(routes=[Route("/ndjson", ndjson), Route("/events", events)]))
+    client = TestClient(app)
+
+    response = client.get("/ndjson", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.content == b"".join(lines)
+    if compression.brotli is not None:
+        response = client.get("/ndjson", headers={"Accept-Encoding": "br"})
+        assert response.headers["content-encoding"] == "br"
+        assert response.content == b"".join(lines)
+
+    response = client.get("/events", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.content == b"data: 1\n\n"
@@ -0,0 +1,224 @@
+"""
+Tests for versioned embedding spaces: re-embedding, dual-read and cutover
+"""
+import asyncio
+import time
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.config import Settings
+from app.models import EmbeddingSpace, EmbeddingSpaceState, Video, VideoEmbedding, VideoStatus
+from app.services import embedding_spaces, rag_service, vector_store
+from app.services.embedding_spaces import EmbeddingSpaces, run_backfill
+from app.services.llm_router import LLMRouter
+from app.services.providers import FakeProvider, OpenAIProvider, ProviderError
+from app.services.transcript_store import save_transcript
+from app.services.vector_store import ChromaVectorStore
+from app.utils import leases
+
+
+OLD = FakeProvider(name="old", dimensions=16)
+NEW = FakeProvider(name="new", dimensions=32)
+
+TRANSCRIPTS = {
+    "v1": "photosynthesis turns sunlight into chemical energy in the leaf",
+    "v2": "the french revolution began with the storming of the bastille",
+}
+
+
+@pytest.fixture
+def spaces(db_session, tmp_path, monkeypatch):
+    """Two completed videos indexed in the old model's space"""
+    store = ChromaVectorStore(str(tmp_path), shard_mode="video")
+    spaces = EmbeddingSpaces(session_factory=sessionmaker(bind=db_session.get_bind()), refresh_interval=0)
+    monkeypatch.setattr(vector_store, "_store", store)
+    monkeypatch.setattr(rag_service, "embedding_spaces", spaces)
+    monkeypatch.setattr(rag_service, "llm_router", LLMRouter([OLD]))
+    rag_service.answer_cache.clear()
+
+    for video_id, transcript in TRANSCRIPTS.items():
+        db_session.add(Video(id=video_id, title=video_id, status=VideoStatus.COMPLETED))
+        db_session.flush()
+        save_transcript(db_session, video_id, transcript)
+    db_session.commit()
+
+    assert spaces.configure(OLD) == OLD.embedding_space
+    for video_id, transcript in TRANSCRIPTS.items():
+        asyncio.run(rag_service.add_video_to_index(video_id, transcript))
+    return spaces
+
+
+def switch_model(spaces, monkeypatch):
+    monkeypatch.setattr(rag_service, "llm_router", LLMRouter([NEW, OLD]))
+    spaces.configure(NEW)
+
+
+def search(query, video_id=None):
+    return asyncio.run(rag_service.search_similar_chunks(query, video_id, limit=5))
+
+
+def test_first_space_is_active(spaces):
+    """Test the first configured model's space is active and every video is indexed there"""
+    assert spaces.active == OLD.embedding_space
+    assert spaces.target is None
+    assert spaces.pending() == []
+    assert [c["video_id"] for c in search("sunlight energy", "v1")] == ["v1"]
+
+
+def test_model_change_starts_migration(spaces, monkeypatch):
+    """Test a new model becomes the target; reads stay on the old space until a video is re-embedded"""
+    switch_model(spaces, monkeypatch)
+
+    assert spaces.target == NEW.embedding_space
+    assert spaces.pending() == ["v1", "v2"]
+    assert spaces.read_space("v1") == OLD.embedding_space
+    assert spaces.write_space() == NEW.embedding_space
+    assert [c["video_id"] for c in search("sunlight energy", "v1")] == ["v1"]
+
+
+def test_dual_read_during_backfill(spaces, monkeypatch):
+    """Test cross-video search reads each video from exactly one space mid-migration"""
+    switch_model(spaces, monkeypatch)
+    asyncio.run(rag_service.add_video_to_index("v1", TRANSCRIPTS["v1"], space=NEW.embedding_space))
+
+    assert spaces.read_space("v1") == NEW.embedding_space
+    assert spaces.read_space("v2") == OLD.embedding_space
+    assert spaces.pending() == ["v2"]
+    assert spaces.read_space_many(["v1", "v2"]) == {"v1": NEW.embedding_space, "v2": OLD.embedding_space}
+
+    # The search resolves every hit's space in one call, not one per hit
+    monkeypatch.setattr(spaces, "read_space", None)
+    hits = search("sunlight energy bastille")
+    assert sorted(c["video_id"] for c in hits) == ["v1", "v2"]
+    assert hits == sorted(hits, key=lambda c: -c["score"])
+
+
+def test_cutover_waits_for_backfill(spaces, monkeypatch):
+    """Test cutover refuses with pending videos, then retires the old space after the backfill"""
+    switch_model(spaces, monkeypatch)
+    with pytest.raises(ValueError):
+        spaces.cutover()
+
+    assert asyncio.run(run_backfill(spaces, videos_per_minute=60000)) == 2
+    result = spaces.cutover(drop_old=True)
+
+    assert result == {"retired": OLD.embedding_space, "active": NEW.embedding_space, "skipped": 0}
+    assert (spaces.active, spaces.target) == (NEW.embedding_space, None)
+    assert vector_store._store.spaces() == {NEW.embedding_space}
+    assert [c["video_id"] for c in search("french revolution", "v2")] == ["v2"]
+
+    status = spaces.status()
+    assert {s["name"]: s["state"] for s in status["spaces"]} == {
+        OLD.embedding_space: EmbeddingSpaceState.RETIRED,
+        NEW.embedding_space: EmbeddingSpaceState.ACTIVE,
+    }
+
+
+def test_backfill_runs_in_one_worker(spaces, monkeypatch, db_session):
+    """Test a worker leaves the backfill to the one holding the target's lease, then takes it over"""
+    switch_model(spaces, monkeypatch)
+    monkeypatch.setattr(embedding_spaces, "BACKFILL_LEASE_TTL", 0.2)
+    assert leases.claim(db_session, EmbeddingSpace, NEW.embedding_space, 0.2, owner="other-worker")
+
+    # The other worker's lease is live, so nothing is done until it lapses
+    started = time.monotonic()
+    assert asyncio.run(run_backfill(spaces, videos_per_minute=60000)) == 2
+    assert time.monotonic() - started >= 0.1
+    assert spaces.pending() == []
+
+    # The finished worker gave its lease up
+    db_session.expire_all()
+    assert db_session.get(EmbeddingSpace, NEW.embedding_space).lease_owner is None
+
+
+
+def test_forced_cutover_skips_pending(spaces, monkeypatch, db_session):
+    """Test a forced cutover activates the target even with videos left to re-embed"""
+    switch_model(spaces, monkeypatch)
+    assert spaces.cutover(force=True)["skipped"] == 2
+    assert spaces.active == NEW.embedding_space
+    assert db_session.query(VideoEmbedding).count() == 0
+
+
+def test_embedding_in_unknown_space_fails():
+    """Test the router refuses to embed into a space no configured provider owns"""
+    with pytest.raises(ProviderError):
+        asyncio.run(LLMRouter([OLD]).embed(["text"], space=NEW.embedding_space))
+
+
+def test_model_change_within_one_provider(db_session, tmp_path, monkeypatch):
+    """Test after a model change on the same provider, unmigrated videos are still queried with the old model"""
+    models = []
+
+    async def embed(self, texts):
+        models.append(self.embedding_model)
+        dimensions = 32 if self.embedding_model == "text-embedding-3-large" else 16
+        return await FakeProvider(dimensions=dimensions).embed(texts)
+
+    def start_worker(embedding_model):
+        router = LLMRouter.from_settings(Settings(
+            _env_file=None, llm_provider="openai", openai_api_key="sk-test", google_api_key="",
+            embedding_model=embedding_model,
+        ))
+        monkeypatch.setattr(rag_service, "llm_router", router)
+        spaces.configure(router.embedding_provider())
+
+    monkeypatch.setattr(OpenAIProvider, "embed", embed)
+    spaces = EmbeddingSpaces(session_factory=sessionmaker(bind=db_session.get_bind()), refresh_interval=0)
+    monkeypatch.setattr(vector_store, "_store", ChromaVectorStore(str(tmp_path), shard_mode="video"))
+    monkeypatch.setattr(rag_service, "embedding_spaces", spaces)
+    rag_service.answer_cache.clear()
+    db_session.add(Video(id="v1", title="v1", status=VideoStatus.COMPLETED))
+    db_session.flush()
+    save_transcript(db_session, "v1", TRANSCRIPTS["v1"])
+    db_session.commit()
+
+    start_worker("")
+    asyncio.run(rag_service.add_video_to_index("v1", TRANSCRIPTS["v1"]))
+    for old, new in (("text-embedding-ada-002", "text-embedding-3-small"),
+                     ("text-embedding-3-small", "text-embedding-3-large")):
+        start_worker(new)
+        assert (spaces.active, spaces.target) == (f"openai-{old}", f"openai-{new}")
+
+        models.clear()
+        assert [c["video_id"] for c in search("sunlight energy", "v1")] == ["v1"]
+        assert models == [old]
+        # New vectors come from the new model
+        asyncio.run(rag_service.get_embeddings([f"new video {new}"]))
+        assert models[-1] == new
+
+        assert asyncio.run(run_backfill(spaces, videos_per_minute=60000)) == 1
+        spaces.cutover()
+
+
+def test_workers_racing_to_register_adopt_once(tmp_path, monkeypatch):
+    """Test two workers configuring at once agree on one active space and adopt legacy vectors once"""
+    from sqlalchemy import create_engine, event
+    from app.database import Base
+
+    engine = create_engine(f"sqlite:///{tmp_path}/race.db")
+    Base.metadata.create_all(bind=engine)
+    adopted = []
+
+    class Store:
+        def adopt_legacy(self, space):
+            adopted.append(space)
+            return 0
+
+    monkeypatch.setattr(vector_store, "_store", Store())
+    first = EmbeddingSpaces(session_factory=sessionmaker(bind=engine), refresh_interval=0)
+    second = EmbeddingSpaces(session_factory=sessionmaker(bind=engine), refresh_interval=0)
+
+    session = first.session_factory()
+
+    @event.listens_for(session, "before_flush", once=True)
+    def other_worker_wins(*args):
+        # The other worker registers between this one's read and its insert
+        second.configure(OLD)
+
+    assert first.configure(OLD, session) == OLD.embedding_space
+    session.close()
+
+    assert adopted == [OLD.embedding_space]
+    assert first.active == second.active == OLD.embedding_space
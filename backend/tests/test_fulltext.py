@@ -0,0 +1,132 @@
+"""
+Tests for full-text search: the FTS5 index over transcripts and notes, its
+sync on writes, and the phrase/keyword search modes
+"""
+from app.models import Note, Video, VideoStatus
+from app.models.fulltext import CREATE_STATEMENTS
+from app.services import rag_service
+from app.services.fulltext import KEYWORD, PHRASE, match_expression, search_text
+from app.services.transcript_store import delete_transcript, save_transcript
+
+
+def filler(words: int, tag: str) -> str:
+    return " ".join(f"{tag}{i}" for i in range(words))
+
+
+def add_video(db, title: str, transcript: str = None) -> Video:
+    video = Video(title=title, source_type="upload", status=VideoStatus.COMPLETED)
+    db.add(video)
+    db.flush()
+    if transcript:
+        save_transcript(db, video.id, transcript)
+    db.commit()
+    return video
+
+
+def test_match_expression_quotes_user_input():
+    """Test query words become quoted terms, so FTS syntax in a query is inert"""
+    assert match_expression('gradient "clipping"', PHRASE) == '"gradient clipping"'
+    assert match_expression("gradient NOT clip*", KEYWORD) == '"gradient" "NOT" "clip"*'
+    assert match_expression("  -- ) ", PHRASE) is None
+
+
+def test_phrase_search_with_snippet_and_timestamp(db_session):
+    """Test an exact phrase is found in its segment with a highlighted snippet and its own time"""
+    # The phrase is 400 words in: the third ~60s segment, 160s into the video
+    transcript = f"{filler(400, 'w')} so we use gradient clipping <here> {filler(300, 'x')} clipping gradient"
+    video = add_video(db_session, "Optimization", transcript)
+
+    results = search_text(db_session, "gradient clipping", PHRASE)
+    assert len(results) == 1
+    hit = results[0]
+    assert (hit["video_id"], hit["video_title"], hit["source"]) == (video.id, "Optimization", "transcript")
+    assert hit["timestamp_start"] == 160 + int(4 / 2.5)
+    assert hit["timestamp_end"] == 180
+    assert "use <mark>gradient clipping</mark> &lt;here&gt;" in hit["snippet"]
+    assert hit["snippet"].startswith("…") and hit["snippet"].endswith("…")
+    assert hit["relevance_score"] > 0
+
+    # Keyword mode also matches the reversed words at the end
+    assert len(search_text(db_session, "clipping gradi", KEYWORD)) == 2
+    assert search_text(db_session, "gradient clipping", PHRASE, video_id="other") == []
+
+
+def test_index_follows_transcript_changes(db_session):
+    """Test replacing or deleting a transcript updates the index"""
+    video = add_video(db_session, "Lecture", "the old wording")
+    assert len(search_text(db_session, "old wording", PHRASE)) == 1
+
+    save_transcript(db_session, video.id, "the new wording")
+    db_session.commit()
+    assert search_text(db_session, "old wording", PHRASE) == []
+    assert len(search_text(db_session, "new wording", PHRASE)) == 1
+
+    delete_transcript(db_session, video.id)
+    db_session.commit()
+    assert search_text(db_session, "wording", KEYWORD) == []
+
+
+def test_notes_are_searchable(db_session):
+    """Test notes are indexed, updated and removed by the triggers"""
+    video = add_video(db_session, "Lecture", "nothing relevant")
+    note = Note(video_id=video.id, content="Remember: learning rate warmup matters", timestamp=95)
+    db_session.add(note)
+    db_session.commit()
+
+    results = search_text(db_session, "rate warmup", PHRASE)
+    assert [(r["source"], r["note_id"], r["timestamp_start"]) for r in results] == [("note", note.id, 95)]
+    assert "learning <mark>rate warmup</mark> matters" in results[0]["snippet"]
+    assert search_text(db_session, "rate warmup", PHRASE, include_notes=False) == []
+
+    note.content = "cosine schedule"
+    db_session.commit()
+    assert search_text(db_session, "warmup", KEYWORD) == []
+    assert len(search_text(db_session, "cosine", KEYWORD)) == 1
+
+    db_session.delete(note)
+    db_session.commit()
+    assert search_text(db_session, "cosine", KEYWORD) == []
+
+
+def test_notes_index_survives_rowid_changes(db_session):
+    """Test notes stay matched to their index rows when the table's implicit rowids change"""
+    video = add_video(db_session, "Lecture", "nothing relevant")
+    notes = [Note(video_id=video.id, content=f"note{i} about {word}") for i, word in enumerate(["alpha", "beta", "gamma"])]
+    db_session.add_all(notes)
+    db_session.commit()
+
+    # What VACUUM or a table rebuild may do: renumber rowids without firing triggers
+    connection = db_session.connection()
+    connection.exec_driver_sql("DROP TRIGGER notes_fts_update")
+    connection.exec_driver_sql("UPDATE notes SET rowid = rowid + 1000")
+    for statement in CREATE_STATEMENTS:
+        connection.exec_driver_sql(statement)
+    db_session.commit()
+
+    results = search_text(db_session, "gamma", KEYWORD)
+    assert [(r["note_id"], r["text"]) for r in results] == [(notes[2].id, "note2 about gamma")]
+    db_session.delete(notes[2])
+    db_session.commit()
+    assert search_text(db_session, "gamma", KEYWORD) == []
+
+
+def test_search_endpoint_modes(client, db_session, monkeypatch):
+    """Test phrase and keyword modes are answered without an embedding call"""
+    video = add_video(db_session, "Regularization", "dropout randomly zeroes activations during training")
+    client.post(f"/api/videos/{video.id}/notes", json={"content": "dropout rate 0.5 works"})
+
+    async def no_embeddings(*args, **kwargs):
+        raise AssertionError("full-text search must not embed")
+
+    monkeypatch.setattr(rag_service, "get_embeddings", no_embeddings)
+
+    response = client.post("/api/search", json={"query": "dropout", "mode": "keyword"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 2
+    assert {r["source"] for r in body["results"]} == {"transcript", "note"}
+
+    response = client.post("/api/search", json={"query": "zeroes activations", "mode": "phrase", "limit": 5})
+    assert [r["video_id"] for r in response.json()["results"]] == [video.id]
+
+    assert client.post("/api/search", json={"query": "x", "mode": "fuzzy"}).status_code == 422
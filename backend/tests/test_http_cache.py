@@ -0,0 +1,83 @@
+"""
+Tests for conditional GET (ETag / Last-Modified) on read endpoints
+"""
+from app.models import Quiz, Video, VideoStatus
+from app.services.transcript_store import save_transcript
+
+
+def create_video(client, title="Cache Test"):
+    response = client.post(
+        "/api/videos/process-url",
+        json={"url": "https://youtube.com/watch?v=cache_test", "title": title}
+    )
+    return response.json()["id"]
+
+
+def test_video_etag_round_trip(client):
+    """Test a matching If-None-Match returns 304 until the video changes"""
+    video_id = create_video(client)
+
+    first = client.get(f"/api/videos/{video_id}")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+    assert "Last-Modified" in first.headers
+
+    cached = client.get(f"/api/videos/{video_id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+    client.post(f"/api/videos/{video_id}/like")
+    changed = client.get(f"/api/videos/{video_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["is_liked"] is True
+
+
+def test_notes_etag_changes_on_write(client):
+    """Test the notes listing is revalidated after a note is added"""
+    video_id = create_video(client)
+
+    etag = client.get(f"/api/videos/{video_id}/notes").headers["ETag"]
+    assert client.get(
+        f"/api/videos/{video_id}/notes", headers={"If-None-Match": etag}
+    ).status_code == 304
+
+    client.post(f"/api/videos/{video_id}/notes", json={"content": "new", "timestamp": 5})
+    response = client.get(f"/api/videos/{video_id}/notes", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+
+
+def test_transcript_etag_depends_on_window(client, db_session):
+    """Test transcript windows are validated independently"""
+    video = Video(title="Transcript Cache", status=VideoStatus.COMPLETED)
+    db_session.add(video)
+    db_session.flush()
+    save_transcript(db_session, video.id, "some words " * 500)
+    db_session.commit()
+
+    url = f"/api/videos/{video.id}/transcript"
+    etag = client.get(url).headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(
+        url, params={"from": 0, "to": 60}, headers={"If-None-Match": etag}
+    ).status_code == 200
+
+
+def test_quiz_is_immutable(client, db_session):
+    """Test quizzes are served with long-lived cache headers"""
+    quiz = Quiz(video_id="v1", questions=[
+        {"id": "q1", "question": "?", "options": [{"id": "a", "text": "A"}], "correct_answer": "a"}
+    ])
+    db_session.add(quiz)
+    db_session.commit()
+
+    response = client.get(f"/api/quiz/{quiz.id}")
+    assert response.status_code == 200
+    assert "immutable" in response.headers["Cache-Control"]
+    assert "correct_answer" not in response.json()["questions"][0]
+
+    cached = client.get(f"/api/quiz/{quiz.id}", headers={"If-None-Match": response.headers["ETag"]})
+    assert cached.status_code == 304
@@ -0,0 +1,137 @@
+"""
+Tests for provider routing: failover, retries, circuit breaking and hedging
+"""
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.config import Settings
+from app.services.llm_router import CircuitBreaker, LLMRouter
+from app.services.providers import FakeProvider, ProviderError
+
+
+def make_router(*providers, **kwargs):
+    kwargs.setdefault("backoff_base", 0)
+    kwargs.setdefault("timeout", 1.0)
+    return LLMRouter(list(providers), **kwargs)
+
+
+def test_fails_over_to_second_provider():
+    """Test a failing primary falls through to the next provider"""
+    broken = FakeProvider(failure_rate=1.0, name="broken")
+    healthy = FakeProvider(name="healthy")
+    router = make_router(broken, healthy, max_retries=0)
+
+    answer = asyncio.run(router.generate("system", "hello"))
+    assert answer.startswith("Fake answer")
+    assert router.stats["broken"].errors == 1
+    assert router.stats["healthy"].successes == 1
+
+
+def test_timeout_raises_provider_error():
+    """Test a slow provider is cut off at the configured timeout"""
+    router = make_router(FakeProvider(latency=0.5), timeout=0.05, max_retries=1)
+    with pytest.raises(ProviderError):
+        asyncio.run(router.generate("system", "hello"))
+    assert router.stats["fake"].errors == 2
+
+
+def test_circuit_opens_and_recovers():
+    """Test the circuit opens after repeated failures and half-opens after the reset timeout"""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    assert breaker.allow()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()  # only one trial call at a time
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_open_circuit_skips_provider():
+    """Test a provider with an open circuit is not called"""
+    broken = FakeProvider(failure_rate=1.0, name="broken")
+    healthy = FakeProvider(name="healthy")
+    router = make_router(broken, healthy, max_retries=0, failure_threshold=1, reset_timeout=60)
+
+    asyncio.run(router.generate("system", "one"))
+    asyncio.run(router.generate("system", "two"))
+    assert router.stats["broken"].errors == 1
+    assert router.status()["broken"]["circuit"] == "open"
+
+
+def test_hedged_request_takes_fastest():
+    """Test a hedge to the secondary wins when the primary is slow"""
+    slow = FakeProvider(latency=0.5, name="slow")
+    fast = FakeProvider(latency=0.01, name="fast")
+    router = make_router(slow, fast, hedge_enabled=True, hedge_min_delay=0.02)
+    # History says the primary usually answers in 20ms, so hedge after that
+    for _ in range(5):
+        router.stats["slow"].record(0.02, ok=True)
+
+    started = time.monotonic()
+    asyncio.run(router.generate("system", "hello"))
+    assert time.monotonic() - started < 0.4
+    assert router.hedges == 1
+    assert router.hedge_wins == 1
+    # The cancelled primary is not counted as a failure
+    assert router.stats["slow"].errors == 0
+    assert router.stats["slow"].successes == 5
+
+
+def test_embeddings_never_fail_over():
+    """Test embeddings stay on the primary provider's vector space"""
+    broken = FakeProvider(failure_rate=1.0, name="broken")
+    healthy = FakeProvider(name="healthy")
+    router = make_router(broken, healthy, max_retries=1)
+
+    with pytest.raises(ProviderError):
+        asyncio.run(router.embed(["text"]))
+    assert router.stats["healthy"].successes == 0
+
+
+def test_embedding_provider_is_explicit():
+    """Test embeddings come from the configured provider, not whichever LLM is preferred"""
+    preferred = FakeProvider(name="preferred", dimensions=16)
+    embedder = FakeProvider(name="embedder", dimensions=32)
+    router = make_router(preferred, embedder, embedding="embedder")
+
+    assert router.embedding_provider() is embedder
+    assert len(asyncio.run(router.embed(["text"]))[0]) == 32
+    assert router.stats["preferred"].successes == 0
+
+    # A missing embedding provider fails rather than embedding into another space
+    router = make_router(preferred, embedding="embedder")
+    assert router.embedding_provider() is None
+    with pytest.raises(ProviderError):
+        asyncio.run(router.embed(["text"]))
+
+
+def test_default_embedding_provider_from_settings():
+    """Test without EMBEDDING_PROVIDER the first provider with a key embeds, whichever LLM is preferred"""
+    def embedder(**values):
+        return LLMRouter.from_settings(Settings(_env_file=None, **values)).embedding_provider()
+
+    assert embedder(google_api_key="", openai_api_key="sk-test").name == "openai"
+    assert embedder(google_api_key="g-key", openai_api_key="sk-test", llm_provider="openai").name == "google"
+    assert embedder(llm_provider="fake", google_api_key="", openai_api_key="").name == "fake"
+    # EMBEDDING_PROVIDER= (empty, as in .env.example) is unset too
+    assert embedder(google_api_key="", openai_api_key="sk-test", embedding_provider="").name == "openai"
+    # Only an explicitly configured provider that has no key fails
+    assert embedder(google_api_key="", openai_api_key="sk-test", embedding_provider="google") is None
+
+
+def test_fake_provider_quiz_output_is_valid_json():
+    """Test the fake provider answers quiz prompts with parseable questions"""
+    provider = FakeProvider()
+    output = asyncio.run(provider.generate("Create 3 multiple choice questions based on...", "go"))
+    questions = json.loads(output)
+    assert len(questions) == 3
+    assert questions[0]["correct_answer"] == "a"
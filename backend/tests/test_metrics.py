@@ -0,0 +1,115 @@
+"""
+Tests for the Prometheus /metrics endpoint
+"""
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+from opentelemetry.sdk.trace import TracerProvider
+from sqlalchemy import text
+
+from app.metrics import SQLMetricsProcessor, registry
+from app.services import rag_service
+from app.services.llm_router import LLMRouter
+from app.services.providers import FakeProvider, ProviderError
+from app.telemetry import instrument_sqlalchemy, tracer
+
+
+def sample(name, **labels):
+    return registry.get_sample_value(name, labels) or 0
+
+
+def test_metrics_endpoint_exposes_runtime_state(client):
+    """Test scrape output includes lanes, caches, DB pool and request latency"""
+    client.get("/api/videos")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/videos",status="200"}' in body
+    assert 'llm_lane_queued{lane="background"}' in body
+    assert 'answer_cache_lookups_total{result="hit"}' in body
+    assert 'singleflight_requests_total{flight="llm",outcome="coalesced"}' in body
+    assert "db_pool_checked_out" in body
+
+
+def test_unmatched_paths_share_one_series(client):
+    """Test unknown URLs don't create a latency series each"""
+    client.get("/no/such/page")
+    assert sample("http_request_duration_seconds_count", method="GET", route="unmatched", status="404") >= 1
+
+
+@pytest.fixture
+def sql_metrics():
+    """Span-derived SQL metrics, as with METRICS_SQL_ENABLED, for one test"""
+    provider = TracerProvider()
+    provider.add_span_processor(SQLMetricsProcessor())
+    previous = tracer.use(provider)
+    yield
+    tracer.use(previous)
+
+
+def test_tracing_stays_off_by_default(client):
+    """Test default metrics don't turn on the tracing SDK"""
+    assert tracer.provider is None
+
+
+def test_pipeline_metrics_without_tracing(client, fake_rag, db_session):
+    """Test a default deployment's /metrics has stage, vector query, batch size and provider samples"""
+    before = {
+        "answer": sample("stage_duration_seconds_count", stage="rag.answer"),
+        "vector": sample("vector_query_duration_seconds_count"),
+        "batch": sample("embedding_batch_size_count"),
+        "provider": sample("llm_provider_call_duration_seconds_count", provider="fake"),
+    }
+
+    asyncio.run(rag_service.get_rag_response("v1", "a fresh question for metrics", db_session))
+
+    assert tracer.provider is None
+    assert sample("stage_duration_seconds_count", stage="rag.answer") == before["answer"] + 1
+    assert sample("vector_query_duration_seconds_count") == before["vector"] + 1
+    assert sample("embedding_batch_size_count") == before["batch"] + 1
+    # One embedding call and one generation
+    assert sample("llm_provider_call_duration_seconds_count", provider="fake") == before["provider"] + 2
+
+    body = client.get("/metrics").text
+    assert 'stage_duration_seconds_count{stage="rag.answer"}' in body
+    assert 'llm_provider_call_duration_seconds_count{provider="fake"}' in body
+    assert "ingest_tasks_in_progress" in body
+
+
+def test_provider_errors_counted():
+    """Test failed provider calls are counted per provider"""
+    before = sample("llm_provider_errors_total", provider="metrics-broken")
+    router = LLMRouter([FakeProvider(failure_rate=1.0, name="metrics-broken")], max_retries=0)
+    with pytest.raises(ProviderError):
+        asyncio.run(router.generate("system", "user"))
+    assert sample("llm_provider_errors_total", provider="metrics-broken") == before + 1
+
+
+def test_sql_metrics_from_spans(sql_metrics, db_session):
+    """Test METRICS_SQL_ENABLED turns statement spans into the SQL latency histogram"""
+    instrument_sqlalchemy(db_session.get_bind())
+    before = sample("db_query_duration_seconds_count", operation="SELECT")
+    db_session.execute(text("SELECT 1"))
+    assert sample("db_query_duration_seconds_count", operation="SELECT") == before + 1
+
+
+def test_multiprocess_scrape_merges_workers(tmp_path):
+    """Test PROMETHEUS_MULTIPROC_DIR makes a scrape report every worker's samples"""
+    worker = (
+        "from app.metrics import http_request_duration, render\n"
+        "http_request_duration.labels('GET', '/api/videos', '200').observe(0.1)\n"
+        "print(render().decode())\n"
+    )
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for _ in range(2):
+        out = subprocess.run(
+            [sys.executable, "-c", worker], env=env, cwd=backend, capture_output=True, text=True, check=True
+        ).stdout
+
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/videos",status="200"} 2.0' in out
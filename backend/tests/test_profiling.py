@@ -0,0 +1,84 @@
+"""
+Tests for admin-only profiling
+"""
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.profiling import ProfilingMiddleware, heap_tracker
+
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+def make_app():
+    app = FastAPI()
+
+    @app.get("/slow")
+    def slow():
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            sum(range(1000))
+        return {"ok": True}
+
+    app.add_middleware(ProfilingMiddleware, admin_token="secret")
+    return app
+
+
+def test_sampled_profile_returns_folded_stacks():
+    """Test X-Profile: sample returns flamegraph-ready folded stacks"""
+    client = TestClient(make_app())
+    response = client.get("/slow", headers={"X-Profile": "sample", **ADMIN})
+
+    assert response.status_code == 200
+    assert response.headers["X-Profile-Status"] == "200"
+    lines = response.text.strip().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert any("slow (test_profiling.py" in line for line in lines)
+
+
+def test_cprofile_mode_and_auth():
+    """Test cProfile output for admins; everyone else gets the normal response"""
+    client = TestClient(make_app())
+
+    response = client.get("/slow", headers={"X-Profile": "cprofile", **ADMIN})
+    assert "cumulative" in response.text
+    # The sync endpoint ran on a worker thread, which is profiled too
+    assert "slow (test_profiling.py" in response.text.split("Other threads")[1]
+
+    response = client.get("/slow", headers={"X-Profile": "cprofile", "X-Admin-Token": "wrong"})
+    assert response.json() == {"ok": True}
+
+
+def test_memory_endpoints_hidden_when_disabled(client):
+    """Test the admin endpoints 404 unless profiling is enabled"""
+    assert client.post("/api/admin/memory/start", headers=ADMIN).status_code == 404
+
+
+def test_memory_snapshot_and_diff(client, monkeypatch):
+    """Test tracemalloc snapshot and diff, admin token required"""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "profiling_enabled", True)
+    monkeypatch.setattr(settings, "admin_token", "secret")
+
+    assert client.post("/api/admin/memory/start").status_code == 403
+    assert client.get("/api/admin/memory/diff", headers=ADMIN).status_code == 409
+
+    try:
+        assert client.post("/api/admin/memory/start", headers=ADMIN).json()["tracing"] is True
+        retained = [bytearray(1024) for _ in range(200)]
+
+        snapshot = client.get("/api/admin/memory/snapshot", headers=ADMIN).json()
+        assert snapshot["traced_bytes"] > 0
+        assert snapshot["top"]
+
+        diff = client.get("/api/admin/memory/diff", headers=ADMIN, params={"group_by": "lineno"}).json()
+        assert diff["growth_bytes"] > 200 * 1024
+        assert any("test_profiling.py" in entry["where"] for entry in diff["top"])
+        del retained
+    finally:
+        assert client.post("/api/admin/memory/stop", headers=ADMIN).json()["tracing"] is False
+    assert not heap_tracker.tracing
@@ -0,0 +1,131 @@
+"""
+Query plan regression tests
+
+Runs EXPLAIN QUERY PLAN against the hot lookup queries so a schema or
+query change can't quietly bring full table scans (or sorts) back.
+"""
+import os
+from datetime import date, datetime
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import and_, inspect, or_, text
+
+from app.models import Video, ChatMessage, Quiz, QuizAttempt, Note, TranscriptSegment, UsageRecord, IngestItem, VideoSummary
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def explain(session, query) -> list:
+    """Return the EXPLAIN QUERY PLAN detail lines for an ORM query"""
+    compiled = query.statement.compile(
+        dialect=session.bind.dialect,
+        compile_kwargs={"literal_binds": True},
+    )
+    rows = session.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    return [row[-1] for row in rows]
+
+
+def assert_indexed(plan: list, lookup: bool = True):
+    """Fail if the plan full-scans a table or sorts in a temp b-tree"""
+    for detail in plan:
+        assert not (detail.startswith("SCAN ") and "INDEX" not in detail), plan
+        assert "TEMP B-TREE" not in detail, plan
+    if lookup:
+        assert any(detail.startswith("SEARCH ") for detail in plan), plan
+
+
+HOT_QUERIES = {
+    "video_list": lambda db: db.query(Video.id, Video.title).order_by(
+        Video.created_at.desc(), Video.id.desc()
+    ).limit(51),
+    "video_list_by_status": lambda db: db.query(Video.id, Video.title).filter(
+        Video.status == "completed"
+    ).order_by(Video.created_at.desc(), Video.id.desc()).limit(51),
+    "video_list_next_page": lambda db: db.query(Video.id, Video.title).filter(
+        or_(
+            Video.created_at < datetime(2026, 1, 1),
+            and_(Video.created_at == datetime(2026, 1, 1), Video.id < "v1"),
+        )
+    ).order_by(Video.created_at.desc(), Video.id.desc()).limit(51),
+    "chat_history": lambda db: db.query(ChatMessage).filter(
+        ChatMessage.video_id == "v1"
+    ).order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc()).limit(51),
+    "chat_history_before": lambda db: db.query(ChatMessage).filter(
+        ChatMessage.video_id == "v1",
+        or_(
+            ChatMessage.created_at < datetime(2026, 1, 1),
+            and_(ChatMessage.created_at == datetime(2026, 1, 1), ChatMessage.id < "m1"),
+        ),
+    ).order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc()).limit(51),
+    "chat_export": lambda db: db.query(ChatMessage).filter(
+        ChatMessage.video_id == "v1"
+    ).order_by(ChatMessage.created_at.asc(), ChatMessage.id.asc()),
+    "notes_for_video": lambda db: db.query(Note).filter(
+        Note.video_id == "v1"
+    ).order_by(Note.timestamp.asc()),
+    "quizzes_for_video": lambda db: db.query(Quiz).filter(
+        Quiz.video_id == "v1"
+    ).order_by(Quiz.created_at.desc()),
+    "transcript_window": lambda db: db.query(TranscriptSegment).filter(
+        TranscriptSegment.video_id == "v1",
+        TranscriptSegment.start > 60,
+        TranscriptSegment.start < 300,
+    ).order_by(TranscriptSegment.start),
+    "latest_attempt": lambda db: db.query(QuizAttempt).filter(
+        QuizAttempt.quiz_id == "q1"
+    ).order_by(QuizAttempt.created_at.desc()).limit(1),
+    "usage_ledger_upsert": lambda db: db.query(UsageRecord).filter_by(
+        day=date(2026, 1, 1), route="POST /api/chat", video_id="v1",
+        kind="generate", provider="google", model="gemini-2.0-flash",
+    ),
+    "ingest_resume": lambda db: db.query(IngestItem).filter(
+        IngestItem.job_id == "j1", IngestItem.status == "pending"
+    ).order_by(IngestItem.line).limit(100),
+    "summaries_for_video": lambda db: db.query(VideoSummary).filter(
+        VideoSummary.video_id == "v1", VideoSummary.level == "chapter"
+    ).order_by(VideoSummary.seq),
+}
+
+# Queries that legitimately walk a whole index (no WHERE clause)
+INDEX_SCANS = {"video_list"}
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_index(db_session, name):
+    """Every hot lookup path is served from an index without sorting"""
+    plan = explain(db_session, HOT_QUERIES[name](db_session))
+    assert_indexed(plan, lookup=name not in INDEX_SCANS)
+
+
+def test_migration_creates_model_indexes(db_session):
+    """The Alembic migration round-trips exactly the indexes the models declare"""
+    config = Config()
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+
+    with db_session.bind.connect() as connection:
+        config.attributes["connection"] = connection
+        expected = {
+            table: {ix["name"] for ix in inspect(connection).get_indexes(table)}
+            for table in (
+                "videos", "chat_messages", "notes", "quizzes", "quiz_attempts",
+                "transcript_segments", "usage_ledger", "embedding_spaces", "video_embeddings",
+                "ingest_jobs", "ingest_items", "video_summaries",
+            )
+        }
+
+        # create_all already built the head schema
+        command.stamp(config, "head")
+        command.downgrade(config, "base")
+        for table in expected:
+            if inspect(connection).has_table(table):
+                assert inspect(connection).get_indexes(table) == []
+
+        command.upgrade(config, "head")
+        for table, names in expected.items():
+            actual = {ix["name"] for ix in inspect(connection).get_indexes(table)}
+            assert actual == names
+        # Full-text tables come back too
+        assert {"transcript_fts", "notes_fts"} <= set(inspect(connection).get_table_names())
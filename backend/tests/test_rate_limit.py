@@ -0,0 +1,99 @@
+"""
+Tests for cost-weighted, cross-worker rate limiting
+"""
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.utils.rate_limit import RateLimitMiddleware, SQLiteBucketBackend
+
+
+def make_app(backend, capacity=20, refill=0.001):
+    app = FastAPI()
+
+    @app.get("/api/videos")
+    def list_videos():
+        return []
+
+    @app.post("/api/chat")
+    def chat():
+        return {"ok": True}
+
+    @app.get("/health")
+    def health():
+        return {"status": "healthy"}
+
+    app.add_middleware(RateLimitMiddleware, backend=backend, capacity=capacity, refill_per_second=refill)
+    return app
+
+
+def test_route_costs(tmp_path):
+    """Test LLM-backed routes cost more than plain reads"""
+    middleware = RateLimitMiddleware(None, SQLiteBucketBackend(str(tmp_path / "rl.db")), 10, 1)
+    assert middleware.cost("GET", "/api/videos") == 1
+    assert middleware.cost("POST", "/api/chat") == 10
+    assert middleware.cost("POST", "/api/quiz/generate") == 20
+    assert middleware.cost("POST", "/api/quiz/abc/submit") == 10
+
+
+def test_expensive_routes_exhaust_bucket(tmp_path):
+    """Test two chat calls drain a 20-token bucket and block further requests"""
+    client = TestClient(make_app(SQLiteBucketBackend(str(tmp_path / "rl.db"))))
+
+    assert client.post("/api/chat").status_code == 200
+    response = client.post("/api/chat")
+    assert response.status_code == 200
+    assert response.headers["X-RateLimit-Remaining"] == "0"
+
+    response = client.get("/api/videos")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+    # Non-API routes are never limited
+    assert client.get("/health").status_code == 200
+
+
+def test_bucket_shared_across_workers(tmp_path):
+    """Test separate backends on the same file (one per worker) share a bucket"""
+    path = str(tmp_path / "rl.db")
+    worker_a = SQLiteBucketBackend(path)
+    worker_b = SQLiteBucketBackend(path)
+
+    async def main():
+        results = []
+        for i in range(6):
+            backend = worker_a if i % 2 == 0 else worker_b
+            allowed, _, _ = await backend.consume("1.2.3.4", 1, 4, 0.001)
+            results.append(allowed)
+        return results
+
+    assert asyncio.run(main()) == [True, True, True, True, False, False]
+
+
+def test_bucket_refills(tmp_path):
+    """Test tokens come back at the refill rate"""
+    backend = SQLiteBucketBackend(str(tmp_path / "rl.db"))
+
+    async def main():
+        assert (await backend.consume("k", 5, 5, 1000))[0]
+        await asyncio.sleep(0.01)
+        return await backend.consume("k", 5, 5, 1000)
+
+    allowed, _, retry_after = asyncio.run(main())
+    assert allowed
+    assert retry_after == 0.0
+
+
+def test_full_buckets_are_pruned(tmp_path):
+    """Test buckets idle long enough to refill are deleted, without changing any decision"""
+    backend = SQLiteBucketBackend(str(tmp_path / "rl.db"), prune_interval=0)
+
+    async def main():
+        await backend.consume("idle", 5, 5, 1000)
+        await asyncio.sleep(0.01)
+        return await backend.consume("busy", 5, 5, 1000)
+
+    assert asyncio.run(main())[0]
+    keys = [key for (key,) in backend._conn.execute("SELECT key FROM rate_buckets")]
+    assert keys == ["busy"]
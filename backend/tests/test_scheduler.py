@@ -0,0 +1,87 @@
+"""
+Tests for LLM admission control and priority lanes
+"""
+import asyncio
+
+import pytest
+
+from app.services import rag_service
+from app.services.scheduler import (
+    BACKGROUND, INTERACTIVE, QUIZ, LaneConfig, LaneSaturated, PriorityScheduler
+)
+
+
+def make_scheduler(concurrency=1, queue=10, background_concurrency=None):
+    return PriorityScheduler(concurrency, {
+        INTERACTIVE: LaneConfig(0, queue, concurrency),
+        QUIZ: LaneConfig(1, queue, concurrency),
+        BACKGROUND: LaneConfig(2, queue, background_concurrency or concurrency),
+    })
+
+
+def test_higher_priority_lane_runs_first():
+    """Test queued interactive work is admitted before earlier-queued quiz work"""
+    scheduler = make_scheduler()
+    order = []
+
+    async def job(lane, name, hold=0.0):
+        async with scheduler.slot(lane):
+            order.append(name)
+            await asyncio.sleep(hold)
+
+    async def main():
+        first = asyncio.ensure_future(job(BACKGROUND, "ingest", hold=0.02))
+        await asyncio.sleep(0)
+        quiz = asyncio.ensure_future(job(QUIZ, "quiz"))
+        await asyncio.sleep(0)
+        chat = asyncio.ensure_future(job(INTERACTIVE, "chat"))
+        await asyncio.gather(first, quiz, chat)
+
+    asyncio.run(main())
+    assert order == ["ingest", "chat", "quiz"]
+
+
+def test_lane_concurrency_cap():
+    """Test background work cannot take every slot"""
+    scheduler = make_scheduler(concurrency=3, background_concurrency=1)
+    peak = {"background": 0}
+
+    async def job(lane):
+        async with scheduler.slot(lane):
+            peak[lane] = max(peak.get(lane, 0), scheduler.running_by_lane[lane])
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(*[job(BACKGROUND) for _ in range(4)], job(INTERACTIVE))
+
+    asyncio.run(main())
+    assert peak["background"] == 1
+    assert scheduler.running == 0
+
+
+def test_full_queue_sheds_load():
+    """Test requests beyond the lane's queue bound are rejected immediately"""
+    scheduler = make_scheduler(queue=1)
+
+    async def main():
+        async with scheduler.slot(QUIZ):
+            waiter = asyncio.ensure_future(scheduler.acquire(QUIZ))
+            await asyncio.sleep(0)
+            with pytest.raises(LaneSaturated) as exc:
+                await scheduler.acquire(QUIZ)
+            assert exc.value.retry_after >= 1
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+
+    asyncio.run(main())
+    assert scheduler.stats()[QUIZ] == {"running": 0, "queued": 0, "shed": 1}
+
+
+def test_saturated_lane_returns_429(client, monkeypatch):
+    """Test the API answers 429 with Retry-After when a lane is saturated"""
+    monkeypatch.setattr(rag_service, "llm_scheduler", make_scheduler(concurrency=0, queue=0))
+
+    response = client.post("/api/search", json={"query": "anything"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
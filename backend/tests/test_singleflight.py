@@ -0,0 +1,98 @@
+"""
+Tests for single-flight coalescing of provider calls
+"""
+import asyncio
+
+import pytest
+
+from app.services import rag_service
+from app.services.singleflight import SingleFlight, request_key
+
+
+def test_request_key_normalizes_whitespace():
+    """Test keys ignore whitespace differences but not part boundaries"""
+    assert request_key("a  b\n", "c") == request_key("a b", "c")
+    assert request_key("a", "b") != request_key("a b")
+
+
+def test_concurrent_duplicates_share_one_call():
+    """Test identical concurrent requests await a single call"""
+    flight = SingleFlight("test")
+    calls = []
+
+    async def work(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value * 2
+
+    async def main():
+        same = [flight.do("k", lambda: work(1)) for _ in range(5)]
+        other = flight.do("other", lambda: work(2))
+        return await asyncio.gather(*same, other)
+
+    results = asyncio.run(main())
+    assert results == [2, 2, 2, 2, 2, 4]
+    assert sorted(calls) == [1, 2]
+    assert flight.stats() == {"calls": 2, "coalesced": 4, "in_flight": 0}
+
+
+def test_errors_reach_every_waiter():
+    """Test a failed call raises for all coalesced callers, then is retried fresh"""
+    flight = SingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("provider down")
+
+    async def main():
+        return await asyncio.gather(
+            *[flight.do("k", fail) for _ in range(3)], return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert flight.stats()["calls"] == 1
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(flight.do("k", fail))
+    assert flight.stats()["calls"] == 2
+
+
+def test_cancelled_caller_does_not_cancel_shared_call():
+    """Test the remaining waiters still get the result if the first caller goes away"""
+    flight = SingleFlight("test")
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_generate_llm_response_coalesces(monkeypatch):
+    """Test duplicate prompts hitting the RAG service make one provider call"""
+    calls = []
+
+    async def fake_call_llm(system_prompt, user_message):
+        calls.append(user_message)
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    monkeypatch.setattr(rag_service, "_call_llm", fake_call_llm)
+
+    async def main():
+        return await asyncio.gather(*[
+            rag_service.generate_llm_response("system", "Generate 10 questions.")
+            for _ in range(10)
+        ])
+
+    assert asyncio.run(main()) == ["answer"] * 10
+    assert len(calls) == 1
@@ -0,0 +1,92 @@
+"""
+Tests for lazy startup: import side effects, lifespan init and warm-up
+"""
+import os
+import subprocess
+import sys
+
+from app import startup
+from app.config import Settings
+from app.services import vector_store
+from app.services.llm_router import LLMRouter
+from app.services.providers import FakeProvider
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeStore:
+    def count(self):
+        return 0
+
+
+def test_import_defers_heavy_modules(tmp_path):
+    """Test importing the app neither loads chromadb/provider SDKs nor touches disk"""
+    env = dict(
+        os.environ,
+        UPLOAD_DIR=str(tmp_path / "uploads"),
+        CHROMA_PERSIST_DIR=str(tmp_path / "chroma"),
+    )
+    probe = (
+        "import sys, app.main; "
+        "print(','.join(m for m in ('chromadb', 'httpx', 'google.generativeai', 'openai', 'tiktoken') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", probe], cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+    assert not (tmp_path / "uploads").exists()
+    assert not (tmp_path / "chroma").exists()
+
+
+def test_import_leaves_no_files_or_global_state(tmp_path):
+    """Test importing the app opens no rate-limit file and installs no tracing or metrics collectors"""
+    env = dict(os.environ, RATE_LIMIT_SQLITE_PATH=str(tmp_path / "ratelimit.db"), TRACING_EXPORTER="console")
+    probe = (
+        "import app.main; "
+        "from app.metrics import _runtime_collectors; from app.telemetry import tracer; "
+        "print(len(_runtime_collectors), tracer.provider)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", probe], cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "0 None"
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_init_resources_creates_directories(tmp_path):
+    """Test lifespan init creates the upload and vector store directories"""
+    settings = Settings(upload_dir=str(tmp_path / "uploads"), chroma_persist_dir=str(tmp_path / "chroma"))
+    startup.init_resources(settings)
+    assert (tmp_path / "uploads").is_dir()
+    assert (tmp_path / "chroma").is_dir()
+
+
+def test_warm_up_runs_each_step_once(monkeypatch):
+    """Test warm-up opens the vector store and records per-step timings"""
+    monkeypatch.setattr(startup, "warmup_status", {"state": "idle", "steps": {}, "error": None})
+    monkeypatch.setattr(vector_store, "_store", FakeStore())
+    monkeypatch.setattr("app.services.llm_router.llm_router", LLMRouter([FakeProvider()]))
+
+    status = startup.warm_up()
+    assert status["state"] == "ready"
+    assert set(status["steps"]) == {"database", "vector_store", "providers", "tokenizer"}
+
+    calls = []
+    monkeypatch.setattr(startup, "WARMUP_STEPS", (("database", lambda: calls.append(1)),))
+    startup.warm_up()
+    assert calls == []
+
+
+def test_warm_up_failure_is_reported(monkeypatch):
+    """Test a failing warm-up step marks warm-up failed instead of raising"""
+    monkeypatch.setattr(startup, "warmup_status", {"state": "idle", "steps": {}, "error": None})
+
+    def broken():
+        raise RuntimeError("vector store unavailable")
+
+    monkeypatch.setattr(startup, "WARMUP_STEPS", (("vector_store", broken),))
+    status = startup.warm_up()
+    assert status["state"] == "failed"
+    assert "vector store unavailable" in status["error"]
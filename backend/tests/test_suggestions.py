@@ -0,0 +1,151 @@
+"""
+Tests for search autocomplete: the prefix index, its snapshot and the
+/api/search/suggestions endpoint
+"""
+from app.models import Video, VideoStatus
+from app.routers import search as search_router
+from app.services.suggestions import SuggestionIndex, salient_phrases
+from app.services.transcript_store import save_transcript
+
+LECTURE = (
+    "Today we study gradient descent. Gradient descent updates the weights. "
+    "The learning rate controls gradient descent, and a small learning rate is slow. "
+    "Momentum helps gradient descent too."
+)
+
+
+def texts(results):
+    return [r["text"] for r in results]
+
+
+def test_salient_phrases_skip_stopwords():
+    """Test repeated phrases are kept and ones framed by stopwords are not"""
+    phrases = dict(salient_phrases(LECTURE))
+    assert phrases["gradient descent"] == 4
+    assert phrases["learning rate"] == 2
+    assert "the weights" not in phrases and "descent the" not in phrases
+    # Said only once
+    assert "momentum" not in phrases
+
+
+def test_prefix_lookup_and_ranking():
+    """Test titles match at any word, rank above phrases, and popular queries rise"""
+    index = SuggestionIndex()
+    index.add_video("v1", "Intro to Gradient Descent", LECTURE)
+    index.add_video("v2", "Graph Neural Networks")
+
+    results = index.suggest("gra")
+    assert results[:2] == [
+        {"text": "Intro to Gradient Descent", "kind": "title", "video_id": "v1"},
+        {"text": "Graph Neural Networks", "kind": "title", "video_id": "v2"},
+    ]
+    assert "gradient descent" in texts(results)
+    # Word starts inside a title, but not stopwords
+    assert texts(index.suggest("neural")) == ["Graph Neural Networks"]
+    assert "Intro to Gradient Descent" in texts(index.suggest("descent"))
+    assert index.suggest("to gra") == []
+    assert index.suggest("learning r", limit=1)[0]["text"] == "learning rate"
+    assert index.suggest("   ") == []
+
+    for _ in range(3):
+        index.record_query("Graph attention networks")
+    index.record_query("graph coloring")
+    # Cached lookups under a changed term are dropped
+    assert texts(index.suggest("graph a")) == ["graph attention networks"]
+    assert texts(index.suggest("graph"))[:3] == [
+        "graph attention networks", "Graph Neural Networks", "graph coloring"
+    ]
+
+
+def test_incremental_updates():
+    """Test re-indexing and deleting a video replace its contributions"""
+    index = SuggestionIndex()
+    index.add_video("v1", "Old Title", LECTURE)
+    index.add_video("v2", "Other", LECTURE)
+    assert texts(index.suggest("old")) == ["Old Title"]
+
+    index.add_video("v1", "New Title", LECTURE)
+    assert index.suggest("old") == []
+    assert texts(index.suggest("new")) == ["New Title"]
+
+    index.remove_video("v1")
+    assert index.suggest("new") == []
+    # Still salient in v2
+    assert "gradient descent" in texts(index.suggest("gradient"))
+    index.remove_video("v2")
+    assert len(index) == 0
+
+
+def test_short_prefixes_rank_the_whole_catalogue():
+    """Test one-letter prefixes find the strongest terms however many keys sort before them"""
+    index = SuggestionIndex(cache_size=0)
+    for i in range(6000):
+        index.add_video(f"v{i}", f"a{i:05d}")
+    for _ in range(3):
+        index.record_query("azure pipelines")
+    assert index.suggest("a", limit=1) == [{"text": "azure pipelines", "kind": "query"}]
+
+    # A term climbing into the ranked list, then dropping back when its title goes
+    index.add_video("z", "Apache Arrow")
+    index.record_query("apache arrow")
+    assert texts(index.suggest("a", limit=2)) == ["Apache Arrow", "azure pipelines"]
+    index.remove_video("z")
+    assert texts(index.suggest("a", limit=2)) == ["azure pipelines", "a00000"]
+
+
+def test_snapshot_merges_workers(tmp_path):
+    """Test a restart loads the snapshot and two workers' changes both survive"""
+    path = str(tmp_path / "suggestions.json")
+    first, second = SuggestionIndex(path), SuggestionIndex(path)
+    first.add_video("v1", "Linear Algebra", LECTURE)
+    first.sync()
+    assert second.load()
+
+    first.add_video("v2", "Calculus")
+    second.add_video("v3", "Statistics")
+    second.record_query("linear regression")
+    first.sync()
+    second.sync()
+    first.sync()
+
+    for index in (first, second):
+        assert texts(index.suggest("lin")) == ["Linear Algebra", "linear regression"]
+        assert texts(index.suggest("calc")) == ["Calculus"]
+        assert texts(index.suggest("stat")) == ["Statistics"]
+
+    restarted = SuggestionIndex(path)
+    assert restarted.load()
+    assert "gradient descent" in texts(restarted.suggest("grad"))
+    assert not SuggestionIndex(str(tmp_path / "missing.json")).load()
+
+
+def test_start_builds_from_database(db_session, tmp_path):
+    """Test a worker without a snapshot indexes completed videos and writes one"""
+    done = Video(title="Thermodynamics", source_type="upload", status=VideoStatus.COMPLETED)
+    pending = Video(title="Topology", source_type="upload", status=VideoStatus.PENDING)
+    db_session.add_all([done, pending])
+    db_session.flush()
+    save_transcript(db_session, done.id, "entropy increases. entropy is a measure of disorder.")
+    db_session.commit()
+
+    index = SuggestionIndex(str(tmp_path / "suggestions.json"))
+    index.start(lambda: db_session)
+    assert index.ready
+    assert texts(index.suggest("t")) == ["Thermodynamics"]
+    assert texts(index.suggest("entr")) == ["entropy"]
+    assert (tmp_path / "suggestions.json").exists()
+
+
+def test_suggestions_endpoint(client, monkeypatch):
+    """Test the endpoint answers from the index and validates its parameters"""
+    index = SuggestionIndex()
+    index.add_video("v1", "Organic Chemistry")
+    monkeypatch.setattr(search_router, "suggestion_index", index)
+
+    response = client.get("/api/search/suggestions", params={"q": "org"})
+    assert response.status_code == 200
+    assert response.json() == {
+        "suggestions": [{"text": "Organic Chemistry", "kind": "title", "video_id": "v1"}]
+    }
+    assert client.get("/api/search/suggestions", params={"q": "zzz"}).json() == {"suggestions": []}
+    assert client.get("/api/search/suggestions", params={"q": "org", "limit": 0}).status_code == 422
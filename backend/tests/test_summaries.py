@@ -0,0 +1,230 @@
+"""
+Tests for the per-video summary tree: building it at ingest, routing
+overview questions to it, and the summary endpoint
+"""
+import asyncio
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.models import SummaryLevel, Video, VideoStatus, VideoSummary
+from app.services import rag_service, summaries, video_processor
+from app.services.summaries import build_summary_tree, route_question, summarize_video
+from app.services.video_processor import create_summaries, process_video_task
+
+
+def transcript(words: int) -> str:
+    return " ".join(f"w{i}" for i in range(words))
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Fake summarizer/answerer recording every prompt it is given"""
+    calls = []
+
+    async def generate(system_prompt, user_message, **kwargs):
+        calls.append((system_prompt, user_message))
+        if system_prompt.startswith("Summarize"):
+            first = user_message.split()[0]
+            return f"About {first}\nThis part starts with {first}."
+        return "overview answer"
+
+    monkeypatch.setattr(summaries, "generate_llm_response", generate)
+    return calls
+
+
+@pytest.fixture
+def chat(monkeypatch):
+    """Chat through get_rag_response with chunk retrieval counted"""
+    retrieved = []
+
+    async def fake_embeddings(texts, **kwargs):
+        return [[1.0, 0.0] for _ in texts]
+
+    async def fake_search(question, video_id, limit=5, **kwargs):
+        retrieved.append(question)
+        return [{"text": "chunk", "video_id": video_id, "start": 1300, "end": 1500, "score": 0.9}]
+
+    async def fake_chunk_answer(system_prompt, user_message, **kwargs):
+        return "chunk answer"
+
+    monkeypatch.setattr(rag_service, "get_embeddings", fake_embeddings)
+    monkeypatch.setattr(rag_service, "search_similar_chunks", fake_search)
+    monkeypatch.setattr(rag_service, "generate_llm_response", fake_chunk_answer)
+    monkeypatch.setattr(summaries, "search_similar_chunks", fake_search)
+    rag_service.answer_cache.clear()
+
+    def ask(db, video_id, question):
+        return asyncio.run(rag_service.get_rag_response(video_id, question, db))
+
+    ask.retrieved = retrieved
+    yield ask
+    rag_service.answer_cache.clear()
+
+
+def summarized_video(db, words: int = 7000) -> Video:
+    video = Video(title="Deep Learning", source_type="upload", status=VideoStatus.COMPLETED)
+    db.add(video)
+    db.commit()
+    asyncio.run(summarize_video(db, video.id, transcript(words)))
+    return video
+
+
+def test_tree_levels_and_call_counts(llm):
+    """Test sections roll up into chapters and one video summary, reusing single children"""
+    # 5 minutes: one section, reused as its chapter and the video summary
+    nodes = asyncio.run(build_summary_tree("Short", transcript(750)))
+    assert [n["level"] for n in nodes] == [SummaryLevel.SECTION, SummaryLevel.CHAPTER, SummaryLevel.VIDEO]
+    assert len(llm) == 1
+    assert {(n["heading"], n["summary"]) for n in nodes} == {("About w0", "This part starts with w0.")}
+
+    # ~47 minutes: 5 sections -> chapters of 4 and 1 -> video
+    llm.clear()
+    nodes = asyncio.run(build_summary_tree("Long", transcript(7000)))
+    sections = [n for n in nodes if n["level"] == SummaryLevel.SECTION]
+    chapters = [n for n in nodes if n["level"] == SummaryLevel.CHAPTER]
+    assert len(sections) == 5 and len(chapters) == 2
+    assert [s["parent_seq"] for s in sections] == [0, 0, 0, 0, 1]
+    assert (chapters[0]["start"], chapters[0]["end"]) == (0, sections[3]["end"])
+    assert chapters[1]["summary"] == sections[4]["summary"]
+    # 5 sections, the 4-section chapter and the video
+    assert len(llm) == 7
+    assert "[0s - 600s] About w0: This part starts with w0." in llm[5][1]
+
+
+def test_route_question():
+    """Test overview questions pick a summary level and everything else uses retrieval"""
+    assert route_question("Can you summarize this video?") == SummaryLevel.VIDEO
+    assert route_question("What is this lecture about?") == SummaryLevel.VIDEO
+    assert route_question("tl;dr please") == SummaryLevel.VIDEO
+    assert route_question("What are the main topics covered?") == SummaryLevel.CHAPTER
+    assert route_question("Give me an outline") == SummaryLevel.CHAPTER
+    assert route_question("Summarize what happens at 12:30") == SummaryLevel.SECTION
+    assert route_question("Recap the ending") == SummaryLevel.SECTION
+    assert route_question("What are the main topics of this video?") == SummaryLevel.CHAPTER
+    assert route_question("Summarize the part about gradient clipping") == SummaryLevel.SECTION
+    assert route_question("How does backpropagation compute gradients?") is None
+    assert route_question("What happens at the end of training?") is None
+
+
+def test_content_questions_are_not_routed():
+    """Test overview words around a subject of the question's own still use retrieval"""
+    for question in (
+        "Explain the heap data structure",
+        "How does the chapter rule work in calculus?",
+        "What is the key idea behind attention?",
+        "Can you summarize how backprop works?",
+        "Give me an overview of transformers",
+        "Summarize the end of training",
+    ):
+        assert route_question(question) is None, question
+
+
+def test_overview_question_answered_from_summaries(llm, chat, db_session):
+    """Test an overview question is answered from the tree with a small prompt and no retrieval"""
+    video = summarized_video(db_session)
+    llm.clear()
+
+    response = chat(db_session, video.id, "Can you summarize this video?")
+
+    assert response["message"] == "overview answer"
+    assert chat.retrieved == []
+    prompt = llm[0][0]
+    video_summary = db_session.query(VideoSummary).filter(VideoSummary.level == SummaryLevel.VIDEO).one()
+    assert video_summary.summary in prompt
+    # Chapters appear as an outline only
+    assert "[0s - 2400s] About" in prompt and "This part starts with w1500" not in prompt
+    assert response["references"][0] == {"start": 0, "end": 2400, "text": video_summary.heading}
+    # Far smaller than the five retrieved chunks it replaces
+    chunks = rag_service.chunk_text(transcript(7000))[:5]
+    assert len(prompt) * 5 < len(rag_service.build_chat_prompt("Deep Learning", chunks))
+
+    # Repeats come from the answer cache
+    assert chat(db_session, video.id, "Can you summarize this video?") == response
+    assert len(llm) == 1
+
+
+def test_section_questions_pick_the_right_part(llm, chat, db_session):
+    """Test a timestamp, a position word or retrieved chunks select the section summaries"""
+    video = summarized_video(db_session)
+
+    for question, start in (
+        ("Summarize what happens at 12:30", 600),
+        ("Recap the ending for me", 2400),
+        ("Summarize the part about w3300", 1200),
+    ):
+        # Every question embeds the same, so each would hit the answer cache
+        rag_service.answer_cache.clear()
+        llm.clear()
+        response = chat(db_session, video.id, question)
+        assert [r["start"] for r in response["references"]] == [start]
+        assert f"This part starts with w{int(start * 2.5)}." in llm[0][0]
+    # Only the last question needed retrieval
+    assert chat.retrieved == ["Summarize the part about w3300"]
+
+
+def test_falls_back_to_chunks(llm, chat, db_session):
+    """Test other questions, and videos without summaries, use chunk retrieval"""
+    video = summarized_video(db_session)
+    assert chat(db_session, video.id, "What optimizer is used?")["message"] == "chunk answer"
+
+    other = Video(title="Unsummarized", source_type="upload", status=VideoStatus.COMPLETED)
+    db_session.add(other)
+    db_session.commit()
+    assert chat(db_session, other.id, "Summarize this video")["message"] == "chunk answer"
+    assert len(chat.retrieved) == 2
+
+
+def test_failed_summarization_stores_nothing(monkeypatch, db_session):
+    """Test one failing call leaves no partial tree and doesn't fail ingest"""
+    async def generate(system_prompt, user_message, **kwargs):
+        if "w3000" in user_message:
+            raise RuntimeError("provider down")
+        return "Heading\nSummary."
+
+    monkeypatch.setattr(summaries, "generate_llm_response", generate)
+    video = Video(title="Lecture", source_type="upload", status=VideoStatus.COMPLETED)
+    db_session.add(video)
+    db_session.commit()
+
+    asyncio.run(create_summaries(db_session, video.id, transcript(7000)))
+    assert db_session.query(VideoSummary).count() == 0
+
+
+def test_video_completes_before_summarizing(monkeypatch, db_session):
+    """Test chat isn't held up by summarization: the video is completed first"""
+    statuses = []
+
+    async def no_embeddings(video_id, transcript):
+        pass
+
+    async def generate(system_prompt, user_message, **kwargs):
+        db_session.expire_all()
+        statuses.append(db_session.get(Video, video.id).status)
+        return "Heading\nSummary."
+
+    monkeypatch.setattr(video_processor, "SessionLocal", sessionmaker(bind=db_session.get_bind()))
+    monkeypatch.setattr(video_processor, "create_embeddings", no_embeddings)
+    monkeypatch.setattr(summaries, "generate_llm_response", generate)
+    video = Video(title="Lecture", source_type="upload", status=VideoStatus.PENDING)
+    db_session.add(video)
+    db_session.commit()
+
+    asyncio.run(process_video_task(video.id, "unused.mp4", is_local=True))
+
+    assert statuses and set(statuses) == {VideoStatus.COMPLETED}
+    assert db_session.query(VideoSummary).count() == 3
+
+
+def test_summary_endpoint_and_delete(llm, client, db_session):
+    """Test the tree endpoint nests sections under chapters and deleting a video drops them"""
+    video = summarized_video(db_session)
+
+    body = client.get(f"/api/videos/{video.id}/summary").json()
+    assert body["video"]["level"] == SummaryLevel.VIDEO
+    assert [len(c["sections"]) for c in body["chapters"]] == [4, 1]
+    assert body["chapters"][1]["sections"][0]["start"] == 2400
+    assert client.get("/api/videos/missing/summary").status_code == 404
+
+    assert client.delete(f"/api/videos/{video.id}").status_code == 200
+    assert db_session.query(VideoSummary).count() == 0
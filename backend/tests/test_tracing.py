@@ -0,0 +1,52 @@
+"""
+Tests for OpenTelemetry spans around the RAG pipeline
+"""
+import asyncio
+
+import pytest
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from app.services import rag_service
+from app.telemetry import instrument_sqlalchemy, tracer
+
+
+@pytest.fixture
+def exporter():
+    """Record this test's spans in memory, then give the app its tracer back"""
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    previous = tracer.use(provider)
+    yield exporter
+    tracer.use(previous)
+    provider.shutdown()
+
+
+def test_chat_pipeline_spans(exporter, fake_rag, db_session):
+    """Test a chat turn records embed, vector query, prompt, LLM and DB spans under one root"""
+    instrument_sqlalchemy(db_session.get_bind())
+
+    asyncio.run(rag_service.get_rag_response("v1", "what is the mitochondria?", db_session))
+    spans = {s.name: s for s in exporter.get_finished_spans()}
+
+    for name in ["rag.embed", "vector.query", "rag.build_prompt", "rag.generate", "llm.provider_call", "db.query"]:
+        assert name in spans
+        assert spans[name].context.trace_id == spans["rag.answer"].context.trace_id
+
+    assert spans["rag.answer"].attributes["cache.hit"] is False
+    assert spans["vector.query"].attributes["vector.hits"] == 1
+    assert spans["rag.build_prompt"].attributes["rag.chunks"] == 1
+    assert spans["rag.generate"].attributes["llm.completion_tokens"] > 0
+    assert spans["llm.provider_call"].attributes["llm.provider"] == "fake"
+
+
+def test_request_span_named_after_route(exporter, client):
+    """Test each request gets a server span named after its route template"""
+    client.get("/api/videos/missing")
+    root = [s for s in exporter.get_finished_spans() if s.kind == trace.SpanKind.SERVER][0]
+
+    assert root.name == "GET /api/videos/{video_id}"
+    assert root.attributes["http.status_code"] == 404
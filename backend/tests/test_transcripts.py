@@ -0,0 +1,62 @@
+"""
+Tests for segmented transcript storage and the transcript endpoint
+"""
+import json
+
+from app.models import Video, VideoStatus
+from app.services.transcript_store import build_segments, save_transcript, load_transcript
+
+
+TRANSCRIPT = "Intro line.\n\n" + " ".join(f"word{i}" for i in range(1000)) + "\nThe end.\n"
+
+
+def create_completed_video(db, transcript=TRANSCRIPT):
+    video = Video(title="Transcript Test", status=VideoStatus.COMPLETED)
+    db.add(video)
+    db.flush()
+    save_transcript(db, video.id, transcript)
+    db.commit()
+    return video.id
+
+
+def test_segments_round_trip():
+    """Test joining segments restores the exact transcript text"""
+    segments = build_segments(TRANSCRIPT)
+    assert len(segments) > 1
+    assert "".join(s["text"] for s in segments) == TRANSCRIPT
+    assert [s["start"] for s in segments] == sorted(s["start"] for s in segments)
+
+
+def test_load_transcript_max_chars(db_session):
+    """Test loading stops once the character budget is reached"""
+    video_id = create_completed_video(db_session)
+    assert load_transcript(db_session, video_id) == TRANSCRIPT
+    assert load_transcript(db_session, video_id, max_chars=50) == TRANSCRIPT[:50]
+    assert load_transcript(db_session, "missing") is None
+
+
+def test_get_transcript_window(client, db_session):
+    """Test fetching only the segments overlapping a time window"""
+    video_id = create_completed_video(db_session)
+
+    response = client.get(f"/api/videos/{video_id}/transcript", params={"from": 120, "to": 300})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["segments"]
+    for segment in data["segments"]:
+        assert segment["end"] > 120 and segment["start"] < 300
+    assert "Intro line." not in data["transcript"]
+
+    full = client.get(f"/api/videos/{video_id}/transcript").json()
+    assert full["transcript"] == TRANSCRIPT
+
+
+def test_get_transcript_ndjson(client, db_session):
+    """Test streaming the transcript as NDJSON"""
+    video_id = create_completed_video(db_session)
+
+    response = client.get(f"/api/videos/{video_id}/transcript", params={"format": "ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert "".join(line["text"] for line in lines) == TRANSCRIPT
@@ -0,0 +1,117 @@
+"""
+Tests for token and cost metering
+"""
+import asyncio
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.models import UsageRecord, Video, VideoStatus
+from app.services.usage import UsageMeter, report_usage, usage_meter, usage_scope, GENERATE
+
+
+def test_meter_aggregates_and_prefers_reported_usage(db_session):
+    """Test calls with the same key collapse into one ledger row"""
+    meter = UsageMeter(session_factory=lambda: db_session, flush_interval=3600)
+
+    with usage_scope(route="POST /api/chat", video_id="v1"):
+        for _ in range(3):
+            with meter.metered(GENERATE, "a prompt") as call:
+                report_usage("openai", "gpt-4o-mini", prompt_tokens=1000, completion_tokens=500)
+                call["output"] = "answer"
+
+    assert meter.pending() == 1
+    meter.flush(db_session)
+    meter.flush(db_session)  # nothing left to write
+
+    row = db_session.query(UsageRecord).one()
+    assert (row.route, row.video_id, row.provider, row.model) == ("POST /api/chat", "v1", "openai", "gpt-4o-mini")
+    assert (row.calls, row.prompt_tokens, row.completion_tokens) == (3, 3000, 1500)
+    assert abs(row.cost_usd - 3 * (1000 * 0.15 + 500 * 0.60) / 1_000_000) < 1e-12
+
+
+def test_failed_retry_keeps_the_batch(db_session, monkeypatch):
+    """Test a batch whose retry after a key conflict also fails is kept for the next flush"""
+    meter = UsageMeter(session_factory=lambda: db_session, flush_interval=3600)
+    meter.record(GENERATE, "openai", "gpt-4o-mini", 100, 10)
+    errors = [IntegrityError("INSERT", {}, Exception("duplicate key")), OperationalError("UPDATE", {}, Exception("locked"))]
+
+    def write(db, batch):
+        raise errors.pop(0)
+
+    monkeypatch.setattr(meter, "_write", write)
+    with pytest.raises(OperationalError):
+        meter.flush(db_session)
+    assert meter.pending() == 1
+
+    monkeypatch.undo()
+    meter.flush(db_session)
+    assert db_session.query(UsageRecord).one().prompt_tokens == 100
+
+
+def test_idle_usage_is_flushed_periodically_and_on_shutdown(db_session):
+    """Test the flush task writes buffered usage with no new calls, and the rest when cancelled"""
+    def prompt_tokens():
+        return sum(row.prompt_tokens for row in db_session.query(UsageRecord))
+
+    async def periodic():
+        meter = UsageMeter(session_factory=lambda: db_session, flush_interval=0.05)
+        task = asyncio.create_task(meter.run())
+        meter.record(GENERATE, "openai", "gpt-4o-mini", 100, 10)
+        await asyncio.sleep(0.3)
+        assert meter.pending() == 0
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    async def shutdown():
+        meter = UsageMeter(session_factory=lambda: db_session, flush_interval=3600)
+        task = asyncio.create_task(meter.run())
+        meter.record(GENERATE, "openai", "gpt-4o-mini", 50, 5)
+        await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(periodic())
+    assert prompt_tokens() == 100
+    asyncio.run(shutdown())
+    assert prompt_tokens() == 150
+
+
+def test_usage_endpoint_is_read_only(client, monkeypatch):
+    """Test reading usage never writes the ledger"""
+    def flush(*args, **kwargs):
+        raise AssertionError("GET /api/usage flushed the ledger")
+
+    monkeypatch.setattr(usage_meter, "flush", flush)
+    assert client.get("/api/usage").status_code == 200
+
+
+def test_failed_calls_are_not_metered():
+    """Test a provider error leaves nothing in the buffer"""
+    meter = UsageMeter(flush_interval=3600)
+    try:
+        with meter.metered(GENERATE, "prompt"):
+            raise RuntimeError("provider down")
+    except RuntimeError:
+        pass
+    assert meter.pending() == 0
+
+
+def test_usage_endpoint_breaks_down_by_video_and_route(client, db_session, fake_rag):
+    """Test a chat turn is recorded against its video and route template"""
+    db_session.add(Video(id="usage-video", title="Usage", status=VideoStatus.COMPLETED))
+    db_session.commit()
+
+    response = client.post("/api/chat", json={"videoId": "usage-video", "message": "how are tokens counted?"})
+    assert response.status_code == 200
+    usage_meter.flush(db_session)  # as the periodic flush would
+
+    rows = client.get("/api/usage", params={"group_by": "video,route,kind", "video_id": "usage-video"}).json()["rows"]
+    by_kind = {r["kind"]: r for r in rows}
+    assert set(by_kind) == {"embed", "generate"}
+    assert by_kind["generate"]["route"] == "POST /api/chat"
+    assert by_kind["generate"]["calls"] == 1
+    assert by_kind["generate"]["prompt_tokens"] > 0
+    assert by_kind["generate"]["completion_tokens"] > 0
+
+    assert client.get("/api/usage", params={"group_by": "nonsense"}).status_code == 400
@@ -0,0 +1,82 @@
+"""
+Tests for the shared vector service and its thin client
+"""
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.vector_store import ChromaVectorStore, RemoteVectorStore, VectorStoreError
+from app.vector_service import create_app
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SPACE = "fake-fake-hash-3"
+
+
+def add_video(store, video_id, direction):
+    store.add(
+        SPACE,
+        video_id,
+        ids=[f"{video_id}_0", f"{video_id}_1"],
+        embeddings=[direction, [0.5, 0.5, 0.0]],
+        documents=[f"{video_id} first chunk", f"{video_id} second chunk"],
+        metadatas=[{"video_id": video_id, "start": 0, "end": 60}, {"video_id": video_id, "start": 60, "end": 120}],
+    )
+
+
+def test_remote_store_round_trip(tmp_path):
+    """Test add, filtered query, count, delete and drop_space through the service API"""
+    app = create_app(ChromaVectorStore(str(tmp_path / "chroma")))
+    with TestClient(app) as http:
+        store = RemoteVectorStore("http://vector-store", client=http)
+        add_video(store, "a", [1.0, 0.0, 0.0])
+        add_video(store, "b", [0.0, 1.0, 0.0])
+        assert store.count() == 4
+
+        hits = store.query(SPACE, [1.0, 0.0, 0.0], n_results=2)
+        assert hits[0]["id"] == "a_0"
+        assert hits[0]["distance"] == pytest.approx(0.0, abs=1e-5)
+
+        hits = store.query(SPACE, [1.0, 0.0, 0.0], n_results=5, video_id="b")
+        assert {h["metadata"]["video_id"] for h in hits} == {"b"}
+
+        store.delete_video("a")
+        assert store.count() == 2
+
+        assert store.count(SPACE) == 2
+        store.drop_space(SPACE)
+        assert store.count() == 0
+
+
+def test_remote_store_reports_unreachable_service(tmp_path):
+    """Test a missing socket raises VectorStoreError instead of a transport error"""
+    store = RemoteVectorStore(f"unix://{tmp_path}/missing.sock", timeout=1.0)
+    with pytest.raises(VectorStoreError):
+        store.count()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Unix sockets only")
+def test_service_over_unix_socket(tmp_path):
+    """Test workers can share one service process over a Unix socket"""
+    socket_path = tmp_path / "vectors.sock"
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app.vector_service", "--socket", str(socket_path), "--path", str(tmp_path / "chroma")],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while not socket_path.exists():
+            assert process.poll() is None, process.stderr.read().decode()
+            assert time.monotonic() < deadline, "vector service did not start"
+            time.sleep(0.05)
+
+        workers = [RemoteVectorStore(f"unix://{socket_path}") for _ in range(2)]
+        add_video(workers[0], "a", [1.0, 0.0, 0.0])
+        assert workers[1].count() == 2
+        assert workers[1].query(SPACE, [1.0, 0.0, 0.0], n_results=1)[0]["id"] == "a_0"
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
@@ -0,0 +1,169 @@
+"""
+Tests for the sharded Chroma vector store
+"""
+import chromadb
+import pytest
+from chromadb.config import Settings as ChromaSettings
+
+from app.services import vector_store
+from app.services.vector_store import LEGACY_COLLECTION, ChromaVectorStore
+
+
+SPACE = "fake-fake-hash-3"
+
+
+def add_video(store, video_id, embeddings, space=SPACE):
+    store.add(
+        space,
+        video_id,
+        ids=[f"{video_id}_{i}" for i in range(len(embeddings))],
+        embeddings=embeddings,
+        documents=[f"{video_id} chunk {i}" for i in range(len(embeddings))],
+        metadatas=[{"video_id": video_id, "start": i * 60, "end": i * 60 + 60} for i in range(len(embeddings))],
+    )
+
+
+def collection_names(store):
+    return {c.name for c in store.client.list_collections()}
+
+
+@pytest.mark.parametrize("mode", ["video", "bucket", "none"])
+def test_queries_stay_within_video(tmp_path, mode):
+    """Test per-video queries only return that video's chunks in every layout"""
+    store = ChromaVectorStore(str(tmp_path), shard_mode=mode, buckets=2)
+    add_video(store, "a", [[1.0, 0.0, 0.0], [0.9, 0.1, 0.0]])
+    add_video(store, "b", [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+    add_video(store, "c", [[0.0, 0.0, 1.0]])
+
+    hits = store.query(SPACE, [1.0, 0.0, 0.0], n_results=5, video_id="b")
+    assert [h["id"] for h in hits] == ["b_0", "b_1"]
+    assert store.query(SPACE, [1.0, 0.0, 0.0], n_results=5, video_id="missing") == []
+    assert store.count() == 5
+
+
+def test_one_collection_per_video(tmp_path):
+    """Test each video gets its own shard and delete drops it"""
+    store = ChromaVectorStore(str(tmp_path), shard_mode="video")
+    add_video(store, "a", [[1.0, 0.0]])
+    add_video(store, "b", [[0.0, 1.0]])
+    assert collection_names(store) == {store.shard_name(SPACE, "a"), store.shard_name(SPACE, "b")}
+
+    store.delete_video("a")
+    assert collection_names(store) == {store.shard_name(SPACE, "b")}
+    assert store.query(SPACE, [1.0, 0.0], n_results=5, video_id="a") == []
+    store.delete_video("a")  # already gone
+
+
+@pytest.mark.parametrize("fanout_workers", [1, 4])
+def test_cross_video_search_merges_top_k(tmp_path, fanout_workers):
+    """Test searching all videos fans out over shards and keeps the nearest k"""
+    store = ChromaVectorStore(str(tmp_path), shard_mode="video", fanout_workers=fanout_workers)
+    add_video(store, "a", [[1.0, 0.0, 0.0], [0.0, 0.0, 1.0]])
+    add_video(store, "b", [[0.8, 0.2, 0.0], [0.0, 1.0, 0.0]])
+    add_video(store, "c", [[0.9, 0.1, 0.0]])
+
+    hits = store.query(SPACE, [1.0, 0.0, 0.0], n_results=3)
+    assert [h["id"] for h in hits] == ["a_0", "c_0", "b_0"]
+    assert hits == sorted(hits, key=lambda h: h["distance"])
+
+
+@pytest.mark.parametrize("fanout_workers", [1, 4])
+def test_shard_dropped_by_another_process_is_skipped(tmp_path, fanout_workers):
+    """Test searches skip a shard another client deleted after this store cached it"""
+    store = ChromaVectorStore(str(tmp_path), shard_mode="video", fanout_workers=fanout_workers)
+    add_video(store, "a", [[1.0, 0.0, 0.0]])
+    add_video(store, "b", [[0.9, 0.1, 0.0]])
+    add_video(store, "c", [[0.0, 1.0, 0.0]])
+    assert len(store.query(SPACE, [1.0, 0.0, 0.0], n_results=5)) == 3
+
+    other = chromadb.PersistentClient(path=str(tmp_path), settings=ChromaSettings(anonymized_telemetry=False))
+    other.delete_collection(store.shard_name(SPACE, "a"))
+
+    assert [h["id"] for h in store.query(SPACE, [1.0, 0.0, 0.0], n_results=5)] == ["b_0", "c_0"]
+    assert store.query(SPACE, [1.0, 0.0, 0.0], n_results=5, video_id="a") == []
+    assert store.count() == 2
+
+    # Re-created by the other process (e.g. re-indexed): the new collection is found
+    other.delete_collection(store.shard_name(SPACE, "b"))
+    other.create_collection(store.shard_name(SPACE, "b"), metadata={"hnsw:space": "cosine"}).add(
+        ids=["b_new"], embeddings=[[1.0, 0.0, 0.0]], documents=["b again"],
+        metadatas=[{"video_id": "b", "start": 0, "end": 60}],
+    )
+    assert [h["id"] for h in store.query(SPACE, [1.0, 0.0, 0.0], n_results=5)] == ["b_new", "c_0"]
+    assert [h["id"] for h in store.query(SPACE, [1.0, 0.0, 0.0], n_results=5, video_id="b")] == ["b_new"]
+
+
+def test_bucket_delete_keeps_other_videos(tmp_path):
+    """Test deleting a video from a shared bucket leaves its neighbours"""
+    store = ChromaVectorStore(str(tmp_path), shard_mode="bucket", buckets=1)
+    add_video(store, "a", [[1.0, 0.0]])
+    add_video(store, "b", [[0.0, 1.0]])
+
+    store.delete_video("a")
+    assert store.count() == 1
+    assert [h["id"] for h in store.query(SPACE, [1.0, 0.0], n_results=5)] == ["b_0"]
+
+
+def test_unversioned_collection_is_adopted(tmp_path):
+    """Test chunks in the old single collection are moved into a space's shards"""
+    client = chromadb.PersistentClient(path=str(tmp_path), settings=ChromaSettings(anonymized_telemetry=False))
+    legacy = client.get_or_create_collection(LEGACY_COLLECTION, metadata={"hnsw:space": "cosine"})
+    legacy.add(
+        ids=["a_0", "b_0"],
+        embeddings=[[1.0, 0.0], [0.0, 1.0]],
+        documents=["a chunk", "b chunk"],
+        metadatas=[{"video_id": "a", "start": 0, "end": 60}, {"video_id": "b", "start": 0, "end": 60}],
+    )
+
+    store = ChromaVectorStore(str(tmp_path), shard_mode="video")
+    assert store.adopt_legacy(SPACE) == 2
+    assert LEGACY_COLLECTION not in collection_names(store)
+    assert [h["text"] for h in store.query(SPACE, [1.0, 0.0], n_results=5, video_id="a")] == ["a chunk"]
+    assert store.count() == 2
+    assert store.adopt_legacy(SPACE) == 0
+
+
+def test_other_layouts_are_moved_on_open(tmp_path):
+    """Test reopening with another shard mode or bucket count moves the chunks into the new layout"""
+    store = ChromaVectorStore(str(tmp_path), shard_mode="video")
+    for video_id in "abc":
+        add_video(store, video_id, [[1.0, 0.0], [0.0, 1.0]])
+
+    for mode, buckets in (("bucket", 2), ("bucket", 3), ("none", 3)):
+        store = ChromaVectorStore(str(tmp_path), shard_mode=mode, buckets=buckets)
+        assert collection_names(store) == {store.shard_name(SPACE, v) for v in "abc"}
+        assert store.count() == 6
+        assert [h["id"] for h in store.query(SPACE, [1.0, 0.0], n_results=1, video_id="b")] == ["b_0"]
+
+
+@pytest.mark.parametrize("mode", ["video", "bucket", "none"])
+def test_spaces_are_isolated(tmp_path, mode):
+    """Test vectors of different embedding spaces never meet, and a space drops cleanly"""
+    store = ChromaVectorStore(str(tmp_path), shard_mode=mode, buckets=2)
+    add_video(store, "a", [[1.0, 0.0]], space="old")
+    add_video(store, "a", [[0.0, 1.0, 0.0]], space="new")
+    add_video(store, "b", [[1.0, 0.0]], space="old")
+
+    assert store.spaces() == {"old", "new"}
+    assert [h["id"] for h in store.query("new", [1.0, 0.0, 0.0], n_results=5)] == ["a_0"]
+    assert len(store.query("old", [1.0, 0.0], n_results=5)) == 2
+
+    store.delete_video("a", space="old")
+    assert store.count("old") == 1 and store.count("new") == 1
+    store.drop_space("old")
+    assert store.spaces() == {"new"}
+    assert store.query("old", [1.0, 0.0], n_results=5) == []
+
+
+def test_deleting_video_drops_its_vectors(client, tmp_path, monkeypatch):
+    """Test DELETE /api/videos/{id} removes the video's shard"""
+    store = ChromaVectorStore(str(tmp_path), shard_mode="video")
+    monkeypatch.setattr(vector_store, "_store", store)
+    video_id = client.post(
+        "/api/videos/process-url",
+        json={"url": "https://youtube.com/watch?v=shard_test", "title": "Sharded"}
+    ).json()["id"]
+    add_video(store, video_id, [[1.0, 0.0]])
+
+    assert client.delete(f"/api/videos/{video_id}").status_code == 200
+    assert store.shard_name(SPACE, video_id) not in collection_names(store)
@@ -7,7 +7,7 @@ def test_health_check(client):
     """Test health endpoint returns healthy status"""
     response = client.get("/health")
     assert response.status_code == 200
-    assert response.json() == {"status": "healthy"}
+    assert response.json() == {"status": "healthy", "warmup": "idle"}
 
 
 def test_root_endpoint(client):
@@ -82,3 +82,36 @@ def test_toggle_like(client):
     unlike_response = client.post(f"/api/videos/{video_id}/like")
     assert unlike_response.status_code == 200
     assert unlike_response.json()["is_liked"] == False
+
+
+def test_get_all_videos_keyset_pagination(client):
+    """Test paging through videos with the X-Next-Cursor header"""
+    for i in range(5):
+        client.post(
+            "/api/videos/process-url",
+            json={"url": f"https://youtube.com/watch?v=page{i}", "title": f"Page {i}"}
+        )
+    
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/videos", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= 2
+        seen.extend(v["title"] for v in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    
+    # Newest first, no duplicates, nothing skipped
+    assert seen == [f"Page {i}" for i in reversed(range(5))]
+
+
+def test_get_all_videos_invalid_cursor(client):
+    """Test a malformed cursor is rejected"""
+    response = client.get("/api/videos", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
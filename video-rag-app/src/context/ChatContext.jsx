@@ -5,6 +5,8 @@ import { chatAPI } from '../services/api'
 const initialState = {
     messages: [], // Current chat messages
     videoId: null,
+    earlierCursor: null, // Cursor for the page before the oldest loaded message
+    loadingEarlier: false,
     loading: false,
     error: null,
 }
@@ -14,6 +16,8 @@ const ACTIONS = {
     SET_LOADING: 'SET_LOADING',
     SET_ERROR: 'SET_ERROR',
     SET_MESSAGES: 'SET_MESSAGES',
+    SET_LOADING_EARLIER: 'SET_LOADING_EARLIER',
+    PREPEND_MESSAGES: 'PREPEND_MESSAGES',
     ADD_MESSAGE: 'ADD_MESSAGE',
     SET_VIDEO_ID: 'SET_VIDEO_ID',
     CLEAR_CHAT: 'CLEAR_CHAT',
@@ -29,16 +33,34 @@ function chatReducer(state, action) {
             return { ...state, error: action.payload, loading: false }
 
         case ACTIONS.SET_MESSAGES:
-            return { ...state, messages: action.payload, loading: false }
+            return {
+                ...state,
+                messages: action.payload.messages,
+                earlierCursor: action.payload.earlierCursor,
+                loading: false,
+            }
+
+        case ACTIONS.SET_LOADING_EARLIER:
+            return { ...state, loadingEarlier: action.payload }
+
+        case ACTIONS.PREPEND_MESSAGES:
+            // A page for a chat that has since been left
+            if (action.payload.videoId !== state.videoId) return state
+            return {
+                ...state,
+                messages: [...action.payload.messages, ...state.messages],
+                earlierCursor: action.payload.earlierCursor,
+                loadingEarlier: false,
+            }
 
         case ACTIONS.ADD_MESSAGE:
             return { ...state, messages: [...state.messages, action.payload] }
 
         case ACTIONS.SET_VIDEO_ID:
-            return { ...state, videoId: action.payload, messages: [] }
+            return { ...state, videoId: action.payload, messages: [], earlierCursor: null, loadingEarlier: false }
 
         case ACTIONS.CLEAR_CHAT:
-            return { ...state, messages: [] }
+            return { ...state, messages: [], earlierCursor: null }
 
         default:
             return state
@@ -52,19 +74,42 @@ const ChatContext = createContext(null)
 export function ChatProvider({ children }) {
     const [state, dispatch] = useReducer(chatReducer, initialState)
 
-    // Initialize chat for a video
+    // Initialize chat for a video with its newest messages
     const initChat = useCallback(async (videoId) => {
         dispatch({ type: ACTIONS.SET_VIDEO_ID, payload: videoId })
         dispatch({ type: ACTIONS.SET_LOADING, payload: true })
         try {
             const history = await chatAPI.getHistory(videoId)
-            dispatch({ type: ACTIONS.SET_MESSAGES, payload: history.messages || [] })
+            dispatch({
+                type: ACTIONS.SET_MESSAGES,
+                payload: { messages: history.messages || [], earlierCursor: history.next_cursor || null },
+            })
         } catch (error) {
             // If no history exists, that's okay
-            dispatch({ type: ACTIONS.SET_MESSAGES, payload: [] })
+            dispatch({ type: ACTIONS.SET_MESSAGES, payload: { messages: [], earlierCursor: null } })
         }
     }, [])
 
+    // Load the page of messages before the oldest one shown
+    const loadEarlier = useCallback(async () => {
+        if (!state.videoId || !state.earlierCursor || state.loadingEarlier) return
+        dispatch({ type: ACTIONS.SET_LOADING_EARLIER, payload: true })
+        try {
+            const history = await chatAPI.getHistory(state.videoId, state.earlierCursor)
+            dispatch({
+                type: ACTIONS.PREPEND_MESSAGES,
+                payload: {
+                    videoId: state.videoId,
+                    messages: history.messages || [],
+                    earlierCursor: history.next_cursor || null,
+                },
+            })
+        } catch (error) {
+            console.error('Error loading earlier messages:', error)
+            dispatch({ type: ACTIONS.SET_LOADING_EARLIER, payload: false })
+        }
+    }, [state.videoId, state.earlierCursor, state.loadingEarlier])
+
     // Send a message
     const sendMessage = useCallback(async (message) => {
         if (!state.videoId) return
@@ -114,7 +159,9 @@ export function ChatProvider({ children }) {
 
     const value = {
         ...state,
+        hasEarlier: Boolean(state.earlierCursor),
         initChat,
+        loadEarlier,
         sendMessage,
         clearChat,
     }
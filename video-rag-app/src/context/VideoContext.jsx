@@ -3,7 +3,9 @@ import { videoAPI } from '../services/api'
 
 // Initial state
 const initialState = {
-    videos: [],
+    videos: [], // Pages loaded so far
+    nextCursor: null, // Cursor for the next page (null after the last)
+    loadingMore: false,
     currentVideo: null,
     loading: false,
     error: null,
@@ -15,6 +17,8 @@ const ACTIONS = {
     SET_LOADING: 'SET_LOADING',
     SET_ERROR: 'SET_ERROR',
     SET_VIDEOS: 'SET_VIDEOS',
+    SET_LOADING_MORE: 'SET_LOADING_MORE',
+    APPEND_VIDEOS: 'APPEND_VIDEOS',
     ADD_VIDEO: 'ADD_VIDEO',
     UPDATE_VIDEO: 'UPDATE_VIDEO',
     DELETE_VIDEO: 'DELETE_VIDEO',
@@ -33,7 +37,26 @@ function videoReducer(state, action) {
             return { ...state, error: action.payload, loading: false }
 
         case ACTIONS.SET_VIDEOS:
-            return { ...state, videos: action.payload, loading: false }
+            return {
+                ...state,
+                videos: action.payload.videos,
+                nextCursor: action.payload.nextCursor,
+                loading: false,
+            }
+
+        case ACTIONS.SET_LOADING_MORE:
+            return { ...state, loadingMore: action.payload }
+
+        case ACTIONS.APPEND_VIDEOS: {
+            // Videos added since the first page was loaded can shift one onto the next page
+            const loaded = new Set(state.videos.map(v => v.id))
+            return {
+                ...state,
+                videos: [...state.videos, ...action.payload.videos.filter(v => !loaded.has(v.id))],
+                nextCursor: action.payload.nextCursor,
+                loadingMore: false,
+            }
+        }
 
         case ACTIONS.ADD_VIDEO:
             return { ...state, videos: [action.payload, ...state.videos] }
@@ -79,17 +102,31 @@ const VideoContext = createContext(null)
 export function VideoProvider({ children }) {
     const [state, dispatch] = useReducer(videoReducer, initialState)
 
-    // Fetch all videos
+    // Fetch the first page of videos
     const fetchVideos = useCallback(async () => {
         dispatch({ type: ACTIONS.SET_LOADING, payload: true })
         try {
-            const videos = await videoAPI.getAll()
-            dispatch({ type: ACTIONS.SET_VIDEOS, payload: videos })
+            const page = await videoAPI.getPage()
+            dispatch({ type: ACTIONS.SET_VIDEOS, payload: page })
         } catch (error) {
             dispatch({ type: ACTIONS.SET_ERROR, payload: error.message })
         }
     }, [])
 
+    // Fetch the next page of videos, if there is one
+    const fetchMoreVideos = useCallback(async () => {
+        if (!state.nextCursor || state.loadingMore) return
+        dispatch({ type: ACTIONS.SET_LOADING_MORE, payload: true })
+        try {
+            const page = await videoAPI.getPage(state.nextCursor)
+            dispatch({ type: ACTIONS.APPEND_VIDEOS, payload: page })
+        } catch (error) {
+            // Keep the pages already shown; the next scroll retries
+            console.error('Error loading more videos:', error)
+            dispatch({ type: ACTIONS.SET_LOADING_MORE, payload: false })
+        }
+    }, [state.nextCursor, state.loadingMore])
+
     // Process video from URL
     const processVideoUrl = useCallback(async (url, title) => {
         dispatch({ type: ACTIONS.SET_LOADING, payload: true })
@@ -163,7 +200,9 @@ export function VideoProvider({ children }) {
 
     const value = {
         ...state,
+        hasMoreVideos: Boolean(state.nextCursor),
         fetchVideos,
+        fetchMoreVideos,
         processVideoUrl,
         uploadVideo,
         deleteVideo,
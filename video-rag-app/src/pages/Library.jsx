@@ -1,20 +1,32 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { Link } from 'react-router-dom'
 import { motion, AnimatePresence } from 'framer-motion'
 import { useVideos } from '../context'
 import { Header, VideoCard, BottomNavLibrary, PageLoader, ErrorMessage, EmptyState } from '../components'
 
 export default function Library() {
-    const { videos, loading, error, fetchVideos, deleteVideo } = useVideos()
+    const { videos, loading, error, fetchVideos, deleteVideo, hasMoreVideos, loadingMore, fetchMoreVideos } = useVideos()
     const [activeTab, setActiveTab] = useState('All')
     const [searchQuery, setSearchQuery] = useState('')
     const tabs = ['All', 'Processed', 'Processing', 'Failed']
+    const loadMoreRef = useRef(null)
 
-    // Fetch videos on mount
+    // Fetch the first page on mount
     useEffect(() => {
         fetchVideos()
     }, [fetchVideos])
 
+    // Infinite scroll: fetch the next page when the end of the grid comes into view
+    useEffect(() => {
+        const sentinel = loadMoreRef.current
+        if (!sentinel || !hasMoreVideos) return
+        const observer = new IntersectionObserver((entries) => {
+            if (entries[0].isIntersecting) fetchMoreVideos()
+        }, { rootMargin: '400px' })
+        observer.observe(sentinel)
+        return () => observer.disconnect()
+    }, [hasMoreVideos, fetchMoreVideos])
+
     // Filter videos based on tab and search
     const filteredVideos = videos.filter((video) => {
         // Tab filter
@@ -142,6 +154,19 @@ export default function Library() {
                         </AnimatePresence>
                     </div>
                 )}
+
+                {/* Next page: loaded on scroll, or with the button */}
+                {hasMoreVideos && !error && (
+                    <div ref={loadMoreRef} className="flex justify-center py-8">
+                        <button
+                            onClick={fetchMoreVideos}
+                            disabled={loadingMore}
+                            className="px-4 py-2 rounded-full text-sm font-medium text-primary hover:bg-primary/10 disabled:text-gray-400 disabled:hover:bg-transparent transition-colors"
+                        >
+                            {loadingMore ? 'Loading more videos...' : 'Load more'}
+                        </button>
+                    </div>
+                )}
             </main>
 
             {/* Mobile Bottom Nav */}
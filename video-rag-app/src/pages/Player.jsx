@@ -8,8 +8,8 @@ import { Header, PageLoader, ErrorMessage } from '../components'
 export default function Player() {
     const navigate = useNavigate()
     const { videoId } = useParams()
-    const { videos, currentVideo, setCurrentVideo, fetchVideos } = useVideos()
-    const { messages, loading: chatLoading, sendMessage, initChat } = useChat()
+    const { videos, currentVideo, setCurrentVideo } = useVideos()
+    const { messages, loading: chatLoading, sendMessage, initChat, hasEarlier, loadingEarlier, loadEarlier } = useChat()
 
     const [activeTab, setActiveTab] = useState('Chat')
     const [chatInput, setChatInput] = useState('')
@@ -39,8 +39,15 @@ export default function Player() {
                 }
             }
 
-            // Otherwise fetch all videos
-            await fetchVideos()
+            // The library loads page by page, so fetch this one directly
+            try {
+                const video = await videoAPI.getById(videoId)
+                setCurrentVideo(video)
+                await initChat(videoId)
+            } catch (error) {
+                console.error('Error loading video:', error)
+                setCurrentVideo(null)
+            }
             setVideoLoading(false)
         }
 
@@ -65,10 +72,11 @@ export default function Player() {
         fetchNotes()
     }, [videoId])
 
-    // Auto-scroll chat
+    // Auto-scroll chat when a new message arrives (not when earlier ones are loaded)
+    const newestMessageId = messages.length > 0 ? messages[messages.length - 1].id : null
     useEffect(() => {
         chatEndRef.current?.scrollIntoView({ behavior: 'smooth' })
-    }, [messages])
+    }, [newestMessageId])
 
     const handleSendMessage = async (e) => {
         e.preventDefault()
@@ -301,42 +309,55 @@ export default function Player() {
                                             <p className="text-sm">Ask questions about this video</p>
                                         </div>
                                     ) : (
-                                        messages.map((msg) => (
-                                            <div
-                                                key={msg.id}
-                                                className={`flex items-start gap-3 ${msg.role === 'user' ? 'justify-end' : ''}`}
-                                            >
-                                                {msg.role !== 'user' && (
-                                                    <div className="bg-primary rounded-full size-8 shrink-0 flex items-center justify-center">
-                                                        <span className="material-symbols-outlined text-white text-sm">smart_toy</span>
+                                        <>
+                                            {hasEarlier && (
+                                                <div className="text-center">
+                                                    <button
+                                                        onClick={loadEarlier}
+                                                        disabled={loadingEarlier}
+                                                        className="text-xs font-medium text-primary hover:underline disabled:text-gray-400 disabled:no-underline"
+                                                    >
+                                                        {loadingEarlier ? 'Loading earlier messages...' : 'Load earlier messages'}
+                                                    </button>
+                                                </div>
+                                            )}
+                                            {messages.map((msg) => (
+                                                <div
+                                                    key={msg.id}
+                                                    className={`flex items-start gap-3 ${msg.role === 'user' ? 'justify-end' : ''}`}
+                                                >
+                                                    {msg.role !== 'user' && (
+                                                        <div className="bg-primary rounded-full size-8 shrink-0 flex items-center justify-center">
+                                                            <span className="material-symbols-outlined text-white text-sm">smart_toy</span>
+                                                        </div>
+                                                    )}
+                                                    <div className={`max-w-[80%] rounded-2xl px-4 py-3 ${msg.role === 'user'
+                                                        ? 'bg-primary text-white rounded-tr-none'
+                                                        : 'bg-white border border-gray-100 shadow-sm rounded-tl-none'
+                                                        }`}>
+                                                        <p className="text-sm whitespace-pre-wrap">{msg.content}</p>
+                                                        {msg.references && msg.references.length > 0 && (
+                                                            <div className="mt-2 pt-2 border-t border-gray-100">
+                                                                <p className="text-xs text-gray-500 mb-1">References:</p>
+                                                                {msg.references.map((ref, i) => (
+                                                                    <button
+                                                                        key={i}
+                                                                        className="text-xs text-primary hover:underline mr-2"
+                                                                    >
+                                                                        {formatTimestamp(ref.start)} - {formatTimestamp(ref.end)}
+                                                                    </button>
+                                                                ))}
+                                                            </div>
+                                                        )}
                                                     </div>
-                                                )}
-                                                <div className={`max-w-[80%] rounded-2xl px-4 py-3 ${msg.role === 'user'
-                                                    ? 'bg-primary text-white rounded-tr-none'
-                                                    : 'bg-white border border-gray-100 shadow-sm rounded-tl-none'
-                                                    }`}>
-                                                    <p className="text-sm whitespace-pre-wrap">{msg.content}</p>
-                                                    {msg.references && msg.references.length > 0 && (
-                                                        <div className="mt-2 pt-2 border-t border-gray-100">
-                                                            <p className="text-xs text-gray-500 mb-1">References:</p>
-                                                            {msg.references.map((ref, i) => (
-                                                                <button
-                                                                    key={i}
-                                                                    className="text-xs text-primary hover:underline mr-2"
-                                                                >
-                                                                    {formatTimestamp(ref.start)} - {formatTimestamp(ref.end)}
-                                                                </button>
-                                                            ))}
+                                                    {msg.role === 'user' && (
+                                                        <div className="bg-gray-200 rounded-full size-8 shrink-0 flex items-center justify-center">
+                                                            <span className="text-gray-600 text-sm font-bold">U</span>
                                                         </div>
                                                     )}
                                                 </div>
-                                                {msg.role === 'user' && (
-                                                    <div className="bg-gray-200 rounded-full size-8 shrink-0 flex items-center justify-center">
-                                                        <span className="text-gray-600 text-sm font-bold">U</span>
-                                                    </div>
-                                                )}
-                                            </div>
-                                        ))
+                                            ))}
+                                        </>
                                     )}
 
                                     {/* Loading indicator */}
@@ -23,8 +23,17 @@ export function cancelRequest(key) {
     }
 }
 
+// Videos per library page
+const VIDEO_PAGE_SIZE = 50
+
 // Helper function for API calls with optional AbortSignal
 async function apiCall(endpoint, options = {}) {
+    const { data } = await apiRequest(endpoint, options)
+    return data
+}
+
+// Like apiCall, but also returns the response headers (e.g. X-Next-Cursor)
+async function apiRequest(endpoint, options = {}) {
     const url = `${API_BASE_URL}${endpoint}`
 
     const config = {
@@ -48,7 +57,7 @@ async function apiCall(endpoint, options = {}) {
             throw new Error(error.message || `HTTP ${response.status}`)
         }
 
-        return await response.json()
+        return { data: await response.json(), headers: response.headers }
     } catch (error) {
         // Don't log abort errors as they're intentional
         if (error.name === 'AbortError') {
@@ -64,8 +73,14 @@ async function apiCall(endpoint, options = {}) {
 // ============================================
 
 export const videoAPI = {
-    // Get all videos
-    getAll: () => apiCall('/videos'),
+    // Get one page of videos, newest first: the first page, or the one after
+    // `cursor` (a previous page's nextCursor, null after the last page)
+    getPage: async (cursor = null) => {
+        const params = new URLSearchParams({ limit: VIDEO_PAGE_SIZE })
+        if (cursor) params.set('cursor', cursor)
+        const { data, headers } = await apiRequest(`/videos?${params}`)
+        return { videos: data, nextCursor: headers.get('X-Next-Cursor') }
+    },
 
     // Get single video by ID
     getById: (id) => apiCall(`/videos/${id}`),
@@ -124,8 +139,12 @@ export const chatAPI = {
         body: JSON.stringify({ videoId, message }),
     }),
 
-    // Get chat history for a video
-    getHistory: (videoId) => apiCall(`/chat/${videoId}/history`),
+    // Get one page of chat history, oldest message first: the newest page,
+    // or the page before `before` (a previous page's next_cursor)
+    getHistory: (videoId, before = null) => {
+        const params = before ? `?${new URLSearchParams({ before })}` : ''
+        return apiCall(`/chat/${videoId}/history${params}`)
+    },
 
     // Clear chat history
     clearHistory: (videoId) => apiCall(`/chat/${videoId}/history`, { method: 'DELETE' }),